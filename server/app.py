@@ -13,22 +13,279 @@ import time
 import signal
 import logging
 import os
+import re
 import os.path as op
 import json
+import numpy as np
 import tornado.httpserver
+from tornado import gen
 from tornado.ioloop import IOLoop
-from tornado.web import RequestHandler, Application, url, HTTPError
-from tornado.escape import json_encode, json_decode, url_escape, url_unescape
+from tornado.web import RequestHandler, Application, url, HTTPError, stream_request_body
+from tornado.escape import json_encode, json_decode, url_escape, url_unescape, utf8
 from urlparse import urlparse
 from sets import Set
 import config
 from hdf5db import Hdf5db
 import hdf5dtype
 from timeUtil import unixTimeToUTC
+from timingUtil import RequestTimer
+import profileUtil
+import slowLogUtil
+import filePoolUtil
+import flightUtil
+import valueCacheUtil
+import jsonUtil
+import reduceUtil
+import selectionUtil
+import uploadUtil
+from compressUtil import CompressionTransform
 from fileUtil import getFilePath, getDomain, getFileModCreateTimes, makeDirs, verifyFile, getLinkTarget
 
+
+class BaseHandler(RequestHandler):
+    """
+    Common base class for the h5serv request handlers.
+    Sets up the per-request timer and adds the Server-Timing header
+    (when enabled by config or by the X-Server-Timing request header).
+    Admin requests can also ask for the request to be profiled, either with
+    a "profile" query parameter or a X-Profile header.
+    Requests slower than 'slow_request_threshold' are written to the slow
+    request log (if configured).
+    """
+    def initialize(self):
+        self.sendTiming = config.get('server_timing')
+        if not self.sendTiming and 'X-Server-Timing' in self.request.headers:
+            self.sendTiming = True
+        # the slow request log needs phase timings for every request
+        self.timer = RequestTimer(self.sendTiming or slowLogUtil.isEnabled())
+        self.profiler = None
+        self.responseBytes = 0
+        self.requestDetails = {}  # selection/type info for the slow request log
+        
+    def prepare(self):
+        if (self.get_query_argument('profile', None) is not None or 
+                'X-Profile' in self.request.headers):
+            if not self.isAdminRequest():
+                logging.info("profile requested without valid admin key")
+                raise HTTPError(403)
+            self.profiler = profileUtil.startProfile()
+            if self.profiler is None:
+                self.set_header('X-Profile-Id', 'skipped')
+        
+    def isAdminRequest(self):
+        # return True if the request has the configured admin key
+        adminKey = config.get('admin_key')
+        if not adminKey:
+            return False  # admin requests are disabled
+        return self.request.headers.get('X-Admin-Key') == adminKey
+        
+    def getFilePath(self, domain):
+        # map domain to file path (timed as the 'domain' phase)
+        with self.timer.phase('domain'):
+            filePath = getFilePath(domain)
+        return filePath
+        
+    def verifyFile(self, filePath, writable=False):
+        with self.timer.phase('domain'):
+            verifyFile(filePath, writable)
+            
+    def getPrecision(self):
+        # number of significant digits for float values (None for full precision)
+        precision = self.get_query_argument('precision', None)
+        if precision is None:
+            return config.get('float_precision')
+        try:
+            precision = int(precision)
+        except ValueError:
+            logging.info("expected int type for precision")
+            raise HTTPError(400)
+        if precision < 1 or precision > 17:
+            logging.info("precision must be between 1 and 17")
+            raise HTTPError(400)
+        return precision
+            
+    def encodeJson(self, response):
+        # response values may include numpy arrays (see jsonUtil)
+        with self.timer.phase('encode'):
+            body = jsonUtil.encodeResponse(response, self.getPrecision())
+        return body
+        
+    def writeJsonBody(self, body):
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        with self.timer.phase('write'):
+            self.write(body)
+            
+    def writeJson(self, response):
+        self.writeJsonBody(self.encodeJson(response))
+        
+    def isBinaryRequest(self):
+        # client asked for raw values rather than JSON
+        return 'application/octet-stream' in self.request.headers.get('Accept', '')
+        
+    def writeBinaryBody(self, body):
+        self.set_header('Content-Type', 'application/octet-stream')
+        with self.timer.phase('write'):
+            self.write(body)
+        
+    def coalesce(self, func):
+        """
+        Return a Future for the result of func (normally an encoded response 
+        body).  func runs on a read worker thread and is shared by identical 
+        requests (same domain, uri and Accept header) that are in flight at 
+        the same time.  Profiled requests run func directly so the profile 
+        includes the read.
+        """
+        if not flightUtil.isEnabled() or self.profiler:
+            return gen.maybe_future(func())
+        key = (self.request.host, self.request.uri, self.request.headers.get('Accept'))
+        return flightUtil.run(key, func)
+            
+    def finish(self, chunk=None):
+        if self.profiler:
+            profiler = self.profiler
+            self.profiler = None
+            profileId = profileUtil.stopProfile(profiler, self.request.uri, 
+                self.request.host, self.timer.getElapsed(), self.get_status())
+            self.set_header('X-Profile-Id', str(profileId))
+        if self.sendTiming:
+            self.set_header('Server-Timing', self.timer.getServerTimingHeader())
+        return super(BaseHandler, self).finish(chunk)
+        
+    def write(self, chunk):
+        if not isinstance(chunk, dict):
+            chunk = utf8(chunk)
+            self.responseBytes += len(chunk)
+        super(BaseHandler, self).write(chunk)
+        
+    def on_finish(self):
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            # reads in flight may predate this write
+            flightUtil.forget(self.request.host)
+        if not slowLogUtil.isEnabled():
+            return
+        elapsed = self.request.request_time() * 1000.0
+        if not slowLogUtil.isSlow(elapsed):
+            return
+        entry = { 'handler': self.__class__.__name__ }
+        entry['method'] = self.request.method
+        entry['uri'] = self.request.uri
+        entry['domain'] = self.request.host
+        entry['status'] = self.get_status()
+        entry['time'] = unixTimeToUTC(time.time())
+        entry['elapsed'] = elapsed
+        entry['responseBytes'] = self.responseBytes
+        entry['readTime'] = self.timer.getTime('read') * 1000.0
+        entry['encodeTime'] = self.timer.getTime('encode') * 1000.0
+        m = re.match(r'/(groups|datasets|datatypes)/([^/]+)', self.request.path)
+        if m:
+            entry['uuid'] = m.group(2)
+        entry.update(self.requestDetails)
+        slowLogUtil.logRequest(entry)
+        
+    def setSelectionDetails(self, selection, count, itemType):
+        # record selection info for the slow request log
+        self.requestDetails['selection'] = selection
+        self.requestDetails['selectionSize'] = count
+        self.requestDetails['type'] = itemType
+    
+class ProfileHandler(BaseHandler):
+    """
+    Admin access to saved request profiles:
+        GET /admin/profiles - list of profiled requests
+        GET /admin/profiles/<id> - stats for one request (optional sort & limit 
+            query params)
+        DELETE /admin/profiles/<id>
+    """
+    def getProfileId(self):
+        # request is in the form /admin/profiles/<id>, return <id> (or None)
+        uri = self.request.path
+        npos = uri.find('/admin/profiles')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed here
+        uri = uri[npos+len('/admin/profiles'):]
+        if len(uri) <= 1:
+            return None  # collection request
+        try:
+            profileId = int(uri[1:])
+        except ValueError:
+            logging.info("invalid profile id")
+            raise HTTPError(400)
+        return profileId
+        
+    def get(self):
+        if not self.isAdminRequest():
+            raise HTTPError(403)
+        profileId = self.getProfileId()
+        response = { }
+        href = self.request.protocol + '://' + self.request.host + '/admin/profiles'
+        if profileId is None:
+            items = profileUtil.getProfiles()
+            for item in items:
+                item['created'] = unixTimeToUTC(item['created'])
+                item['href'] = href + '/' + str(item['id'])
+            response['profiles'] = items
+            response['hrefs'] = [{'rel': 'self', 'href': href}]
+        else:
+            sort = self.get_query_argument('sort', 'cumulative')
+            try:
+                limit = int(self.get_query_argument('limit', 50))
+            except ValueError:
+                logging.info("expected int type for limit")
+                raise HTTPError(400) 
+            item = profileUtil.getProfile(profileId)
+            if item is None:
+                raise HTTPError(404)
+            try:
+                text = profileUtil.getProfileText(profileId, sort, limit)
+            except KeyError:
+                logging.info("invalid profile sort key")
+                raise HTTPError(400)
+            for k in ('id', 'uri', 'domain', 'status', 'elapsed', 'totalCalls'):
+                response[k] = item[k]
+            response['created'] = unixTimeToUTC(item['created'])
+            response['stats'] = text
+            response['hrefs'] = [{'rel': 'self', 'href': href + '/' + str(profileId)},
+                {'rel': 'owner', 'href': href}]
+        self.writeJson(response)
+        
+    def delete(self):
+        if not self.isAdminRequest():
+            raise HTTPError(403)
+        profileId = self.getProfileId()
+        if profileId is None:
+            raise HTTPError(405)  # Method not allowed
+        if not profileUtil.deleteProfile(profileId):
+            raise HTTPError(404)
     
-class DefaultHandler(RequestHandler):
+class MetricsHandler(BaseHandler):
+    """
+    Admin access to server metrics:
+        GET /admin/metrics - file pool, chunk cache, value cache and read 
+            request statistics
+        DELETE /admin/metrics - reset the counters
+    """
+    def get(self):
+        if not self.isAdminRequest():
+            raise HTTPError(403)
+        response = { }
+        filePool = filePoolUtil.getStats()
+        for item in filePool['files']:
+            item['opened'] = unixTimeToUTC(item['opened'])
+        response['filePool'] = filePool
+        response['valueCache'] = valueCacheUtil.getStats()
+        response['readRequests'] = flightUtil.getStats()
+        href = self.request.protocol + '://' + self.request.host + '/admin/metrics'
+        response['hrefs'] = [{'rel': 'self', 'href': href}]
+        self.writeJson(response)
+        
+    def delete(self):
+        if not self.isAdminRequest():
+            raise HTTPError(403)
+        filePoolUtil.resetStats()
+        valueCacheUtil.resetStats()
+        flightUtil.resetStats()
+    
+class DefaultHandler(BaseHandler):
     def put(self):
         logging.warning("got default PUT request")
         logging.warning(self.request)
@@ -49,15 +306,15 @@ class DefaultHandler(RequestHandler):
         logging.warning(self.request)
         raise HTTPError(400) 
         
-class LinkCollectionHandler(RequestHandler):
+class LinkCollectionHandler(BaseHandler):
     def getRequestId(self, uri):
         # helper method
         # uri should be in the form: /groups/<uuid>/links
         # extract the <uuid>
-        uri = self.request.uri
+        uri = self.request.path
         if uri[:len('/groups/')] != '/groups/':
             # should not get here!
-            logging.error("unexpected uri: " + uri)
+            logging.error("unexpected uri: %s", uri)
             raise HTTPError(500)
         uri = uri[len('/groups/'):]  # get stuff after /groups/
         npos = uri.find('/')
@@ -66,17 +323,17 @@ class LinkCollectionHandler(RequestHandler):
             raise HTTPError(400)  
         id = uri[:npos]
          
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
         
     def get(self):
-        logging.info('LinkCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')       
+        logging.info('LinkCollectionHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)       
         
-        reqUuid = self.getRequestId(self.request.uri)
+        reqUuid = self.getRequestId(self.request.path)
         domain = self.request.host
-        filePath = getFilePath(domain) 
+        filePath = self.getFilePath(domain) 
         
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
@@ -90,15 +347,15 @@ class LinkCollectionHandler(RequestHandler):
                 
         response = { }
         
-        verifyFile(filePath)
+        self.verifyFile(filePath)
         items = None
         rootUUID = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             items = db.getLinkItems(reqUuid, marker=marker, limit=limit)
             if items == None:
                 httpError = 404  # not found
                 #todo: return 410 if the group was recently deleted
-                logging.info("group: [" + reqUuid + "] not found")
+                logging.info("group: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -119,18 +376,18 @@ class LinkCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'owner', 'href': href + 'groups/' + reqUuid})  
         response['hrefs'] = hrefs      
         
-        self.write(json_encode(response))
+        self.writeJson(response)
     
         
-class LinkHandler(RequestHandler):
+class LinkHandler(BaseHandler):
     def getRequestId(self, uri):
         # helper method
         # uri should be in the form: /groups/<uuid>/links/<name>
         # extract the <uuid>
-        uri = self.request.uri
+        uri = self.request.path
         if uri[:len('/groups/')] != '/groups/':
             # should not get here!
-            logging.error("unexpected uri: " + uri)
+            logging.error("unexpected uri: %s", uri)
             raise HTTPError(500)
         uri = uri[len('/groups/'):]  # get stuff after /groups/
         npos = uri.find('/')
@@ -139,7 +396,7 @@ class LinkHandler(RequestHandler):
             raise HTTPError(400)  
         id = uri[:npos]
          
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
@@ -164,22 +421,22 @@ class LinkHandler(RequestHandler):
         return linkName
         
     def get(self):
-        logging.info('LinkHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')       
+        logging.info('LinkHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)       
         
-        reqUuid = self.getRequestId(self.request.uri)
+        reqUuid = self.getRequestId(self.request.path)
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        linkName = self.getName(self.request.uri)
+        filePath = self.getFilePath(domain) 
+        linkName = self.getName(self.request.path)
         
         response = { }
         
-        verifyFile(filePath)
+        self.verifyFile(filePath)
         items = None
         rootUUID = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getLinkItemByUuid(reqUuid, linkName)
             if item == None:
-                logging.info("group: [" + reqUuid + "], link: [" + linkName + "] not found")
+                logging.info("group: [%s], link: [%s] not found", reqUuid, linkName)
                 raise HTTPError(db.httpStatus)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -200,19 +457,19 @@ class LinkHandler(RequestHandler):
         hrefs.append({'rel': 'owner', 'href': href + 'groups/' + reqUuid})  
         response['hrefs'] = hrefs      
         
-        self.write(json_encode(response))
+        self.writeJson(response)
     
     def put(self):
-        logging.info('LinkHandler.put host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('LinkHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
         # put - create a new link
         # patterns are:
         # PUT /group/<id>/links/<name> {id: <id> } 
         # PUT /group/<id>/links/<name> {h5path: <path> } 
         # PUT /group/<id>/links/<name> {href: <href> }
-        uri = self.request.uri
-        reqUuid = self.getRequestId(self.request.uri)
+        uri = self.request.path
+        reqUuid = self.getRequestId(self.request.path)
         
-        linkName = url_unescape(self.getName(self.request.uri))
+        linkName = url_unescape(self.getName(self.request.path))
         
         body = json.loads(self.request.body)
         
@@ -257,18 +514,18 @@ class LinkHandler(RequestHandler):
                 
             
         else: 
-            logging.info("bad put syntax: [" + self.request.body + "]")
+            logging.info("bad put syntax: [%s]", self.request.body)
             raise HTTPError(400)                      
         
         domain = self.request.host
-        filePath = getFilePath(domain) 
+        filePath = self.getFilePath(domain) 
         
         response = { }
         
-        verifyFile(filePath)
+        self.verifyFile(filePath)
         items = None
         rootUUID = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             if childUuid:
                 ok = db.linkObject(reqUuid, childUuid, linkName)
             elif filename:
@@ -287,17 +544,17 @@ class LinkHandler(RequestHandler):
         self.set_status(201) 
         
     def delete(self): 
-        logging.info('LinkHandler.delete ' + self.request.host)   
-        reqUuid = self.getRequestId(self.request.uri)
+        logging.info('LinkHandler.delete %s', self.request.host)   
+        reqUuid = self.getRequestId(self.request.path)
         
-        linkName = self.getName(self.request.uri)
+        linkName = self.getName(self.request.path)
         
-        logging.info( " delete link  name[: " + linkName + "] parentUuid: " + reqUuid)
+        logging.info(" delete link  name[: %s] parentUuid: %s", linkName, reqUuid)
            
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        with Hdf5db(filePath) as db:
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        with Hdf5db(filePath, timer=self.timer) as db:
             ok = db.unlinkItem(reqUuid, linkName)
             if not ok:
                 httpStatus = db.httpStatus
@@ -305,40 +562,40 @@ class LinkHandler(RequestHandler):
                     httpStatus = 500
                 raise HTTPError(httpStatus)  
                 
-class TypeHandler(RequestHandler):
+class TypeHandler(BaseHandler):
     
     # or 'Snn' for fixed string or 'vlen_bytes' for variable 
     def getRequestId(self):
         # request is in the form /datatypes/<id>, return <id>
-        uri = self.request.uri
+        uri = self.request.path
         npos = uri.rfind('/')
         if npos < 0:
             raise HTTPError(500)  # should not get routed to TypeHandler in this case
         if npos == len(uri) - 1:
             raise HTTPError(400, message="missing id")
         id = uri[(npos+1):]
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
     def get(self):
-        logging.info('TypeHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('TypeHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         response = { }
         hrefs = []
         rootUUID = None
         item = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getCommittedTypeItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -356,17 +613,17 @@ class TypeHandler(RequestHandler):
         response['attributeCount'] = item['attributeCount']
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response))
+        self.writeJson(response)
         
     def post(self):
-        logging.info('TypeHandler.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
-        if self.request.uri != '/datatypes/':
+        logging.info('TypeHandler.post host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if self.request.path != '/datatypes/':
             logging.info('bad datatypes post request')
             raise HTTPError(405)  # Method not allowed
                
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
         
         body = json.loads(self.request.body)
             
@@ -376,14 +633,14 @@ class TypeHandler(RequestHandler):
             
         datatype = body["type"]     
         
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             rootUUID = db.getUUIDByPath('/')
             typeUUID = db.createCommittedType(datatype)
             if typeUUID == None:
                 httpError = 500
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("failed to create type (httpError: " + str(httpError) + ")")
+                logging.info("failed to create type (httpError: %s)", httpError)
                 raise HTTPError(httpError)
          
         response = { }
@@ -398,16 +655,16 @@ class TypeHandler(RequestHandler):
         response['attributeCount'] = 0
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response)) 
+        self.writeJson(response) 
         self.set_status(201)  # resource created
         
     def delete(self): 
-        logging.info('TypeHandler.delete ' + self.request.host)   
+        logging.info('TypeHandler.delete %s', self.request.host)   
         uuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        with Hdf5db(filePath) as db:
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        with Hdf5db(filePath, timer=self.timer) as db:
             ok = db.deleteObjectByUuid(uuid)
             if not ok:
                 httpStatus = db.httpStatus
@@ -415,10 +672,10 @@ class TypeHandler(RequestHandler):
                     httpStatus = 500
                 raise HTTPError(httpStatus)  
                 
-class DatatypeHandler(RequestHandler):
+class DatatypeHandler(BaseHandler):
     def getRequestId(self):
         # request is in the form /datasets/<id>/type, return <id>
-        uri = self.request.uri
+        uri = self.request.path
         npos = uri.rfind('/type')
         if npos < 0:
             raise HTTPError(500)  # should not get routed to DatatypeHandler in this case
@@ -430,29 +687,29 @@ class DatatypeHandler(RequestHandler):
         if npos == len(id_part) - 1:
             raise HTTPError(400, message="missing id")
         id = id_part[(npos+1):]
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
     def get(self):
-        logging.info('DatatypeHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('DatatypeHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         response = { }
         hrefs = []
         rootUUID = None
         item = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getDatasetTypeItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -467,12 +724,12 @@ class DatatypeHandler(RequestHandler):
         response['lastModified'] = unixTimeToUTC(item['mtime'])
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response))
+        self.writeJson(response)
                 
-class ShapeHandler(RequestHandler):
+class ShapeHandler(BaseHandler):
     def getRequestId(self):
         # request is in the form /datasets/<id>/shape, return <id>
-        uri = self.request.uri
+        uri = self.request.path
         npos = uri.rfind('/shape')
         if npos < 0:
             raise HTTPError(500)  # should not get routed to ShapeHandler in this case
@@ -484,29 +741,29 @@ class ShapeHandler(RequestHandler):
         if npos == len(id_part) - 1:
             raise HTTPError(400, message="missing id")
         id = id_part[(npos+1):]
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
     def get(self):
-        logging.info('ShapeHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('ShapeHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         response = { }
         hrefs = []
         rootUUID = None
         item = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getDatasetItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -525,14 +782,14 @@ class ShapeHandler(RequestHandler):
         response['lastModified'] = unixTimeToUTC(item['mtime'])
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response))
+        self.writeJson(response)
         
     def put(self):
-        logging.info('ShapeHandler.put host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('ShapeHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
         reqUuid = self.getRequestId()       
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
         
         body = json.loads(self.request.body)
         
@@ -559,51 +816,273 @@ class ShapeHandler(RequestHandler):
                 logging.info("invalid shape (negative extent)")
                 raise HTTPError(400) 
         
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             rootUUID = db.getUUIDByPath('/')
             db.resizeDataset(reqUuid, shape)
             
             if db.httpStatus != 200:
                 httpError = db.httpStatus # library may have more specific error code
-                logging.info("failed to resize dataset (httpError: " + str(httpError) + ")")
+                logging.info("failed to resize dataset (httpError: %s)", httpError)
                 raise HTTPError(httpError)
         logging.info("resize OK")    
         self.set_status(201)  # resource created    
                 
-class DatasetHandler(RequestHandler):
+class AppendHandler(BaseHandler):
+    """
+    Append rows to an extensible dataset:
+        POST /datasets/<id>/append[?axis=n] - extend the dataset along 
+            dimension n (default is the first unlimited dimension) and write
+            the rows given as {"value": [...]} or, with Content-Type
+            application/octet-stream, as raw bytes in the dataset's type.
+            The resize and write are done together, so concurrent appenders
+            each get their own rows.  Returns the new dims and the index of
+            the first appended row.
+    """
+    def getRequestId(self):
+        # request is in the form /datasets/<id>/append, return <id>
+        uri = self.request.path
+        npos = uri.rfind('/append')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to AppendHandler in this case
+        id_part = uri[:npos]
+        npos = id_part.rfind('/')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to AppendHandler in this case
+        
+        if npos == len(id_part) - 1:
+            raise HTTPError(400, message="missing id")
+        id = id_part[(npos+1):]
+        logging.debug('got id: [%s]', id)
+    
+        return id
+        
+    def getAxis(self, shape):
+        axis = self.get_query_argument('axis', None)
+        if axis is None:
+            # first unlimited dimension
+            maxdims = shape.get('maxdims', [])
+            if 0 in maxdims:
+                return maxdims.index(0)
+            return 0
+        try:
+            return int(axis)
+        except ValueError:
+            logging.info("expected int type for axis")
+            raise HTTPError(400)
+        
+    def post(self):
+        logging.info('AppendHandler.post host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        reqUuid = self.getRequestId()       
+        domain = self.request.host
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        
+        contentType = self.request.headers.get('Content-Type', '')
+        if contentType.startswith('application/octet-stream'):
+            data = self.request.body
+        else:
+            try:
+                body = json.loads(self.request.body)
+            except ValueError:
+                logging.info("invalid JSON body")
+                raise HTTPError(400)
+            if type(body) is not dict or "value" not in body:
+                logging.info("Value not supplied")
+                raise HTTPError(400)  # missing data
+            data = body['value']
+        
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getDatasetItemByUuid(reqUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+            shape = item['shape']
+            if shape['class'] != 'H5S_SIMPLE':
+                logging.info("can't append to dataspace: %s", shape['class'])
+                raise HTTPError(400)
+            axis = self.getAxis(shape)
+            result = db.appendDatasetValuesByUuid(reqUuid, data, axis)
+            if result is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("append failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+            (start, dims) = result
+            self.setSelectionDetails('append', dims[axis] - start, item['type'])
+            rootUUID = db.getUUIDByPath('/')
+            
+        href = self.request.protocol + '://' + domain + '/'
+        response = { 'dims': list(dims), 'start': start, 'axis': axis }
+        hrefs = []
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/append'})
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid })
+        hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID})   
+        response['hrefs'] = hrefs
+        self.writeJson(response)
+                
+class ChunkHandler(BaseHandler):
+    """
+    Direct access to the stored (filtered) chunks of a chunked dataset:
+        GET /datasets/<id>/chunks - chunk shape and filters
+        GET /datasets/<id>/chunks?coords=x,y - raw bytes of the chunk starting 
+            at element (x,y), with the filter mask in the X-Filter-Mask header
+        PUT /datasets/<id>/chunks?coords=x,y[&filter_mask=n] - store the body 
+            as the chunk (the data must already be filtered)
+    """
+    def getRequestId(self):
+        # request is in the form /datasets/<id>/chunks, return <id>
+        uri = self.request.path
+        npos = uri.rfind('/chunks')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to ChunkHandler in this case
+        id_part = uri[:npos]
+        npos = id_part.rfind('/')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to ChunkHandler in this case
+        
+        if npos == len(id_part) - 1:
+            raise HTTPError(400, message="missing id")
+        id = id_part[(npos+1):]
+        logging.debug('got id: [%s]', id)
+    
+        return id
+        
+    def getCoords(self):
+        # return list of ints from the coords query param (or None if not given)
+        coords = self.get_query_argument('coords', None)
+        if coords is None:
+            return None
+        try:
+            coords = [int(coord) for coord in coords.split(',')]
+        except ValueError:
+            logging.info("invalid coords parameter (can't convert to int)")
+            raise HTTPError(400)
+        return coords
+        
+    def get(self):
+        logging.info('ChunkHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        coords = self.getCoords()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        response = { }
+        hrefs = []
+        rootUUID = None
+        chunk = None
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getDatasetChunkInfoByUuid(reqUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] chunks not available", reqUuid)
+                raise HTTPError(httpError)
+            if coords is not None:
+                chunk = db.readDatasetChunkByUuid(reqUuid, coords)
+                if chunk == None:
+                    logging.info("chunk read failed (httpError: %s)", db.httpStatus)
+                    raise HTTPError(db.httpStatus)
+            rootUUID = db.getUUIDByPath('/')
+        
+        if chunk is not None:
+            (filterMask, data) = chunk
+            self.set_header('Content-Type', 'application/octet-stream')
+            # the chunk is sent as stored, don't compress it again
+            self.set_header('Cache-Control', 'no-transform')
+            self.set_header('X-Filter-Mask', str(filterMask))
+            self.set_header('X-Filters', json.dumps(item['filters']))
+            with self.timer.phase('write'):
+                self.write(data)
+            return
+                         
+        # got everything we need, put together the response
+        href = self.request.protocol + '://' + domain + '/'
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/chunks'})
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid })
+        hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID})   
+        response['dims'] = item['dims']
+        response['chunks'] = item['chunks']
+        response['filters'] = item['filters']
+        response['hrefs'] = hrefs
+        
+        self.writeJson(response)
+        
+    def put(self):
+        logging.info('ChunkHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        reqUuid = self.getRequestId()       
+        coords = self.getCoords()
+        if coords is None:
+            logging.info("coords not supplied")
+            raise HTTPError(400)
+        try:
+            filterMask = int(self.get_query_argument('filter_mask', 0))
+        except ValueError:
+            logging.info("expected int type for filter_mask")
+            raise HTTPError(400) 
+        domain = self.request.host
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        
+        with Hdf5db(filePath, timer=self.timer) as db:
+            ok = db.writeDatasetChunkByUuid(reqUuid, coords, self.request.body, filterMask)
+            if not ok:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("chunk write failed (httpError: %s)", httpError)
+                raise HTTPError(httpError)
+        logging.info("chunk write succeeded")
+                
+class DatasetHandler(BaseHandler):
    
     def getRequestId(self):
         # request is in the form /datasets/<id>, return <id>
-        uri = self.request.uri
+        uri = self.request.path
         npos = uri.rfind('/')
         if npos < 0:
             raise HTTPError(500)  # should not get routed to TypeHandler in this case
         if npos == len(uri) - 1:
             raise HTTPError(400, message="missing id")
         id = uri[(npos+1):]
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
+    @gen.coroutine
     def get(self):
-        logging.info('DatasetHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('DatasetHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
+        body = yield self.coalesce(lambda: self.getDatasetBody(reqUuid, filePath))
+        self.writeJsonBody(body)
+        
+    """
+    Return the encoded response for GET dataset
+    """
+    def getDatasetBody(self, reqUuid, filePath):
+        domain = self.request.host
         response = { }
         hrefs = []
         rootUUID = None
         item = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getDatasetItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             rootUUID = db.getUUIDByPath('/')
             
@@ -620,22 +1099,23 @@ class DatasetHandler(RequestHandler):
         response['shape'] = item['shape']
         if 'fillvalue' in item:
             response['fillvalue'] = item['fillvalue']
+        response['creationProperties'] = item['creationProperties']
         response['created'] = unixTimeToUTC(item['ctime'])
         response['lastModified'] = unixTimeToUTC(item['mtime'])
         response['attributeCount'] = item['attributeCount']
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response))
+        return self.encodeJson(response)
         
     def post(self):
-        logging.info('DatasetHandler.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
-        if self.request.uri != '/datasets/':
+        logging.info('DatasetHandler.post host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if self.request.path != '/datasets/':
             logging.info('bad datasets post request')
             raise HTTPError(405)  # Method not allowed
                
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
         shape = None
         
         body = json.loads(self.request.body)
@@ -691,15 +1171,23 @@ class DatasetHandler(RequestHandler):
                     raise HTTPError(400)
                 if maxextent == 0:
                     maxshape[i] = None  # this indicates unlimited
+                    
+        # optional chunk layout, filters, fill and allocation time
+        # (validated by Hdf5db.createDataset)
+        creationProps = None
+        if "creationProperties" in body:
+            creationProps = body["creationProperties"]
         
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             rootUUID = db.getUUIDByPath('/')
-            dsetUUID = db.createDataset(datatype, shape, maxshape)
+            dsetUUID = db.createDataset(datatype, shape, maxshape, 
+                creation_props=creationProps)
             if dsetUUID == None:
                 httpError = 500
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("failed to create dataset (httpError: " + str(httpError) + ")")
+                logging.info("failed to create dataset (httpError: %s) %s", httpError,
+                    db.httpMessage)
                 raise HTTPError(httpError)
                 
         response = { }
@@ -715,16 +1203,16 @@ class DatasetHandler(RequestHandler):
         response['attributeCount'] = 0
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response))  
+        self.writeJson(response)  
         self.set_status(201)  # resource created
         
     def delete(self): 
-        logging.info('DatasetHandler.delete host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('DatasetHandler.delete host=[%s] uri=[%s]', self.request.host, self.request.uri)
         uuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        with Hdf5db(filePath) as db:
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        with Hdf5db(filePath, timer=self.timer) as db:
             ok = db.deleteObjectByUuid(uuid)
             if not ok:
                 httpStatus = db.httpStatus
@@ -732,7 +1220,141 @@ class DatasetHandler(RequestHandler):
                     httpStatus = 500
                 raise HTTPError(httpStatus)  
                 
-class ValueHandler(RequestHandler):
+@stream_request_body
+class ValueHandler(BaseHandler):
+    """
+    Request bodies are streamed.  Binary (application/octet-stream) and 
+    newline-delimited JSON (application/x-ndjson, one row per line) PUT 
+    value requests are written to the selection given by the query params 
+    as the body arrives, a slab of 'upload_slab_size' bytes of rows at a 
+    time.  Each slab is written before more of the body is read, so a 
+    client sending faster than the dataset is written is held back by TCP 
+    flow control.  Other request bodies (including binary point writes, see
+    putBinaryPoints) are collected and parsed as usual.
+    """
+    def prepare(self):
+        super(ValueHandler, self).prepare()
+        self.bodyPieces = []
+        self.upload = None
+        self.uploadError = None
+        uploadType = uploadUtil.getUploadType(self.request.headers.get('Content-Type', ''))
+        if (self.request.method == 'PUT' and uploadType is not None and 
+                self.request.path.endswith('/value') and 
+                self.get_query_argument('points', None) is None):
+            self.startUpload(uploadType)
+            
+    def data_received(self, chunk):
+        if self.upload is None:
+            self.bodyPieces.append(chunk)
+            return
+        if self.uploadError is not None:
+            return  # drain the rest of the body
+        try:
+            slabs = self.upload.add(chunk)
+        except ValueError as e:
+            logging.info("upload failed: %s", e)
+            self.uploadError = 400
+            return
+        for slab in slabs:
+            self.writeSlab(slab)
+            
+    """
+    Helper method - return the (non-streamed) request body, which takes the
+    place of self.request.body
+    """
+    def getBody(self):
+        return ''.join(self.bodyPieces)
+        
+    """
+    Helper method - check the selection of a streamed PUT value request and 
+    set up the buffer that splits the body into slabs of rows
+    """
+    def startUpload(self, uploadType):
+        self.uploadUuid = self.getRequestId()
+        self.uploadPath = self.getFilePath(self.request.host)
+        self.verifyFile(self.uploadPath, True)
+        with Hdf5db(self.uploadPath, timer=self.timer) as db:
+            item = db.getDatasetItemByUuid(self.uploadUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", self.uploadUuid)
+                raise HTTPError(httpError)
+            shape = item['shape']
+            if shape['class'] != 'H5S_SIMPLE':
+                logging.info("streamed upload not supported for dataspace: %s", shape['class'])
+                raise HTTPError(400)
+            dims = shape['dims']
+            dt = db.getDatasetObjByUuid(self.uploadUuid).dtype
+        slices = self.getSlicesQueryParam(dims)
+        counts = reduceUtil.getSelectionCounts(slices, dims)
+        if 0 in counts:
+            logging.info("empty selection for upload")
+            raise HTTPError(400)
+        self.setSelectionDetails('hyperslab', int(np.prod(counts)), item['type'])
+        rowBytes = dt.itemsize * int(np.prod(counts[1:]))
+        rowsPerSlab = config.get('upload_slab_size') // rowBytes
+        if uploadType == 'application/octet-stream':
+            if dt.hasobject:
+                logging.info("binary upload not available for this type")
+                raise HTTPError(400)
+            self.upload = uploadUtil.RowBuffer(rowBytes, rowsPerSlab, counts[0])
+        else:
+            self.upload = uploadUtil.LineBuffer(rowsPerSlab, counts[0], 
+                config.get('upload_slab_size'))
+        self.uploadSlices = slices
+        self.uploadExtent = dims[0]
+        self.uploadCounts = counts
+        self.uploadType = dt
+        self.request.connection.set_max_body_size(config.get('max_upload_size'))
+        
+    """
+    Helper method - write a (firstRow, rows) slab of a streamed upload
+    """
+    def writeSlab(self, slab):
+        (firstRow, rows) = slab
+        (start, stop, step) = self.uploadSlices[0].indices(self.uploadExtent)
+        if isinstance(rows, str):
+            count = len(rows) // self.upload.rowBytes
+            rows = np.frombuffer(rows, dtype=self.uploadType).reshape(
+                [count] + list(self.uploadCounts[1:]))
+        else:
+            count = len(rows)
+        first = start + firstRow * step
+        slices = (slice(first, first + count * step, step),) + tuple(self.uploadSlices[1:])
+        with Hdf5db(self.uploadPath, timer=self.timer) as db:
+            ok = db.setDatasetValuesByUuid(self.uploadUuid, rows, slices)
+            if not ok:
+                httpError = 500  # internal error
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("upload write failed (httpError: %s)", httpError)
+                self.uploadError = httpError
+            
+    """
+    Helper method - write the rest of a streamed upload
+    """
+    def finishUpload(self):
+        if self.uploadError is None:
+            try:
+                slab = self.upload.finish()
+            except ValueError as e:
+                logging.info("upload failed: %s", e)
+                raise HTTPError(400)
+            if slab is not None:
+                self.writeSlab(slab)
+        if self.uploadError is not None:
+            raise HTTPError(self.uploadError)
+        logging.info("value upload succeeded")
+            
+    def getListQueryParam(self, name, default=None):
+        # return list from a comma separated query param
+        value = self.get_query_argument(name, None)
+        if value is None:
+            return default
+        return [item.strip() for item in value.split(',') if item.strip()]
+        
     """
     Helper method - return slice for dim based on query params
     """
@@ -747,19 +1369,84 @@ class ValueHandler(RequestHandler):
             logging.info("invalid selection parameter (can't convert to int)")
             raise HTTPError(400)
         if start < 0 or start > extent:
-            logging.info("bad selection start parameter for dimension: " + dimQuery)
+            logging.info("bad selection start parameter for dimension: %s", dimQuery)
             raise HTTPError(400)
         if stop > extent:
-            logging.info("bad selection stop parameter for dimension: " + dimQuery)
+            logging.info("bad selection stop parameter for dimension: %s", dimQuery)
             raise HTTPError(400)
         if step == 0:
-            logging.info("bad selection step parameter for dimension: " + dimQuery)
+            logging.info("bad selection step parameter for dimension: %s", dimQuery)
             raise HTTPError(400)
         s = slice(start, stop, step)
-        logging.info(dimQuery + " start: " + str(start) + " stop: " + str(stop) + " step: " + 
-            str(step)) 
+        logging.debug("%s start: %s stop: %s step: %s", dimQuery, start, stop, step)
         return s
         
+    """
+    Helper method - return the selection (list of slice, index or index 
+    list items, see selectionUtil) given by the select query param, or by 
+    the dimN_start/stop/step params if there isn't one
+    """
+    def getSelectionQueryParam(self, dims):
+        text = self.get_query_argument('select', None)
+        if text is None:
+            return [self.getSliceQueryParam(dim, dims[dim]) for dim in range(len(dims))]
+        for dim in range(len(dims)):
+            for suffix in ('_start', '_stop', '_step'):
+                if self.get_query_argument('dim' + str(dim + 1) + suffix, None) is not None:
+                    logging.info("select can't be combined with dimN_start/stop/step")
+                    raise HTTPError(400)
+        return self.parseSelection(text, dims)
+        
+    """
+    Helper method - parse selection text (see selectionUtil) for a dataset 
+    of the given dims
+    """
+    def parseSelection(self, text, dims):
+        if not isinstance(text, basestring):
+            logging.info("expected string for selection")
+            raise HTTPError(400)
+        try:
+            return selectionUtil.parseSelection(text, dims)
+        except ValueError as e:
+            logging.info("invalid selection: %s", e)
+            raise HTTPError(400)
+            
+    """
+    Helper method - return the selection query params as a tuple of slices,
+    for requests that work on hyperslabs (indices select one element and
+    keep their dimension)
+    """
+    def getSlicesQueryParam(self, dims):
+        slices = selectionUtil.getHyperslab(self.getSelectionQueryParam(dims))
+        if slices is None:
+            logging.info("index list selections are not supported for this request")
+            raise HTTPError(400)
+        return slices
+        
+    """
+    Helper method - return list of dimN_resolution values (None for dims 
+    without one), or None if no resolution was requested.  With a resolution
+    the selection is read from the coarsest up to date pyramid level that 
+    has at least that many elements along the dimension (see PyramidHandler).
+    """
+    def getResolutionQueryParam(self, rank):
+        resolution = []
+        for dim in range(rank):
+            value = self.get_query_argument('dim' + str(dim + 1) + '_resolution', None)
+            if value is not None:
+                try:
+                    value = int(value)
+                except ValueError:
+                    logging.info("invalid resolution parameter (can't convert to int)")
+                    raise HTTPError(400)
+                if value < 1:
+                    logging.info("bad resolution parameter for dimension: %s", dim + 1)
+                    raise HTTPError(400)
+            resolution.append(value)
+        if resolution.count(None) == rank:
+            return None
+        return resolution
+        
     """
     Get slices given lists of start, stop, step values
     """
@@ -773,7 +1460,7 @@ class ValueHandler(RequestHandler):
                 raise HTTPError(400)
             for dim in range(rank):
                 if start[dim] < 0 or start[dim] >= dsetshape[dim]:
-                    logging.info("request start index invalid for dim: " + str(dim))
+                    logging.info("request start index invalid for dim: %s", dim)
                     raise HTTPError(400)
         else:
             start = []
@@ -788,7 +1475,7 @@ class ValueHandler(RequestHandler):
                 raise HTTPError(400)
             for dim in range(rank):
                 if stop[dim] <= start[dim] or stop[dim] > dsetshape[dim]:
-                    logging.info("request stop index invalid for dim: " + str(dim))
+                    logging.info("request stop index invalid for dim: %s", dim)
                     raise HTTPError(400)
         else:
             stop = []
@@ -803,7 +1490,7 @@ class ValueHandler(RequestHandler):
                 raise HTTPError(400)
             for dim in range(rank):
                 if step[dim] <= 0 or step[dim] > dsetshape[dim]:
-                    logging.info("request step index invalid for dim: " + str(dim))
+                    logging.info("request step index invalid for dim: %s", dim)
                     raise HTTPError(400)
         else:
             step = []
@@ -825,10 +1512,10 @@ class ValueHandler(RequestHandler):
     """    
     def getRequestId(self):
         # request is in the form /datasets/<id>/value?xxx, return <id>
-        uri = self.request.uri
+        uri = self.request.path
         if uri[:len('/datasets/')] != '/datasets/':
             # should not get here!
-            logging.error("unexpected uri: " + uri)
+            logging.error("unexpected uri: %s", uri)
             raise HTTPError(500)
         uri = uri[len('/datasets/'):]  # get stuff after /datasets/
         npos = uri.find('/')
@@ -837,30 +1524,167 @@ class ValueHandler(RequestHandler):
             raise HTTPError(400)  
         id = uri[:npos]
          
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
+    @gen.coroutine
     def get(self):
-        logging.info('ValueHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('ValueHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        # optional downsampling, see getDownsampleValues
+        downsample = self.get_query_argument('downsample', None)
+        if downsample is not None and downsample not in reduceUtil.DOWNSAMPLE_MODES:
+            logging.info("invalid downsample mode: %s", downsample)
+            raise HTTPError(400)
+        # optional row filter, see getQueryValues
+        query = self.get_query_argument('query', None)
+        if query is not None and downsample is not None:
+            logging.info("query and downsample can't be combined")
+            raise HTTPError(400)
+        
+        body = yield self.coalesce(lambda: self.getValueBody(reqUuid, filePath, downsample, query))
+        if self.isBinaryRequest():
+            self.writeBinaryBody(body)
+        else:
+            self.writeJsonBody(body)
+        
+    """
+    Helper method - return the list of compound members to read (from the
+    'fields' query param or the request body), or None to read all of them
+    """
+    def getFields(self, body=None):
+        fields = self.getListQueryParam('fields')
+        if body is not None and 'fields' in body:
+            fields = body['fields']
+            if type(fields) is not list:
+                logging.info("expected list of field names")
+                raise HTTPError(400)
+        return fields
+        
+    """
+    Helper method - return the values in the requested form: as given for 
+    JSON rows, or a dict of field name to column array with the 'columns' 
+    query param.  For binary requests the raw bytes are returned (the 
+    columns one after the other with 'columns'), in the dataset's byte order.
+    """
+    def formatValues(self, values):
+        columns = self.get_query_argument('columns', None) is not None
+        isArray = isinstance(values, (np.ndarray, np.generic))
+        if columns and not (isArray and values.dtype.names):
+            logging.info("columns requested for a non-compound type")
+            raise HTTPError(400)
+        if self.isBinaryRequest():
+            if not isArray or values.dtype.hasobject:
+                logging.info("binary response not available for this type")
+                raise HTTPError(406)  # Not Acceptable
+            with self.timer.phase('encode'):
+                if columns:
+                    return ''.join([np.ascontiguousarray(values[name]).tobytes() 
+                        for name in values.dtype.names])
+                return np.ascontiguousarray(values).tobytes()
+        if columns:
+            values = dict([(name, values[name]) for name in values.dtype.names])
+        return values
+        
+    """
+    Return the rows of the selection (of a 1-d compound dataset) that match
+    the query expression (see queryUtil).  At most Limit rows are returned 
+    (capped at 'query_max_rows'), starting after row Marker, so a client can 
+    page through the matches by passing the last returned index as Marker.
+    With return=index only the row indices are returned, with return=value 
+    only the rows (default is both).
+    """
+    def getQueryValues(self, db, reqUuid, slices, query, fields=None):
+        try:
+            limit = int(self.get_query_argument("Limit", 0))
+            marker = self.get_query_argument("Marker", None)
+            if marker is not None:
+                marker = int(marker)
+        except ValueError:
+            logging.info("expected int type for Limit and Marker")
+            raise HTTPError(400)
+        maxRows = config.get('query_max_rows')
+        if limit <= 0 or (maxRows and limit > maxRows):
+            limit = maxRows
+        returnItems = self.get_query_argument('return', 'both')
+        if returnItems not in ('index', 'value', 'both'):
+            logging.info("invalid return parameter: %s", returnItems)
+            raise HTTPError(400)
+        result = db.getDatasetQueryByUuid(reqUuid, slices, query, limit, marker,
+            returnItems != 'index', config.get('reduce_block_size'), fields)
+        if result is None:
+            httpError = 500
+            if db.httpStatus != 200:
+                httpError = db.httpStatus # library may have more specific error code
+            logging.info("query failed (httpError: %s) %s", httpError, db.httpMessage)
+            raise HTTPError(httpError)
+        if returnItems == 'value':
+            del result['index']
+        return result
+        
+    """
+    Downsample the selection to dimN_buckets buckets per dimension (default
+    is one bucket per selected element).  With downsample=minmax the 
+    response has 'min' and 'max' arrays, with downsample=mean a 'value' 
+    array of bucket means, and with downsample=lttb (1-d datasets only) the 
+    'value' and 'index' of one point picked per bucket.
+    """
+    def getDownsampleValues(self, db, reqUuid, slices, dims, mode):
+        buckets = []
+        for dim in range(len(slices)):
+            count = len(xrange(*slices[dim].indices(dims[dim])))
+            try:
+                n = int(self.get_query_argument('dim' + str(dim + 1) + '_buckets', count))
+            except ValueError:
+                logging.info("invalid buckets parameter (can't convert to int)")
+                raise HTTPError(400)
+            buckets.append(n)
+        result = db.getDatasetDownsampleByUuid(reqUuid, slices, mode, buckets,
+            config.get('reduce_block_size'))
+        if result is None:
+            httpError = 500
+            if db.httpStatus != 200:
+                httpError = db.httpStatus # library may have more specific error code
+            logging.info("downsample failed (httpError: %s) %s", httpError, db.httpMessage)
+            raise HTTPError(httpError)
+        return result
+        
+    """
+    Helper method - read the selection (of just the given fields of a 
+    compound type, if any)
+    """
+    def getValues(self, db, reqUuid, slices, fields=None):
+        values = db.getDatasetValuesByUuid(reqUuid, slices, asArray=True, fields=fields)
+        if values is None and fields is not None:
+            logging.info("read failed (httpError: %s) %s", db.httpStatus, db.httpMessage)
+            raise HTTPError(db.httpStatus)
+        return values
         
+    """
+    Read the selection and return the encoded response for GET value
+    """
+    def getValueBody(self, reqUuid, filePath, downsample=None, query=None):
+        domain = self.request.host
         response = { }
         hrefs = []
         rootUUID = None
         item = None
         values = None
-        with Hdf5db(filePath) as db:
+        fields = self.getFields()
+        binary = self.isBinaryRequest()
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getDatasetItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             itemType = item['type']
             if itemType['class'] == 'H5T_VLEN':
@@ -872,30 +1696,69 @@ class ValueHandler(RequestHandler):
                 logging.info("GET OPAQUE data not supported")
                 raise HTTPError(501)  # Not implemented
             shape = item['shape']
+            if (downsample is not None or query is not None) and shape['class'] != 'H5S_SIMPLE':
+                logging.info("downsample/query not supported for dataspace: %s", shape['class'])
+                raise HTTPError(400)
             if shape['class'] == 'H5S_NULL':
                 pass   # don't return a value
             elif shape['class'] == 'H5S_SCALAR':
-                values = db.getDatasetValuesByUuid(reqUuid, Ellipsis)
+                self.getSelectionQueryParam(())  # only an empty select is valid
+                self.setSelectionDetails('scalar', 1, itemType)
+                values = self.getValues(db, reqUuid, Ellipsis, fields)
             elif shape['class'] == 'H5S_SIMPLE':
                 dims = shape['dims']
                 rank = len(dims)
-                slices = []
-                for dim in range(rank):
-                    slice = self.getSliceQueryParam(dim, dims[dim])
-                    slices.append(slice)
+                selection = self.getSelectionQueryParam(dims)
+                slices = selectionUtil.getHyperslab(selection)
+                count = selectionUtil.getSelectionCount(selection, dims)
+                self.setSelectionDetails('hyperslab', count, itemType)
          
-                values = db.getDatasetValuesByUuid(reqUuid, tuple(slices)) 
+                resolution = self.getResolutionQueryParam(rank)
+                pyramid = None
+                if binary and (downsample is not None or query is not None or 
+                        resolution is not None):
+                    logging.info("binary response is only available for plain selections")
+                    raise HTTPError(406)  # Not Acceptable
+                if slices is None and (downsample is not None or query is not None or 
+                        resolution is not None):
+                    logging.info("index list selections are only available for plain reads")
+                    raise HTTPError(400)
+                if downsample is not None:
+                    downsampled = self.getDownsampleValues(db, reqUuid, tuple(slices), dims, downsample)
+                    response['downsample'] = downsample
+                    for key in ('min', 'max', 'index', 'buckets'):
+                        if key in downsampled:
+                            response[key] = downsampled[key]
+                    values = downsampled.get('value')
+                elif query is not None:
+                    queryResult = self.getQueryValues(db, reqUuid, tuple(slices), query, fields)
+                    if 'index' in queryResult:
+                        response['index'] = queryResult['index']
+                    values = queryResult.get('value')
+                elif resolution is not None:
+                    pyramid = db.getPyramidValuesByUuid(reqUuid, tuple(slices), resolution)
+                if pyramid is not None:
+                    for key in ('level', 'factor', 'start'):
+                        response[key] = pyramid[key]
+                    values = pyramid['value']
+                elif downsample is None and query is None:
+                    values = self.getValues(db, reqUuid, tuple(selection), fields)
             else:
-                logging.error("unexpected shape class: " + shape['class'])
+                logging.error("unexpected shape class: %s", shape['class'])
                 raise HTTPError(500)
                 
             rootUUID = db.getUUIDByPath('/')
                          
+        if binary:
+            if values is None:
+                return ''
+            return self.formatValues(values)
+            
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
         
         if values is not None:
-            response['value'] = values
+            response['value'] = self.formatValues(values)
         
         hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/value'})
         hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID}) 
@@ -903,63 +1766,176 @@ class ValueHandler(RequestHandler):
         hrefs.append({'rel': 'home',  'href': href })   
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response)) 
-        
-    def post(self):
-        logging.info('ValueHandler.post host=[' + self.request.host + '] uri=[' +
-             self.request.uri + ']')
-        
-        reqUuid = self.getRequestId()
-        domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        return self.encodeJson(response)
         
-        body = json.loads(self.request.body)
-        if "points" not in body:
-            logging.info("value post request without points in body")
-            raise HTTPError(400)
-        points = body['points']
+    """
+    Helper method - verify the points of a point selection
+    """
+    def checkPoints(self, points, rank):
         if type(points) != list:
             logging.info("expecting list of points")
             raise HTTPError(400)
-        
-        
-        response = { }
-        hrefs = []
-        rootUUID = None
+        for point in points:
+            if rank == 1 and type(point) != int:
+                logging.info("elements of points to be int type for datasets of rank 1")
+                raise HTTPError(400)
+            elif rank > 1:
+                if type(point) != list:
+                    logging.info("elements of points to be list type for datasets of rank >1")
+                    raise HTTPError(400)
+                if len(point) != rank:
+                    logging.info("one or more points have missing coordinate value")
+                    raise HTTPError(400)
+                    
+    """
+    Helper method - return list of ('hyperslab', slices), ('select', items) or
+    ('points', points) items for the 'selections' of a POST value request
+    """
+    def getRegions(self, selections, dims):
+        if type(selections) != list or not selections:
+            logging.info("expecting list of selections")
+            raise HTTPError(400)
+        if len(selections) > config.get('max_selections'):
+            logging.info("too many selections: %d", len(selections))
+            raise HTTPError(400)
+        regions = []
+        for selection in selections:
+            if type(selection) != dict:
+                logging.info("expecting a dict for each selection")
+                raise HTTPError(400)
+            for key in selection:
+                if key not in ('start', 'stop', 'step', 'select', 'points'):
+                    # rather than reading the whole dataset
+                    logging.info("unknown selection key: %s", key)
+                    raise HTTPError(400)
+            if 'points' in selection:
+                if 'start' in selection or 'stop' in selection or 'step' in selection:
+                    logging.info("can't use hyperslab selection with points")
+                    raise HTTPError(400)
+                self.checkPoints(selection['points'], len(dims))
+                regions.append(('points', selection['points']))
+            elif 'select' in selection:
+                if 'start' in selection or 'stop' in selection or 'step' in selection:
+                    logging.info("can't use start/stop/step with select")
+                    raise HTTPError(400)
+                items = self.parseSelection(selection['select'], dims)
+                if selectionUtil.getHyperslab(items) == tuple(items):
+                    regions.append(('hyperslab', tuple(items)))
+                else:
+                    regions.append(('select', tuple(items)))
+            else:
+                slices = self.getHyperslabSelection(dims, selection.get('start'), 
+                    selection.get('stop'), selection.get('step'))
+                regions.append(('hyperslab', slices))
+        return regions
+        
+    """
+    Read each of the 'selections' (list of start/stop/step hyperslab, 
+    select or points items) of a POST value request.  The JSON response has a 'value'
+    list with the values of each selection.  The binary response starts 
+    with a table of little-endian uint64 offsets: one per selection plus 
+    the total length, counted from the end of the table, followed by the 
+    values of the selections one after the other.
+    """
+    def postRegions(self, reqUuid, filePath, selections, fields):
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getDatasetItemByUuid(reqUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+            shape = item['shape']
+            if shape['class'] != 'H5S_SIMPLE':
+                logging.info("selections are not supported for dataspace: %s", shape['class'])
+                raise HTTPError(400)
+            dims = shape['dims']
+            regions = self.getRegions(selections, dims)
+            count = 0
+            for (kind, selection) in regions:
+                if kind == 'points':
+                    count += len(selection)
+                else:
+                    count += selectionUtil.getSelectionCount(selection, dims)
+            self.setSelectionDetails('regions', count, item['type'])
+            values = db.getDatasetRegionValuesByUuid(reqUuid, regions, fields)
+            if values is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("selection read failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+                
+        values = [self.formatValues(regionValues) for regionValues in values]
+        if self.isBinaryRequest():
+            offsets = [0]
+            for regionValues in values:
+                offsets.append(offsets[-1] + len(regionValues))
+            table = np.array(offsets, dtype='<u8').tobytes()
+            self.writeBinaryBody(table + ''.join(values))
+            return
+        self.writeJson({ 'value': values })
+        
+    def post(self):
+        logging.info('ValueHandler.post host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        body = json.loads(self.getBody())
+        fields = self.getFields(body)
+        if "selections" in body:
+            if "points" in body:
+                logging.info("value post request with both points and selections")
+                raise HTTPError(400)
+            self.postRegions(reqUuid, filePath, body['selections'], fields)
+            return
+        if "points" not in body:
+            logging.info("value post request without points in body")
+            raise HTTPError(400)
+        points = body['points']
+        if type(points) != list:
+            logging.info("expecting list of points")
+            raise HTTPError(400)
+        
+        response = { }
+        hrefs = []
+        rootUUID = None
         item = None
         values = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getDatasetItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             shape = item['shape']
             if shape['class'] == 'H5S_SCALAR':
                 logging.info("point selection is not supported on scalar datasets")
                 raise HTTPError(400)
             rank = len(shape['dims'])
-                
-            for point in points:
-                if rank == 1 and type(point) != int:
-                    logging.info("elements of points to be int type for datasets of rank 1")
-                    raise HTTPError(400)
-                elif rank > 1 and type(point) != list:
-                    logging.info("elements of points to be list type for datasets of rank >1")
-                    raise HTTPError(400)
-                    if len(point) != rank:
-                        logging.info("one or more points have missing coordinate value")
-                        raise HTTPError(400)
+            self.checkPoints(points, rank)
              
-            values = db.getDatasetPointSelectionByUuid(reqUuid, points) 
+            self.setSelectionDetails('points', len(points), item['type'])
+            values = db.getDatasetPointSelectionByUuid(reqUuid, points, asArray=True, 
+                fields=fields)
+            if values is None and db.httpStatus != 200:
+                logging.info("point selection failed (httpError: %s) %s", db.httpStatus, db.httpMessage)
+                raise HTTPError(db.httpStatus)
             rootUUID = db.getUUIDByPath('/')
+            
+        if self.isBinaryRequest():
+            self.writeBinaryBody(self.formatValues(values))
+            return
                          
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
-        response['value'] = values
+        response['value'] = self.formatValues(values)
         
         hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/value'})
         hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID}) 
@@ -967,22 +1943,88 @@ class ValueHandler(RequestHandler):
         hrefs.append({'rel': 'home',  'href': href })   
         #response['hrefs'] = hrefs
         
-        self.write(json_encode(response))     
+        self.writeJson(response)     
     
-    def put(self):
-        logging.info('ValueHandler.put host=[' + self.request.host + '] uri=[' + 
-            self.request.uri + ']')
+    """
+    Helper method - write the values of a point selection
+    """
+    def putPoints(self, db, reqUuid, points, data, itemType):
+        self.setSelectionDetails('points', len(points), itemType)
+        ok = db.setDatasetPointValuesByUuid(reqUuid, points, data)
+        if not ok:
+            httpError = 500  # internal error
+            if db.httpStatus != 200:
+                httpError = db.httpStatus # library may have more specific error code
+            logging.info("point write failed (httpError: %s) %s", httpError, db.httpMessage)
+            raise HTTPError(httpError)
+            
+    """
+    Binary point write: PUT value?points=<count> with an application/
+    octet-stream body of count coordinates (rank little-endian uint64 
+    each) followed by count values in the dataset's type
+    """
+    def putBinaryPoints(self, count):
+        reqUuid = self.getRequestId()
+        filePath = self.getFilePath(self.request.host) 
+        self.verifyFile(filePath, True)
+        try:
+            count = int(count)
+        except ValueError:
+            logging.info("expected int type for points")
+            raise HTTPError(400)
+        if count < 0:
+            logging.info("invalid number of points: %d", count)
+            raise HTTPError(400)
+        body = self.getBody()
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getDatasetItemByUuid(reqUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+            shape = item['shape']
+            if shape['class'] != 'H5S_SIMPLE':
+                logging.info("point selection is not supported for dataspace: %s", shape['class'])
+                raise HTTPError(400)
+            rank = len(shape['dims'])
+            coordBytes = count * rank * 8
+            if len(body) < coordBytes:
+                logging.info("binary point write body is too short")
+                raise HTTPError(400)
+            points = np.frombuffer(body[:coordBytes], dtype='<u8').reshape((count, rank))
+            if (points > np.iinfo(np.int64).max).any():
+                logging.info("binary point coordinate out of range")
+                raise HTTPError(400)
+            self.putPoints(db, reqUuid, points, body[coordBytes:], item['type'])
+        logging.info("value put succeeded")
         
+    def put(self):
+        logging.info('ValueHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        if self.upload is not None:
+            self.finishUpload()
+            return
+        points = self.get_query_argument('points', None)
+        if points is not None:
+            if uploadUtil.getUploadType(self.request.headers.get('Content-Type', '')) != \
+                    'application/octet-stream':
+                logging.info("points query param is for binary point writes")
+                raise HTTPError(400)
+            self.putBinaryPoints(points)
+            return
+            
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         points = None
         start = None
         stop = None
         step = None
         
-        body = json.loads(self.request.body)
+        body = json.loads(self.getBody())
         
         if "value" not in body:
             logging.info("Value not supplied")
@@ -993,11 +2035,12 @@ class ValueHandler(RequestHandler):
             if type(points) != list:
                 logging.info("expecting list of points")
                 raise HTTPError(400)
-            if 'start' in body or 'stop' in body or 'step' in body:
-                logging.info("can use hyperslab selection with points")
+            if 'start' in body or 'stop' in body or 'step' in body or 'select' in body:
+                logging.info("can't use hyperslab selection with points")
                 raise HTTPError(400)
-            if len(points) > len(value):
-                logging.info("more points provided than values")
+        elif "select" in body:
+            if 'start' in body or 'stop' in body or 'step' in body:
+                logging.info("can't use start/stop/step with select")
                 raise HTTPError(400)
         else:
             # hyperslab selection
@@ -1010,23 +2053,36 @@ class ValueHandler(RequestHandler):
                             
         data = body["value"]
         
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getDatasetItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("dataset: [" + reqUuid + "] not found")
+                logging.info("dataset: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             dsetshape = item['shape']
-            dims = dsetshape['dims']
-            rank = len(dims) 
-            if points:
-                for point in points:
-                    pass
-                    
+            if points is not None:
+                if dsetshape['class'] != 'H5S_SIMPLE':
+                    logging.info("point selection is not supported for dataspace: %s", 
+                        dsetshape['class'])
+                    raise HTTPError(400)
+                self.checkPoints(points, len(dsetshape['dims']))
+                self.putPoints(db, reqUuid, points, data, item['type'])
             else:
-                slices = self.getHyperslabSelection(dims, start, stop, step)
+                dims = dsetshape['dims']
+                rank = len(dims) 
+                if "select" in body:
+                    slices = selectionUtil.getHyperslab(self.parseSelection(body['select'], dims))
+                    if slices is None:
+                        logging.info("index list selections can't be written")
+                        raise HTTPError(400)
+                else:
+                    slices = self.getHyperslabSelection(dims, start, stop, step)
+                count = 1
+                for dim in range(rank):
+                    count *= len(xrange(*slices[dim].indices(dims[dim])))
+                self.setSelectionDetails('hyperslab', count, item['type'])
                 # todo - check that the types are compatible
                 ok = db.setDatasetValuesByUuid(reqUuid, data, slices)
                 if not ok:
@@ -1037,7 +2093,571 @@ class ValueHandler(RequestHandler):
                     raise HTTPError(httpError)   
             logging.info("value post succeeded")   
            
-class AttributeHandler(RequestHandler):
+class StatsHandler(ValueHandler):
+    """
+    Reductions over a selection of a dataset, computed on the server:
+        GET /datasets/<id>/stats[?ops=min,max,sum,mean,std,count][&axis=0,1]
+    The selection is given with the same dimN_start/stop/step parameters as 
+    GET value.  Without axis the result is a scalar per op, otherwise the 
+    listed dimensions are reduced and an array is returned per op.
+    """
+    @gen.coroutine
+    def get(self):
+        logging.info('StatsHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        ops = self.getListQueryParam('ops', ['min', 'max', 'sum', 'mean', 'std'])
+        for op in ops:
+            if op not in reduceUtil.STATS_OPS:
+                logging.info("invalid stats op: %s", op)
+                raise HTTPError(400)
+        axes = self.getListQueryParam('axis')
+        if axes is not None:
+            try:
+                axes = [int(axis) for axis in axes]
+            except ValueError:
+                logging.info("invalid axis parameter (can't convert to int)")
+                raise HTTPError(400)
+        
+        body = yield self.coalesce(lambda: self.getStatsBody(reqUuid, filePath, ops, axes))
+        self.writeJsonBody(body)
+        
+    """
+    Compute the stats and return the encoded response
+    """
+    def getStatsBody(self, reqUuid, filePath, ops, axes):
+        domain = self.request.host
+        response = { }
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getDatasetItemByUuid(reqUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+            shape = item['shape']
+            slices = None
+            if shape['class'] == 'H5S_SIMPLE':
+                dims = shape['dims']
+                slices = self.getSlicesQueryParam(dims)
+                count = int(np.prod(reduceUtil.getSelectionCounts(slices, dims)))
+                self.setSelectionDetails('hyperslab', count, item['type'])
+            elif shape['class'] != 'H5S_SCALAR':
+                logging.info("no values for dataspace: %s", shape['class'])
+                raise HTTPError(400)
+            stats = db.getDatasetStatsByUuid(reqUuid, slices, ops, axes,
+                config.get('reduce_block_size'))
+            if stats is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("stats failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+            rootUUID = db.getUUIDByPath('/')
+        
+        href = self.request.protocol + '://' + domain + '/'
+        hrefs = []
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/stats'})
+        hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID}) 
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid }) 
+        hrefs.append({'rel': 'home',  'href': href })   
+        response['stats'] = stats
+        response['hrefs'] = hrefs
+        return self.encodeJson(response)
+        
+    def post(self):
+        raise HTTPError(405)  # Method not allowed
+        
+    def put(self):
+        raise HTTPError(405)  # Method not allowed
+                
+class HistogramHandler(ValueHandler):
+    """
+    Histogram of a selection of a dataset, computed on the server:
+        GET /datasets/<id>/histogram[?bins=<n>|<edge>,<edge>,...]
+            [&range=<min>,<max>][&field=<name>]
+    bins is the number of equal width bins (10 by default) over range (the 
+    range of the selected values if not given), or a list of bin edges.  
+    field selects the member of a compound type.  The selection is given 
+    with the same dimN_start/stop/step parameters as GET value.  NaNs 
+    aren't counted.
+    """
+    @gen.coroutine
+    def get(self):
+        logging.info('HistogramHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        bins = self.getListQueryParam('bins', ['10'])
+        valueRange = self.getListQueryParam('range')
+        try:
+            if len(bins) == 1:
+                bins = int(bins[0])
+            else:
+                bins = [float(edge) for edge in bins]
+            if valueRange is not None:
+                valueRange = tuple([float(value) for value in valueRange])
+        except ValueError:
+            logging.info("invalid bins or range parameter (can't convert to number)")
+            raise HTTPError(400)
+        if isinstance(bins, int):
+            nbins = bins
+        else:
+            nbins = len(bins) - 1
+            if valueRange is not None:
+                logging.info("range can't be used with bin edges")
+                raise HTTPError(400)
+        if nbins < 1 or nbins > config.get('histogram_max_bins'):
+            logging.info("invalid number of bins: %d", nbins)
+            raise HTTPError(400)
+        if valueRange is not None and len(valueRange) != 2:
+            logging.info("expected min,max for range")
+            raise HTTPError(400)
+        field = self.get_query_argument('field', None)
+        
+        body = yield self.coalesce(lambda: self.getHistogramBody(reqUuid, filePath, 
+            bins, valueRange, field))
+        self.writeJsonBody(body)
+        
+    """
+    Compute the histogram and return the encoded response
+    """
+    def getHistogramBody(self, reqUuid, filePath, bins, valueRange, field):
+        domain = self.request.host
+        response = { }
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getDatasetItemByUuid(reqUuid)
+            if item == None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+            shape = item['shape']
+            if shape['class'] != 'H5S_SIMPLE':
+                logging.info("no histogram for dataspace: %s", shape['class'])
+                raise HTTPError(400)
+            dims = shape['dims']
+            slices = self.getSlicesQueryParam(dims)
+            count = int(np.prod(reduceUtil.getSelectionCounts(slices, dims)))
+            self.setSelectionDetails('hyperslab', count, item['type'])
+            histogram = db.getDatasetHistogramByUuid(reqUuid, slices, bins, valueRange,
+                field, config.get('reduce_block_size'))
+            if histogram is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("histogram failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+            rootUUID = db.getUUIDByPath('/')
+        
+        href = self.request.protocol + '://' + domain + '/'
+        hrefs = []
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/histogram'})
+        hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID}) 
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid }) 
+        hrefs.append({'rel': 'home',  'href': href })   
+        response['counts'] = histogram['counts'].tolist()
+        response['edges'] = histogram['edges'].tolist()
+        response['hrefs'] = hrefs
+        return self.encodeJson(response)
+        
+    def post(self):
+        raise HTTPError(405)  # Method not allowed
+        
+    def put(self):
+        raise HTTPError(405)  # Method not allowed
+                
+class PyramidHandler(BaseHandler):
+    """
+    Multi-resolution pyramid of a dataset (kept in the file's "__db__" 
+    group, or the .db file for read-only files):
+        GET /datasets/<id>/pyramid - levels and whether the pyramid is stale
+        PUT /datasets/<id>/pyramid[?background] - build or rebuild the 
+            pyramid.  With background the build runs on a read worker and
+            202 is returned without waiting for it.
+        DELETE /datasets/<id>/pyramid - remove the pyramid
+    GET value with dimN_resolution=<n> is served from the coarsest up to 
+    date level that has at least n elements along dimension N.  Writes to 
+    the dataset mark its pyramid stale until it is rebuilt.
+    """
+    def getRequestId(self):
+        # request is in the form /datasets/<id>/pyramid, return <id>
+        uri = self.request.path
+        npos = uri.rfind('/pyramid')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to PyramidHandler in this case
+        id_part = uri[:npos]
+        npos = id_part.rfind('/')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to PyramidHandler in this case
+        
+        if npos == len(id_part) - 1:
+            raise HTTPError(400, message="missing id")
+        id = id_part[(npos+1):]
+        logging.debug('got id: [%s]', id)
+    
+        return id
+        
+    def getResponse(self, reqUuid, item):
+        href = self.request.protocol + '://' + self.request.host + '/'
+        hrefs = []
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/pyramid'})
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid })
+        hrefs.append({'rel': 'home',  'href': href })
+        response = { }
+        if item is not None:
+            response.update(item)
+        response['hrefs'] = hrefs
+        return response
+        
+    def get(self):
+        logging.info('PyramidHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getPyramidInfoByUuid(reqUuid)
+            if item is None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("pyramid for dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+        
+        self.writeJson(self.getResponse(reqUuid, item))
+        
+    """
+    Build the pyramid, return the pyramid info.  timer is None for 
+    background builds (that outlive the request)
+    """
+    def buildPyramid(self, reqUuid, filePath, timer):
+        with Hdf5db(filePath, timer=timer) as db:
+            item = db.buildPyramidByUuid(reqUuid, config.get('reduce_block_size'),
+                config.get('pyramid_min_extent'))
+            if item is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("pyramid build failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+        logging.info("pyramid built for dataset: [%s] levels: %d", reqUuid, len(item['levels']))
+        return item
+        
+    @gen.coroutine
+    def put(self):
+        logging.info('PyramidHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        # concurrent builds of the same pyramid share one build
+        key = ('pyramid', filePath, reqUuid)
+        if self.get_query_argument('background', None) is not None and flightUtil.isEnabled():
+            future = flightUtil.run(key, lambda: self.buildPyramid(reqUuid, filePath, None))
+            def logError(f):
+                if f.exception() is not None:
+                    logging.warning("background pyramid build failed for dataset: [%s]", reqUuid)
+            future.add_done_callback(logError)
+            self.set_status(202)  # accepted
+            self.writeJson(self.getResponse(reqUuid, None))
+            return
+        
+        if flightUtil.isEnabled() and not self.profiler:
+            item = yield flightUtil.run(key, lambda: self.buildPyramid(reqUuid, filePath, None))
+        else:
+            item = self.buildPyramid(reqUuid, filePath, self.timer)
+        self.set_status(201)  # resource created
+        self.writeJson(self.getResponse(reqUuid, item))
+        
+    def delete(self):
+        logging.info('PyramidHandler.delete host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath)
+        with Hdf5db(filePath, timer=self.timer) as db:
+            ok = db.deletePyramidByUuid(reqUuid)
+            if not ok:
+                httpStatus = db.httpStatus
+                if httpStatus == 200:
+                    httpStatus = 500
+                raise HTTPError(httpStatus)
+                
+class IndexHandler(BaseHandler):
+    """
+    Secondary indexes on fields of a one-dimensional compound dataset (kept 
+    in the file's "__db__" group, or the .db file for read-only files):
+        GET /datasets/<id>/indexes - list the dataset's indexes
+        GET /datasets/<id>/indexes/<field> - get one index
+        PUT /datasets/<id>/indexes/<field> - build or rebuild the index
+        DELETE /datasets/<id>/indexes/<field> - remove the index
+    PUT and DELETE are admin requests (X-Admin-Key header).  Value queries
+    on an indexed field read just the rows in the range of values the 
+    query can match.  Indexes are updated as the dataset is written.
+    """
+    def getPathParts(self):
+        # request is in the form /datasets/<id>/indexes[/<field>], return 
+        # (<id>, <field> or None).  The id is the path segment after 
+        # /datasets/, so field names are not searched for "/indexes".
+        uri = self.request.path
+        prefix = '/datasets/'
+        if not uri.startswith(prefix):
+            raise HTTPError(500)  # should not get routed to IndexHandler in this case
+        parts = uri[len(prefix):].split('/', 2)
+        if len(parts) < 2 or parts[1] != 'indexes':
+            raise HTTPError(500)  # should not get routed to IndexHandler in this case
+        if not parts[0]:
+            raise HTTPError(400, message="missing id")
+        field = None
+        if len(parts) == 3 and parts[2]:
+            field = url_unescape(parts[2])
+            if field.find('/') >= 0:
+                logging.info("invalid field name")
+                raise HTTPError(400)
+        return (parts[0], field)
+        
+    def getRequestId(self):
+        id = self.getPathParts()[0]
+        logging.debug('got id: [%s]', id)
+        return id
+        
+    def getField(self):
+        # return the <field> of /datasets/<id>/indexes/<field> (None for 
+        # the collection)
+        return self.getPathParts()[1]
+        
+    def getHref(self, reqUuid, field=None):
+        href = self.request.protocol + '://' + self.request.host + '/'
+        href += 'datasets/' + reqUuid + '/indexes'
+        if field is not None:
+            href += '/' + url_escape(field)
+        return href
+        
+    def getResponse(self, reqUuid, item=None):
+        href = self.request.protocol + '://' + self.request.host + '/'
+        hrefs = []
+        if item is None:
+            hrefs.append({'rel': 'self', 'href': self.getHref(reqUuid)})
+        else:
+            hrefs.append({'rel': 'self', 'href': self.getHref(reqUuid, item['field'])})
+            hrefs.append({'rel': 'collection', 'href': self.getHref(reqUuid)})
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid })
+        hrefs.append({'rel': 'home',  'href': href })
+        response = { }
+        if item is not None:
+            response.update(item)
+        response['hrefs'] = hrefs
+        return response
+        
+    def get(self):
+        logging.info('IndexHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        field = self.getField()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        with Hdf5db(filePath, timer=self.timer) as db:
+            items = db.getIndexesByUuid(reqUuid)
+            if items is None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+        
+        if field is None:
+            response = self.getResponse(reqUuid)
+            for item in items:
+                item['href'] = self.getHref(reqUuid, item['field'])
+            response['indexes'] = items
+        else:
+            items = [item for item in items if item['field'] == field]
+            if not items:
+                logging.info("no index for field: [%s]", field)
+                raise HTTPError(404)
+            response = self.getResponse(reqUuid, items[0])
+        self.writeJson(response)
+        
+    """
+    Build the index, return the index item.  timer is None when the build
+    is run on a read worker (and may outlive the request)
+    """
+    def buildIndex(self, reqUuid, field, filePath, timer):
+        with Hdf5db(filePath, timer=timer) as db:
+            item = db.createIndexByUuid(reqUuid, field, config.get('reduce_block_size'))
+            if item is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("index build failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+        logging.info("index built for dataset: [%s] field: [%s]", reqUuid, field)
+        return item
+        
+    @gen.coroutine
+    def put(self):
+        logging.info('IndexHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if not self.isAdminRequest():
+            logging.info("index build requested without valid admin key")
+            raise HTTPError(403)
+        
+        reqUuid = self.getRequestId()
+        field = self.getField()
+        if field is None:
+            raise HTTPError(405)  # Method not allowed
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        if flightUtil.isEnabled() and not self.profiler:
+            # concurrent builds of the same index share one build
+            key = ('index', filePath, reqUuid, field)
+            item = yield flightUtil.run(key, 
+                lambda: self.buildIndex(reqUuid, field, filePath, None))
+        else:
+            item = self.buildIndex(reqUuid, field, filePath, self.timer)
+        self.set_status(201)  # resource created
+        self.writeJson(self.getResponse(reqUuid, item))
+        
+    def delete(self):
+        logging.info('IndexHandler.delete host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if not self.isAdminRequest():
+            logging.info("index delete requested without valid admin key")
+            raise HTTPError(403)
+        reqUuid = self.getRequestId()
+        field = self.getField()
+        if field is None:
+            raise HTTPError(405)  # Method not allowed
+        domain = self.request.host
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath)
+        with Hdf5db(filePath, timer=self.timer) as db:
+            ok = db.deleteIndexByUuid(reqUuid, field)
+            if not ok:
+                httpStatus = db.httpStatus
+                if httpStatus == 200:
+                    httpStatus = 500
+                raise HTTPError(httpStatus)
+                
+class ZoneMapHandler(BaseHandler):
+    """
+    Zone map of a dataset: the min, max and number of NaNs of each chunk,
+    for numeric datasets or the numeric fields of compound datasets (kept 
+    in the file's "__db__" group, or the .db file for read-only files):
+        GET /datasets/<id>/zonemap - zone shape and number of zones with 
+            up to date stats
+        PUT /datasets/<id>/zonemap - start keeping a zone map (clears any
+            existing one)
+        DELETE /datasets/<id>/zonemap - remove the zone map
+    PUT and DELETE are admin requests (X-Admin-Key header).  Stats of a 
+    chunk are computed when a scan first needs them, and recomputed after 
+    the chunk is written.  Value queries skip chunks with no values in the
+    range the query can match.
+    """
+    def getRequestId(self):
+        # request is in the form /datasets/<id>/zonemap, return <id>
+        uri = self.request.path
+        npos = uri.rfind('/zonemap')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to ZoneMapHandler in this case
+        id_part = uri[:npos]
+        npos = id_part.rfind('/')
+        if npos < 0:
+            raise HTTPError(500)  # should not get routed to ZoneMapHandler in this case
+        
+        if npos == len(id_part) - 1:
+            raise HTTPError(400, message="missing id")
+        id = id_part[(npos+1):]
+        logging.debug('got id: [%s]', id)
+    
+        return id
+        
+    def getResponse(self, reqUuid, item):
+        href = self.request.protocol + '://' + self.request.host + '/'
+        hrefs = []
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/zonemap'})
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid })
+        hrefs.append({'rel': 'home',  'href': href })
+        response = { }
+        response.update(item)
+        response['hrefs'] = hrefs
+        return response
+        
+    def get(self):
+        logging.info('ZoneMapHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.getZoneMapInfoByUuid(reqUuid)
+            if item is None:
+                httpError = 404  # not found
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("zone map for dataset: [%s] not found", reqUuid)
+                raise HTTPError(httpError)
+        
+        self.writeJson(self.getResponse(reqUuid, item))
+        
+    def put(self):
+        logging.info('ZoneMapHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if not self.isAdminRequest():
+            logging.info("zone map requested without valid admin key")
+            raise HTTPError(403)
+        
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
+        
+        with Hdf5db(filePath, timer=self.timer) as db:
+            item = db.createZoneMapByUuid(reqUuid, config.get('zone_bytes'))
+            if item is None:
+                httpError = 500
+                if db.httpStatus != 200:
+                    httpError = db.httpStatus # library may have more specific error code
+                logging.info("zone map create failed (httpError: %s) %s", httpError, db.httpMessage)
+                raise HTTPError(httpError)
+        self.set_status(201)  # resource created
+        self.writeJson(self.getResponse(reqUuid, item))
+        
+    def delete(self):
+        logging.info('ZoneMapHandler.delete host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if not self.isAdminRequest():
+            logging.info("zone map delete requested without valid admin key")
+            raise HTTPError(403)
+        reqUuid = self.getRequestId()
+        domain = self.request.host
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath)
+        with Hdf5db(filePath, timer=self.timer) as db:
+            ok = db.deleteZoneMapByUuid(reqUuid)
+            if not ok:
+                httpStatus = db.httpStatus
+                if httpStatus == 200:
+                    httpStatus = 500
+                raise HTTPError(httpStatus)
+                
+class AttributeHandler(BaseHandler):
 
     # convert embedded list (list of lists) to tuples
     def convertToTuple(self, data):
@@ -1052,7 +2672,7 @@ class AttributeHandler(RequestHandler):
     def getRequestId(self):
         # request is in the form /(datasets|groups|datatypes)/<id>/attributes(/<name>), 
         # return <id>
-        uri = self.request.uri
+        uri = self.request.path
         idpart = None
         if uri[:len('/datasets/')] == '/datasets/':
             idpart = uri[len('/datasets/'):]  # get stuff after /datasets/
@@ -1062,7 +2682,7 @@ class AttributeHandler(RequestHandler):
             idpart = uri[len('/datatypes/'):]  # get stuff after /datatypes/
         else:
             # should not get here!
-            logging.error("unexpected uri: " + uri)
+            logging.error("unexpected uri: %s", uri)
             raise HTTPError(500)
         
         npos = idpart.find('/')
@@ -1071,7 +2691,7 @@ class AttributeHandler(RequestHandler):
             raise HTTPError(400)  
         id = idpart[:npos]
          
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
         
@@ -1079,7 +2699,7 @@ class AttributeHandler(RequestHandler):
         # request is in the form /(datasets|groups|datatypes)/<id>/attributes(/<name>), 
         # return <name>
         # return None if the uri doesn't end with ".../<name>"
-        uri = self.request.uri
+        uri = self.request.path
         name = None
         npos = uri.rfind('/attributes')
         if npos <= 0:
@@ -1090,14 +2710,14 @@ class AttributeHandler(RequestHandler):
             uri = uri[1:]
             if len(uri) > 0:
                 name = url_unescape(uri)  # todo: handle possible query string?
-                logging.info('got name: [' + name + ']') 
+                logging.debug('got name: [%s]', name) 
     
         return name
         
     def getRequestCollectionName(self):
         # request is in the form /(datasets|groups|datatypes)/<id>/attributes(/<name>), 
         # return datasets | groups | datatypes
-        uri = self.request.uri
+        uri = self.request.path
         
         npos = uri.find('/')
         if npos < 0:
@@ -1107,7 +2727,7 @@ class AttributeHandler(RequestHandler):
         npos = uri.find('/')  # second '/'
         col_name = uri[:npos]
          
-        logging.info('got collection name: [' + col_name + ']')
+        logging.debug('got collection name: [%s]', col_name)
         if col_name not in ('datasets', 'groups', 'datatypes'):
             raise HTTPError(500)   # shouldn't get routed here in this case
     
@@ -1115,14 +2735,14 @@ class AttributeHandler(RequestHandler):
         
         
     def get(self):
-        logging.info('AttrbiuteHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('AttrbiuteHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         
         reqUuid = self.getRequestId()
         domain = self.request.host
         col_name = self.getRequestCollectionName()
         attr_name = self.getRequestName()
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         response = { }
         hrefs = []
@@ -1137,14 +2757,14 @@ class AttributeHandler(RequestHandler):
                 logging.info("expected int type for limit")
                 raise HTTPError(400) 
         marker = self.get_query_argument("Marker", None)
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             if attr_name != None:
-                item = db.getAttributeItem(col_name, reqUuid, attr_name)
+                item = db.getAttributeItem(col_name, reqUuid, attr_name, asArray=True)
                 if item == None:
                     httpError = 404  # not found
                     if db.httpStatus != 200:
                         httpError = db.httpStatus # library may have more specific error code
-                    logging.info("attribute: [" + reqUuid + "]/" + attr_name + " not found")
+                    logging.info("attribute: [%s]/%s not found", reqUuid, attr_name)
                     raise HTTPError(httpError)
                 items.append(item)
             else:
@@ -1189,17 +2809,17 @@ class AttributeHandler(RequestHandler):
         else:
             if len(responseItems) == 0:
                 # should have raised exception earlier
-                logging.error("attribute not found: " + attr_name) 
+                logging.error("attribute not found: %s", attr_name) 
                 raise HTTPError(404)
             responseItem = responseItems[0]
             for k in responseItem:
                 response[k] = responseItem[k]
         response['hrefs'] = hrefs   
          
-        self.write(json_encode(response))
+        self.writeJson(response)
         
     def put(self):
-        logging.info('AttributeHandler.put host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('AttributeHandler.put host=[%s] uri=[%s]', self.request.host, self.request.uri)
         
         domain = self.request.host
         col_name = self.getRequestCollectionName()
@@ -1208,8 +2828,8 @@ class AttributeHandler(RequestHandler):
         if attr_name == None:
             logging.info("Attribute name not supplied")
             raise HTTPError(400)
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         body = json.loads(self.request.body)
         
@@ -1251,7 +2871,7 @@ class AttributeHandler(RequestHandler):
         data = self.convertToTuple(value)
                    
         
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             db.createAttribute(col_name, reqUuid, attr_name, shape, datatype, data)
             if db.httpStatus != 200:
                 raise HTTPError(db.httpStatus)
@@ -1273,11 +2893,11 @@ class AttributeHandler(RequestHandler):
         hrefs.append({'rel': 'root',   'href': root_href }) 
         response['hrefs'] = hrefs 
         
-        self.write(json_encode(response))  
+        self.writeJson(response)  
         self.set_status(201)  # resource created
         
     def delete(self): 
-        logging.info('AttributeHandler.delete ' + self.request.host)   
+        logging.info('AttributeHandler.delete %s', self.request.host)   
         obj_uuid = self.getRequestId()
         domain = self.request.host
         col_name = self.getRequestCollectionName()
@@ -1285,9 +2905,9 @@ class AttributeHandler(RequestHandler):
         if attr_name == None:
             logging.info("Attribute name not supplied")
             raise HTTPError(400)
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        with Hdf5db(filePath) as db:
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        with Hdf5db(filePath, timer=self.timer) as db:
             ok = db.deleteAttribute(col_name, obj_uuid, attr_name)
             if not ok:
                 httpStatus = db.httpStatus
@@ -1296,38 +2916,38 @@ class AttributeHandler(RequestHandler):
                 raise HTTPError(httpStatus) 
                 
          
-class GroupHandler(RequestHandler):
+class GroupHandler(BaseHandler):
     def getRequestId(self):
-        uri = self.request.uri
+        uri = self.request.path
         npos = uri.rfind('/')
         if npos < 0:
             raise HTTPError(500)  # should not get routed to GroupHandler in this case
         if npos == len(uri) - 1:
             raise HTTPError(400, message="missing id")
         id = uri[(npos+1):]
-        logging.info('got id: [' + id + ']')
+        logging.debug('got id: [%s]', id)
     
         return id
             
     def get(self):
-        logging.info('GroupHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('GroupHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         reqUuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         response = { }
              
         hrefs = []
         rootUUID = None
         item = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             item = db.getGroupItemByUuid(reqUuid)
             if item == None:
                 httpError = 404  # not found
                 if db.httpStatus != 200:
                     httpError = db.httpStatus # library may have more specific error code
-                logging.info("group: [" + reqUuid + "] not found")
+                logging.info("group: [%s] not found", reqUuid)
                 raise HTTPError(httpError)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -1345,15 +2965,15 @@ class GroupHandler(RequestHandler):
         response['linkCount'] = item['linkCount']
         response['hrefs'] = hrefs
         
-        self.write(json_encode(response))
+        self.writeJson(response)
         
     def delete(self): 
-        logging.info('GroupHandler.delete ' + self.request.host)   
+        logging.info('GroupHandler.delete %s', self.request.host)   
         uuid = self.getRequestId()
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        with Hdf5db(filePath) as db:
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
+        with Hdf5db(filePath, timer=self.timer) as db:
             ok = db.deleteObjectByUuid(uuid)
             if not ok:
                 httpStatus = db.httpStatus
@@ -1372,15 +2992,15 @@ class GroupHandler(RequestHandler):
         hrefs.append({'rel': 'home',       'href': href }) 
         response['hrefs'] = hrefs
          
-        self.write(json_encode(response)) 
+        self.writeJson(response) 
                 
-class GroupCollectionHandler(RequestHandler):
+class GroupCollectionHandler(BaseHandler):
             
     def get(self):
-        logging.info('GroupCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('GroupCollectionHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         rootUUID = None
         
         # Get optional query parameters
@@ -1397,7 +3017,7 @@ class GroupCollectionHandler(RequestHandler):
              
         items = None
         hrefs = []
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             items = db.getCollection("groups", marker, limit)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -1409,19 +3029,19 @@ class GroupCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'home',       'href': href }) 
         response['hrefs'] = hrefs
          
-        self.write(json_encode(response))
+        self.writeJson(response)
         
     def post(self):
-        logging.info('GroupHandlerCollection.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
-        if self.request.uri != '/groups':
+        logging.info('GroupHandlerCollection.post host=[%s] uri=[%s]', self.request.host, self.request.uri)
+        if self.request.path != '/groups':
             logging.info('bad group post request')
             raise HTTPError(405)  # Method not allowed
                
         domain = self.request.host
-        filePath = getFilePath(domain)
-        verifyFile(filePath, True)
+        filePath = self.getFilePath(domain)
+        self.verifyFile(filePath, True)
         
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             rootUUID = db.getUUIDByPath('/')
             grpUUID = db.createGroup()
             if grpUUID == None:
@@ -1450,17 +3070,17 @@ class GroupCollectionHandler(RequestHandler):
         response['attributeCount'] = item['attributeCount']
         response['linkCount'] = item['linkCount']
         response['hrefs'] = hrefs
-        self.write(json_encode(response))
+        self.writeJson(response)
                 
         self.set_status(201)  # resource created
         
-class DatasetCollectionHandler(RequestHandler):
+class DatasetCollectionHandler(BaseHandler):
             
     def get(self):
-        logging.info('DatasetCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('DatasetCollectionHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
@@ -1477,7 +3097,7 @@ class DatasetCollectionHandler(RequestHandler):
         rootUUID = None
              
         items = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             items = db.getCollection("datasets", marker, limit)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -1489,15 +3109,15 @@ class DatasetCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'home',       'href': href }) 
         response['hrefs'] = hrefs
          
-        self.write(json_encode(response))
+        self.writeJson(response)
         
-class TypeCollectionHandler(RequestHandler):
+class TypeCollectionHandler(BaseHandler):
             
     def get(self):
-        logging.info('TypeCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        logging.info('TypeCollectionHandler.get host=[%s] uri=[%s]', self.request.host, self.request.uri)
         domain = self.request.host
-        filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        filePath = self.getFilePath(domain) 
+        self.verifyFile(filePath)
         
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
@@ -1514,7 +3134,7 @@ class TypeCollectionHandler(RequestHandler):
         rootUUID = None
              
         items = None
-        with Hdf5db(filePath) as db:
+        with Hdf5db(filePath, timer=self.timer) as db:
             items = db.getCollection("datatypes", marker, limit)
             rootUUID = db.getUUIDByPath('/')
                          
@@ -1526,17 +3146,17 @@ class TypeCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'home',       'href': href }) 
         response['hrefs'] = hrefs
          
-        self.write(json_encode(response))
+        self.writeJson(response)
           
         
-class RootHandler(RequestHandler):
+class RootHandler(BaseHandler):
      
     
     def getRootResponse(self, filePath):
         # used by GET / and PUT /
         domain = self.request.host
-        filePath = getFilePath(domain)
-        with Hdf5db(filePath) as db:
+        filePath = self.getFilePath(domain)
+        with Hdf5db(filePath, timer=self.timer) as db:
             rootUUID = db.getUUIDByPath('/')
             datasetCount = db.getNumberOfDatasets()
             groupCount = db.getNumberOfGroups()
@@ -1561,37 +3181,37 @@ class RootHandler(RequestHandler):
         return response
         
     def get(self):
-        logging.info('RootHandler.get ' + self.request.host)
+        logging.info('RootHandler.get %s', self.request.host)
         # get file path for the domain
         # will raise exception if not found
-        filePath = getFilePath(self.request.host)
-        verifyFile(filePath)
+        filePath = self.getFilePath(self.request.host)
+        self.verifyFile(filePath)
         response = self.getRootResponse(filePath)
         
-        self.write(json_encode(response)) 
+        self.writeJson(response) 
         
     def put(self): 
-        logging.info('RootHandler.put ' + self.request.host)  
-        filePath = getFilePath(self.request.host)
-        logging.info("put filePath: " + filePath)
+        logging.info('RootHandler.put %s', self.request.host)  
+        filePath = self.getFilePath(self.request.host)
+        logging.info("put filePath: %s", filePath)
         if op.isfile(filePath):
             logging.info("path exists")
             raise HTTPError(409)  # Conflict - is this the correct code?
         # create directories as needed
         makeDirs(op.dirname(filePath))
-        logging.info("creating file: [" + filePath + "]")
+        logging.info("creating file: [%s]", filePath)
         if not Hdf5db.createHDF5File(filePath):
-            logging.error("unexpected error creating HDF5: " + filePath)
+            logging.error("unexpected error creating HDF5: %s", filePath)
             raise HTTPError(500)
         response = self.getRootResponse(filePath)
         
-        self.write(json_encode(response))
+        self.writeJson(response)
         self.set_status(201)  # resource created
           
     def delete(self): 
-        logging.info('RootHandler.delete ' + self.request.host)   
-        filePath = getFilePath(self.request.host)
-        verifyFile(filePath, True)
+        logging.info('RootHandler.delete %s', self.request.host)   
+        filePath = self.getFilePath(self.request.host)
+        self.verifyFile(filePath, True)
         
         if not op.isfile(filePath):
             # file not there
@@ -1601,6 +3221,8 @@ class RootHandler(RequestHandler):
             # file is read-only
             raise HTTPError(403) # Forbidden
             
+        filePoolUtil.closeFile(filePath)
+        valueCacheUtil.invalidateFile(filePath)
         os.remove(filePath)    
         
 def sig_handler(sig, frame):
@@ -1627,6 +3249,7 @@ def shutdown():
     stop_loop() 
     
     logging.info("closing db")
+    filePoolUtil.closeAll()
 
 def make_app():
     settings = {
@@ -1636,10 +3259,17 @@ def make_app():
         # "xsrf_cookies": True,
         "debug": config.get('debug')
     }
+    transforms = []
+    if config.get('compress_response'):
+        transforms.append(CompressionTransform)
     print 'static_path:', settings['static_path']
     print 'isdebug:', settings['debug']
     
     app = Application( [
+        # ahead of the other /datasets/<id>/... routes, so index (field) 
+        # names like "type" or "shape" aren't routed to them
+        url(r"/datasets/[^/]+/indexes", IndexHandler),
+        url(r"/datasets/[^/]+/indexes/.*", IndexHandler),
         url(r"/datasets/.*/type", DatatypeHandler),
         url(r"/datasets/.*/shape", ShapeHandler),
         url(r"/datasets/.*/attributes/.*", AttributeHandler),
@@ -1648,10 +3278,21 @@ def make_app():
         url(r"/datasets/.*/attributes", AttributeHandler),
         url(r"/groups/.*/attributes", AttributeHandler),
         url(r"/datatypes/.*/attributes", AttributeHandler),
+        url(r"/datasets/.*/append", AppendHandler),
+        url(r"/datasets/.*/append\?.*", AppendHandler),
+        url(r"/datasets/.*/chunks", ChunkHandler),
+        url(r"/datasets/.*/chunks\?.*", ChunkHandler),
         url(r"/datatypes/.*", TypeHandler),
         url(r"/datatypes/", TypeHandler),
         url(r"/datatypes\?.*", TypeCollectionHandler),
         url(r"/datatypes", TypeCollectionHandler),
+        url(r"/datasets/.*/zonemap", ZoneMapHandler),
+        url(r"/datasets/.*/pyramid", PyramidHandler),
+        url(r"/datasets/.*/pyramid\?.*", PyramidHandler),
+        url(r"/datasets/.*/stats", StatsHandler),
+        url(r"/datasets/.*/histogram", HistogramHandler),
+        url(r"/datasets/.*/histogram\?.*", HistogramHandler),
+        url(r"/datasets/.*/stats\?.*", StatsHandler),
         url(r"/datasets/.*/value", ValueHandler),
         url(r"/datasets/.*/value\?.*", ValueHandler),
         url(r"/datasets/.*", DatasetHandler),
@@ -1665,14 +3306,17 @@ def make_app():
         url(r"/groups/.*", GroupHandler), 
         url(r"/groups\?.*", GroupCollectionHandler),
         url(r"/groups", GroupCollectionHandler),
+        url(r"/admin/profiles", ProfileHandler),
+        url(r"/admin/profiles/.*", ProfileHandler),
+        url(r"/admin/metrics", MetricsHandler),
         url(r"/", RootHandler),
         url(r".*", DefaultHandler)
-    ],  **settings)
+    ], transforms=transforms, **settings)
     return app
 
 def main():
     # os.chdir(config.get('datapath'))
-    logging.basicConfig(level=logging.DEBUG)
+    logging.basicConfig(level=getattr(logging, config.get('log_level')))
     port = config.get('port')
     global server
     app = make_app()
@@ -1684,4 +3328,5 @@ def main():
     print "Starting event loop on port: ", port
     IOLoop.current().start()
 
-main()
+if __name__ == '__main__':
+    main()
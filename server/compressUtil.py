@@ -0,0 +1,187 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import zlib
+from tornado.web import OutputTransform
+from tornado.escape import native_str
+try:
+    import brotli
+except ImportError:
+    brotli = None   # 'br' encoding not available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None   # 'zstd' encoding not available
+
+import config
+
+"""
+ Response compression.
+ CompressionTransform picks a content encoding from the request's 
+ Accept-Encoding header and the 'compress_encodings' config (in order of
+ preference), and compresses responses whose content type is listed in 
+ 'compress_types' and that are at least 'compress_min_size' bytes long.
+ Responses that are flushed in several chunks are compressed as a stream.
+ Responses with "Cache-Control: no-transform" (e.g. stored chunks that are 
+ already compressed) are sent as is.
+"""
+
+
+class ZlibCompressor:
+    # gzip (wbits = 16 + MAX_WBITS) or deflate (zlib format) 
+    def __init__(self, level, wbits):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+        
+    def compress(self, data, finishing):
+        out = self.compressor.compress(data)
+        if finishing:
+            return out + self.compressor.flush(zlib.Z_FINISH)
+        return out + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        
+        
+class BrotliCompressor:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+        
+    def compress(self, data, finishing):
+        out = self.compressor.process(data)
+        if finishing:
+            return out + self.compressor.finish()
+        return out + self.compressor.flush()
+        
+        
+class ZstdCompressor:
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        
+    def compress(self, data, finishing):
+        out = self.compressor.compress(data)
+        if finishing:
+            return out + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return out + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        
+        
+"""
+  createCompressor - return compressor for the given encoding
+"""
+def createCompressor(encoding, level):
+    if encoding == 'gzip':
+        return ZlibCompressor(level, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return ZlibCompressor(level, zlib.MAX_WBITS)
+    if encoding == 'br':
+        return BrotliCompressor(level)
+    if encoding == 'zstd':
+        return ZstdCompressor(level)
+    raise ValueError("unknown encoding: " + encoding)
+    
+"""
+  getAvailableEncodings - configured encodings that this server can produce
+"""
+def getAvailableEncodings():
+    encodings = []
+    for encoding in config.get('compress_encodings'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if encoding == 'zstd' and zstandard is None:
+            continue
+        encodings.append(encoding)
+    return encodings
+        
+"""
+  parseAcceptEncoding - return dict of encoding -> q value for the given 
+    Accept-Encoding header value, e.g. "gzip;q=1.0, br" -> {'gzip': 1.0, 'br': 1.0}
+"""
+def parseAcceptEncoding(value):
+    accepted = {}
+    for item in value.split(','):
+        parts = item.strip().split(';')
+        encoding = parts[0].strip().lower()
+        if not encoding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[encoding] = q
+    return accepted
+    
+"""
+  chooseEncoding - return the encoding to use for the given Accept-Encoding
+    header (or None for no compression).  The client's q values come first,
+    ties go to the earlier encoding in 'compress_encodings'.
+"""
+def chooseEncoding(acceptEncoding):
+    if not acceptEncoding:
+        return None
+    accepted = parseAcceptEncoding(acceptEncoding)
+    choice = None
+    choiceQ = 0.0
+    for encoding in getAvailableEncodings():
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > choiceQ:
+            choice = encoding
+            choiceQ = q
+    return choice
+    
+"""
+  isCompressibleType - check the content type against 'compress_types'
+    (entries ending in '/' match any subtype)
+"""
+def isCompressibleType(contentType):
+    contentType = contentType.split(';')[0].strip().lower()
+    for ctype in config.get('compress_types'):
+        if ctype.endswith('/'):
+            if contentType.startswith(ctype):
+                return True
+        elif contentType == ctype:
+            return True
+    return False
+        
+        
+class CompressionTransform(OutputTransform):
+    def __init__(self, request):
+        self.encoding = chooseEncoding(request.headers.get('Accept-Encoding', ''))
+        self.compressor = None
+        
+    def transform_first_chunk(self, status_code, headers, chunk, finishing):
+        ctype = native_str(headers.get('Content-Type', ''))
+        if not isCompressibleType(ctype):
+            return status_code, headers, chunk
+        # response depends on the Accept-Encoding header
+        if 'Vary' in headers:
+            headers['Vary'] += ', Accept-Encoding'
+        else:
+            headers['Vary'] = 'Accept-Encoding'
+        if (self.encoding is None or 'Content-Encoding' in headers or
+                'no-transform' in headers.get('Cache-Control', '') or
+                (finishing and len(chunk) < config.get('compress_min_size'))):
+            # small responses written in one go aren't worth compressing
+            return status_code, headers, chunk
+        self.compressor = createCompressor(self.encoding, config.get('compress_level'))
+        headers['Content-Encoding'] = self.encoding
+        chunk = self.transform_chunk(chunk, finishing)
+        if 'Content-Length' in headers:
+            # with more chunks to come, fall back to chunked encoding
+            if finishing:
+                headers['Content-Length'] = str(len(chunk))
+            else:
+                del headers['Content-Length']
+        return status_code, headers, chunk
+        
+    def transform_chunk(self, chunk, finishing):
+        if self.compressor:
+            chunk = self.compressor.compress(chunk, finishing)
+        return chunk
@@ -16,7 +16,37 @@ cfg = {
     'domain': 'hdf.io',
     'hdf5_ext': '.h5',
     'local_ip': '127.0.0.1',
-    'default_dns': '8.8.8.8'  # used by local_dns.py
+    'default_dns': '8.8.8.8',  # used by local_dns.py
+    'server_timing': False,    # always send Server-Timing header (otherwise only on request)
+    'admin_key': None,         # value for X-Admin-Key header of admin requests (None to disable)
+    'profile_max_concurrent': 1,  # max number of requests profiled at the same time
+    'profile_max_saved': 20,      # number of request profiles kept for /admin/profiles
+    'float_precision': None,      # significant digits for float values in responses (None for full)
+    'compress_response': True,    # compress responses for clients that accept it
+    'compress_encodings': ['zstd', 'br', 'gzip', 'deflate'],  # preference order (zstd/br if installed)
+    'compress_types': ['application/json', 'application/octet-stream', 'text/'],
+    'compress_min_size': 1024,    # don't compress responses smaller than this
+    'compress_level': 1,          # favor speed over ratio
+    'log_level': 'INFO',          # DEBUG for per-object tracing
+    'slow_request_log': None,     # file for the slow request log (JSON lines), None to disable
+    'slow_request_threshold': 1000, # requests slower than this (in ms) are logged
+    'file_pool_size': 16,         # files kept open between requests (0 to reopen for each request)
+    'chunk_cache_nbytes': 16*1024*1024,  # HDF5 raw data chunk cache size per file
+    'chunk_cache_nslots': 10007,  # chunk cache hash table size (a prime ~100x the chunks that fit)
+    'chunk_cache_w0': 0.75,       # chunk cache preemption policy (1.0 to evict fully read chunks first)
+    'chunk_cache_overrides': {},  # domain or domain+h5path -> {'nbytes', 'nslots', 'w0'}
+    'value_cache_size': 64*1024*1024,  # bytes of decoded selections kept for value requests (0 to disable)
+    'value_cache_max_item': 0.25, # largest selection cached, as a fraction of value_cache_size
+    'reduce_block_size': 16*1024*1024,  # bytes read at a time for /stats reductions and downsampling
+    'pyramid_min_extent': 256,    # pyramid levels are added until no dimension is larger than this
+    'query_max_rows': 10000,      # most rows returned by a value query (see Limit/Marker paging)
+    'zone_bytes': 1024*1024,      # zone size of zone maps for contiguous datasets (chunked datasets use the chunks)
+    'histogram_max_bins': 100000, # most bins of a /histogram request
+    'max_selections': 1000,       # most selections read by one POST value request
+    'upload_slab_size': 4*1024*1024,   # bytes of rows written at a time by streamed PUT value uploads
+    'max_upload_size': 16*1024*1024*1024,  # largest streamed PUT value body
+    'read_threads': 4             # threads for dataset/value reads, identical concurrent reads are
+                                  # shared (0 to read on the IOLoop without coalescing)
 }
    
 def get(x):     
@@ -0,0 +1,306 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import os
+import os.path as op
+import time
+import threading
+import itertools
+import logging
+from collections import OrderedDict
+
+import config
+import valueCacheUtil
+from fileUtil import getDomain
+
+"""
+ Pool of HDF5 files kept open between requests.
+ Reopening the file for each request throws away the HDF5 metadata and raw
+ data chunk caches, so small slab reads of a compressed dataset decompress 
+ the same chunks over and over.  Files given back to the pool stay open (up
+ to 'file_pool_size' of them, the least recently used are closed first) and
+ are reopened if the file has been changed or replaced on disk.
+ 
+ Chunk cache settings come from 'chunk_cache_nbytes', 'chunk_cache_nslots' 
+ and 'chunk_cache_w0', with 'chunk_cache_overrides' keyed by domain (for a 
+ file) or by domain + h5path (for a single dataset), e.g.:
+    {'images.hdf.io': {'nbytes': 64*1024*1024},
+     'images.hdf.io/frames/raw': {'nbytes': 256*1024*1024, 'nslots': 100003}}
+"""
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (filePath, mode) -> PoolEntry, least recently used first
+_counts = { 'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0, 'busy': 0 }
+
+
+"""
+  ChunkTracker - estimates chunk cache hits for reads of one dataset.
+    HDF5 doesn't report raw data chunk cache statistics, so the chunks touched 
+    by each selection are run through an LRU list sized like the dataset's 
+    chunk cache.
+"""
+class ChunkTracker:
+    def __init__(self, dset):
+        (nslots, nbytes, w0) = dset.id.get_access_plist().get_chunk_cache()
+        chunkBytes = dset.dtype.itemsize
+        for extent in dset.chunks:
+            chunkBytes *= extent
+        self.chunks = dset.chunks
+        self.shape = dset.shape
+        self.capacity = min(nslots, nbytes // max(chunkBytes, 1))
+        self.lru = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def getChunkIndices(self, dim, s):
+        # return list of chunk indices touched in dimension dim by slice s
+        (start, stop, step) = s.indices(self.shape[dim])
+        if stop <= start:
+            return []
+        chunkExtent = self.chunks[dim]
+        if step <= chunkExtent:
+            return range(start // chunkExtent, (stop - 1) // chunkExtent + 1)
+        return sorted(set([i // chunkExtent for i in range(start, stop, step)]))
+        
+    def addSelection(self, slices):
+        if slices is Ellipsis:
+            slices = [slice(None)] * len(self.shape)
+        indices = []
+        count = 1
+        for dim in range(len(self.shape)):
+            dimIndices = self.getChunkIndices(dim, slices[dim])
+            indices.append(dimIndices)
+            count *= len(dimIndices)
+        if count > self.capacity:
+            # selection doesn't fit in the cache, count every chunk as a miss
+            self.misses += count
+            self.lru.clear()
+            return
+        for index in itertools.product(*indices):
+            if index in self.lru:
+                self.hits += 1
+                del self.lru[index]
+            else:
+                self.misses += 1
+            self.lru[index] = True
+        while len(self.lru) > self.capacity:
+            self.lru.popitem(last=False)
+
+
+class PoolEntry:
+    def __init__(self, filePath, mode, f, dbf):
+        self.filePath = filePath
+        self.mode = mode
+        self.f = f
+        self.dbf = dbf
+        self.inUse = True
+        self.pooled = False     # True if the entry is kept in the pool
+        self.fileStat = None    # file stat at last release
+        self.opened = time.time()
+        self.uses = 1
+        self.datasets = { }     # dataset uuid -> h5py Dataset
+        self.trackers = { }     # dataset uuid -> ChunkTracker
+        
+    def trackRead(self, objUuid, dset, slices):
+        if dset.chunks is None:
+            return
+        if objUuid not in self.trackers:
+            self.trackers[objUuid] = ChunkTracker(dset)
+        self.trackers[objUuid].addSelection(slices)
+        
+    def forgetDataset(self, objUuid):
+        self.datasets.pop(objUuid, None)
+        self.trackers.pop(objUuid, None)
+        
+    def getChunkCounts(self):
+        hits = 0
+        misses = 0
+        for tracker in self.trackers.values():
+            hits += tracker.hits
+            misses += tracker.misses
+        return (hits, misses)
+            
+    def close(self):
+        self.datasets = { }
+        try:
+            self.f.close()
+            if self.dbf:
+                self.dbf.close()
+        except Exception as e:
+            logging.warning("error closing %s: %s", self.filePath, e)
+            
+            
+def isEnabled():
+    return config.get('file_pool_size') > 0
+        
+def getFileStat(filePath):
+    # changes to any of these mean the file has to be reopened
+    st = os.stat(filePath)
+    return (st.st_ino, st.st_size, st.st_mtime)
+    
+"""
+  getChunkCacheConfig - return the rdcc settings for a file, or for the 
+    dataset at h5path in the file.  For datasets, None is returned unless 
+    there is a dataset specific override.
+"""
+def getChunkCacheConfig(filePath, h5path=None):
+    overrides = config.get('chunk_cache_overrides')
+    settings = None
+    if h5path is None:
+        settings = { 'nbytes': config.get('chunk_cache_nbytes'), 
+            'nslots': config.get('chunk_cache_nslots'), 
+            'w0': config.get('chunk_cache_w0') }
+    if not overrides:
+        return settings
+    datapath = op.realpath(config.get('datapath'))
+    if not op.realpath(filePath).startswith(datapath + os.sep):
+        return settings  # not a domain file
+    key = getDomain(filePath)
+    if h5path is not None:
+        key += h5path
+    if key in overrides:
+        if settings is None:
+            settings = getChunkCacheConfig(filePath)
+        settings.update(overrides[key])
+    return settings
+    
+"""
+  acquire - return a PoolEntry for the file.  opener is called with no 
+    arguments to open the file when there's no usable pooled handle, and
+    should return a tuple of (file, dbfile).
+    Entries must be given back with release().
+"""
+def acquire(filePath, mode, opener):
+    key = (filePath, mode)
+    fileStat = getFileStat(filePath)
+    staleEntry = None
+    pooled = True
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            if entry.inUse:
+                # nested open of the same file, use a private handle
+                _counts['busy'] += 1
+                pooled = False
+            elif entry.fileStat != fileStat:
+                # changed outside the pool
+                _counts['stale'] += 1
+                staleEntry = _entries.pop(key)
+            else:
+                _counts['hits'] += 1
+                entry.inUse = True
+                entry.uses += 1
+                del _entries[key]
+                _entries[key] = entry  # most recently used
+                return entry
+        _counts['misses'] += 1
+        
+    if staleEntry is not None:
+        logging.info("file pool: reopening changed file %s", filePath)
+        staleEntry.close()
+        valueCacheUtil.invalidateFile(filePath)
+    (f, dbf) = opener()
+    entry = PoolEntry(filePath, mode, f, dbf)
+    if pooled:
+        with _lock:
+            if key not in _entries:
+                entry.pooled = True
+                _entries[key] = entry
+    return entry
+    
+"""
+  release - give an entry back after a request is done with it.  The file is
+    flushed, and closed if it wasn't pooled.
+"""
+def release(entry):
+    entry.f.flush()
+    if entry.dbf:
+        entry.dbf.flush()
+    if not entry.pooled:
+        entry.close()
+        return
+    evicted = []
+    try:
+        entry.fileStat = getFileStat(entry.filePath)
+    except OSError:
+        # file removed while in use
+        entry.fileStat = None
+    maxSize = config.get('file_pool_size')
+    with _lock:
+        entry.inUse = False
+        key = (entry.filePath, entry.mode)
+        if entry.fileStat is None and _entries.get(key) is entry:
+            del _entries[key]
+            evicted.append(entry)
+        for key in list(_entries.keys()):
+            if len(_entries) <= maxSize:
+                break
+            if not _entries[key].inUse:
+                evicted.append(_entries.pop(key))
+                _counts['evictions'] += 1
+    for item in evicted:
+        item.close()
+        
+"""
+  closeFile - close any idle pooled handles for the file (e.g. before the 
+    file is removed)
+"""
+def closeFile(filePath):
+    closed = []
+    with _lock:
+        for key in list(_entries.keys()):
+            if key[0] == filePath and not _entries[key].inUse:
+                closed.append(_entries.pop(key))
+    for entry in closed:
+        entry.close()
+    
+def closeAll():
+    with _lock:
+        entries = list(_entries.values())
+        _entries.clear()
+    for entry in entries:
+        if not entry.inUse:
+            entry.close()
+    
+"""
+  getStats - return pool counters and per-file cache statistics
+"""
+def getStats():
+    stats = { 'maxSize': config.get('file_pool_size') }
+    files = [ ]
+    chunkHits = 0
+    chunkMisses = 0
+    with _lock:
+        stats.update(_counts)
+        stats['size'] = len(_entries)
+        for entry in _entries.values():
+            item = { 'filePath': entry.filePath, 'mode': entry.mode }
+            item['inUse'] = entry.inUse
+            item['opened'] = entry.opened
+            item['uses'] = entry.uses
+            item['datasets'] = len(entry.datasets)
+            (hits, misses) = entry.getChunkCounts()
+            item['chunkCacheHits'] = hits
+            item['chunkCacheMisses'] = misses
+            chunkHits += hits
+            chunkMisses += misses
+            if not entry.inUse:
+                item['metadataCacheHitRate'] = entry.f.id.get_mdc_hit_rate()
+            files.append(item)
+    stats['chunkCacheHits'] = chunkHits
+    stats['chunkCacheMisses'] = chunkMisses
+    stats['files'] = files
+    return stats
+    
+def resetStats():
+    with _lock:
+        for k in _counts:
+            _counts[k] = 0
@@ -30,7 +30,7 @@ def getFileModCreateTimes(filePath):
     return (mtime, ctime)
 
 def getFilePath(host_value):
-    logging.info('getFilePath[' + host_value + ']')
+    logging.debug('getFilePath[%s]', host_value)
     #strip off port specifier (if present)
     npos = host_value.rfind(':')
     if npos > 0:
@@ -70,7 +70,7 @@ def getFilePath(host_value):
 
     filePath += ".h5"   # add extension
     
-    logging.info('getFilePath[' + host + '] -> "' + filePath + '"')
+    logging.debug('getFilePath[%s] -> "%s"', host, filePath)
     
     return filePath
         
@@ -95,7 +95,7 @@ def getDomain(filePath):
   
 
 def verifyFile(filePath, writable=False):
-    logging.info("filePath: " + filePath)
+    logging.debug("filePath: %s", filePath)
     if not op.isfile(filePath):
         raise HTTPError(404)  # not found
     if not is_hdf5(filePath):
@@ -109,7 +109,7 @@ def makeDirs(filePath):
     # Make any directories along path as needed
     if len(filePath) == 0 or op.isdir(filePath):
         return
-    logging.info('makeDirs filePath: [' + filePath + ']')
+    logging.info('makeDirs filePath: [%s]', filePath)
     topdomain = config.get('domain')
     dirname = op.dirname(filePath)
     
@@ -117,7 +117,7 @@ def makeDirs(filePath):
         logging.warning('makeDirs - unexpected dirname')
         return
     makeDirs(dirname)  # recursive call
-    logging.info('mkdir("' + filePath + '")')
+    logging.info('mkdir("%s")', filePath)
     os.mkdir(filePath)  # should succeed since parent directory is created  
     
 """
@@ -138,7 +138,7 @@ def getLinkTarget(item, protocol="file"):
     elif item['class'] == 'user':
         target = "???"
     else:
-        logging.error("unexpected link item class: " + item['class'])
+        logging.error("unexpected link item class: %s", item['class'])
         raise HTTPError(500) 
     return target
     
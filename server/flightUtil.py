@@ -0,0 +1,115 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import threading
+import logging
+import Queue
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+import config
+
+"""
+ Single-flight helpers for read requests.
+ Reads run on a small pool of worker threads ('read_threads') so the IOLoop 
+ can accept other requests meanwhile.  Identical requests that arrive while 
+ a read is in flight don't start another one: they get the Future of the 
+ running read, so one Hdf5db read and one encoded body are shared by all 
+ of them.
+"""
+
+_lock = threading.Lock()
+_workerLock = threading.Lock()
+_queue = Queue.Queue()
+_workers = []
+_inFlight = { }   # request key -> Future
+_counts = { 'started': 0, 'coalesced': 0 }
+
+
+def isEnabled():
+    return config.get('read_threads') > 0
+    
+def workerLoop():
+    while True:
+        (func, future, ioloop) = _queue.get()
+        try:
+            result = func()
+        except Exception:
+            ioloop.add_callback(future.set_exc_info, sys.exc_info())
+        else:
+            ioloop.add_callback(future.set_result, result)
+        
+def startWorkers():
+    with _workerLock:
+        while len(_workers) < config.get('read_threads'):
+            thread = threading.Thread(target=workerLoop, name='read-' + str(len(_workers)))
+            thread.daemon = True
+            thread.start()
+            _workers.append(thread)
+            
+"""
+  runInWorker - call func on a worker thread, returns a Future for its 
+    result (resolved on the calling thread's IOLoop)
+"""
+def runInWorker(func):
+    if len(_workers) < config.get('read_threads'):
+        startWorkers()
+    future = Future()
+    _queue.put((func, future, IOLoop.current()))
+    return future
+    
+"""
+  run - return a Future for func's result, sharing the in-flight call for 
+    key if there is one.  Must be called from the IOLoop thread.
+"""
+def run(key, func):
+    with _lock:
+        future = _inFlight.get(key)
+        if future is not None:
+            _counts['coalesced'] += 1
+            logging.debug("coalesced request: %s", key)
+            return future
+        _counts['started'] += 1
+        future = runInWorker(func)
+        _inFlight[key] = future
+        
+    def done(f):
+        with _lock:
+            if _inFlight.get(key) is f:
+                del _inFlight[key]
+    future.add_done_callback(done)
+    return future
+    
+"""
+  forget - stop sharing the in-flight reads of a domain (called once a write
+    to the domain is done), so later requests start a new read rather than 
+    getting a result read before the write.  Reads already running still 
+    complete for the requests that joined them.
+"""
+def forget(host):
+    with _lock:
+        for key in list(_inFlight.keys()):
+            if key[0] == host:
+                del _inFlight[key]
+    
+def getStats():
+    stats = { 'threads': config.get('read_threads') }
+    with _lock:
+        stats.update(_counts)
+        stats['inFlight'] = len(_inFlight)
+        stats['queued'] = _queue.qsize()
+    return stats
+    
+def resetStats():
+    with _lock:
+        for k in _counts:
+            _counts[k] = 0
@@ -47,6 +47,35 @@ This class is used to manage UUID lookup tables for primary HDF objects (Groups,
     description: contains map of file offset to UUID.
     members: none
     attrs: map of file offset to UUID
+
+"{pyramids}"
+    description: optional, created when a pyramid is first built.  Contains a 
+        group for each dataset with a pyramid.  Group name is the UUID
+    members: one dataset per pyramid level (named "1", "2", ...) holding the 
+        mean of each 2**level block of the dataset
+    attrs (of the per-dataset group): 'levels', 'stale' (dataset changed 
+        since the build), 'generation' (incremented when marked stale) and
+        'built' (timestamp)
+        
+"{indexes}"
+    description: optional, created when an index is first built.  Contains a
+        group for each dataset with indexes.  Group name is the UUID
+    members: one group per indexed field (named for the field) with datasets
+        'keys' (the field's values in sorted order) and 'rows' (the row of 
+        each key)
+    attrs (of the per-field group): 'covered' (number of dataset rows 
+        indexed) and 'built' (timestamp)
+        
+"{zonemaps}"
+    description: optional, created when a zone map is first created.  
+        Contains a group for each dataset with a zone map.  Group name is 
+        the UUID
+    members: datasets 'min', 'max', 'nulls' (count of NaNs) and 'valid' 
+        (stats are up to date) with one element per zone (chunk) of the
+        dataset.  For compound datasets 'min', 'max' and 'nulls' have a 
+        member for each numeric field
+    attrs (of the per-dataset group): 'zoneShape', 'generation' (incremented
+        when zones are marked invalid) and 'created' (timestamp)
         
     
     
@@ -54,26 +83,67 @@ This class is used to manage UUID lookup tables for primary HDF objects (Groups,
 """
 import sys
 import time
+import threading
 import h5py
 import numpy as np
+from h5py._hl import filters as h5filters
 import shutil
 import uuid
 import logging
+import json
 import os.path as op
 import os
 
 import hdf5dtype
+import filePoolUtil
+import valueCacheUtil
+import reduceUtil
+import queryUtil
+import indexUtil
+import zoneUtil
+import selectionUtil
+from timingUtil import nullTimer
+
 
+# serializes appends, so concurrent appenders get disjoint ranges of rows
+_appendLock = threading.Lock()
 
-# global dictionary to direct back to the Hdf5db instance by filename
-# (needed for visititems callback)
-# Will break in multi-threaded context
-_db = { }
+# per-thread dictionary to direct back to the Hdf5db instance by filename
+# (needed for visititems callback).  Reads run on worker threads, so each 
+# thread keeps its own: visititems calls back on the thread that called it.
+_local = threading.local()
+
+def getDbRegistry():
+    if not hasattr(_local, 'db'):
+        _local.db = { }
+    return _local.db
 
 UUID_LEN = 36  # length for uuid strings
 
+# dataset creation property names used in REST requests/responses
+_layoutClasses = { 
+    h5py.h5d.COMPACT: 'H5D_COMPACT',
+    h5py.h5d.CONTIGUOUS: 'H5D_CONTIGUOUS', 
+    h5py.h5d.CHUNKED: 'H5D_CHUNKED' }
+_fillTimes = {
+    h5py.h5d.FILL_TIME_ALLOC: 'H5D_FILL_TIME_ALLOC',
+    h5py.h5d.FILL_TIME_NEVER: 'H5D_FILL_TIME_NEVER',
+    h5py.h5d.FILL_TIME_IFSET: 'H5D_FILL_TIME_IFSET' }
+_allocTimes = {
+    h5py.h5d.ALLOC_TIME_DEFAULT: 'H5D_ALLOC_TIME_DEFAULT',
+    h5py.h5d.ALLOC_TIME_EARLY: 'H5D_ALLOC_TIME_EARLY',
+    h5py.h5d.ALLOC_TIME_INCR: 'H5D_ALLOC_TIME_INCR',
+    h5py.h5d.ALLOC_TIME_LATE: 'H5D_ALLOC_TIME_LATE' }
+_filterClasses = {
+    h5py.h5z.FILTER_DEFLATE: 'H5Z_FILTER_DEFLATE',
+    h5py.h5z.FILTER_SHUFFLE: 'H5Z_FILTER_SHUFFLE',
+    h5py.h5z.FILTER_FLETCHER32: 'H5Z_FILTER_FLETCHER32',
+    h5py.h5z.FILTER_SZIP: 'H5Z_FILTER_SZIP',
+    h5py.h5z.FILTER_SCALEOFFSET: 'H5Z_FILTER_SCALEOFFSET',
+    h5py.h5z.FILTER_LZF: 'H5Z_FILTER_LZF' }
+
 def visitObj(path, obj):   
-    hdf5db = _db[obj.file.filename]
+    hdf5db = getDbRegistry()[obj.file.filename]
     hdf5db.visit(path, obj)
     
 class Hdf5db:
@@ -89,7 +159,11 @@ class Hdf5db:
         return True
            
         
-    def __init__(self, filePath, readonly=False):
+    def __init__(self, filePath, readonly=False, timer=None):
+        # timer - optional timingUtil.RequestTimer used to collect per-phase timings
+        if timer is None:
+            timer = nullTimer
+        self.timer = timer
         mode = 'r'
         if readonly:
             self.readonly = True
@@ -100,15 +174,43 @@ class Hdf5db:
             else:
                 self.readonly = True
         #logging.info("init -- filePath: " + filePath + " mode: " + mode)
+        self.filePath = filePath
+        self.mode = mode
+        
+        self.poolEntry = None
+        if filePoolUtil.isEnabled():
+            # reuse an open handle (and its warm caches) if there is one
+            self.poolEntry = filePoolUtil.acquire(filePath, mode, self.openFiles)
+            self.f = self.poolEntry.f
+            self.dbf = self.poolEntry.dbf
+            self.datasetObjs = self.poolEntry.datasets
+        else:
+            (self.f, self.dbf) = self.openFiles()
+            self.datasetObjs = { }
+        # create a global reference to this class
+        # so visitObj can call back (keeping any outer instance for the 
+        # same file to restore on exit)
+        registry = getDbRegistry()
+        self.outerDb = registry.get(filePath)
+        registry[filePath] = self 
         
-        self.f = h5py.File(filePath, mode)
+    """
+      openFiles - open the HDF5 file (and db file for read-only files) 
+        with the configured chunk cache settings
+    """
+    def openFiles(self):
+        rdcc = filePoolUtil.getChunkCacheConfig(self.filePath)
+        with self.timer.phase('open'):
+            f = h5py.File(self.filePath, self.mode, rdcc_nbytes=rdcc['nbytes'],
+                rdcc_nslots=rdcc['nslots'], rdcc_w0=rdcc['w0'])
         
+        dbf = None
         if self.readonly:
             # for read-only files, add a dot in front of the name to be used as the 
             # db file.  This won't collide with actual data files, since "." is not 
             # allowed as the first character in a domain name.
-            dirname = op.dirname(self.f.filename)
-            basename = op.basename(self.f.filename)
+            dirname = op.dirname(f.filename)
+            basename = op.basename(f.filename)
             if len(dirname) > 0: 
                 dbFilePath = dirname + '/.' + basename
             else:
@@ -116,27 +218,30 @@ class Hdf5db:
             dbMode = 'r+'
             if not op.isfile(dbFilePath):
                 dbMode = 'w'
-            logging.info("dbFilePath: " + dbFilePath + " mode: " + dbMode)
-            self.dbf = h5py.File(dbFilePath, dbMode)
-        else:
-            self.dbf = None # for read only
-        # create a global reference to this class
-        # so visitObj can call back
-        _db[filePath] = self 
+            logging.info("dbFilePath: %s mode: %s", dbFilePath, dbMode)
+            with self.timer.phase('open'):
+                dbf = h5py.File(dbFilePath, dbMode)
+        return (f, dbf)
     
     def __enter__(self):
-        logging.info('Hdf5db __enter')
+        logging.debug('Hdf5db __enter')
         return self
 
     def __exit__(self, type, value, traceback):
-        logging.info('Hdf5db __exit')
-        filename = self.f.filename
-        self.f.flush()
-        self.f.close()
-        if self.dbf:
-            self.dbf.flush()
-            self.dbf.close()
-        del _db[filename]
+        logging.debug('Hdf5db __exit')
+        if self.poolEntry is not None:
+            filePoolUtil.release(self.poolEntry)
+        else:
+            self.f.flush()
+            self.f.close()
+            if self.dbf:
+                self.dbf.flush()
+                self.dbf.close()
+        registry = getDbRegistry()
+        if self.outerDb is not None:
+            registry[self.filePath] = self.outerDb
+        else:
+            registry.pop(self.filePath, None)
         
         
     def getTimeStampName(self, uuid, objType="object", name=None):
@@ -177,7 +282,7 @@ class Hdf5db:
         if timestamp == None:
             timestamp = time.time()
         if ts_name in ctime_grp.attrs:
-            logging.warning("modifying create time for object: " + ts_name)
+            logging.warning("modifying create time for object: %s", ts_name)
         ctime_grp.attrs.create(ts_name, timestamp, dtype='int64')
     
     """
@@ -251,41 +356,42 @@ class Hdf5db:
         # logging.info("initFile")
         self.httpStatus = 200
         self.httpMessage = None
-        if self.readonly:
-            self.dbGrp = self.dbf
-            if "{groups}" in self.dbf:
-                # file already initialized
-                return
-            
-        else:
-            if "__db__" in self.f:
-                # file already initialized
-                self.dbGrp = self.f["__db__"]
-                return;  # already initialized 
-            self.dbGrp = self.f.create_group("__db__")
-           
-        logging.info("initializing file") 
-        root_uuid = str(uuid.uuid1())
-        self.dbGrp.attrs["rootUUID"] = root_uuid
-        self.dbGrp.create_group("{groups}")
-        self.dbGrp.create_group("{datasets}")
-        self.dbGrp.create_group("{datatypes}")
-        self.dbGrp.create_group("{addr}") # store object address
-        self.dbGrp.create_group("{ctime}") # stores create timestamps
-        self.dbGrp.create_group("{mtime}") # store modified timestamps
-        
-        mtime = op.getmtime(self.f.filename)
-        ctime = mtime
-        self.setCreateTime(root_uuid, timestamp=ctime)
-        self.setModifiedTime(root_uuid, timestamp=mtime)
+        with self.timer.phase('init'):
+            if self.readonly:
+                self.dbGrp = self.dbf
+                if "{groups}" in self.dbf:
+                    # file already initialized
+                    return
+                
+            else:
+                if "__db__" in self.f:
+                    # file already initialized
+                    self.dbGrp = self.f["__db__"]
+                    return;  # already initialized 
+                self.dbGrp = self.f.create_group("__db__")
+               
+            logging.info("initializing file") 
+            root_uuid = str(uuid.uuid1())
+            self.dbGrp.attrs["rootUUID"] = root_uuid
+            self.dbGrp.create_group("{groups}")
+            self.dbGrp.create_group("{datasets}")
+            self.dbGrp.create_group("{datatypes}")
+            self.dbGrp.create_group("{addr}") # store object address
+            self.dbGrp.create_group("{ctime}") # stores create timestamps
+            self.dbGrp.create_group("{mtime}") # store modified timestamps
             
-        self.f.visititems(visitObj)
+            mtime = op.getmtime(self.f.filename)
+            ctime = mtime
+            self.setCreateTime(root_uuid, timestamp=ctime)
+            self.setModifiedTime(root_uuid, timestamp=mtime)
+                
+            self.f.visititems(visitObj)
         
     def visit(self, path, obj):
         name = obj.__class__.__name__
         if len(path) >= 6 and path[:6] == '__db__':
             return  # don't include the db objects
-        logging.info('visit: ' + path +' name: ' + name)
+        logging.debug('visit: %s name: %s', path, name)
         col = None 
         if name == 'Group':
             col = self.dbGrp["{groups}"].attrs
@@ -294,7 +400,7 @@ class Hdf5db:
         elif name == 'Datatype':
             col = self.dbGrp["{datatypes}"].attrs
         else:
-            logging.error("unknown type: " + __name__)
+            logging.error("unknown type: %s", __name__)
             self.httpStatus = 500
             self.httpMessage = "Unexpected error"
             return
@@ -315,10 +421,11 @@ class Hdf5db:
         if "{addr}" not in self.dbGrp:
             logging.error("expected to find {addr} group") 
             return None
-        addrGrp = self.dbGrp["{addr}"]
         objUuid = None
-        if str(addr) in addrGrp.attrs:
-            objUuid = addrGrp.attrs[str(addr)] 
+        with self.timer.phase('uuid'):
+            addrGrp = self.dbGrp["{addr}"]
+            if str(addr) in addrGrp.attrs:
+                objUuid = addrGrp.attrs[str(addr)] 
         return objUuid
     
         
@@ -372,9 +479,9 @@ class Hdf5db:
         
     def getUUIDByPath(self, path):
         self.initFile()
-        logging.info("getUUIDByPath: [" + path + "]")
+        logging.debug("getUUIDByPath: [%s]", path)
         if len(path) >= 6 and path[:6] == '__db__':
-            logging.error("getUUIDByPath called with invalid path: [" + path + "]")
+            logging.error("getUUIDByPath called with invalid path: [%s]", path)
             raise Exception
         if path == '/':
             # just return the root UUID
@@ -395,31 +502,44 @@ class Hdf5db:
     def getObjectByUuid(self, col_type, objUuid):
         #col_type should be either "datasets", "groups", or "datatypes"
         if col_type not in ("datasets", "groups", "datatypes"):
-            logging.error("invalid col_type: [" + col_type + "]")
+            logging.error("invalid col_type: [%s]", col_type)
             self.httpStatus = 500
             return None
-        if col_type == "groups" and objUuid == self.dbGrp.attrs["rootUUID"]:
-            return self.f['/']  # returns root group
-            
         obj = None  # Group, Dataset, or Datatype
-        col_name = '{' + col_type + '}'
-        # get the collection group for this collection type
-        col = self.dbGrp[col_name]
-        if objUuid in col.attrs:
-            ref = col.attrs[objUuid]
-            obj = self.f[ref]  # this works for read-only as well
-        elif objUuid in col: 
-            # anonymous object
-            obj = col[objUuid]
+        with self.timer.phase('uuid'):
+            if col_type == "groups" and objUuid == self.dbGrp.attrs["rootUUID"]:
+                return self.f['/']  # returns root group
+                
+            col_name = '{' + col_type + '}'
+            # get the collection group for this collection type
+            col = self.dbGrp[col_name]
+            if objUuid in col.attrs:
+                ref = col.attrs[objUuid]
+                obj = self.f[ref]  # this works for read-only as well
+            elif objUuid in col: 
+                # anonymous object
+                obj = col[objUuid]
                 
         return obj
         
     def getDatasetObjByUuid(self, objUuid):
-        logging.info("getDatasetObjByUuid(" + objUuid + ")")
+        logging.debug("getDatasetObjByUuid(%s)", objUuid)
         self.initFile()
+        if objUuid in self.datasetObjs:
+            return self.datasetObjs[objUuid]
         obj = self.getObjectByUuid("datasets", objUuid)
                                  
-        if obj == None:
+        if obj != None:
+            if obj.chunks is not None:
+                rdcc = filePoolUtil.getChunkCacheConfig(self.filePath, obj.name)
+                if rdcc is not None:
+                    # HDF5 shares open datasets, so the default handle has 
+                    # to be released before reopening with the new settings
+                    name = obj.name
+                    obj = None
+                    obj = self.openDatasetWithCache(name, rdcc)
+            self.datasetObjs[objUuid] = obj
+        else:
             if self.getModifiedTime(objUuid, useRoot=False):
                 self.httpStatus = 410  # Gone
                 self.httpMessage = "Resource has been removed"
@@ -428,8 +548,18 @@ class Hdf5db:
                 self.httpMessage = "Resource not found"
         return obj
         
+    """
+      openDatasetWithCache - open the dataset at h5path with its own chunk
+        cache settings
+    """
+    def openDatasetWithCache(self, h5path, rdcc):
+        dapl = h5py.h5p.create(h5py.h5p.DATASET_ACCESS)
+        dapl.set_chunk_cache(rdcc['nslots'], rdcc['nbytes'], rdcc['w0'])
+        dsid = h5py.h5d.open(self.f.id, h5path, dapl=dapl)
+        return h5py.Dataset(dsid)
+        
     def getGroupObjByUuid(self, objUuid):
-        logging.info("getGroupObjByUuid(" + objUuid + ")")
+        logging.debug("getGroupObjByUuid(%s)", objUuid)
         self.initFile()
         obj =  self.getObjectByUuid("groups", objUuid)
          
@@ -445,7 +575,7 @@ class Hdf5db:
     def getDatasetTypeItemByUuid(self, objUuid):
         dset = self.getDatasetObjByUuid(objUuid)
         if dset == None:
-            logging.info("dataset: " + objUuid + " not found")
+            logging.info("dataset: %s not found", objUuid)
             return None
         item = { 'id': objUuid }
         item['type'] = hdf5dtype.getTypeItem(dset.dtype)
@@ -494,7 +624,7 @@ class Hdf5db:
     def getDatasetItemByUuid(self, objUuid):
         dset = self.getDatasetObjByUuid(objUuid)
         if dset == None:
-            logging.info("dataset: " + objUuid + " not found")
+            logging.info("dataset: %s not found", objUuid)
             return None
         item = { 'id': objUuid }
         
@@ -533,6 +663,8 @@ class Hdf5db:
                 # exception is thrown if fill value is not set
                 pass   # nop
             
+        item['creationProperties'] = self.getCreationPropsItem(dset)
+            
         item['ctime'] = self.getCreateTime(objUuid)
         item['mtime'] = self.getModifiedTime(objUuid)      
         
@@ -575,7 +707,7 @@ class Hdf5db:
     Returns type obj
     """   
     def getCommittedTypeObjByUuid(self, objUuid):
-        logging.info("getCommittedTypeObjByUuid(" + objUuid + ")")
+        logging.debug("getCommittedTypeObjByUuid(%s)", objUuid)
         self.initFile()
         datatype = None
         datatypesGrp = self.dbGrp["{datatypes}"]
@@ -593,7 +725,7 @@ class Hdf5db:
     Returns type obj
     """   
     def getCommittedTypeItemByUuid(self, objUuid):
-        logging.info("getCommittedTypeItemByUuid(" + objUuid + ")")
+        logging.debug("getCommittedTypeItemByUuid(%s)", objUuid)
         self.initFile()
         datatype = self.getCommittedTypeObjByUuid(objUuid)
          
@@ -620,11 +752,13 @@ class Hdf5db:
     """
       Get attribute given an object and name
       returns: Json object 
+      If asArray is set, numeric values are returned as numpy arrays rather
+      than lists (see jsonUtil).
     """ 
-    def getAttributeItemByObj(self, obj, name, includeData=True):
+    def getAttributeItemByObj(self, obj, name, includeData=True, asArray=False):
          
         if name not in obj.attrs:
-            logging.info("attribute: [" + name + "] not found in object: " + obj.name)
+            logging.info("attribute: [%s] not found in object: %s", name, obj.name)
             self.httpStatus = 404  # not found
             return None
             
@@ -654,35 +788,39 @@ class Hdf5db:
             includeData = False
         if includeData:
             try:
-                attr = obj.attrs[name]  # returns a numpy array
+                with self.timer.phase('read'):
+                    attr = obj.attrs[name]  # returns a numpy array
             except TypeError:
                 logging.warning("type error reading attribute") 
         item['shape'] = self.getShapeItemByAttrObj(attrObj)
         if includeData and attr is not None:
-            if typeItem['class'] == 'H5T_VLEN':
-                item['value'] = self.vlenToList(attr)
-            elif typeItem['class'] == 'H5T_REFERENCE':
-                item['value'] = self.refToList(attr)
-            elif typeItem['class'] == 'H5T_COMPOUND':
-                item['value'] = attr.tolist()  # convert to list
-            elif len(attrObj.shape) == 0 and type(attr) in (str, unicode, int, float):
-                item['value'] = attr   # just copy value
-            else:
-                item['value'] = attr.tolist()  # convert to list
+            with self.timer.phase('convert'):
+                if typeItem['class'] == 'H5T_VLEN':
+                    item['value'] = self.vlenToList(attr)
+                elif typeItem['class'] == 'H5T_REFERENCE':
+                    item['value'] = self.refToList(attr)
+                elif asArray and isinstance(attr, (np.ndarray, np.generic)):
+                    item['value'] = attr
+                elif typeItem['class'] == 'H5T_COMPOUND':
+                    item['value'] = attr.tolist()  # convert to list
+                elif len(attrObj.shape) == 0 and type(attr) in (str, unicode, int, float):
+                    item['value'] = attr   # just copy value
+                else:
+                    item['value'] = attr.tolist()  # convert to list
         # timestamps will be added by getAttributeItem()
         return item
             
     def getAttributeItems(self, col_type, objUuid, marker=None, limit=0):
-        logging.info("db.getAttributeItems(" + objUuid + ")")
+        logging.debug("db.getAttributeItems(%s)", objUuid)
         if marker:
-            logging.info("...marker: " + marker)
+            logging.debug("...marker: %s", marker)
         if limit:
-            logging.info("...limit: " + str(limit))
+            logging.debug("...limit: %s", limit)
         
         self.initFile()
         obj = self.getObjectByUuid(col_type, objUuid)
         if obj == None:
-            logging.error("uuid: " + objUuid + " could not be loaded")
+            logging.error("uuid: %s could not be loaded", objUuid)
             self.httpStatus = 404  # not found
             return None
             
@@ -709,14 +847,13 @@ class Hdf5db:
                 break  # return what we got
         return items
             
-    def getAttributeItem(self, col_type, objUuid, name):
-        logging.info("getAttributeItemByUuid(" + col_type + ", " + objUuid + ", " + 
-            name + ")")
+    def getAttributeItem(self, col_type, objUuid, name, asArray=False):
+        logging.debug("getAttributeItemByUuid(%s, %s, %s)", col_type, objUuid, name)
         self.initFile()
         obj = self.getObjectByUuid(col_type, objUuid)
         if obj == None:
             return None
-        item = self.getAttributeItemByObj(obj, name)
+        item = self.getAttributeItemByObj(obj, name, asArray=asArray)
         if item == None:
             return None
         # mix-in timestamps
@@ -817,7 +954,7 @@ class Hdf5db:
         sel = h5py.h5r.get_region(regionRef, objid)  
         select_type = sel.get_select_type()
         if select_type not in selectionEnums:
-            logging.error("Unexpected selection type: " + regionRef.typecode)
+            logging.error("Unexpected selection type: %s", regionRef.typecode)
             return None
         item['select_type'] = selectionEnums[select_type]
         points = None
@@ -851,7 +988,7 @@ class Hdf5db:
                 elif self.getCommittedTypeObjByUuid(uuid):
                     out = "/datatypes/" + uuid
                 else:
-                    logging.warning("uuid in region ref not found: [" + uuid + "]");
+                    logging.warning("uuid in region ref not found: [%s]", uuid);
                     return None
             else:
                 out = "null"
@@ -868,11 +1005,16 @@ class Hdf5db:
     Get values from dataset identified by objUuid.
     If a slices list or tuple is provided, it should have the same
     number of elements as the rank of the dataset.
+    If asArray is set, numeric values are returned as a numpy array rather
+    than a list.
+    If fields is given (for compound types), only those members are read.
     """    
-    def getDatasetValuesByUuid(self, objUuid, slices=Ellipsis):
+    def getDatasetValuesByUuid(self, objUuid, slices=Ellipsis, asArray=False, fields=None):
         dset = self.getDatasetObjByUuid(objUuid)
         if dset == None:
             return None
+        if fields is not None and not self.checkFields(dset, fields):
+            return None
         values = None
         dt = dset.dtype
         rank = len(dset.shape)
@@ -892,20 +1034,37 @@ class Hdf5db:
             logging.error("getDatasetValuesByUuid: number of dims in selection not same as rank")
             return None 
         
-        if dt.kind == 'O':    
+        if fields is not None:
+            with self.timer.phase('read'):
+                data = self.readSelection(objUuid, dset, slices, fields)
+            if asArray:
+                values = data
+            else:
+                with self.timer.phase('convert'):
+                    values = data.tolist()
+        elif dt.kind == 'O':    
             # numpy object type - could be a vlen string or generic vlen
             h5t_check = h5py.h5t.check_dtype(vlen=dt)
             if h5t_check == str or h5t_check == unicode:
-                values = dset[slices].tolist()  # just dump to list
+                with self.timer.phase('read'):
+                    data = self.readIndexed(dset, slices)
+                with self.timer.phase('convert'):
+                    values = data.tolist()  # just dump to list
             elif h5t_check is not None:
                 # other vlen data
-                values = self.vlenToList(dset[slices])
+                with self.timer.phase('read'):
+                    data = self.readIndexed(dset, slices)
+                with self.timer.phase('convert'):
+                    values = self.vlenToList(data)
             else:
                 # check for reference type
                 h5t_check = h5py.h5t.check_dtype(ref=dt)
                 if h5t_check is not None:
                     # reference type
-                    values = self.refToList(dset[slices])
+                    with self.timer.phase('read'):
+                        data = self.readIndexed(dset, slices)
+                    with self.timer.phase('convert'):
+                        values = self.refToList(data)
                 else:     
                     self.httpStatus = 500
                     logging.error("unknown object type")
@@ -915,49 +1074,1210 @@ class Hdf5db:
             values = "????"
         else:
             # just use tolist to dump
-            values = dset[slices].tolist()
+            with self.timer.phase('read'):
+                data = self.readSelection(objUuid, dset, slices)
+            if asArray:
+                values = data
+            else:
+                with self.timer.phase('convert'):
+                    values = data.tolist()
         return values 
         
+    """
+      readSelection - read a selection of a dataset (a tuple of slices, 
+        indices and index lists, see selectionUtil), using the value cache 
+        when it's enabled.  Cached arrays are read-only.
+    """
+    def readSelection(self, objUuid, dset, slices, fields=None):
+        key = None
+        if valueCacheUtil.isEnabled():
+            generation = valueCacheUtil.getGeneration(self.filePath, objUuid)
+            mtime = self.getModifiedTime(objUuid)
+            key = valueCacheUtil.getKey(self.filePath, objUuid, dset.shape, slices, 
+                mtime, fields)
+            data = valueCacheUtil.get(key)
+            if data is not None:
+                return data
+        if self.poolEntry is not None:
+            tracked = slices
+            if slices is not Ellipsis:
+                tracked = selectionUtil.getHyperslab(slices, bounding=True)
+            self.poolEntry.trackRead(objUuid, dset, tracked)
+        if not fields and self.isDirectRead(dset, slices):
+            data = self.readHyperslab(dset, slices)
+        else:
+            data = self.readIndexed(dset, slices, fields)
+        if key is not None and isinstance(data, np.ndarray):
+            valueCacheUtil.put(key, data, generation)
+        return data
+        
+    """
+      readIndexed - read a selection with h5py, which needs the indices of 
+        an index list in increasing order (see selectionUtil.getSortedSelection)
+    """
+    def readIndexed(self, dset, slices, fields=None):
+        (args, axis, order) = selectionUtil.getSortedSelection(slices)
+        if fields:
+            if type(args) is not tuple:
+                args = (args,)
+            data = self.readFields(dset, args, fields)
+        else:
+            data = dset[args]
+        if order is not None:
+            data = np.take(data, order, axis=axis)
+        return data
+        
+    """
+      isDirectRead - return True if the selection is read with a single 
+        hyperslab H5Dread into a preallocated array rather than through 
+        h5py's selection handling: selections that are one run of a 
+        contiguous dataset or whole chunks of a chunked one, where HDF5 
+        copies straight into the result
+    """
+    def isDirectRead(self, dset, slices):
+        if type(slices) is not tuple or dset.dtype.hasobject or dset.dtype.subdtype is not None:
+            return False
+        if dset.chunks is None:
+            return selectionUtil.isContiguous(slices, dset.shape)
+        return selectionUtil.isChunkAligned(slices, dset.shape, dset.chunks)
+        
+    def readHyperslab(self, dset, slices):
+        items = selectionUtil.getSimpleItems(slices, dset.shape)
+        (start, count, step) = zip(*items)
+        data = np.empty(count, dtype=dset.dtype)
+        fspace = dset.id.get_space()
+        fspace.select_hyperslab(start, count, step)
+        mspace = h5py.h5s.create_simple(count)
+        dset.id.read(mspace, fspace, data, h5py.h5t.py_create(dset.dtype))
+        return data.reshape(selectionUtil.getSelectionShape(slices, dset.shape))
+        
+    """
+      checkFields - verify the list of field names to read from a compound 
+        dataset (sets httpStatus 400 if they aren't valid)
+    """
+    def checkFields(self, dset, fields):
+        names = dset.dtype.names
+        if names is None:
+            self.httpStatus = 400
+            self.httpMessage = "Fields can only be selected from a compound type"
+            return False
+        if not fields or len(set(fields)) != len(fields):
+            self.httpStatus = 400
+            self.httpMessage = "Invalid list of fields"
+            return False
+        for name in fields:
+            if name not in names:
+                self.httpStatus = 400
+                self.httpMessage = "Unknown field: " + name
+                return False
+        return True
+        
+    """
+      readFields - read just the given members of a compound dataset (the 
+        other members aren't converted or copied).  Returns a compound array
+        with those members.
+    """
+    def readFields(self, dset, args, fields):
+        data = dset[args + tuple(fields)]
+        if len(fields) == 1:
+            # h5py returns the member's values, put them back in a compound
+            fieldType = dset.dtype.fields[fields[0]][0]
+            shape = data.shape[:data.ndim - len(fieldType.shape)]
+            projected = np.empty(shape, dtype=[(fields[0], fieldType)])
+            projected[fields[0]] = data
+            data = projected
+        return data
+        
+    """
+      getDatasetStatsByUuid - return dict of reductions (see reduceUtil.STATS_OPS) 
+        over the selection.  axes is a list of dimensions to reduce (None for
+        all of them).  The selection is read in blocks of up to 
+        blockSize bytes.
+    """
+    def getDatasetStatsByUuid(self, objUuid, slices, ops, axes=None, blockSize=None):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        if dset.dtype.kind not in ('b', 'i', 'u', 'f'):
+            self.httpStatus = 400
+            self.httpMessage = "Statistics require a numeric type"
+            return None
+        rank = len(dset.shape)
+        if axes is not None:
+            for axis in axes:
+                if axis < 0 or axis >= rank:
+                    self.httpStatus = 400
+                    self.httpMessage = "Invalid axis: " + str(axis)
+                    return None
+        accumulator = reduceUtil.StatsAccumulator(ops, axes, rank)
+        if rank == 0:
+            blocks = [()]
+        else:
+            if len(slices) != rank:
+                self.httpStatus = 400
+                self.httpMessage = "Selection doesn't match dataset rank"
+                return None
+            if 0 in reduceUtil.getSelectionCounts(slices, dset.shape):
+                self.httpStatus = 400
+                self.httpMessage = "Empty selection"
+                return None
+            if blockSize is None:
+                blockSize = 16*1024*1024
+            blocks = reduceUtil.getBlockSlices(slices, dset.shape, 
+                dset.dtype.itemsize, blockSize, dset.chunks)
+        for blockSlices in blocks:
+            with self.timer.phase('read'):
+                block = dset[blockSlices]
+            with self.timer.phase('reduce'):
+                accumulator.add(block)
+        return accumulator.getResult()
+
+    """
+      getDatasetHistogramByUuid - return dict with the 'counts' of the 
+        selection's values in each bin and the bin 'edges'.  bins is the 
+        number of equal width bins or a list of bin edges.  valueRange is 
+        the (min, max) of the bins (the range of the selected values if 
+        None).  field is the member of a compound type to count.  The 
+        selection is read in blocks of up to blockSize bytes, skipping 
+        chunks the zone map (if any) shows are outside the bins.  Results
+        are cached in the value cache until the dataset is modified.
+    """
+    def getDatasetHistogramByUuid(self, objUuid, slices, bins, valueRange=None, 
+            field=None, blockSize=None):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        dt = dset.dtype
+        if dt.names is not None:
+            if field is None or field not in dt.names:
+                self.httpStatus = 400
+                self.httpMessage = "Histograms of a compound type need a field"
+                return None
+            dt = dt.fields[field][0]
+        elif field is not None:
+            self.httpStatus = 400
+            self.httpMessage = "Fields can only be selected from a compound type"
+            return None
+        if dt.kind not in ('b', 'i', 'u', 'f') or dt.shape:
+            self.httpStatus = 400
+            self.httpMessage = "Histograms require a numeric type"
+            return None
+        if len(dset.shape) == 0 or len(slices) != len(dset.shape):
+            self.httpStatus = 400
+            self.httpMessage = "Selection doesn't match dataset rank"
+            return None
+        if blockSize is None:
+            blockSize = 16*1024*1024
+        names = ()
+        if field is not None:
+            names = (field,)
+            
+        key = None
+        if valueCacheUtil.isEnabled():
+            binsKey = bins
+            if isinstance(bins, list):
+                binsKey = tuple(bins)
+            generation = valueCacheUtil.getGeneration(self.filePath, objUuid)
+            mtime = self.getModifiedTime(objUuid)
+            key = valueCacheUtil.getKey(self.filePath, objUuid, dset.shape, slices,
+                mtime, names, ('histogram', binsKey, valueRange))
+            cached = valueCacheUtil.get(key)
+            if cached is not None:
+                return { 'counts': cached['counts'], 'edges': cached['edges'] }
+                
+        if valueRange is None and isinstance(bins, (int, long)):
+            # first pass for the range of the values
+            blocks = reduceUtil.getBlockSlices(slices, dset.shape, dt.itemsize, 
+                blockSize, dset.chunks)
+            for blockSlices in blocks:
+                with self.timer.phase('read'):
+                    block = dset[blockSlices + names]
+                with self.timer.phase('reduce'):
+                    valueRange = reduceUtil.mergeValueRanges(valueRange, 
+                        reduceUtil.getValueRange(block))
+        try:
+            accumulator = reduceUtil.HistogramAccumulator(bins, valueRange)
+        except ValueError as ve:
+            self.httpStatus = 400
+            self.httpMessage = str(ve)
+            return None
+        edges = accumulator.edges
+        keyRange = (edges[0].item(), True, edges[-1].item(), True)
+        with self.timer.phase('zonemap'):
+            scanSelections = self.getZonePlan(objUuid, dset, slices, { field: keyRange })
+        if scanSelections is None:
+            scanSelections = [slices]
+        for scanSelection in scanSelections:
+            blocks = reduceUtil.getBlockSlices(scanSelection, dset.shape, dt.itemsize, 
+                blockSize, dset.chunks)
+            for blockSlices in blocks:
+                with self.timer.phase('read'):
+                    block = dset[blockSlices + names]
+                with self.timer.phase('reduce'):
+                    accumulator.add(block)
+        result = accumulator.getResult()
+        
+        if key is not None:
+            nbins = len(result['counts'])
+            cached = np.zeros((), dtype=[('counts', np.int64, (nbins,)), 
+                ('edges', result['edges'].dtype, (nbins + 1,))])
+            cached['counts'] = result['counts']
+            cached['edges'] = result['edges']
+            valueCacheUtil.put(key, cached, generation)
+        return result
+        
+    """
+      getDatasetDownsampleByUuid - reduce the selection to the given number
+        of buckets per dimension.  mode is one of reduceUtil.DOWNSAMPLE_MODES,
+        'lttb' requires a 1-d dataset.  Returns dict with 'min' and 'max'
+        (minmax), 'value' (mean), or 'value' and 'index' (lttb, index holds
+        the dataset coordinates of the selected points), plus 'buckets': the
+        number of buckets used per dimension.
+    """
+    def getDatasetDownsampleByUuid(self, objUuid, slices, mode, buckets, blockSize=None):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        if dset.dtype.kind not in ('b', 'i', 'u', 'f'):
+            self.httpStatus = 400
+            self.httpMessage = "Downsampling requires a numeric type"
+            return None
+        rank = len(dset.shape)
+        if rank == 0 or len(slices) != rank or len(buckets) != rank:
+            self.httpStatus = 400
+            self.httpMessage = "Selection doesn't match dataset rank"
+            return None
+        if mode == 'lttb' and rank != 1:
+            self.httpStatus = 400
+            self.httpMessage = "lttb downsampling requires a one-dimensional dataset"
+            return None
+        counts = reduceUtil.getSelectionCounts(slices, dset.shape)
+        if 0 in counts:
+            self.httpStatus = 400
+            self.httpMessage = "Empty selection"
+            return None
+        for n in buckets:
+            if n < 1 or (mode == 'lttb' and n < 3):
+                self.httpStatus = 400
+                self.httpMessage = "Invalid number of buckets: " + str(n)
+                return None
+        if blockSize is None:
+            blockSize = 16*1024*1024
+        blocks = reduceUtil.getBlockSlices(slices, dset.shape,
+            dset.dtype.itemsize, blockSize, dset.chunks)
+
+        if mode == 'lttb' and buckets[0] < counts[0]:
+            edges = reduceUtil.getLttbEdges(counts[0], buckets[0])
+            selector = reduceUtil.LttbSelector(edges)
+            passes = (selector.addMeans, selector.addPoints)
+        elif mode == 'lttb':
+            # no more points than buckets, every point is used
+            with self.timer.phase('read'):
+                values = dset[slices]
+            (start, stop, step) = slices[0].indices(dset.shape[0])
+            return { 'value': values, 'index': np.arange(start, stop, step), 
+                'buckets': [counts[0]] }
+        else:
+            edges = [reduceUtil.getBucketEdges(counts[dim], buckets[dim]) for dim in range(rank)]
+            selector = reduceUtil.BucketAccumulator(mode, edges)
+            passes = (selector.add,)
+        for addBlock in passes:
+            rowStart = 0
+            for blockSlices in blocks:
+                with self.timer.phase('read'):
+                    block = dset[blockSlices]
+                with self.timer.phase('reduce'):
+                    addBlock(block, rowStart)
+                rowStart += block.shape[0]
+            if addBlock == passes[0] and len(passes) > 1:
+                selector.finishMeans()
+        result = selector.getResult()
+
+        if mode == 'lttb':
+            (start, stop, step) = slices[0].indices(dset.shape[0])
+            result['index'] = start + result['index'] * step
+            result['buckets'] = [buckets[0]]
+        else:
+            result['buckets'] = [len(dimEdges) - 1 for dimEdges in edges]
+        return result
+
+    """
+      getDatasetQueryByUuid - find the rows of a 1-d compound dataset in the 
+        selection that match the query (see queryUtil).  Rows are scanned in
+        blocks (reading only the fields the query uses) starting after row 
+        marker, and the scan stops once limit rows (if non-zero) are found.
+        An index on a query field is used to skip rows outside the range of
+        values the query can match.
+        Returns dict with 'index': the matching row indices and, if 
+        returnValues is set, 'value': the matching rows (just the given 
+        fields, if any).
+    """
+    def getDatasetQueryByUuid(self, objUuid, slices, query, limit=0, marker=None,
+            returnValues=True, blockSize=None, fields=None):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        if fields is not None and not self.checkFields(dset, fields):
+            return None
+        dt = dset.dtype
+        if dt.names is None or len(dset.shape) != 1:
+            self.httpStatus = 400
+            self.httpMessage = "Queries require a one-dimensional compound dataset"
+            return None
+        try:
+            tree = queryUtil.parseQuery(query)
+        except ValueError as ve:
+            self.httpStatus = 400
+            self.httpMessage = str(ve)
+            return None
+        names = sorted(queryUtil.getQueryFields(tree))
+        if not names:
+            self.httpStatus = 400
+            self.httpMessage = "Query must use a field"
+            return None
+        itemsize = 0
+        for name in names:
+            if name not in dt.names:
+                self.httpStatus = 400
+                self.httpMessage = "Unknown field: " + name
+                return None
+            fieldType = dt.fields[name][0]
+            if fieldType.shape or fieldType.kind not in ('b', 'i', 'u', 'f', 'S', 'U'):
+                self.httpStatus = 400
+                self.httpMessage = "Field can't be used in a query: " + name
+                return None
+            itemsize += fieldType.itemsize
+            
+        (start, stop, step) = slices[0].indices(dset.shape[0])
+        if marker is not None and marker >= start:
+            # continue after the last row returned
+            start += ((marker - start) // step + 1) * step
+        if blockSize is None:
+            blockSize = 16*1024*1024
+            
+        indices = []
+        values = []
+        found = 0
+        for (block, blockRows) in self.getQueryBlocks(objUuid, dset, tree, names, 
+                start, stop, step, itemsize, blockSize):
+            with self.timer.phase('query'):
+                if len(names) == 1:
+                    columns = { names[0]: block }
+                else:
+                    columns = dict([(name, block[name]) for name in names])
+                try:
+                    mask = queryUtil.evaluateQuery(tree, columns, block.shape[0])
+                except ValueError as ve:
+                    self.httpStatus = 400
+                    self.httpMessage = str(ve)
+                    return None
+                rowIndices = blockRows[np.flatnonzero(mask)]
+                if limit:
+                    rowIndices = rowIndices[:limit - found]
+            if len(rowIndices) == 0:
+                continue
+            indices.append(rowIndices)
+            if returnValues:
+                rowArgs = (rowIndices.tolist(),)
+                first = int(rowIndices[0])
+                span = int(rowIndices[-1]) + 1 - first
+                if len(rowIndices) * 4 > span:
+                    # many matches, read all the rows they span
+                    rowArgs = (slice(first, first + span),)
+                with self.timer.phase('read'):
+                    if fields is None:
+                        rowValues = dset[rowArgs]
+                    else:
+                        rowValues = self.readFields(dset, rowArgs, fields)
+                if not isinstance(rowArgs[0], list):
+                    rowValues = rowValues[rowIndices - first]
+                values.append(rowValues)
+            found += len(rowIndices)
+            if limit and found >= limit:
+                break
+                
+        result = { }
+        if indices:
+            result['index'] = np.concatenate(indices)
+        else:
+            result['index'] = np.zeros((0,), dtype=np.int64)
+        if returnValues:
+            if values:
+                result['value'] = np.concatenate(values)
+            elif fields is not None:
+                result['value'] = self.readFields(dset, (slice(0, 0),), fields)
+            else:
+                result['value'] = np.zeros((0,), dtype=dt)
+        return result
+        
+    """
+      getQueryBlocks - generate (query field values, row indices) for the 
+        rows of the selection a query needs to look at.  If an index on one
+        of the query's fields restricts it to a small range of values, 
+        only the rows with keys in that range (and rows added since the 
+        index was built) are read.  Otherwise the selection is scanned in 
+        blocks of up to blockSize bytes, skipping chunks the zone map (if 
+        any) shows have no values in range.
+    """
+    def getQueryBlocks(self, objUuid, dset, tree, names, start, stop, step, 
+            itemsize, blockSize):
+        candidates = None
+        covered = 0
+        grp = self.getIndexGroup(objUuid)
+        selected = len(xrange(start, stop, step))
+        if grp is not None and selected > 0:
+            with self.timer.phase('index'):
+                (candidates, covered) = self.getIndexCandidates(grp, tree, names, 
+                    start, stop, step)
+            if candidates is not None and len(candidates) * 4 > selected:
+                candidates = None  # not selective, scan instead
+        if candidates is None:
+            covered = start
+        else:
+            rowsPerBlock = max(1, blockSize // itemsize)
+            for i in range(0, len(candidates), rowsPerBlock):
+                blockRows = candidates[i:i + rowsPerBlock]
+                first = int(blockRows[0])
+                span = int(blockRows[-1]) + 1 - first
+                with self.timer.phase('read'):
+                    if len(blockRows) * 4 > span:
+                        block = dset[(slice(first, first + span),) + tuple(names)]
+                        block = block[blockRows - first]
+                    else:
+                        block = dset[(blockRows.tolist(),) + tuple(names)]
+                yield (block, blockRows)
+            if covered > start:
+                # continue with the first selected row the index doesn't cover
+                start += ((covered - start + step - 1) // step) * step
+                
+        # skip zones that can't have matching rows
+        scanSelections = None
+        keyRanges = {}
+        for name in names:
+            keyRange = indexUtil.getKeyRange(tree, name)
+            if keyRange is not None and indexUtil.isRangeComparable(keyRange, 
+                    dset.dtype.fields[name][0]):
+                keyRanges[name] = keyRange
+        if keyRanges and start < stop:
+            with self.timer.phase('zonemap'):
+                scanSelections = self.getZonePlan(objUuid, dset, 
+                    (slice(start, stop, step),), keyRanges)
+        if scanSelections is None:
+            scanSelections = [(slice(start, stop, step),)]
+            
+        for scanSelection in scanSelections:
+            blocks = reduceUtil.getBlockSlices(scanSelection, dset.shape, 
+                itemsize, blockSize, dset.chunks)
+            for blockSlices in blocks:
+                with self.timer.phase('read'):
+                    block = dset[blockSlices + tuple(names)]
+                blockSlice = blockSlices[0]
+                yield (block, np.arange(blockSlice.start, blockSlice.stop, step))
+            
+    """
+      getPyramidGroup - return the "{pyramids}" group of the dataset, 
+        or None if it has no pyramid (and create is False)
+    """
+    def getPyramidGroup(self, objUuid, create=False):
+        self.initFile()
+        if "{pyramids}" not in self.dbGrp:
+            if not create:
+                return None
+            self.dbGrp.create_group("{pyramids}")
+        pyramids = self.dbGrp["{pyramids}"]
+        if objUuid not in pyramids:
+            if not create:
+                return None
+            pyramids.create_group(objUuid)
+        return pyramids[objUuid]
+        
+    """
+      getPyramidInfoByUuid - return dict with the dataset's pyramid 'levels' 
+        (list of level, factor and dims), 'stale' and 'built' (timestamp). 
+        Returns None with httpStatus 404 if no pyramid has been built.
+    """
+    def getPyramidInfoByUuid(self, objUuid):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        grp = self.getPyramidGroup(objUuid)
+        if grp is None:
+            self.httpStatus = 404
+            self.httpMessage = "Dataset has no pyramid"
+            return None
+        levels = []
+        for level in range(1, int(grp.attrs['levels']) + 1):
+            levelDset = grp[str(level)]
+            levels.append({ 'level': level, 'factor': 2 ** level, 
+                'dims': list(levelDset.shape) })
+        item = { 'levels': levels }
+        item['stale'] = bool(grp.attrs['stale'])
+        item['built'] = int(grp.attrs['built'])
+        return item
+        
+    """
+      buildPyramidByUuid - (re)build the pyramid of a numeric dataset.  
+        Levels are added until no dimension is larger than minExtent.  
+        Returns the pyramid info (see getPyramidInfoByUuid).
+    """
+    def buildPyramidByUuid(self, objUuid, blockSize=None, minExtent=256):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        if dset.dtype.kind not in ('b', 'i', 'u', 'f'):
+            self.httpStatus = 400
+            self.httpMessage = "Pyramids require a numeric type"
+            return None
+        shape = dset.shape
+        if len(shape) == 0 or 0 in shape:
+            self.httpStatus = 400
+            self.httpMessage = "Pyramids require a non-empty simple dataspace"
+            return None
+        if blockSize is None:
+            blockSize = 16*1024*1024
+        grp = self.getPyramidGroup(objUuid, create=True)
+        generation = grp.attrs.get('generation', 0)
+        for name in grp.keys():
+            del grp[name]
+        grp.attrs['levels'] = 0
+        grp.attrs['stale'] = True
+        grp.attrs['built'] = 0
+        
+        levelType = reduceUtil.getLevelType(dset.dtype)
+        src = dset
+        level = 0
+        while max(src.shape) > minExtent:
+            tgt = grp.create_dataset(str(level + 1), 
+                reduceUtil.getLevelShape(shape, level + 1), dtype=levelType)
+            rowBytes = 8 * int(np.prod(src.shape[1:]))
+            rowsPerBlock = max(2, blockSize // rowBytes)
+            rowsPerBlock -= rowsPerBlock % 2
+            for rowStart in range(0, src.shape[0], rowsPerBlock):
+                with self.timer.phase('read'):
+                    block = src[rowStart:rowStart + rowsPerBlock]
+                with self.timer.phase('reduce'):
+                    block = reduceUtil.halveBlock(block, rowStart, shape, level)
+                with self.timer.phase('store'):
+                    tgt[rowStart // 2:rowStart // 2 + block.shape[0]] = block
+            src = tgt
+            level += 1
+        grp.attrs['levels'] = level
+        grp.attrs['built'] = int(time.time())
+        # values written while building leave the pyramid stale
+        grp.attrs['stale'] = grp.attrs.get('generation', 0) != generation
+        return self.getPyramidInfoByUuid(objUuid)
+        
+    """
+      markPyramidStale - note that the dataset changed since its pyramid 
+        was built, so the pyramid won't be used until it is rebuilt
+    """
+    def markPyramidStale(self, objUuid):
+        grp = self.getPyramidGroup(objUuid)
+        if grp is not None:
+            grp.attrs['stale'] = True
+            grp.attrs['generation'] = grp.attrs.get('generation', 0) + 1
+            
+    def deletePyramidByUuid(self, objUuid):
+        self.httpStatus = 200
+        if self.getPyramidGroup(objUuid) is None:
+            self.httpStatus = 404
+            self.httpMessage = "Dataset has no pyramid"
+            return False
+        del self.dbGrp["{pyramids}"][objUuid]
+        return True
+        
+    """
+      getPyramidValuesByUuid - read the selection from the coarsest pyramid 
+        level that has at least resolution[dim] elements along each dim 
+        (None for no constraint).  Returns dict with the 'level', 'factor', 
+        'start' (dataset coordinates of the first element) and 'value', or 
+        None if the selection should be read from the dataset itself (no 
+        up to date pyramid, strided selection, or no coarser level fits).
+    """
+    def getPyramidValuesByUuid(self, objUuid, slices, resolution):
+        self.httpStatus = 200
+        grp = self.getPyramidGroup(objUuid)
+        if grp is None or grp.attrs['stale']:
+            return None
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        shape = dset.shape
+        for s in slices:
+            if s.step not in (None, 1):
+                return None
+        level = reduceUtil.getPyramidLevel(slices, shape, resolution, 
+            int(grp.attrs['levels']))
+        if level == 0:
+            return None
+        factor = 2 ** level
+        levelSlices = []
+        for dim in range(len(shape)):
+            (start, stop, step) = slices[dim].indices(shape[dim])
+            levelSlices.append(slice(start // factor, (stop + factor - 1) // factor))
+        with self.timer.phase('read'):
+            values = grp[str(level)][tuple(levelSlices)]
+        item = { 'level': level, 'factor': factor, 'value': values }
+        item['start'] = [s.start * factor for s in levelSlices]
+        return item
+        
+    """
+      getIndexGroup - return the "{indexes}" group of the dataset, 
+        or None if it has no indexes (and create is False)
+    """
+    def getIndexGroup(self, objUuid, create=False):
+        self.initFile()
+        if "{indexes}" not in self.dbGrp:
+            if not create:
+                return None
+            self.dbGrp.create_group("{indexes}")
+        indexes = self.dbGrp["{indexes}"]
+        if objUuid not in indexes:
+            if not create:
+                return None
+            indexes.create_group(objUuid)
+        return indexes[objUuid]
+        
+    def getIndexItem(self, index, field):
+        item = { 'field': field }
+        item['rows'] = int(index.attrs['covered'])
+        item['built'] = int(index.attrs['built'])
+        return item
+        
+    """
+      getIndexesByUuid - return list of the indexes of the dataset, each 
+        with the 'field', the number of dataset 'rows' it covers and when
+        it was 'built'
+    """
+    def getIndexesByUuid(self, objUuid):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        items = []
+        grp = self.getIndexGroup(objUuid)
+        if grp is not None:
+            for field in sorted(grp.keys()):
+                items.append(self.getIndexItem(grp[field], field))
+        return items
+        
+    """
+      createIndexByUuid - (re)build the index of a field of a 1-d compound
+        dataset: the field's values in sorted order with the row of each.  
+        The field is read in blocks of up to blockSize bytes.  Returns the 
+        index item (see getIndexesByUuid).
+    """
+    def createIndexByUuid(self, objUuid, field, blockSize=None):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        dt = dset.dtype
+        if dt.names is None or len(dset.shape) != 1:
+            self.httpStatus = 400
+            self.httpMessage = "Indexes require a one-dimensional compound dataset"
+            return None
+        if field not in dt.names or '/' in field:
+            self.httpStatus = 400
+            self.httpMessage = "Unknown field: " + field
+            return None
+        keyType = dt.fields[field][0]
+        if keyType.shape or keyType.kind not in ('b', 'i', 'u', 'f', 'S'):
+            self.httpStatus = 400
+            self.httpMessage = "Field can't be indexed: " + field
+            return None
+        if blockSize is None:
+            blockSize = 16*1024*1024
+        rows = dset.shape[0]
+        keys = np.empty((rows,), dtype=keyType)
+        blocks = reduceUtil.getBlockSlices((slice(0, rows),), dset.shape, 
+            keyType.itemsize, blockSize, dset.chunks)
+        for blockSlices in blocks:
+            with self.timer.phase('read'):
+                keys[blockSlices[0]] = dset[blockSlices + (field,)]
+        with self.timer.phase('index'):
+            order = np.argsort(keys, kind='mergesort')
+        grp = self.getIndexGroup(objUuid, create=True)
+        if field in grp:
+            del grp[field]
+        index = grp.create_group(field)
+        with self.timer.phase('store'):
+            index.create_dataset('keys', data=keys[order], maxshape=(None,), 
+                chunks=True)
+            index.create_dataset('rows', data=order.astype(np.int64), 
+                maxshape=(None,), chunks=True)
+        index.attrs['covered'] = rows
+        index.attrs['built'] = int(time.time())
+        return self.getIndexItem(index, field)
+        
+    def deleteIndexByUuid(self, objUuid, field):
+        self.httpStatus = 200
+        grp = self.getIndexGroup(objUuid)
+        if grp is None or field not in grp:
+            self.httpStatus = 404
+            self.httpMessage = "Dataset has no index for: " + field
+            return False
+        del grp[field]
+        if len(grp) == 0:
+            del self.dbGrp["{indexes}"][objUuid]
+        return True
+        
+    """
+      getIndexCandidates - use the most selective index that applies to the
+        query to find the selected rows it may match.  Returns (sorted row
+        indices, number of dataset rows covered by the index), or 
+        (None, 0) if no index restricts the query.
+    """
+    def getIndexCandidates(self, grp, tree, names, start, stop, step):
+        best = None
+        for name in names:
+            if name not in grp:
+                continue
+            keyRange = indexUtil.getKeyRange(tree, name)
+            if keyRange is None:
+                continue
+            keys = grp[name]['keys']
+            if not indexUtil.isRangeComparable(keyRange, keys.dtype):
+                continue
+            (first, last) = indexUtil.getRangePositions(keys, keyRange)
+            if best is None or last - first < best[2] - best[1]:
+                best = (grp[name], first, last)
+        if best is None:
+            return (None, 0)
+        (index, first, last) = best
+        covered = int(index.attrs['covered'])
+        rows = np.sort(index['rows'][first:last])
+        rows = rows[(rows >= start) & (rows < stop)]
+        if step != 1:
+            rows = rows[(rows - start) % step == 0]
+        return (rows, covered)
+        
+    """
+      updateIndexes - update the dataset's indexes for values written to 
+        rows start to stop.  Rows added at the end with keys not less than 
+        the indexed ones are appended, otherwise the index is rewritten
+        with the new keys merged in.
+    """
+    def updateIndexes(self, objUuid, dset, start, stop):
+        grp = self.getIndexGroup(objUuid)
+        if grp is None:
+            return
+        stop = min(stop, dset.shape[0])
+        for field in grp.keys():
+            index = grp[field]
+            covered = int(index.attrs['covered'])
+            first = min(start, covered)   # rows after covered weren't indexed
+            if first >= stop:
+                continue
+            with self.timer.phase('read'):
+                newKeys = dset[(slice(first, stop), field)]
+            with self.timer.phase('index'):
+                order = np.argsort(newKeys, kind='mergesort')
+                newKeys = newKeys[order]
+                newRows = order.astype(np.int64) + first
+                keys = index['keys']
+                rows = index['rows']
+                count = keys.shape[0]
+                if first == covered and (count == 0 or newKeys[0] >= keys[count - 1]):
+                    keys.resize((count + len(newKeys),))
+                    keys[count:] = newKeys
+                    rows.resize((count + len(newRows),))
+                    rows[count:] = newRows
+                else:
+                    oldKeys = keys[...]
+                    oldRows = rows[...]
+                    keep = (oldRows < first) | (oldRows >= stop)
+                    allKeys = np.concatenate((oldKeys[keep], newKeys))
+                    allRows = np.concatenate((oldRows[keep], newRows))
+                    order = np.argsort(allKeys, kind='mergesort')
+                    keys.resize(allKeys.shape)
+                    keys[...] = allKeys[order]
+                    rows.resize(allRows.shape)
+                    rows[...] = allRows[order]
+            index.attrs['covered'] = max(covered, stop)
+            
+    """
+      getZoneMapGroup - return the "{zonemaps}" group of the dataset, 
+        or None if it has no zone map (and create is False)
+    """
+    def getZoneMapGroup(self, objUuid, create=False):
+        self.initFile()
+        if "{zonemaps}" not in self.dbGrp:
+            if not create:
+                return None
+            self.dbGrp.create_group("{zonemaps}")
+        zonemaps = self.dbGrp["{zonemaps}"]
+        if objUuid not in zonemaps:
+            if not create:
+                return None
+            zonemaps.create_group(objUuid)
+        return zonemaps[objUuid]
+        
+    """
+      getZoneMapInfoByUuid - return dict with the 'fields' the zone map 
+        covers (empty for a numeric dataset), the 'zoneShape', the number of
+        'zones' and how many are 'validZones' (stats computed since the 
+        zone was last written).  Returns None with httpStatus 404 if the 
+        dataset has no zone map.
+    """
+    def getZoneMapInfoByUuid(self, objUuid):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        grp = self.getZoneMapGroup(objUuid)
+        if grp is None:
+            self.httpStatus = 404
+            self.httpMessage = "Dataset has no zone map"
+            return None
+        valid = grp['valid'][...]
+        item = { 'fields': [f for f in zoneUtil.getZoneFields(dset.dtype) if f is not None] }
+        item['zoneShape'] = [int(n) for n in grp.attrs['zoneShape']]
+        item['zones'] = int(valid.size)
+        item['validZones'] = int(np.count_nonzero(valid))
+        item['created'] = int(grp.attrs['created'])
+        return item
+        
+    """
+      createZoneMapByUuid - keep a zone map (min, max and number of NaNs of
+        each chunk) for the numeric fields of the dataset.  The zone stats 
+        are computed as scans first need them.  Returns the zone map info 
+        (see getZoneMapInfoByUuid).
+    """
+    def createZoneMapByUuid(self, objUuid, zoneBytes=1024*1024):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        dt = dset.dtype
+        fields = zoneUtil.getZoneFields(dt)
+        if not fields:
+            self.httpStatus = 400
+            self.httpMessage = "Zone maps require a numeric type or numeric fields"
+            return None
+        if len(dset.shape) == 0:
+            self.httpStatus = 400
+            self.httpMessage = "Zone maps require a simple dataspace"
+            return None
+        zoneShape = zoneUtil.getZoneShape(dset.shape, dset.chunks, dt.itemsize, zoneBytes)
+        grid = zoneUtil.getZoneGrid(dset.shape, zoneShape)
+        if fields == [None]:
+            (statsType, nullsType) = (dt, np.int64)
+        else:
+            statsType = np.dtype([(name, dt.fields[name][0]) for name in fields])
+            nullsType = np.dtype([(name, np.int64) for name in fields])
+        grp = self.getZoneMapGroup(objUuid, create=True)
+        for name in grp.keys():
+            del grp[name]
+        maxshape = (None,) * len(grid)
+        grp.create_dataset('valid', grid, dtype=np.uint8, maxshape=maxshape, chunks=True)
+        grp.create_dataset('min', grid, dtype=statsType, maxshape=maxshape, chunks=True)
+        grp.create_dataset('max', grid, dtype=statsType, maxshape=maxshape, chunks=True)
+        grp.create_dataset('nulls', grid, dtype=nullsType, maxshape=maxshape, chunks=True)
+        grp.attrs['zoneShape'] = zoneShape
+        grp.attrs['generation'] = grp.attrs.get('generation', 0) + 1
+        grp.attrs['created'] = int(time.time())
+        return self.getZoneMapInfoByUuid(objUuid)
+        
+    def deleteZoneMapByUuid(self, objUuid):
+        self.httpStatus = 200
+        if self.getZoneMapGroup(objUuid) is None:
+            self.httpStatus = 404
+            self.httpMessage = "Dataset has no zone map"
+            return False
+        del self.dbGrp["{zonemaps}"][objUuid]
+        return True
+        
+    """
+      getZonePlan - return list of the parts of the selection (tuples of 
+        slices, one per zone) that may have values in the given ranges.  
+        keyRanges is a dict of field name (None for a numeric dataset) to 
+        key range (see indexUtil.getKeyRange).  Stats of zones that haven't
+        been computed are computed and saved.  Returns None if the dataset
+        has no zone map or it covers none of the fields.
+    """
+    def getZonePlan(self, objUuid, dset, slices, keyRanges):
+        grp = self.getZoneMapGroup(objUuid)
+        if grp is None:
+            return None
+        fields = zoneUtil.getZoneFields(dset.dtype)
+        keyRanges = dict([(field, keyRanges[field]) for field in keyRanges if field in fields])
+        if not keyRanges:
+            return None
+        shape = dset.shape
+        zoneShape = tuple(grp.attrs['zoneShape'])
+        generation = grp.attrs['generation']
+        gridSlices = zoneUtil.getZoneGridSlices(slices, shape, zoneShape)
+        valid = grp['valid'][gridSlices]
+        mins = grp['min'][gridSlices]
+        maxs = grp['max'][gridSlices]
+        nulls = grp['nulls'][gridSlices]
+        updated = False
+        plan = []
+        for position in zoneUtil.getGridPositions(gridSlices):
+            zoneSelection = zoneUtil.getZoneSelection(position, zoneShape, slices, shape)
+            if zoneSelection is None:
+                continue
+            local = tuple([p - s.start for (p, s) in zip(position, gridSlices)])
+            if not valid[local]:
+                # read the whole zone to compute its stats
+                zone = []
+                for (p, size, extent) in zip(position, zoneShape, shape):
+                    zone.append(slice(p * size, min((p + 1) * size, extent)))
+                zone = tuple(zone)
+                with self.timer.phase('read'):
+                    if fields == [None]:
+                        block = dset[zone]
+                    else:
+                        block = dset[zone + tuple(fields)]
+                for field in fields:
+                    if field is None:
+                        (mins[local], maxs[local], nulls[local]) = zoneUtil.getZoneStats(block)
+                        continue
+                    values = block if len(fields) == 1 else block[field]
+                    (mins[field][local], maxs[field][local], nulls[field][local]) = \
+                        zoneUtil.getZoneStats(values)
+                valid[local] = 1
+                updated = True
+            mayMatch = True
+            for (field, keyRange) in keyRanges.items():
+                if field is None:
+                    (low, high) = (mins[local], maxs[local])
+                else:
+                    (low, high) = (mins[field][local], maxs[field][local])
+                if not zoneUtil.zoneMayMatch(low, high, keyRange):
+                    mayMatch = False
+                    break
+            if mayMatch:
+                plan.append(zoneSelection)
+        # zones written while computing the stats are left invalid
+        if updated and grp.attrs['generation'] == generation:
+            with self.timer.phase('store'):
+                grp['min'][gridSlices] = mins
+                grp['max'][gridSlices] = maxs
+                grp['nulls'][gridSlices] = nulls
+                grp['valid'][gridSlices] = valid
+        return plan
+        
+    """
+      markZonesStale - note that values in the region (tuple of slices, or
+        None for the whole dataset) changed, so the stats of the zones it 
+        touches need to be computed again
+    """
+    def markZonesStale(self, objUuid, dset, slices=None):
+        grp = self.getZoneMapGroup(objUuid)
+        if grp is None:
+            return
+        grp.attrs['generation'] = grp.attrs['generation'] + 1
+        valid = grp['valid']
+        if slices is None:
+            valid[...] = 0
+            return
+        gridSlices = zoneUtil.getZoneGridSlices(slices, dset.shape, 
+            tuple(grp.attrs['zoneShape']))
+        valid[gridSlices] = 0
+        
+    """
+      markZonePointsStale - mark the zones holding the points (array of 
+        coordinates) as needing their stats computed
+    """
+    def markZonePointsStale(self, objUuid, coords):
+        grp = self.getZoneMapGroup(objUuid)
+        if grp is None:
+            return
+        grp.attrs['generation'] = grp.attrs['generation'] + 1
+        zones = coords // np.array(grp.attrs['zoneShape'], dtype=np.int64)
+        valid = grp['valid'][...]
+        valid[tuple(zones.T)] = 0
+        grp['valid'][...] = valid
+        
+    """
+      resizeZoneMap - resize the zone map's grid for the dataset's new 
+        shape.  Zones that were at the edge or are new need their stats 
+        computed.
+    """
+    def resizeZoneMap(self, objUuid, dset, oldShape):
+        grp = self.getZoneMapGroup(objUuid)
+        if grp is None:
+            return
+        grp.attrs['generation'] = grp.attrs['generation'] + 1
+        zoneShape = tuple(grp.attrs['zoneShape'])
+        grid = zoneUtil.getZoneGrid(dset.shape, zoneShape)
+        for name in ('valid', 'min', 'max', 'nulls'):
+            grp[name].resize(grid)
+        valid = grp['valid']
+        for dim in range(len(grid)):
+            edge = oldShape[dim] // zoneShape[dim]
+            if edge < grid[dim]:
+                region = [slice(0, n) for n in grid]
+                region[dim] = slice(edge, grid[dim])
+                valid[tuple(region)] = 0
+                
+    """
+      getDatasetRegionValuesByUuid - read several selections of a dataset 
+        in one session.  regions is a list of ('hyperslab', tuple of slices),
+        ('select', tuple of selectionUtil items) or ('points', list of 
+        points) items.  Returns list of the values of
+        each region (as arrays).  Hyperslabs that don't share any rows are 
+        read with a single HDF5 read of their union.
+    """
+    def getDatasetRegionValuesByUuid(self, objUuid, regions, fields=None):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return None
+        if fields is not None and not self.checkFields(dset, fields):
+            return None
+        values = [None] * len(regions)
+        hyperslabs = [i for i in range(len(regions)) if regions[i][0] == 'hyperslab']
+        if len(hyperslabs) > 1 and self.canCombineHyperslabs(dset, 
+                [regions[i][1] for i in hyperslabs]):
+            combined = self.readHyperslabUnion(dset, 
+                [regions[i][1] for i in hyperslabs], fields)
+            for (i, regionValues) in zip(hyperslabs, combined):
+                values[i] = regionValues
+        for i in range(len(regions)):
+            if values[i] is not None:
+                continue
+            (kind, selection) = regions[i]
+            if kind == 'points':
+                values[i] = self.getDatasetPointSelectionByUuid(objUuid, selection,
+                    asArray=True, fields=fields)
+            else:
+                values[i] = self.getDatasetValuesByUuid(objUuid, selection, 
+                    asArray=True, fields=fields)
+            if values[i] is None:
+                if self.httpStatus == 200:
+                    self.httpStatus = 500
+                return None
+        return values
+        
+    """
+      canCombineHyperslabs - return True if the hyperslabs can be read as 
+        one selection: HDF5 returns the elements of a union in row-major 
+        order, which is the order of the hyperslabs only if they are 
+        row-disjoint and in increasing order
+    """
+    def canCombineHyperslabs(self, dset, hyperslabs):
+        if dset.dtype.hasobject or len(dset.shape) == 0:
+            return False
+        lastRow = -1
+        for slices in hyperslabs:
+            rows = xrange(*slices[0].indices(dset.shape[0]))
+            if len(rows) == 0 or rows[0] <= lastRow:
+                return False
+            for (s, extent) in zip(slices, dset.shape):
+                if s.indices(extent)[2] < 1:
+                    return False
+            lastRow = rows[-1]
+        return True
+        
+    """
+      readHyperslabUnion - read the union of the hyperslabs with one HDF5 
+        read.  Returns list of the values of each hyperslab.
+    """
+    def readHyperslabUnion(self, dset, hyperslabs, fields=None):
+        shape = dset.shape
+        dt = dset.dtype
+        if fields is not None:
+            dt = np.dtype([(name, dt.fields[name][0]) for name in fields])
+        fspace = dset.id.get_space()
+        fspace.select_none()
+        counts = []
+        for slices in hyperslabs:
+            start = []
+            stride = []
+            for (s, extent) in zip(slices, shape):
+                (first, stop, step) = s.indices(extent)
+                start.append(first)
+                stride.append(step)
+            count = reduceUtil.getSelectionCounts(slices, shape)
+            fspace.select_hyperslab(tuple(start), tuple(count), tuple(stride), 
+                op=h5py.h5s.SELECT_OR)
+            counts.append(count)
+        total = sum([int(np.prod(count)) for count in counts])
+        data = np.empty((total,), dtype=dt)
+        if total > 0:
+            mspace = h5py.h5s.create_simple((total,))
+            with self.timer.phase('read'):
+                dset.id.read(mspace, fspace, data, h5py.h5t.py_create(dt))
+        values = []
+        offset = 0
+        for count in counts:
+            n = int(np.prod(count))
+            values.append(data[offset:offset + n].reshape(count))
+            offset += n
+        return values
+        
+    """
+      invalidateValueCache - drop cached selections of a dataset that is 
+        being changed
+    """
+    def invalidateValueCache(self, objUuid):
+        if valueCacheUtil.isEnabled():
+            valueCacheUtil.invalidate(self.filePath, objUuid)
+        
     """
     Get values from dataset identified by objUuid using the given
     point selection.
     """
-    def getDatasetPointSelectionByUuid(self, objUuid, points):
+    def getDatasetPointSelectionByUuid(self, objUuid, points, asArray=False, fields=None):
         self.httpStatus = 200
         dset = self.getDatasetObjByUuid(objUuid)
         if dset == None:
-            logging.info("dataset: " + objUuid + " not found")
+            logging.info("dataset: %s not found", objUuid)
             self.httpStatus = 404  # not found
             return False
         rank = len(dset.shape)
-        values = np.zeros(len(points), dtype=dset.dtype)
+        dt = dset.dtype
+        if fields is not None:
+            if not self.checkFields(dset, fields):
+                return None
+            dt = np.dtype([(name, dt.fields[name][0]) for name in fields])
+        values = np.zeros(len(points), dtype=dt)
         try:
-            i = 0
-            for point in points:
-                # need to convert to strings so result can be JSON serializable
-                #values.append(dset[[point]].tolist())
-                if rank == 1:
-                    values[i] = dset[[point]]
-                else:
-                    values[i] = dset[tuple(point)]
-                i += 1
+            with self.timer.phase('read'):
+                i = 0
+                for point in points:
+                    # need to convert to strings so result can be JSON serializable
+                    #values.append(dset[[point]].tolist())
+                    if fields is not None:
+                        if rank == 1:
+                            values[i] = self.readFields(dset, ([point],), fields)[0]
+                        else:
+                            values[i] = self.readFields(dset, tuple(point), fields)[()]
+                    elif rank == 1:
+                        values[i] = dset[[point]]
+                    else:
+                        values[i] = dset[tuple(point)]
+                    i += 1
         except ValueError:
             # out of range error
             logging.info("getDatasetPointSelection, out of range error")
             self.httpStatus = 400
             return None
-        return values.tolist()
+        if values.dtype.kind == 'O' or not asArray:
+            with self.timer.phase('convert'):
+                values = values.tolist()
+        return values
                  
         
     def setDatasetValuesByUuid(self, objUuid, data, slices=None):
         dset = self.getDatasetObjByUuid(objUuid)
         if dset == None:
-            logging.info("dataset: " + objUuid + " not found")
+            logging.info("dataset: %s not found", objUuid)
             self.httpStatus = 404  # not found
             return False
         if slices == None:
             # write entire dataset
-            dset[()] = data
+            with self.timer.phase('store'):
+                dset[()] = data
         else:
             if type(slices) != tuple:
                 logging.error("getDatasetValuesByUuid: bad type for dim parameter")
@@ -968,21 +2288,447 @@ class Hdf5db:
                 logging.error("getDatasetValuesByUuid: number of dims in selection not same as rank")
                 return False 
             else: 
-                if rank == 1:
-                    slice = slices[0]
-                    dset[slice] = data
-                else:
-                    dset[slices] = data     
+                with self.timer.phase('store'):
+                    if rank == 1:
+                        slice = slices[0]
+                        dset[slice] = data
+                    else:
+                        dset[slices] = data     
         
         # update modified time
         self.setModifiedTime(objUuid)
+        self.invalidateValueCache(objUuid)
+        self.markPyramidStale(objUuid)
+        self.markZonesStale(objUuid, dset, slices)
+        if len(dset.shape) == 1:
+            rowRange = xrange(dset.shape[0])
+            if slices is not None:
+                rowRange = xrange(*slices[0].indices(dset.shape[0]))
+            if len(rowRange) > 0:
+                self.updateIndexes(objUuid, dset, rowRange[0], rowRange[-1] + 1)
+        return True
+        
+    """
+      setDatasetPointValuesByUuid - write data (one value per point, see 
+        getValuesArray) to the points (list or array of coordinates) of the
+        dataset.  The points are sorted by chunk and written with a single 
+        element selection, so each chunk is read and written once however 
+        the points are ordered.  Where a point is repeated the last value 
+        wins.
+    """
+    def setDatasetPointValuesByUuid(self, objUuid, points, data):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            return False
+        shape = dset.shape
+        rank = len(shape)
+        self.httpStatus = 400
+        if rank == 0:
+            self.httpMessage = "Point selection is not supported on scalar datasets"
+            return False
+        try:
+            coords = np.array(points, dtype=np.int64)
+        except (ValueError, TypeError):
+            self.httpMessage = "Invalid points"
+            return False
+        if coords.size == 0 or (rank == 1 and coords.ndim == 1):
+            coords = coords.reshape((-1, rank))
+        if coords.ndim != 2 or coords.shape[1] != rank:
+            self.httpMessage = "Points don't match the dataset rank"
+            return False
+        if ((coords < 0) | (coords >= np.array(shape, dtype=np.int64))).any():
+            self.httpMessage = "Point out of range"
+            return False
+        values = self.getValuesArray(dset.dtype, data, (len(coords),))
+        if values is None:
+            return False
+        if len(values) != len(coords):
+            self.httpMessage = "Number of values doesn't match the number of points"
+            return False
+        self.httpStatus = 200
+        if len(coords) == 0:
+            return True
+            
+        linear = np.ravel_multi_index(tuple(coords.T), shape)
+        if dset.chunks is not None:
+            chunks = np.array(dset.chunks, dtype=np.int64)
+            grid = (np.array(shape, dtype=np.int64) + chunks - 1) // chunks
+            order = np.lexsort((linear, np.ravel_multi_index(tuple((coords // chunks).T), grid)))
+        else:
+            order = np.argsort(linear, kind='mergesort')
+        # both sorts are stable, keep the last of each repeated point
+        linear = linear[order]
+        order = order[np.append(linear[1:] != linear[:-1], True)]
+        coords = coords[order]
+        values = values[order]
+        with self.timer.phase('store'):
+            if dset.dtype.hasobject:
+                # h5py converts variable length values itself
+                for (point, value) in zip(coords, values):
+                    dset[tuple(point)] = value
+            else:
+                fspace = dset.id.get_space()
+                fspace.select_elements(coords)
+                mspace = h5py.h5s.create_simple((len(coords),))
+                dset.id.write(mspace, fspace, np.ascontiguousarray(values), 
+                    h5py.h5t.py_create(dset.dtype))
+        
+        # update modified time
+        self.setModifiedTime(objUuid)
+        self.invalidateValueCache(objUuid)
+        self.markPyramidStale(objUuid)
+        self.markZonePointsStale(objUuid, coords)
+        if rank == 1:
+            self.updateIndexes(objUuid, dset, int(coords[0, 0]), int(coords[-1, 0]) + 1)
+        return True
+        
+    """
+    getFilterItems - return list of filters in the given dataset creation
+      property list, e.g.: 
+        [{'id': 1, 'name': 'deflate', 'flags': 1, 'parameters': [4]}]
+    """
+    def getFilterItems(self, plist):
+        filters = []
+        for i in range(plist.get_nfilters()):
+            (filterId, flags, values, name) = plist.get_filter(i)
+            item = { 'id': filterId, 'name': name, 'flags': flags }
+            item['parameters'] = list(values)
+            filters.append(item)
+        return filters
+        
+    """
+    getCreationPropsItem - return the creation properties of a dataset in 
+      the form accepted by createDataset
+    """
+    def getCreationPropsItem(self, dset):
+        plist = dset.id.get_create_plist()
+        item = { }
+        layout = plist.get_layout()
+        layoutItem = { 'class': _layoutClasses.get(layout, 'H5D_LAYOUT_ERROR') }
+        if layout == h5py.h5d.CHUNKED:
+            layoutItem['dims'] = list(plist.get_chunk())
+        item['layout'] = layoutItem
+        item['fillTime'] = _fillTimes.get(plist.get_fill_time())
+        item['allocTime'] = _allocTimes.get(plist.get_alloc_time())
+        filters = [ ]
+        for filterItem in self.getFilterItems(plist):
+            filterId = filterItem['id']
+            params = filterItem['parameters']
+            filterItem['class'] = _filterClasses.get(filterId, 'H5Z_FILTER_USER')
+            if filterId == h5py.h5z.FILTER_DEFLATE and params:
+                filterItem['level'] = params[0]
+            elif filterId == h5py.h5z.FILTER_SCALEOFFSET and len(params) > 1:
+                if params[0] == h5py.h5z.SO_INT:
+                    filterItem['scaleType'] = 'H5Z_SO_INT'
+                else:
+                    filterItem['scaleType'] = 'H5Z_SO_FLOAT_DSCALE'
+                filterItem['scaleOffset'] = params[1]
+            filters.append(filterItem)
+        if filters:
+            item['filters'] = filters
+        return item
+        
+    """
+    getDatasetCreateArgs - validate the creationProperties of a create dataset 
+      request and return the keyword arguments for create_dataset.
+      Sets httpStatus to 400 and returns None for invalid properties.
+      
+      Filters are applied in the HDF5 library's pipeline order (scaleoffset,
+      shuffle, compression, fletcher32) regardless of the order given.
+    """
+    def getDatasetCreateArgs(self, creationProps, datashape, max_shape=None):
+        kwargs = { }
+        if creationProps is None:
+            return kwargs
+        if type(creationProps) is not dict:
+            self.httpStatus = 400
+            self.httpMessage = "Invalid creationProperties"
+            return None
+        for key in creationProps:
+            if key not in ('layout', 'fillTime', 'allocTime', 'filters'):
+                self.httpStatus = 400
+                self.httpMessage = "Unknown creation property: " + key
+                return None
+        rank = len(datashape)
+        plist = h5py.h5p.create(h5py.h5p.DATASET_CREATE)
+        kwargs['dcpl'] = plist
+        
+        layoutClass = None
+        if 'layout' in creationProps:
+            layout = creationProps['layout']
+            if type(layout) is not dict or 'class' not in layout:
+                self.httpStatus = 400
+                self.httpMessage = "Invalid layout"
+                return None
+            layoutClass = layout['class']
+            if layoutClass == 'H5D_CHUNKED':
+                if rank == 0:
+                    self.httpStatus = 400
+                    self.httpMessage = "Scalar datasets can not be chunked"
+                    return None
+                if 'dims' in layout:
+                    chunks = layout['dims']
+                    if type(chunks) is int:
+                        chunks = [chunks,]
+                    if type(chunks) not in (list, tuple) or len(chunks) != rank:
+                        self.httpStatus = 400
+                        self.httpMessage = "Chunk dims don't match dataset rank"
+                        return None
+                    for i in range(rank):
+                        extent = chunks[i]
+                        if type(extent) is not int or extent < 1:
+                            self.httpStatus = 400
+                            self.httpMessage = "Invalid chunk dims"
+                            return None
+                        maxextent = datashape[i]
+                        if max_shape:
+                            maxextent = max_shape[i]
+                        if maxextent is not None and extent > maxextent:
+                            self.httpStatus = 400
+                            self.httpMessage = "Chunk dims exceed dataset extent"
+                            return None
+                    kwargs['chunks'] = tuple(chunks)
+                else:
+                    kwargs['chunks'] = True  # let h5py pick the chunk shape
+            elif layoutClass in ('H5D_CONTIGUOUS', 'H5D_COMPACT'):
+                if max_shape and list(max_shape) != list(datashape):
+                    self.httpStatus = 400
+                    self.httpMessage = "Resizable datasets must be chunked"
+                    return None
+                if layoutClass == 'H5D_COMPACT':
+                    plist.set_layout(h5py.h5d.COMPACT)
+            else:
+                self.httpStatus = 400
+                self.httpMessage = "Unknown layout class: " + str(layoutClass)
+                return None
+                
+        if 'fillTime' in creationProps:
+            fillTime = None
+            for (k, v) in _fillTimes.items():
+                if v == creationProps['fillTime']:
+                    fillTime = k
+            if fillTime is None:
+                self.httpStatus = 400
+                self.httpMessage = "Invalid fillTime"
+                return None
+            plist.set_fill_time(fillTime)
+            
+        if 'allocTime' in creationProps:
+            allocTime = None
+            for (k, v) in _allocTimes.items():
+                if v == creationProps['allocTime']:
+                    allocTime = k
+            if allocTime is None:
+                self.httpStatus = 400
+                self.httpMessage = "Invalid allocTime"
+                return None
+            plist.set_alloc_time(allocTime)
+                
+        filters = creationProps.get('filters', [])
+        if type(filters) not in (list, tuple):
+            self.httpStatus = 400
+            self.httpMessage = "Invalid filters"
+            return None
+        for filterItem in filters:
+            if type(filterItem) in (str, unicode):
+                filterItem = { 'class': filterItem }  # allow just the class name
+            if type(filterItem) is not dict or 'class' not in filterItem:
+                self.httpStatus = 400
+                self.httpMessage = "Invalid filter"
+                return None
+            filterClass = filterItem['class']
+            if filterClass in ('H5Z_FILTER_DEFLATE', 'H5Z_FILTER_LZF'):
+                if 'compression' in kwargs:
+                    self.httpStatus = 400
+                    self.httpMessage = "Only one compression filter can be used"
+                    return None
+                if filterClass == 'H5Z_FILTER_LZF':
+                    if not h5py.h5z.filter_avail(h5py.h5z.FILTER_LZF):
+                        self.httpStatus = 400
+                        self.httpMessage = "LZF filter is not available"
+                        return None
+                    kwargs['compression'] = 'lzf'
+                else:
+                    level = filterItem.get('level', 4)
+                    if type(level) is not int or level < 0 or level > 9:
+                        self.httpStatus = 400
+                        self.httpMessage = "Invalid deflate level"
+                        return None
+                    kwargs['compression'] = 'gzip'
+                    kwargs['compression_opts'] = level
+            elif filterClass == 'H5Z_FILTER_SHUFFLE':
+                kwargs['shuffle'] = True
+            elif filterClass == 'H5Z_FILTER_FLETCHER32':
+                kwargs['fletcher32'] = True
+            elif filterClass == 'H5Z_FILTER_SCALEOFFSET':
+                # integer types: number of bits to keep (0 for automatic),
+                # float types: number of decimal digits to keep
+                scaleOffset = filterItem.get('scaleOffset', 0)
+                if type(scaleOffset) is not int or scaleOffset < 0:
+                    self.httpStatus = 400
+                    self.httpMessage = "Invalid scaleOffset"
+                    return None
+                kwargs['scaleoffset'] = scaleOffset
+            else:
+                self.httpStatus = 400
+                self.httpMessage = "Unsupported filter: " + str(filterClass)
+                return None
+                
+        if len(kwargs) > 1 and 'chunks' not in kwargs:
+            # filters need a chunked layout
+            if layoutClass is not None or rank == 0:
+                self.httpStatus = 400
+                self.httpMessage = "Filters require a chunked layout"
+                return None
+        return kwargs
+        
+    """
+    getDatasetChunkInfoByUuid - return chunk shape and filters of a chunked
+      dataset
+    """
+    def getDatasetChunkInfoByUuid(self, objUuid):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            logging.info("dataset: %s not found", objUuid)
+            self.httpStatus = 404  # not found
+            return None
+        if dset.chunks is None:
+            logging.info("dataset: %s is not chunked", objUuid)
+            self.httpStatus = 400
+            self.httpMessage = "Dataset is not chunked"
+            return None
+        plist = dset.id.get_create_plist()
+        item = { 'dims': list(dset.shape), 'chunks': list(dset.chunks) }
+        item['filters'] = self.getFilterItems(plist)
+        return item
+        
+    """
+    getChunkOffsets - validate chunk coordinates (the offset of the first 
+      element of the chunk) for the dataset and return them as a tuple
+    """
+    def getChunkOffsets(self, dset, coords):
+        if dset.chunks is None:
+            self.httpStatus = 400
+            self.httpMessage = "Dataset is not chunked"
+            return None
+        if len(coords) != len(dset.shape):
+            self.httpStatus = 400
+            self.httpMessage = "Number of coordinates not same as rank"
+            return None
+        for dim in range(len(coords)):
+            coord = coords[dim]
+            if coord < 0 or coord >= dset.shape[dim] or coord % dset.chunks[dim] != 0:
+                self.httpStatus = 400
+                self.httpMessage = "Coordinates are not at a chunk boundary"
+                return None
+        return tuple(coords)
+        
+    """
+    readDatasetChunkByUuid - return (filter mask, stored bytes) of the chunk 
+      at the given coordinates, without applying the dataset's filters
+    """
+    def readDatasetChunkByUuid(self, objUuid, coords):
+        self.httpStatus = 200
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            logging.info("dataset: %s not found", objUuid)
+            self.httpStatus = 404  # not found
+            return None
+        offsets = self.getChunkOffsets(dset, coords)
+        if offsets is None:
+            return None
+        if not hasattr(dset.id, 'read_direct_chunk') or sys.version_info[0] < 3:
+            # needs h5py 2.10 or later, and on Python 2 h5py returns the repr 
+            # of the read buffer rather than the chunk's bytes
+            self.httpStatus = 501  # not implemented
+            self.httpMessage = "Reading raw chunks is not supported by this server"
+            return None
+        try:
+            with self.timer.phase('read'):
+                (filterMask, data) = dset.id.read_direct_chunk(offsets)
+        except RuntimeError:
+            logging.info("chunk %s of dataset: %s is not allocated", offsets, objUuid)
+            self.httpStatus = 404
+            self.httpMessage = "Chunk not allocated"
+            return None
+        return (filterMask, data)
+        
+    """
+    writeDatasetChunkByUuid - store already filtered bytes as the chunk at the
+      given coordinates
+    """
+    def writeDatasetChunkByUuid(self, objUuid, coords, data, filterMask=0):
+        self.httpStatus = 200
+        if self.readonly:
+            self.httpStatus = 403  # Forbidden
+            self.httpMessage = "Updates are not allowed"
+            return False
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset == None:
+            logging.info("dataset: %s not found", objUuid)
+            self.httpStatus = 404  # not found
+            return False
+        offsets = self.getChunkOffsets(dset, coords)
+        if offsets is None:
+            return False
+        plist = dset.id.get_create_plist()
+        if plist.get_nfilters() == 0:
+            # no filters, so size should match the chunk
+            nbytes = dset.dtype.itemsize * int(np.prod(dset.chunks))
+            if len(data) != nbytes:
+                self.httpStatus = 400
+                self.httpMessage = "Expected " + str(nbytes) + " bytes for chunk"
+                return False
+        with self.timer.phase('store'):
+            dset.id.write_direct_chunk(offsets, data, filterMask)
+        self.setModifiedTime(objUuid)
+        self.invalidateValueCache(objUuid)
+        self.markPyramidStale(objUuid)
+        self.markZonesStale(objUuid, dset, 
+            tuple([slice(o, o + n) for (o, n) in zip(offsets, dset.chunks)]))
+        if len(offsets) == 1:
+            self.updateIndexes(objUuid, dset, offsets[0], offsets[0] + dset.chunks[0])
         return True
     
+    """
+    makeDataset - create the dataset with the low-level API, for requests
+      with a fillTime.  h5py's create_dataset sets the fill time of chunked
+      datasets to H5D_FILL_TIME_ALLOC after applying the dcpl given to it, so
+      complete the plist (chunks and filters) the same way h5py does and then
+      put the requested fill time back.
+    """
+    def makeDataset(self, grp, name, dt, shape, maxshape, fillvalue, kwargs):
+        plist = kwargs['dcpl']
+        fillTime = plist.get_fill_time()
+        if isinstance(dt, h5py.Datatype):
+            tid = dt.id
+            dtype = tid.dtype
+        else:
+            dtype = np.dtype(dt)
+            tid = h5py.h5t.py_create(dtype, logical=1)
+        if maxshape is not None:
+            maxshape = tuple(maxshape)
+        h5filters.fill_dcpl(plist, tuple(shape), dtype, kwargs.get('chunks'), 
+            kwargs.get('compression'), kwargs.get('compression_opts'), 
+            kwargs.get('shuffle'), kwargs.get('fletcher32'), maxshape, 
+            kwargs.get('scaleoffset'), None)
+        plist.set_fill_time(fillTime)
+        if fillvalue is not None:
+            plist.set_fill_value(np.array(fillvalue))
+        if maxshape is not None:
+            maxshape = tuple([h5py.h5s.UNLIMITED if m is None else m for m in maxshape])
+        sid = h5py.h5s.create_simple(tuple(shape), maxshape)
+        h5py.h5d.create(grp.id, name, tid, sid, dcpl=plist)
+        return grp[name]
+        
     """
     createDataset - creates new dataset given shape and datatype
     Returns UUID
     """   
-    def createDataset(self, datatype, datashape, max_shape=None, fill_value=None):
+    def createDataset(self, datatype, datashape, max_shape=None, fill_value=None,
+            creation_props=None):
         self.initFile()
         if self.readonly:
             self.httpStatus = 403  # Forbidden
@@ -1009,8 +2755,22 @@ class Hdf5db:
             self.httpStatus = 500  # unexpected
             return None  # invalid type     
             
-        newDataset = datasets.create_dataset(objUuid, shape=datashape, dtype=dt, 
-            maxshape=max_shape, fillvalue=fill_value)
+        kwargs = self.getDatasetCreateArgs(creation_props, datashape, max_shape)
+        if kwargs is None:
+            return None  # invalid creation properties
+        try:
+            if creation_props and 'fillTime' in creation_props:
+                newDataset = self.makeDataset(datasets, objUuid, dt, datashape, 
+                    max_shape, fill_value, kwargs)
+            else:
+                newDataset = datasets.create_dataset(objUuid, shape=datashape, dtype=dt, 
+                    maxshape=max_shape, fillvalue=fill_value, **kwargs)
+        except (ValueError, TypeError) as e:
+            # e.g. a filter that can't be used with the type
+            logging.info("unable to create dataset: %s", e)
+            self.httpStatus = 400
+            self.httpMessage = str(e)
+            return None
         if newDataset == None:
             logging.error('unexpected failure to create dataset')
             return None
@@ -1054,12 +2814,116 @@ class Hdf5db:
                 self.httpMessage = "Max extent exceeeded"
                 return
         
+        oldShape = dset.shape
         dset.resize(shape)  # resize
         
         # update modified time
         self.setModifiedTime(objUuid)
+        self.invalidateValueCache(objUuid)
+        self.markPyramidStale(objUuid)
+        self.resizeZoneMap(objUuid, dset, oldShape)
+        if len(shape) == 1:
+            # index the fill values of the new rows
+            self.updateIndexes(objUuid, dset, oldShape[0], shape[0])
         self.httpStatus = 200
     
+    """
+      getValuesArray - return data (JSON values or the raw bytes of a binary
+        request) as an array of type dt that has the given shape in every 
+        dimension but axis, or None if it doesn't fit
+    """
+    def getValuesArray(self, dt, data, shape, axis=0):
+        rowShape = list(shape)
+        if isinstance(data, str):
+            rowSize = dt.itemsize
+            for (dim, extent) in enumerate(rowShape):
+                if dim != axis:
+                    rowSize *= extent
+            if rowSize == 0 or len(data) % rowSize != 0:
+                self.httpMessage = "Binary data is not a whole number of rows"
+                return None
+            rowShape[axis] = len(data) // rowSize
+            return np.frombuffer(data, dtype=dt).reshape(rowShape)
+        if dt.names is not None:
+            data = self.toRecords(data, len(rowShape))
+        try:
+            values = np.array(data, dtype=dt)
+        except (ValueError, TypeError):
+            self.httpMessage = "Values don't match the dataset type"
+            return None
+        if values.ndim != len(rowShape):
+            self.httpMessage = "Values don't match the dataset rank"
+            return None
+        rowShape[axis] = values.shape[axis]
+        if values.shape != tuple(rowShape):
+            self.httpMessage = "Values don't match the dataset shape"
+            return None
+        return values
+        
+    """
+      toRecords - convert the lists at the given depth of nested JSON lists
+        to tuples, which numpy takes as the members of a compound type
+    """
+    def toRecords(self, data, depth):
+        if type(data) is not list:
+            return data
+        if depth == 0:
+            return tuple(data)
+        return [self.toRecords(item, depth - 1) for item in data]
+        
+    """
+      appendDatasetValuesByUuid - extend the dataset along dimension axis and
+        write data to the new rows, as one operation (appends are serialized,
+        so concurrent appenders don't overwrite each other's rows).  data is
+        as for getValuesArray.  Returns the index along axis of the first
+        appended row and the new shape, or None on error.
+        The extent grows by exactly the appended rows: it's the shape that 
+        every reader sees, and chunked storage is allocated a chunk at a 
+        time as it's written anyway.
+    """
+    def appendDatasetValuesByUuid(self, objUuid, data, axis=0):
+        self.httpStatus = 200
+        if self.readonly:
+            self.httpStatus = 403  # Forbidden
+            self.httpMessage = "Updates are not allowed"
+            return None
+        dset = self.getDatasetObjByUuid(objUuid)
+        if dset is None:
+            return None
+        rank = len(dset.shape)
+        if axis < 0 or axis >= rank:
+            self.httpStatus = 400
+            self.httpMessage = "Invalid dimension to append to"
+            return None
+        values = self.getValuesArray(dset.dtype, data, dset.shape, axis)
+        if values is None:
+            self.httpStatus = 400
+            return None
+        count = values.shape[axis]
+        with _appendLock:
+            oldShape = dset.shape
+            start = oldShape[axis]
+            maxExtent = dset.maxshape[axis]
+            if maxExtent is not None and start + count > maxExtent:
+                self.httpStatus = 400
+                self.httpMessage = "Max extent exceeded"
+                return None
+            if count == 0:
+                return (start, oldShape)
+            region = [slice(0, extent) for extent in oldShape]
+            region[axis] = slice(start, start + count)
+            with self.timer.phase('store'):
+                dset.resize(start + count, axis=axis)
+                dset[tuple(region)] = values
+            # the resized zone map recomputes the zones holding the new rows
+            self.setModifiedTime(objUuid)
+            self.invalidateValueCache(objUuid)
+            self.markPyramidStale(objUuid)
+            self.resizeZoneMap(objUuid, dset, oldShape)
+            if rank == 1:
+                self.updateIndexes(objUuid, dset, start, start + count)
+            return (start, dset.shape)
+    
     """
     Check if link points to given target (as a HardLink)
     """
@@ -1078,7 +2942,7 @@ class Hdf5db:
             if parentGroup[linkName] == targetGroup:
                 return True
         else:
-            logging.warning("unexpected linkclass: " + linkClass)
+            logging.warning("unexpected linkclass: %s", linkClass)
             return False    
      
     """
@@ -1086,7 +2950,7 @@ class Hdf5db:
     """    
     def deleteObjectByUuid(self, objUuid):
         self.initFile()
-        logging.info("delete uuid: " + objUuid)
+        logging.info("delete uuid: %s", objUuid)
         if self.readonly:
             self.httpStatus = 403  # Forbidden
             self.httpMessage = "Updates are not allowed"
@@ -1117,7 +2981,7 @@ class Hdf5db:
                 dbCol = self.dbGrp["{datatypes}"]
             
         if tgt == None:
-            logging.info("delete uuid: " + objUuid + " not found")
+            logging.info("delete uuid: %s not found", objUuid)
             self.httpStatus = 404  # Not Found
             self.httpMessage = "id: " + objUuid + " was not found"
             return False 
@@ -1154,18 +3018,28 @@ class Hdf5db:
             dbRemoved = True
         
         if not dbRemoved:
-            logging.warning("did not find: " + objUuid + " in anonymous collection")
+            logging.warning("did not find: %s in anonymous collection", objUuid)
                 
             if objUuid in dbCol.attrs:
-                logging.info("removing: " + objUuid + " from non-anonymous collection")
+                logging.info("removing: %s from non-anonymous collection", objUuid)
                 del dbCol.attrs[objUuid]
                 dbRemoved = True
              
         if not dbRemoved:
-            logging.error("expected to find reference to: " + objUuid)
+            logging.error("expected to find reference to: %s", objUuid)
         else:
             # note when the object was deleted
             self.setModifiedTime(objUuid)
+            self.datasetObjs.pop(objUuid, None)
+            if self.poolEntry is not None:
+                self.poolEntry.forgetDataset(objUuid)
+            self.invalidateValueCache(objUuid)
+            if self.getPyramidGroup(objUuid) is not None:
+                self.deletePyramidByUuid(objUuid)
+            if self.getIndexGroup(objUuid) is not None:
+                del self.dbGrp["{indexes}"][objUuid]
+            if self.getZoneMapGroup(objUuid) is not None:
+                self.deleteZoneMapByUuid(objUuid)
                
         return dbRemoved
           
@@ -1238,7 +3112,7 @@ class Hdf5db:
                  
         
     def getLinkItemByUuid(self, grpUuid, linkName):
-        logging.info("db.getLinkItemByUuid(" + grpUuid + ", [" + linkName + "])")
+        logging.debug("db.getLinkItemByUuid(%s, [%s])", grpUuid, linkName)
          
         self.initFile()
         parent = self.getGroupObjByUuid(grpUuid)
@@ -1264,11 +3138,11 @@ class Hdf5db:
         return item
         
     def getLinkItems(self, grpUuid, marker=None, limit=0):
-        logging.info("db.getLinkItems(" + grpUuid + ")")
+        logging.debug("db.getLinkItems(%s)", grpUuid)
         if marker:
-            logging.info("...marker: " + marker)
+            logging.debug("...marker: %s", marker)
         if limit:
-            logging.info("...limit: " + str(limit))
+            logging.debug("...limit: %s", limit)
         
         self.initFile()
         parent = self.getGroupObjByUuid(grpUuid)
@@ -1325,8 +3199,7 @@ class Hdf5db:
             # UDLink? Return false to indicate that we can not delete this
             self.httpStatus = 501  # Not implemented
             self.httpMessage = "Unable to remove user defined link"
-            logging.info("unable to remove udlink: " + grpUuid + 
-                " linkName: " + linkName)
+            logging.info("unable to remove udlink: %s linkName: %s", grpUuid, linkName)
             return False
         
         linkDeleted = False
@@ -1344,10 +3217,10 @@ class Hdf5db:
         return linkDeleted
         
     def getCollection(self, col_type, marker=None, limit=None):
-        logging.info("db.getCollection(" + col_type + ")")
+        logging.debug("db.getCollection(%s)", col_type)
         #col_type should be either "datasets", "groups", or "datatypes"
         if col_type not in ("datasets", "groups", "datatypes"):
-            logging.error("invalid col_type: [" + col_type + "]")
+            logging.error("invalid col_type: [%s]", col_type)
             self.httpStatus = 500
             return None
         self.initFile()
@@ -1412,13 +3285,13 @@ class Hdf5db:
             self.httpMessage = "Updates are not allowed"
             return None 
         if linkName not in parentGrp:
-            logging.info("linkName: [" + linkName + "] not found")
+            logging.info("linkName: [%s] not found", linkName)
             return False
         try:
             linkObj = parentGrp.get(linkName, None, False, True)
         except TypeError:
             # user defined link?
-            logging.info("Unknown link type for item: " + name)
+            logging.info("Unknown link type for item: %s", name)
             return False
         linkClass = linkObj.__class__.__name__
         # only deal with HardLinks
@@ -1434,11 +3307,11 @@ class Hdf5db:
                     # also remove the attribute UUID key
                     addr = h5py.h5o.get_info(obj.id).addr  
                     objUuid = self.getUUIDByAddress(addr)
-                    logging.info("converting: " + objUuid + " to anonymous obj")
+                    logging.info("converting: %s to anonymous obj", objUuid)
                     dbCol = self.getDBCollection(objUuid)
                     del dbCol.attrs[objUuid]  # remove the object ref
                     dbCol[objUuid] = obj      # add a hardlink        
-                logging.info("deleting link: [" + linkName + "] from: " + parentGrp.name)
+                logging.info("deleting link: [%s] from: %s", linkName, parentGrp.name)
                 del parentGrp[linkName]  
                 linkDeleted = True    
         else:
@@ -276,7 +276,7 @@ def getNumpyTypename(hdf5TypeName, typeClass=None):
     
     
 def createBaseDataType(typeItem):
-    logging.info("createDatatype (" + str(typeItem) + ") type: " + str(type(typeItem)))
+    logging.debug("createDatatype (%s) type: %s", typeItem, type(typeItem))
     dtRet = None
     if type(typeItem) == str or type(typeItem) == unicode:
         # should be one of the predefined types
@@ -368,7 +368,7 @@ def createBaseDataType(typeItem):
     return dtRet  
     
 def createDataType(typeItem):
-    logging.info("createDatatype(" + str(typeItem) + ") type: " + str(type(typeItem)))
+    logging.debug("createDatatype(%s) type: %s", typeItem, type(typeItem))
     
     dtRet = None
     if type(typeItem) == str or type(typeItem) == unicode:
@@ -0,0 +1,153 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import numpy as np
+
+import queryUtil
+
+"""
+ Helpers for secondary indexes on fields of 1-d compound datasets.
+ An index is a table of the field's values in sorted order ('keys') with 
+ the row each came from ('rows'), covering the first 'covered' rows of the 
+ dataset.  A value query whose expression constrains an indexed field to a
+ range looks up the rows in that range (a binary search on the stored keys)
+ and evaluates the query on just those rows, rather than scanning the 
+ dataset.
+"""
+
+SEARCH_WINDOW = 4096   # keys read at once at the end of a binary search
+
+# comparison with the operands swapped (5 < x is x > 5)
+_flippedOps = { '<': '>', '<=': '>=', '>': '<', '>=': '<=', '==': '==', '!=': '!=' }
+
+
+"""
+  getKeyRange - return (low, lowInclusive, high, highInclusive) for the 
+    values of field that can satisfy the query (None for an unbounded 
+    side), or None if the query doesn't restrict the field to a range.
+    The range may be wider than the query (the query is still evaluated on
+    the rows in it).
+"""
+def getKeyRange(node, field):
+    kind = node[0]
+    if kind == 'compare':
+        keyRange = (None, False, None, False)
+        found = False
+        (operands, ops) = (node[1], node[2])
+        for i in range(len(ops)):
+            (left, op, right) = (operands[i], ops[i], operands[i+1])
+            if left == ('field', field) and right[0] == 'const':
+                value = right[1]
+            elif right == ('field', field) and left[0] == 'const':
+                (op, value) = (_flippedOps[op], left[1])
+            else:
+                continue
+            if op == '!=':
+                continue
+            found = True
+            if op in ('>', '>=', '=='):
+                keyRange = intersectRanges(keyRange, (value, op != '>', None, False))
+            if op in ('<', '<=', '=='):
+                keyRange = intersectRanges(keyRange, (None, False, value, op != '<'))
+        if not found:
+            return None
+        return keyRange
+    if kind == 'and':
+        keyRange = None
+        for child in node[1]:
+            childRange = getKeyRange(child, field)
+            if childRange is not None:
+                if keyRange is None:
+                    keyRange = childRange
+                else:
+                    keyRange = intersectRanges(keyRange, childRange)
+        return keyRange
+    if kind == 'or':
+        # every alternative must be restricted, use the range covering all
+        keyRange = None
+        for child in node[1]:
+            childRange = getKeyRange(child, field)
+            if childRange is None:
+                return None
+            if keyRange is None:
+                keyRange = childRange
+            else:
+                keyRange = unionRanges(keyRange, childRange)
+        return keyRange
+    return None   # not, bare field
+    
+def intersectRanges(a, b):
+    (low, lowInclusive) = (a[0], a[1])
+    if b[0] is not None and (low is None or b[0] > low or (b[0] == low and not b[1])):
+        (low, lowInclusive) = (b[0], b[1])
+    (high, highInclusive) = (a[2], a[3])
+    if b[2] is not None and (high is None or b[2] < high or (b[2] == high and not b[3])):
+        (high, highInclusive) = (b[2], b[3])
+    return (low, lowInclusive, high, highInclusive)
+    
+def unionRanges(a, b):
+    (low, lowInclusive) = (None, False)
+    if a[0] is not None and b[0] is not None:
+        (low, lowInclusive) = min((a[0], not a[1]), (b[0], not b[1]))
+        lowInclusive = not lowInclusive
+    (high, highInclusive) = (None, False)
+    if a[2] is not None and b[2] is not None:
+        (high, highInclusive) = max((a[2], a[3]), (b[2], b[3]))
+    return (low, lowInclusive, high, highInclusive)
+    
+"""
+  searchSorted - like numpy.searchsorted on the first count elements of 
+    keys, which may be an h5py dataset (only about log2(count) elements 
+    plus SEARCH_WINDOW are read)
+"""
+def searchSorted(keys, value, side='left', count=None):
+    low = 0
+    high = count
+    if high is None:
+        high = keys.shape[0]
+    while high - low > SEARCH_WINDOW:
+        mid = (low + high) // 2
+        key = keys[mid]
+        if key < value or (side == 'right' and key == value):
+            low = mid + 1
+        else:
+            high = mid
+    if high <= low:
+        return low
+    return low + int(np.searchsorted(keys[low:high], value, side))
+    
+"""
+  getRangePositions - return (first, stop) positions in the sorted keys 
+    of the keys in keyRange
+"""
+def getRangePositions(keys, keyRange, count=None):
+    (low, lowInclusive, high, highInclusive) = keyRange
+    if count is None:
+        count = keys.shape[0]
+    first = 0
+    stop = count
+    if low is not None:
+        first = searchSorted(keys, low, 'left' if lowInclusive else 'right', count)
+    if high is not None:
+        stop = searchSorted(keys, high, 'right' if highInclusive else 'left', count)
+    return (first, max(first, stop))
+    
+"""
+  isRangeComparable - return True if the bounds of keyRange can be compared
+    with keys of type dt (strings with strings, numbers with numbers).  
+    Otherwise the query will fail when evaluated, so the index isn't used.
+"""
+def isRangeComparable(keyRange, dt):
+    isString = dt.kind in ('S', 'U')
+    for bound in (keyRange[0], keyRange[2]):
+        if bound is not None and queryUtil.isStringOperand(bound) != isString:
+            return False
+    return True
@@ -0,0 +1,160 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import json
+import numpy as np
+from tornado.escape import json_encode
+
+"""
+ JSON encoding for value responses.
+ Numeric ndarrays are formatted directly (in chunks of rows) rather than
+ going through ndarray.tolist() and json.dumps, which create a Python object
+ per element and format each one again.  Other arrays (strings, vlen, 
+ references, nested compounds) use the tolist() path.
+ Output matches json.dumps(arr.tolist()), except that float32 and float16
+ values are written with the shortest repr for their own width (so 0.1
+ rather than 0.10000000149011612), and floats are written with '%.<n>g'
+ when a precision is given.
+"""
+
+CHUNK_SIZE = 65536   # approximate number of elements formatted at a time
+
+
+"""
+  isFastType - return True if the given numpy dtype can be formatted
+    without going through tolist()
+"""
+def isFastType(dt):
+    if dt.kind in ('i', 'u', 'f'):
+        return True
+    if dt.names:
+        # compound - fields must be numeric scalars
+        for name in dt.names:
+            field = dt.fields[name][0]
+            if field.shape or field.kind not in ('i', 'u', 'f'):
+                return False
+        return True
+    return False
+    
+"""
+  formatFloats - return list of JSON strings for a 1-d float array
+"""
+def formatFloats(arr, precision=None):
+    if precision is not None:
+        fmt = '%.' + str(precision) + 'g'
+        strs = [fmt % v for v in arr.tolist()]
+    else:
+        if arr.dtype.itemsize > 8:
+            arr = arr.astype(np.float64)  # long double
+        strs = arr.astype(str)   # shortest repr for the dtype
+        strs = strs.tolist()
+    if not np.isfinite(arr).all():
+        # JSON (as written by json.dumps) uses NaN and Infinity
+        for i in np.flatnonzero(~np.isfinite(arr)).tolist():
+            if np.isnan(arr[i]):
+                strs[i] = 'NaN'
+            elif arr[i] > 0:
+                strs[i] = 'Infinity'
+            else:
+                strs[i] = '-Infinity'
+    return strs
+    
+"""
+  formatElements - return list of JSON strings, one per element of the
+    (1-d) array
+"""
+def formatElements(arr, precision=None):
+    dt = arr.dtype
+    if dt.names:
+        # compound - format each field, then put together the records
+        columns = []
+        for name in dt.names:
+            columns.append(formatElements(arr[name], precision))
+        return ['[' + ', '.join(fields) + ']' for fields in zip(*columns)]
+    if dt.kind == 'f':
+        return formatFloats(arr, precision)
+    return map(str, arr.tolist())   # integers 
+    
+"""
+  nestStrings - put together the text for an array of the given shape from
+    the list of element strings (in C order)
+"""
+def nestStrings(strs, shape):
+    for extent in reversed(shape[1:]):
+        strs = ['[' + ', '.join(strs[i:i+extent]) + ']' 
+            for i in range(0, len(strs), extent)]
+    return ', '.join(strs)   # outer brackets are added by the caller
+    
+"""
+  iterEncodeArray - yield pieces of the JSON text for the given array
+"""
+def iterEncodeArray(arr, precision=None):
+    arr = np.asarray(arr)
+    if not isFastType(arr.dtype) or arr.size == 0:
+        yield json_encode(arr.tolist())
+        return
+    if arr.ndim == 0:
+        yield formatElements(arr.reshape((1,)), precision)[0]
+        return
+    rowSize = arr.size // arr.shape[0]
+    rowsPerChunk = max(1, CHUNK_SIZE // rowSize)
+    yield '['
+    for start in range(0, arr.shape[0], rowsPerChunk):
+        chunk = arr[start:start+rowsPerChunk]
+        if start > 0:
+            yield ', '
+        if arr.dtype.kind in ('i', 'u'):
+            # the json module's C encoder is quickest for integers
+            yield json.dumps(chunk.tolist())[1:-1]
+        else:
+            strs = formatElements(chunk.reshape((chunk.size,)), precision)
+            yield nestStrings(strs, chunk.shape)
+    yield ']'
+
+"""
+  encodeArray - return JSON text for the given array
+"""
+def encodeArray(arr, precision=None):
+    return ''.join(iterEncodeArray(arr, precision))
+    
+"""
+  encodeResponse - return JSON text for a response dictionary, where
+    values may be numpy arrays (e.g. the 'value' of a value request) or
+    lists of items with numpy array values (e.g. attribute values)
+"""
+def encodeResponse(response, precision=None):
+    if not hasArrays(response):
+        return json_encode(response)
+    parts = []
+    for key in response:
+        parts.append(json_encode(key) + ': ' + encodeValue(response[key], precision))
+    return '{' + ', '.join(parts) + '}'
+    
+def encodeValue(value, precision=None):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return encodeArray(value, precision)
+    if type(value) is dict:
+        return encodeResponse(value, precision)
+    if type(value) is list and hasArrays(value):
+        return '[' + ', '.join([encodeValue(v, precision) for v in value]) + ']'
+    return json_encode(value)
+    
+def hasArrays(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return True
+    if type(value) is dict:
+        value = value.values()
+    elif type(value) is not list or not value or not isinstance(value[0], (dict, np.ndarray)):
+        return False   # arrays are only looked for in lists of items or arrays
+    for v in value:
+        if hasArrays(v):
+            return True
+    return False
@@ -0,0 +1,123 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import cProfile
+import pstats
+import threading
+import time
+import logging
+from StringIO import StringIO
+from collections import OrderedDict
+
+import config
+
+"""
+ Per-request profiling helpers.
+ A request is run under cProfile when an admin asks for it; the resulting
+ stats are kept (up to 'profile_max_saved' entries) for retrieval from the
+ /admin/profiles endpoint.
+"""
+
+_lock = threading.Lock()
+_activeCount = 0       # number of requests currently being profiled
+_nextId = 1
+_profiles = OrderedDict()  # profile id -> saved profile item
+
+
+"""
+  startProfile - return an enabled profiler, or None if the number of
+    concurrently profiled requests is already at 'profile_max_concurrent'
+"""
+def startProfile():
+    global _activeCount
+    with _lock:
+        if _activeCount >= config.get('profile_max_concurrent'):
+            logging.info("profile request skipped, too many active profiles")
+            return None
+        _activeCount += 1
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # another profiler is already active in this thread
+        releaseProfile()
+        return None
+    return profiler
+
+def releaseProfile():
+    global _activeCount
+    with _lock:
+        _activeCount -= 1
+
+"""
+  stopProfile - disable the profiler and store the stats.
+    Returns the id the profile was saved under.
+"""
+def stopProfile(profiler, uri, domain, elapsed, status=200):
+    global _nextId
+    profiler.disable()
+    releaseProfile()
+    out = StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    item = { 'uri': uri, 'domain': domain, 'status': status }
+    item['elapsed'] = elapsed
+    item['created'] = time.time()
+    item['stats'] = stats
+    item['totalCalls'] = stats.total_calls
+    with _lock:
+        profileId = _nextId
+        _nextId += 1
+        item['id'] = profileId
+        _profiles[profileId] = item
+        while len(_profiles) > config.get('profile_max_saved'):
+            _profiles.popitem(last=False)  # discard oldest
+    return profileId
+
+"""
+  getProfiles - return list of saved profiles (without the stats)
+"""
+def getProfiles():
+    items = []
+    with _lock:
+        for item in _profiles.values():
+            summary = {}
+            for k in ('id', 'uri', 'domain', 'status', 'elapsed', 'created', 'totalCalls'):
+                summary[k] = item[k]
+            items.append(summary)
+    return items
+
+def getProfile(profileId):
+    with _lock:
+        if profileId not in _profiles:
+            return None
+        return _profiles[profileId]
+
+"""
+  getProfileText - return printable stats for the given profile
+    sort: pstats sort key (e.g. 'cumulative', 'time', 'calls')
+    limit: max number of functions to list
+"""
+def getProfileText(profileId, sort='cumulative', limit=50):
+    item = getProfile(profileId)
+    if item is None:
+        return None
+    out = StringIO()
+    stats = item['stats']
+    stats.stream = out
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+def deleteProfile(profileId):
+    with _lock:
+        if profileId not in _profiles:
+            return False
+        del _profiles[profileId]
+    return True
@@ -0,0 +1,245 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import re
+import operator
+import numpy as np
+
+"""
+ Restricted boolean expressions over the fields of a compound dataset, e.g.:
+     energy > 10.5 and (detector == 3 or detector == 4)
+     0 <= x < 100 & not flag
+ Operands are field names (`quoted` with backticks if needed), numbers and
+ 'strings'.  Comparisons (<, <=, >, >=, ==, !=) may be chained for ranges, 
+ and combined with and/or/not (or &, |, ~) and parentheses.  A bare field 
+ name is true where the field is non-zero.  Expressions are parsed into a 
+ small tree (nothing is passed to eval) and evaluated with numpy over a 
+ block of rows at a time.  Errors raise ValueError.
+"""
+
+MAX_DEPTH = 32    # max nesting of parentheses/not
+
+_tokenPattern = re.compile(r"""\s*(?:
+    (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?) |
+    (?P<string>'[^']*'|"[^"]*") |
+    (?P<quoted>`[^`]+`) |
+    (?P<name>[A-Za-z_][A-Za-z0-9_]*) |
+    (?P<op><=|>=|==|!=|<|>|&&?|\|\|?|~|!|\(|\)|-)
+    )""", re.VERBOSE)
+
+_compareOps = {
+    '<': operator.lt, '<=': operator.le, 
+    '>': operator.gt, '>=': operator.ge,
+    '==': operator.eq, '!=': operator.ne }
+    
+_keywords = { 'and': '&', 'or': '|', 'not': '~' }
+_aliases = { '&&': '&', '||': '|', '!': '~' }
+
+
+"""
+  tokenize - return list of (kind, value) tokens
+"""
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _tokenPattern.match(text, pos)
+        if match is None:
+            raise ValueError("Invalid query at: " + text[pos:pos+20].strip())
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'number':
+            if re.match(r'^\d+$', value):
+                value = int(value)
+            else:
+                value = float(value)
+        elif kind == 'string':
+            value = value[1:-1]
+            if isinstance(value, unicode):
+                value = value.encode('utf-8')
+        elif kind == 'quoted':
+            kind = 'name'
+            value = value[1:-1]
+        elif kind == 'name' and value.lower() in _keywords:
+            kind = 'op'
+            value = _keywords[value.lower()]
+        elif kind == 'op':
+            value = _aliases.get(value, value)
+        tokens.append((kind, value))
+    return tokens
+    
+    
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.depth = 0
+        
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+        
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Unexpected end of query")
+        self.pos += 1
+        return token
+        
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty query")
+        node = self.parseOr()
+        if self.pos != len(self.tokens):
+            raise ValueError("Unexpected token in query: " + str(self.peek()[1]))
+        return node
+        
+    def parseOr(self):
+        nodes = [self.parseAnd()]
+        while self.peek() == ('op', '|'):
+            self.next()
+            nodes.append(self.parseAnd())
+        if len(nodes) == 1:
+            return nodes[0]
+        return ('or', nodes)
+        
+    def parseAnd(self):
+        nodes = [self.parseNot()]
+        while self.peek() == ('op', '&'):
+            self.next()
+            nodes.append(self.parseNot())
+        if len(nodes) == 1:
+            return nodes[0]
+        return ('and', nodes)
+        
+    def parseNot(self):
+        if self.peek() == ('op', '~'):
+            self.next()
+            self.enter()
+            node = ('not', self.parseNot())
+            self.depth -= 1
+            return node
+        return self.parseComparison()
+        
+    def enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ValueError("Query is nested too deeply")
+        
+    def parseComparison(self):
+        if self.peek() == ('op', '('):
+            self.next()
+            self.enter()
+            node = self.parseOr()
+            self.depth -= 1
+            if self.next() != ('op', ')'):
+                raise ValueError("Expected ) in query")
+            return node
+        operands = [self.parseOperand()]
+        ops = []
+        while self.peek()[0] == 'op' and self.peek()[1] in _compareOps:
+            ops.append(self.next()[1])
+            operands.append(self.parseOperand())
+        if not ops:
+            if operands[0][0] != 'field':
+                raise ValueError("Expected a comparison in query")
+            return ('field', operands[0][1])
+        return ('compare', operands, ops)
+        
+    def parseOperand(self):
+        (kind, value) = self.next()
+        if kind == 'op' and value == '-':
+            (kind, value) = self.next()
+            if kind != 'number':
+                raise ValueError("Expected a number after -")
+            value = -value
+        if kind == 'number' or kind == 'string':
+            return ('const', value)
+        if kind == 'name':
+            return ('field', value)
+        raise ValueError("Unexpected token in query: " + str(value))
+        
+        
+"""
+  parseQuery - return the expression tree for the query text
+"""
+def parseQuery(text):
+    return Parser(text).parse()
+    
+"""
+  getQueryFields - return set of the field names used in the query
+"""
+def getQueryFields(node):
+    kind = node[0]
+    if kind == 'field':
+        return set([node[1]])
+    if kind == 'const':
+        return set()
+    if kind == 'not':
+        return getQueryFields(node[1])
+    names = set()
+    for child in node[1]:   # operands or sub-expressions
+        names |= getQueryFields(child)
+    return names
+    
+def getOperand(node, fields):
+    if node[0] == 'field':
+        return fields[node[1]]
+    return node[1]
+    
+def isStringOperand(value):
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in ('S', 'U')
+    return isinstance(value, basestring)
+    
+"""
+  evaluateQuery - return boolean mask of the rows that match the query.
+    fields is a dict of field name to array (one element per row).
+"""
+def evaluateQuery(node, fields, rows):
+    mask = evaluateNode(node, fields)
+    if not isinstance(mask, np.ndarray) or mask.dtype != np.bool_:
+        raise ValueError("Query does not compare compatible types")
+    return np.broadcast_to(mask, (rows,))
+    
+def evaluateNode(node, fields):
+    kind = node[0]
+    if kind == 'field':
+        return fields[node[1]] != 0
+    if kind == 'not':
+        return ~evaluateNode(node[1], fields)
+    if kind == 'and':
+        mask = evaluateNode(node[1][0], fields)
+        for child in node[1][1:]:
+            mask = mask & evaluateNode(child, fields)
+        return mask
+    if kind == 'or':
+        mask = evaluateNode(node[1][0], fields)
+        for child in node[1][1:]:
+            mask = mask | evaluateNode(child, fields)
+        return mask
+    # comparison, possibly chained (a < b < c is a < b and b < c)
+    (operands, ops) = (node[1], node[2])
+    mask = None
+    for i in range(len(ops)):
+        left = getOperand(operands[i], fields)
+        right = getOperand(operands[i+1], fields)
+        if isStringOperand(left) != isStringOperand(right):
+            raise ValueError("Query compares a string with a number")
+        result = np.asarray(_compareOps[ops[i]](left, right))
+        if mask is None:
+            mask = result
+        else:
+            mask = mask & result
+    return mask
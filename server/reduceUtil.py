@@ -0,0 +1,447 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import numpy as np
+
+"""
+ Block-wise reductions over dataset selections.
+ The selection is read a block of rows (along the first dimension) at a 
+ time, so memory use is bounded by the block size however large the 
+ selection is.  Partial results of the blocks are merged: min, max and sum 
+ directly, mean and std with the pairwise update of Chan et al. so the 
+ result matches numpy over the whole selection.
+"""
+
+STATS_OPS = ('min', 'max', 'sum', 'mean', 'std', 'count')
+
+
+"""
+  getSelectionCounts - return the number of elements selected in each 
+    dimension (slices is a tuple of slice objects)
+"""
+def getSelectionCounts(slices, shape):
+    counts = []
+    for (s, extent) in zip(slices, shape):
+        counts.append(len(xrange(*s.indices(extent))))
+    return counts
+
+"""
+  getBlockSlices - return list of selections (tuples of slices) that cover 
+    the given selection in blocks of rows of up to blockBytes bytes.  Blocks
+    are rounded to whole chunks along the first dimension when they can be.
+"""
+def getBlockSlices(slices, shape, itemsize, blockBytes, chunks=None):
+    counts = getSelectionCounts(slices, shape)
+    rowBytes = itemsize
+    for count in counts[1:]:
+        rowBytes *= count
+    rowsPerBlock = max(1, blockBytes // max(rowBytes, 1))
+    (start, stop, step) = slices[0].indices(shape[0])
+    if chunks and step == 1 and rowsPerBlock > chunks[0]:
+        rowsPerBlock -= rowsPerBlock % chunks[0]
+    blocks = []
+    for i in range(0, counts[0], rowsPerBlock):
+        blockStart = start + i * step
+        blockStop = min(stop, start + (i + rowsPerBlock) * step)
+        blocks.append((slice(blockStart, blockStop, step),) + tuple(slices[1:]))
+    return blocks
+    
+def getSumType(dt):
+    # accumulate sums in 64 bits
+    if dt.kind == 'f':
+        return np.float64
+    if dt.kind == 'u':
+        return np.uint64
+    return np.int64
+    
+
+"""
+  StatsAccumulator - computes the requested ops over the given axes from 
+    blocks of a selection added in order.  axes of None reduces over all 
+    dimensions.
+"""
+class StatsAccumulator:
+    def __init__(self, ops, axes, rank):
+        self.ops = ops
+        if axes is None:
+            axes = range(rank)
+        self.axes = tuple(sorted(set(axes)))
+        # blocks split the first dimension, so partial results are merged
+        # if it is reduced and concatenated otherwise
+        self.mergeBlocks = rank == 0 or 0 in self.axes
+        self.needMean = 'mean' in ops or 'std' in ops
+        self.result = None
+        self.parts = []
+        
+    def getBlockStats(self, block):
+        axes = self.axes
+        stats = { }
+        n = 1
+        for axis in axes:
+            n *= block.shape[axis]
+        stats['count'] = n
+        if 'min' in self.ops:
+            stats['min'] = np.min(block, axis=axes)
+        if 'max' in self.ops:
+            stats['max'] = np.max(block, axis=axes)
+        if 'sum' in self.ops:
+            stats['sum'] = np.sum(block, axis=axes, dtype=getSumType(block.dtype))
+        if self.needMean:
+            mean = np.mean(block, axis=axes, dtype=np.float64, keepdims=True)
+            if 'std' in self.ops:
+                stats['m2'] = np.sum(np.square(block - mean), axis=axes)
+            stats['mean'] = np.squeeze(mean, axis=axes)
+        return stats
+        
+    def merge(self, a, b):
+        result = { 'count': a['count'] + b['count'] }
+        if 'min' in a:
+            result['min'] = np.minimum(a['min'], b['min'])
+        if 'max' in a:
+            result['max'] = np.maximum(a['max'], b['max'])
+        if 'sum' in a:
+            result['sum'] = a['sum'] + b['sum']
+        if 'mean' in a:
+            n = float(result['count'])
+            delta = b['mean'] - a['mean']
+            result['mean'] = a['mean'] + delta * (b['count'] / n)
+            if 'm2' in a:
+                result['m2'] = a['m2'] + b['m2'] + np.square(delta) * (a['count'] * b['count'] / n)
+        return result
+        
+    def add(self, block):
+        stats = self.getBlockStats(block)
+        if not self.mergeBlocks:
+            self.parts.append(stats)
+        elif self.result is None:
+            self.result = stats
+        else:
+            self.result = self.merge(self.result, stats)
+            
+    """
+      getResult - return dict of op name -> ndarray (or scalar if all
+        dimensions were reduced)
+    """
+    def getResult(self):
+        stats = self.result
+        if not self.mergeBlocks:
+            stats = { 'count': self.parts[0]['count'] }
+            for k in self.parts[0]:
+                if k != 'count':
+                    stats[k] = np.concatenate([part[k] for part in self.parts])
+        result = { }
+        for op in self.ops:
+            if op == 'std':
+                value = np.sqrt(stats['m2'] / float(stats['count']))
+            else:
+                value = stats[op]
+            if isinstance(value, np.generic) or (isinstance(value, np.ndarray) and value.ndim == 0):
+                value = value.item()
+            result[op] = value
+        return result
+
+
+"""
+ Downsampling: the selection is split into a given number of buckets per 
+ dimension and each bucket is reduced to its min and max ('minmax') or its 
+ mean ('mean'), or (for 1-d selections) one point is picked per bucket with 
+ Largest-Triangle-Three-Buckets ('lttb').  Buckets are computed with 
+ ufunc.reduceat over blocks of rows, so memory stays bounded by the block 
+ size plus the result.
+"""
+
+DOWNSAMPLE_MODES = ('minmax', 'mean', 'lttb')
+
+
+"""
+  getBucketEdges - return array of buckets+1 edges that split count 
+    elements into (nearly) equal sized buckets
+"""
+def getBucketEdges(count, buckets):
+    buckets = max(1, min(buckets, count))
+    return (np.arange(buckets + 1, dtype=np.int64) * count) // buckets
+    
+"""
+  getBlockSegments - return the offsets (within a block of rows starting at 
+    row rowStart) where buckets start, and the index of the first bucket
+"""
+def getBlockSegments(edges, rowStart, rows):
+    firstBucket = int(np.searchsorted(edges, rowStart, side='right')) - 1
+    starts = edges[(edges > rowStart) & (edges < rowStart + rows)] - rowStart
+    return (np.concatenate(([0], starts)).astype(np.intp), firstBucket)
+    
+    
+"""
+  BucketAccumulator - min/max or mean per bucket from blocks of rows added 
+    in order (rowStart is the selection row of the block's first row)
+"""
+class BucketAccumulator:
+    def __init__(self, mode, edges):
+        self.mode = mode
+        self.edges = edges   # list of bucket edges per dimension
+        self.parts = []      # list of (first bucket, dict of partial arrays)
+        
+    def reduceBlock(self, block, segments):
+        ufuncs = { }
+        if self.mode == 'minmax':
+            ufuncs = { 'min': np.minimum, 'max': np.maximum }
+        else:
+            ufuncs = { 'sum': np.add }
+            if block.dtype.kind != 'f' or block.dtype.itemsize < 8:
+                block = block.astype(np.float64)
+        result = { }
+        for (name, ufunc) in ufuncs.items():
+            arr = ufunc.reduceat(block, segments, axis=0)
+            for dim in range(1, block.ndim):
+                arr = ufunc.reduceat(arr, self.edges[dim][:-1].astype(np.intp), axis=dim)
+            result[name] = arr
+        return result
+        
+    def add(self, block, rowStart):
+        (segments, firstBucket) = getBlockSegments(self.edges[0], rowStart, block.shape[0])
+        part = self.reduceBlock(block, segments)
+        if self.parts:
+            (lastFirst, lastPart) = self.parts[-1]
+            lastBucket = lastFirst + lastPart.values()[0].shape[0] - 1
+            if lastBucket == firstBucket:
+                # the bucket continues from the previous block, merge the rows
+                for name in part:
+                    if name == 'min':
+                        merged = np.minimum(lastPart[name][-1], part[name][0])
+                    elif name == 'max':
+                        merged = np.maximum(lastPart[name][-1], part[name][0])
+                    else:
+                        merged = lastPart[name][-1] + part[name][0]
+                    lastPart[name][-1] = merged
+                    part[name] = part[name][1:]
+                firstBucket += 1
+        if part.values()[0].shape[0] > 0:
+            self.parts.append((firstBucket, part))
+        
+    def getResult(self):
+        result = { }
+        for name in self.parts[0][1]:
+            result[name] = np.concatenate([part[name] for (first, part) in self.parts])
+        if self.mode == 'mean':
+            counts = np.ones((), dtype=np.float64)
+            for edges in self.edges:
+                counts = np.multiply.outer(counts, np.diff(edges))
+            result = { 'value': result['sum'] / counts }
+        return result
+        
+        
+"""
+  getLttbEdges - LTTB bucket edges for count points: the first and last 
+    points are buckets of their own, the others are split into buckets-2 
+    buckets
+"""
+def getLttbEdges(count, buckets):
+    middle = getBucketEdges(count - 2, buckets - 2) + 1
+    return np.concatenate(([0], middle, [count]))
+    
+    
+"""
+  LttbSelector - Largest-Triangle-Three-Buckets point selection for a 1-d 
+    selection.  Needs two passes over the data: the first (addMeans) gets 
+    the average of each bucket, the second (addPoints) picks the point of 
+    each bucket that makes the largest triangle with the point picked in 
+    the previous bucket and the average of the next bucket.
+"""
+class LttbSelector:
+    def __init__(self, edges):
+        self.edges = edges
+        self.means = BucketAccumulator('mean', [edges])
+        self.avgX = None
+        self.avgY = None
+        self.indices = [0]   # selected points (selection indices)
+        self.values = []
+        self.bucket = 1      # bucket being searched
+        self.best = None     # (area, index, value) of best point so far
+        
+    def addMeans(self, block, rowStart):
+        self.means.add(block, rowStart)
+        
+    def finishMeans(self):
+        self.avgY = self.means.getResult()['value']
+        self.avgX = (self.edges[:-1] + self.edges[1:] - 1) / 2.0
+        self.means = None
+        
+    def finishBucket(self):
+        (area, index, value) = self.best
+        self.indices.append(index)
+        self.values.append(value)
+        self.best = None
+        self.bucket += 1
+        
+    def addPoints(self, block, rowStart):
+        if rowStart == 0:
+            self.values.append(block[0])  # first point is always used
+        nbuckets = len(self.edges) - 1
+        (segments, firstBucket) = getBlockSegments(self.edges, rowStart, block.shape[0])
+        segmentEnds = np.append(segments[1:], block.shape[0])
+        for i in range(len(segments)):
+            bucket = firstBucket + i
+            if bucket == 0 or bucket == nbuckets - 1:
+                continue   # first and last points
+            while self.bucket < bucket:
+                self.finishBucket()
+            ax = self.indices[-1]
+            ay = float(self.values[-1])
+            cx = self.avgX[bucket + 1]
+            cy = self.avgY[bucket + 1]
+            y = block[segments[i]:segmentEnds[i]].astype(np.float64)
+            x = np.arange(rowStart + segments[i], rowStart + segmentEnds[i])
+            area = np.abs((ax - cx) * (y - ay) - (ax - x) * (cy - ay))
+            j = int(np.argmax(area))
+            if self.best is None or area[j] > self.best[0]:
+                self.best = (area[j], int(x[j]), block[segments[i] + j])
+        if rowStart + block.shape[0] == self.edges[-1]:
+            # end of the data
+            while self.best is not None:
+                self.finishBucket()
+            self.indices.append(int(self.edges[-1] - 1))
+            self.values.append(block[-1])
+            
+    def getResult(self):
+        return { 'index': np.array(self.indices), 'value': np.array(self.values) }
+
+
+"""
+ Pyramids: level k of a dataset's pyramid has one element per 2**k 
+ elements along every dimension, holding the mean of the dataset elements 
+ it covers.  Level k+1 is computed from level k in blocks of (an even number 
+ of) rows, weighting each element by the number of dataset elements it 
+ covers so the partial elements at the end of a dimension stay exact.
+"""
+
+"""
+  getLevelShape - shape of the given pyramid level of a dataset
+"""
+def getLevelShape(shape, level):
+    factor = 2 ** level
+    return tuple([(extent + factor - 1) // factor for extent in shape])
+    
+"""
+  getLevelCounts - number of dataset elements covered by each element of a 
+    pyramid level along a dimension of the given extent
+"""
+def getLevelCounts(extent, level):
+    factor = 2 ** level
+    size = (extent + factor - 1) // factor
+    counts = np.empty(size, dtype=np.float64)
+    counts[:] = factor
+    counts[-1] = extent - factor * (size - 1)
+    return counts
+    
+"""
+  getLevelType - type used to store pyramid levels of a dataset type
+"""
+def getLevelType(dt):
+    return np.promote_types(dt, np.float32)
+    
+"""
+  halveBlock - return the level+1 means for a block of level means whose 
+    first row is rowStart (an even number).  shape is the dataset shape.
+"""
+def halveBlock(block, rowStart, shape, level):
+    weights = np.ones((), dtype=np.float64)
+    counts = np.ones((), dtype=np.float64)
+    rows = block.shape[0]
+    for dim in range(len(shape)):
+        blockWeights = getLevelCounts(shape[dim], level)
+        blockCounts = getLevelCounts(shape[dim], level + 1)
+        if dim == 0:
+            blockWeights = blockWeights[rowStart:rowStart + rows]
+            blockCounts = blockCounts[rowStart // 2:(rowStart + rows + 1) // 2]
+        weights = np.multiply.outer(weights, blockWeights)
+        counts = np.multiply.outer(counts, blockCounts)
+    sums = block * weights
+    for dim in range(block.ndim):
+        sums = np.add.reduceat(sums, np.arange(0, sums.shape[dim], 2), axis=dim)
+    return sums / counts
+    
+"""
+  getPyramidLevel - return the coarsest level (up to maxLevel) that still 
+    has at least resolution[dim] elements for the selection along each dim 
+    (dims with a resolution of None are not constrained)
+"""
+def getPyramidLevel(slices, shape, resolution, maxLevel):
+    level = 0
+    while level < maxLevel:
+        factor = 2 ** (level + 1)
+        for dim in range(len(shape)):
+            if resolution[dim] is None:
+                continue
+            (start, stop, step) = slices[dim].indices(shape[dim])
+            if (stop + factor - 1) // factor - start // factor < resolution[dim]:
+                return level
+        level += 1
+    return level
+    
+
+"""
+ Histograms: counts of the selection's values in each bin, accumulated a 
+ block at a time.  NaNs aren't counted.  Bins are given as a number of 
+ equal width bins over a range (the range of the values if not given), or
+ as a list of bin edges, as for numpy.histogram.  The result matches
+ numpy.histogram over the whole selection.
+"""
+
+"""
+  getValueRange - return (min, max) of the values in block (ignoring NaNs), 
+    or None if there are none
+"""
+def getValueRange(block):
+    block = np.asarray(block).reshape(-1)
+    if block.dtype.kind == 'f':
+        block = block[~np.isnan(block)]
+    if block.size == 0:
+        return None
+    return (block.min().item(), block.max().item())
+    
+def mergeValueRanges(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (min(a[0], b[0]), max(a[1], b[1]))
+    
+class HistogramAccumulator:
+    """
+      bins is the number of bins or a list of edges, valueRange a (min, max)
+      tuple (used with a number of bins).  Raises ValueError for invalid 
+      bins or range.
+    """
+    def __init__(self, bins, valueRange=None):
+        if valueRange is None:
+            valueRange = (0, 1)   # as numpy, for no values
+        self.bins = bins
+        self.range = valueRange
+        if not isinstance(bins, (int, long)):
+            self.range = None
+        self.edges = np.histogram_bin_edges(np.zeros((0,)), bins, self.range)
+        self.counts = np.zeros((len(self.edges) - 1,), dtype=np.int64)
+        
+    def add(self, block):
+        block = np.asarray(block).reshape(-1)
+        if block.dtype.kind == 'f':
+            block = block[~np.isnan(block)]
+        elif block.dtype.kind == 'b':
+            block = block.astype(np.uint8)
+        if self.range is not None:
+            # equal width bins, numpy computes the bin of each value directly
+            counts = np.histogram(block, self.bins, self.range)[0]
+        else:
+            counts = np.histogram(block, self.edges)[0]
+        self.counts += counts
+        
+    def getResult(self):
+        return { 'counts': self.counts, 'edges': self.edges }
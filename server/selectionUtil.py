@@ -0,0 +1,266 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import re
+
+"""
+ Compact numpy-like selections, e.g. the select= query parameter:
+     [0:1000:2, 5, ::10]
+     [-10:, [3, 1, 7]]
+     [..., 0]
+ One item per dimension: a start:stop:step slice (parts may be left out or 
+ negative, counting from the end of the dimension), an index (the 
+ dimension is dropped from the result like in numpy) or a list of indices 
+ in any order (at most one list per selection).  '...' stands for all the 
+ dimensions that aren't given, and missing trailing dimensions are 
+ selected in full.  The outer brackets are optional, so an index list 
+ of a 1-d dataset needs its own: [[3, 1, 7]].  Steps have to be positive 
+ since HDF5 hyperslabs can't run backwards.
+ 
+ parseSelection checks the selection against the dataset shape and returns
+ a list with a normalized slice, int or list of ints for each dimension, 
+ which h5py can read directly (after sorting the index list, see 
+ getSortedSelection).  Errors raise ValueError.
+"""
+
+MAX_LENGTH = 64 * 1024   # longest selection string accepted
+
+_intPattern = re.compile(r'^[-+]?\d+$')
+
+
+"""
+  splitItems - split text on the commas that aren't inside brackets
+"""
+def splitItems(text):
+    items = []
+    depth = 0
+    start = 0
+    for (i, c) in enumerate(text):
+        if c == '[':
+            depth += 1
+        elif c == ']':
+            depth -= 1
+            if depth < 0:
+                raise ValueError("Unbalanced brackets in selection")
+        elif c == ',' and depth == 0:
+            items.append(text[start:i].strip())
+            start = i + 1
+    if depth != 0:
+        raise ValueError("Unbalanced brackets in selection")
+    items.append(text[start:].strip())
+    return items
+    
+"""
+  getClosingBracket - return position of the bracket that closes the one 
+    text starts with
+"""
+def getClosingBracket(text):
+    depth = 0
+    for (i, c) in enumerate(text):
+        if c == '[':
+            depth += 1
+        elif c == ']':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Unbalanced brackets in selection")
+    
+def parseInt(text):
+    text = text.strip()
+    if not _intPattern.match(text):
+        raise ValueError("Invalid index in selection: " + text[:20])
+    return int(text)
+    
+"""
+  normalizeIndex - return index as a non-negative index into a dimension
+    of the given extent
+"""
+def normalizeIndex(index, extent):
+    if index < 0:
+        index += extent
+    if index < 0 or index >= extent:
+        raise ValueError("Index out of range in selection: " + str(index))
+    return index
+    
+"""
+  parseItem - return the slice, int or list of ints for one dimension
+"""
+def parseItem(text, extent):
+    if not text:
+        raise ValueError("Empty item in selection")
+    if text[0] == '[':
+        if text[-1] != ']':
+            raise ValueError("Invalid index list in selection")
+        indices = [normalizeIndex(parseInt(item), extent) 
+            for item in text[1:-1].split(',') if item.strip()]
+        if not indices:
+            raise ValueError("Empty index list in selection")
+        return indices
+    if ':' not in text:
+        return normalizeIndex(parseInt(text), extent)
+    parts = text.split(':')
+    if len(parts) > 3:
+        raise ValueError("Invalid slice in selection: " + text[:20])
+    values = [None, None, None]
+    for (i, part) in enumerate(parts):
+        if part.strip():
+            values[i] = parseInt(part)
+    if values[2] is not None and values[2] <= 0:
+        raise ValueError("Slice step must be positive in selection")
+    (start, stop, step) = slice(*values).indices(extent)
+    return slice(start, max(start, stop), step)
+    
+"""
+  parseSelection - return list of slice/int/list items (one per dimension)
+    for the selection text of a dataset with the given shape
+"""
+def parseSelection(text, shape):
+    text = text.strip()
+    if len(text) > MAX_LENGTH:
+        raise ValueError("Selection is too long")
+    if text.startswith('[') and getClosingBracket(text) == len(text) - 1:
+        text = text[1:-1].strip()   # like the brackets of dset[...]
+    items = []
+    if text:
+        items = splitItems(text)
+        if items and not items[-1]:
+            items.pop()   # trailing comma
+    if items.count('...') > 1:
+        raise ValueError("Only one ellipsis is allowed in selection")
+    if '...' in items:
+        pos = items.index('...')
+        fill = len(shape) - len(items) + 1
+        if fill < 0:
+            raise ValueError("Too many dimensions in selection")
+        items = items[:pos] + [':'] * fill + items[pos + 1:]
+    if len(items) > len(shape):
+        raise ValueError("Too many dimensions in selection")
+    items += [':'] * (len(shape) - len(items))
+    selection = [parseItem(item, extent) for (item, extent) in zip(items, shape)]
+    if len([item for item in selection if type(item) is list]) > 1:
+        raise ValueError("Only one index list is allowed in selection")
+    return selection
+    
+"""
+  getHyperslab - return tuple of slices for the selection (indices become 
+    slices of one element, so the dimension is kept), or None if the 
+    selection has an index list.  With bounding=True an index list is 
+    replaced by the slice covering all of its indices.
+"""
+def getHyperslab(selection, bounding=False):
+    slices = []
+    for item in selection:
+        if type(item) is list:
+            if not bounding:
+                return None
+            item = slice(min(item), max(item) + 1, 1)
+        elif type(item) is not slice:
+            item = slice(item, item + 1, 1)
+        slices.append(item)
+    return tuple(slices)
+    
+"""
+  getSelectionShape - return the shape of the values read for the selection
+"""
+def getSelectionShape(selection, shape):
+    dims = []
+    for (item, extent) in zip(selection, shape):
+        if type(item) is slice:
+            dims.append(len(xrange(*item.indices(extent))))
+        elif type(item) is list:
+            dims.append(len(item))
+    return tuple(dims)
+    
+def getSelectionCount(selection, shape):
+    count = 1
+    for extent in getSelectionShape(selection, shape):
+        count *= extent
+    return count
+    
+"""
+  getSortedSelection - return (selection, axis, order): h5py needs the 
+    indices of a list in increasing order without repeats, so the list is 
+    replaced by its sorted unique indices.  The values read have to be 
+    reordered with numpy.take(values, order, axis) (axis and order are None
+    if no reordering is needed).
+"""
+def getSortedSelection(selection):
+    if type(selection) not in (list, tuple):
+        return (selection, None, None)
+    axis = 0
+    for (dim, item) in enumerate(selection):
+        if type(item) is list:
+            indices = sorted(set(item))
+            if indices == item:
+                break
+            position = dict([(index, i) for (i, index) in enumerate(indices)])
+            order = [position[index] for index in item]
+            sortedSelection = tuple(selection[:dim]) + (indices,) + tuple(selection[dim + 1:])
+            return (sortedSelection, axis, order)
+        if type(item) is slice:
+            axis += 1
+    return (tuple(selection), None, None)
+    
+"""
+  getSimpleItems - return list of (start, count, step) for a selection of 
+    only slices and indices, or None if it has an index list or selects 
+    nothing
+"""
+def getSimpleItems(selection, shape):
+    items = []
+    for (item, extent) in zip(selection, shape):
+        if type(item) is slice:
+            (start, stop, step) = item.indices(extent)
+            count = len(xrange(start, stop, step))
+        elif type(item) is list:
+            return None
+        else:
+            (start, count, step) = (item, 1, 1)
+        if count == 0:
+            return None
+        items.append((start, count, step))
+    return items
+    
+"""
+  isContiguous - return True if the selection is a single run of elements
+    in C order (so one range of bytes of a contiguous dataset): after the 
+    first dimension with more than one element selected, every dimension 
+    is selected in full
+"""
+def isContiguous(selection, shape):
+    items = getSimpleItems(selection, shape)
+    if items is None:
+        return False
+    multiple = False
+    for ((start, count, step), extent) in zip(items, shape):
+        if multiple and count != extent:
+            return False
+        if count > 1:
+            if step != 1:
+                return False
+            multiple = True
+    return True
+    
+"""
+  isChunkAligned - return True if the selection is made of whole chunks 
+    (chunks at the edge of the dataset may be partial)
+"""
+def isChunkAligned(selection, shape, chunks):
+    items = getSimpleItems(selection, shape)
+    if items is None or not chunks:
+        return False
+    for ((start, count, step), extent, chunk) in zip(items, shape, chunks):
+        if count > 1 and step != 1:
+            return False
+        stop = start + count
+        if start % chunk != 0 or (stop % chunk != 0 and stop != extent):
+            return False
+    return True
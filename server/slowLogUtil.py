@@ -0,0 +1,57 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import json
+import threading
+import logging
+
+import config
+
+"""
+ Slow request log.
+ Requests that take longer than 'slow_request_threshold' milliseconds are
+ appended as one JSON object per line to the 'slow_request_log' file.
+"""
+
+_lock = threading.Lock()
+
+
+"""
+  isEnabled - return True if a slow request log file is configured
+"""
+def isEnabled():
+    if config.get('slow_request_log'):
+        return True
+    return False
+
+"""
+  isSlow - return True if the elapsed time (in ms) is over the threshold
+"""
+def isSlow(elapsed):
+    return elapsed >= config.get('slow_request_threshold')
+
+"""
+  logRequest - append entry (a dict) to the slow request log if the
+    entry's 'elapsed' value (ms) exceeds the threshold.
+    Returns True if the entry was written.
+"""
+def logRequest(entry):
+    if not isEnabled() or not isSlow(entry['elapsed']):
+        return False
+    line = json.dumps(entry, sort_keys=True) + '\n'
+    with _lock:
+        try:
+            with open(config.get('slow_request_log'), 'a') as f:
+                f.write(line)
+        except IOError as e:
+            logging.error("unable to write slow request log: %s", e)
+            return False
+    return True
@@ -0,0 +1,91 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import time
+
+"""
+ Request timing helpers
+ (per-phase timings used to build the Server-Timing response header)
+"""
+
+
+class NullPhase:
+    # no-op context manager returned by disabled timers
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+_nullPhase = NullPhase()
+
+
+class TimerPhase:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.timer.addTime(self.name, time.time() - self.start)
+        return False
+
+
+"""
+  RequestTimer - accumulates elapsed time per named phase for one request.
+    Phases that are entered more than once (e.g. uuid lookups) are summed.
+    A disabled timer hands out a shared no-op phase, so callers can always
+    write:  with timer.phase('read'): ...
+"""
+class RequestTimer:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.startTime = time.time()
+        self.names = []       # phase names in the order first seen
+        self.durations = {}   # phase name -> seconds
+
+    def phase(self, name):
+        if not self.enabled:
+            return _nullPhase
+        return TimerPhase(self, name)
+
+    def addTime(self, name, elapsed):
+        if name in self.durations:
+            self.durations[name] += elapsed
+        else:
+            self.names.append(name)
+            self.durations[name] = elapsed
+
+    def getTime(self, name):
+        # returns elapsed seconds for the phase (0 if never entered)
+        return self.durations.get(name, 0.0)
+
+    def getElapsed(self):
+        return time.time() - self.startTime
+
+    """
+      getServerTimingHeader - return value for the Server-Timing header, e.g.:
+        domain;dur=0.120, open;dur=1.502, read;dur=10.211, total;dur=13.004
+      (durations are in milliseconds)
+    """
+    def getServerTimingHeader(self):
+        metrics = []
+        for name in self.names:
+            metrics.append("%s;dur=%.3f" % (name, self.durations[name] * 1000.0))
+        metrics.append("total;dur=%.3f" % (self.getElapsed() * 1000.0))
+        return ", ".join(metrics)
+
+# shared disabled timer for Hdf5db instances created without one
+nullTimer = RequestTimer(enabled=False)
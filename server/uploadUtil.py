@@ -0,0 +1,126 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import json
+
+"""
+ Splitting of streamed value uploads into slabs of whole rows.
+ The body of a binary or newline-delimited JSON (one row per line) PUT 
+ value request arrives in pieces of whatever size the connection delivers;
+ the buffers here collect them and hand out (firstRow, rows) slabs of up to
+ rowsPerSlab rows (along the first dimension of the selection) as soon as 
+ they are complete, so at most about one slab is held in memory.  Errors 
+ (too many rows, bad JSON, a partial row at the end) raise ValueError.
+"""
+
+UPLOAD_TYPES = ('application/octet-stream', 'application/x-ndjson')
+
+
+"""
+  getUploadType - return the streamed upload type for a Content-Type 
+    header, or None if it isn't one
+"""
+def getUploadType(contentType):
+    contentType = contentType.split(';')[0].strip().lower()
+    if contentType in UPLOAD_TYPES:
+        return contentType
+    return None
+    
+
+"""
+  RowBuffer - binary rows of rowBytes bytes.  Slabs are the raw bytes of 
+    their rows.
+"""
+class RowBuffer:
+    def __init__(self, rowBytes, rowsPerSlab, maxRows):
+        self.rowBytes = rowBytes
+        self.rowsPerSlab = max(1, rowsPerSlab)
+        self.maxRows = maxRows
+        self.pieces = []
+        self.size = 0       # bytes in pieces
+        self.rows = 0       # rows handed out so far
+        
+    def getSlab(self, count):
+        data = ''.join(self.pieces)
+        nbytes = count * self.rowBytes
+        slab = (self.rows, data[:nbytes])
+        self.pieces = [data[nbytes:]]
+        self.size = len(data) - nbytes
+        self.rows += count
+        return slab
+        
+    def add(self, data):
+        self.pieces.append(data)
+        self.size += len(data)
+        if self.rows * self.rowBytes + self.size > self.maxRows * self.rowBytes:
+            raise ValueError("More data than the selection holds")
+        slabs = []
+        slabBytes = self.rowsPerSlab * self.rowBytes
+        while self.size >= slabBytes:
+            slabs.append(self.getSlab(self.rowsPerSlab))
+        return slabs
+        
+    def finish(self):
+        # return the last slab (None if there are no rows left)
+        if self.rows * self.rowBytes + self.size != self.maxRows * self.rowBytes:
+            raise ValueError("Data doesn't fill the selection")
+        if self.size == 0:
+            return None
+        return self.getSlab(self.size // self.rowBytes)
+        
+        
+"""
+  LineBuffer - newline-delimited JSON rows.  Slabs are lists of the 
+    decoded rows; blank lines are skipped.
+"""
+class LineBuffer:
+    def __init__(self, rowsPerSlab, maxRows, maxLineBytes):
+        self.rowsPerSlab = max(1, rowsPerSlab)
+        self.maxRows = maxRows
+        self.maxLineBytes = maxLineBytes
+        self.partial = ''   # start of a line that hasn't been terminated
+        self.pending = []   # decoded rows not handed out yet
+        self.rows = 0       # rows handed out so far
+        
+    def addLine(self, line):
+        if not line.strip():
+            return
+        if self.rows + len(self.pending) >= self.maxRows:
+            raise ValueError("More rows than the selection holds")
+        self.pending.append(json.loads(line))
+        
+    def getSlab(self, count):
+        slab = (self.rows, self.pending[:count])
+        self.pending = self.pending[count:]
+        self.rows += count
+        return slab
+        
+    def add(self, data):
+        lines = (self.partial + data).split('\n')
+        self.partial = lines.pop()
+        if len(self.partial) > self.maxLineBytes:
+            raise ValueError("Row is too long")
+        for line in lines:
+            self.addLine(line)
+        slabs = []
+        while len(self.pending) >= self.rowsPerSlab:
+            slabs.append(self.getSlab(self.rowsPerSlab))
+        return slabs
+        
+    def finish(self):
+        # return the last slab (None if there are no rows left)
+        self.addLine(self.partial)
+        self.partial = ''
+        if self.rows + len(self.pending) != self.maxRows:
+            raise ValueError("Rows don't fill the selection")
+        if not self.pending:
+            return None
+        return self.getSlab(len(self.pending))
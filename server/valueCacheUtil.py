@@ -0,0 +1,168 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import threading
+from collections import OrderedDict
+
+import config
+
+"""
+ Memory bounded LRU cache of dataset selections read by value requests.
+ Clients that poll the same slices (e.g. the latest frame of an image stack) 
+ get the decoded numpy array without another HDF5 read.  Small results 
+ computed from a selection (histograms) are cached the same way.  Entries 
+ are keyed by (file path, dataset uuid, normalized selection, dataset 
+ modified time) and evicted least recently used first once the cached 
+ arrays add up to more than 'value_cache_size' bytes.  Hdf5db drops a dataset's entries when it is 
+ written, resized or deleted.
+ 
+ The cache lives in the server process; each server process has its own.
+"""
+
+_lock = threading.Lock()
+_items = OrderedDict()   # key -> numpy array, least recently used first
+_datasetKeys = { }       # (filePath, uuid) -> set of keys in _items
+_generations = { }       # (filePath, uuid) or filePath -> invalidation count
+_counts = { 'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0 }
+_nbytes = 0              # total size of the cached arrays
+
+
+def isEnabled():
+    return config.get('value_cache_size') > 0
+    
+def getItemKey(item, extent):
+    if type(item) is slice:
+        return item.indices(extent)
+    if type(item) is list:
+        return tuple(item)
+    return item
+    
+"""
+  getKey - return the cache key for a selection of a dataset.  
+    slices is Ellipsis or a tuple of slice objects (or indices and index 
+    lists, see selectionUtil); slices are normalized to (start, stop, step) 
+    tuples so equivalent selections share an entry.
+    fields is the list of members read from a compound type (if not all).
+    op identifies a result computed from the selection (e.g. a histogram),
+    None for the values themselves.
+"""
+def getKey(filePath, objUuid, shape, slices, mtime, fields=None, op=None):
+    if slices is Ellipsis:
+        selection = tuple([(0, extent, 1) for extent in shape])
+    else:
+        selection = tuple([getItemKey(s, extent) for (s, extent) in zip(slices, shape)])
+    if fields:
+        fields = tuple(fields)
+    return (filePath, objUuid, selection, mtime, fields, op)
+    
+"""
+  getGeneration - return a token that changes whenever the dataset's entries
+    are invalidated.  Take it before reading the values and pass it to put, 
+    so a read that overlapped a write isn't cached.
+"""
+def getGeneration(filePath, objUuid):
+    with _lock:
+        return (_generations.get(filePath, 0), _generations.get((filePath, objUuid), 0))
+    
+def get(key):
+    with _lock:
+        if key not in _items:
+            _counts['misses'] += 1
+            return None
+        _counts['hits'] += 1
+        arr = _items.pop(key)
+        _items[key] = arr  # now most recently used
+        return arr
+        
+def removeItem(key):
+    # remove key from the cache, caller must hold the lock
+    global _nbytes
+    arr = _items.pop(key)
+    _nbytes -= arr.nbytes
+    keys = _datasetKeys[key[:2]]
+    keys.discard(key)
+    if not keys:
+        del _datasetKeys[key[:2]]
+    
+"""
+  put - add an array to the cache.  The array is made read-only since it 
+    will be shared by later requests.  Returns False if the array is too big 
+    to cache, or if the dataset was invalidated since generation (from 
+    getGeneration) was taken.
+"""
+def put(key, arr, generation=None):
+    global _nbytes
+    maxSize = config.get('value_cache_size')
+    if arr.nbytes > maxSize * config.get('value_cache_max_item'):
+        return False
+    arr.flags.writeable = False
+    with _lock:
+        if generation is not None and generation != (_generations.get(key[0], 0),
+                _generations.get(key[:2], 0)):
+            return False
+        if key in _items:
+            removeItem(key)
+        _items[key] = arr
+        _nbytes += arr.nbytes
+        _datasetKeys.setdefault(key[:2], set()).add(key)
+        while _nbytes > maxSize:
+            oldest = next(iter(_items))
+            removeItem(oldest)
+            _counts['evictions'] += 1
+    return True
+    
+"""
+  invalidate - drop all cached selections of the dataset
+"""
+def invalidate(filePath, objUuid):
+    with _lock:
+        datasetKey = (filePath, objUuid)
+        _generations[datasetKey] = _generations.get(datasetKey, 0) + 1
+        keys = _datasetKeys.get(datasetKey)
+        if not keys:
+            return
+        _counts['invalidations'] += 1
+        for key in list(keys):
+            removeItem(key)
+            
+"""
+  invalidateFile - drop all cached selections from the file (e.g. when it
+    has been replaced or removed)
+"""
+def invalidateFile(filePath):
+    with _lock:
+        _generations[filePath] = _generations.get(filePath, 0) + 1
+        for datasetKey in list(_datasetKeys.keys()):
+            if datasetKey[0] == filePath:
+                _counts['invalidations'] += 1
+                for key in list(_datasetKeys[datasetKey]):
+                    removeItem(key)
+    
+def clear():
+    global _nbytes
+    with _lock:
+        _items.clear()
+        _datasetKeys.clear()
+        _nbytes = 0
+    
+def getStats():
+    stats = { 'maxSize': config.get('value_cache_size') }
+    with _lock:
+        stats.update(_counts)
+        stats['size'] = _nbytes
+        stats['count'] = len(_items)
+        stats['datasets'] = len(_datasetKeys)
+    return stats
+    
+def resetStats():
+    with _lock:
+        for k in _counts:
+            _counts[k] = 0
@@ -0,0 +1,126 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import itertools
+import numpy as np
+
+"""
+ Helpers for zone maps: the min, max and number of nulls (NaNs) of each 
+ zone of a dataset.  Zones are the dataset's chunks (or, for contiguous 
+ datasets, blocks of whole rows).  A scan for values in a range only needs 
+ to read the zones whose [min, max] overlaps the range.
+"""
+
+ZONE_KINDS = ('b', 'i', 'u', 'f')   # types zone maps are kept for
+
+
+"""
+  getZoneFields - return list of the fields of dt that zone maps are kept 
+    for, [None] for a numeric (non-compound) type
+"""
+def getZoneFields(dt):
+    if dt.names is None:
+        if dt.kind in ZONE_KINDS and not dt.shape:
+            return [None]
+        return []
+    fields = []
+    for name in dt.names:
+        fieldType = dt.fields[name][0]
+        if fieldType.kind in ZONE_KINDS and not fieldType.shape:
+            fields.append(name)
+    return fields
+    
+"""
+  getZoneShape - return the shape of the zones: the chunk shape, or for 
+    contiguous datasets blocks of rows of about zoneBytes bytes
+"""
+def getZoneShape(shape, chunks, itemsize, zoneBytes):
+    if chunks:
+        return tuple(chunks)
+    rowBytes = itemsize * int(np.prod(shape[1:]))
+    rows = max(1, zoneBytes // max(rowBytes, 1))
+    return (rows,) + tuple(shape[1:])
+    
+def getZoneGrid(shape, zoneShape):
+    # number of zones along each dimension
+    return tuple([(extent + size - 1) // size for (extent, size) in zip(shape, zoneShape)])
+    
+"""
+  getZoneGridSlices - return tuple of slices of the zone grid for the zones
+    the selection (or, with no step, the region) touches
+"""
+def getZoneGridSlices(slices, shape, zoneShape):
+    gridSlices = []
+    for (s, extent, size) in zip(slices, shape, zoneShape):
+        r = xrange(*s.indices(extent))
+        if len(r) == 0:
+            gridSlices.append(slice(0, 0))
+        else:
+            gridSlices.append(slice(min(r[0], r[-1]) // size, max(r[0], r[-1]) // size + 1))
+    return tuple(gridSlices)
+    
+"""
+  getZoneSelection - return the part of the selection (tuple of slices 
+    with positive steps) in the zone at the given grid position, or None if
+    the selection has no elements in the zone
+"""
+def getZoneSelection(position, zoneShape, slices, shape):
+    zoneSlices = []
+    for (pos, size, s, extent) in zip(position, zoneShape, slices, shape):
+        (start, stop, step) = s.indices(extent)
+        zoneStart = max(pos * size, start)
+        zoneStop = min((pos + 1) * size, stop)
+        # first selected index in the zone
+        zoneStart = start + ((zoneStart - start + step - 1) // step) * step
+        if zoneStart >= zoneStop:
+            return None
+        zoneSlices.append(slice(zoneStart, zoneStop, step))
+    return tuple(zoneSlices)
+    
+"""
+  getZoneStats - return (min, max, number of NaNs) of the values in block 
+    (min and max are NaN if all the values are)
+"""
+def getZoneStats(block):
+    block = np.asarray(block).reshape(-1)
+    if block.dtype.kind != 'f':
+        return (block.min(), block.max(), 0)
+    isNull = np.isnan(block)
+    nulls = int(np.count_nonzero(isNull))
+    if nulls == block.size:
+        return (np.nan, np.nan, nulls)
+    if nulls:
+        block = block[~isNull]
+    return (block.min(), block.max(), nulls)
+    
+"""
+  zoneMayMatch - return False if no value between low and high (NaN if the
+    zone has no values) can be in keyRange (see indexUtil.getKeyRange)
+"""
+def zoneMayMatch(low, high, keyRange):
+    if low != low:
+        return False   # NaN, no value is in any range
+    (rangeLow, lowInclusive, rangeHigh, highInclusive) = keyRange
+    if rangeLow is not None:
+        if high < rangeLow or (high == rangeLow and not lowInclusive):
+            return False
+    if rangeHigh is not None:
+        if low > rangeHigh or (low == rangeHigh and not highInclusive):
+            return False
+    return True
+    
+"""
+  getGridPositions - return list of the grid positions (in row-major order)
+    in the given grid slices
+"""
+def getGridPositions(gridSlices):
+    ranges = [xrange(s.start, s.stop) for s in gridSlices]
+    return list(itertools.product(*ranges))
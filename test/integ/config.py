@@ -14,8 +14,9 @@ import os
 cfg = {
     'server': '127.0.0.1',
     'port':   5000,
-    'domain':  'test.hdf.io'
+    'domain':  'test.hdf.io',
     #'domain':   'test.data.hdfgroup.org'
+    'admin_key': ''   # set to the server's admin_key to run admin tests
 }
    
 def get(x):
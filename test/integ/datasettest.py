@@ -14,6 +14,8 @@ import config
 import helper
 import unittest
 import json
+import zlib
+import struct
 
 class DatasetTest(unittest.TestCase):
     def __init__(self, *args, **kwargs):
@@ -42,6 +44,52 @@ class DatasetTest(unittest.TestCase):
         self.assertEqual(shape['dims'][0], 10)  
         self.assertEqual(shape['maxdims'][0], 10)
         
+    def testGetChunks(self):
+        domain = 'chunked.' + config.get('domain')  
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset') 
+        req = self.endpoint + "/datasets/" + dset_uuid + "/chunks"
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['dims'], [20, 20])
+        self.failUnlessEqual(rspJson['chunks'], [10, 10])
+        self.failUnlessEqual(rspJson['filters'][0]['name'], 'deflate')
+        
+        # get the stored (compressed) bytes of the chunk at [10, 0]
+        headers['Accept-Encoding'] = 'gzip'
+        # (501 if the server's h5py can't read raw chunks)
+        rsp = requests.get(req, headers=headers, params={'coords': '10,0'})
+        if rsp.status_code != 501:
+            self.failUnlessEqual(rsp.status_code, 200)
+            self.failUnlessEqual(rsp.headers['X-Filter-Mask'], '0')
+            self.assertTrue('Content-Encoding' not in rsp.headers)
+            values = struct.unpack('<100i', zlib.decompress(rsp.content))
+            self.failUnlessEqual(values[0], 200)
+            self.failUnlessEqual(values[99], 209 + 9*20)
+        
+        # not on a chunk boundary
+        rsp = requests.get(req, headers=headers, params={'coords': '5,0'})
+        self.failUnlessEqual(rsp.status_code, 400)
+        
+    def testPutChunks(self):
+        domain = 'chunked_updated.' + config.get('domain')  
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset') 
+        req = self.endpoint + "/datasets/" + dset_uuid + "/chunks"
+        headers = {'host': domain}
+        chunk = zlib.compress(struct.pack('<100i', *range(100)))
+        rsp = requests.put(req, headers=headers, params={'coords': '10,10'}, data=chunk)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        req = self.endpoint + "/datasets/" + dset_uuid + "/value"
+        params = {'dim1_start': 10, 'dim1_stop': 12, 'dim2_start': 10, 'dim2_stop': 12}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['value'], [[0, 1], [10, 11]])
+        
     def testGetResizable(self):
         domain = 'resizable.' + config.get('domain')  
         root_uuid = helper.getRootUUID(domain)
@@ -738,6 +786,42 @@ class DatasetTest(unittest.TestCase):
         rsp = requests.put(req, data=json.dumps(payload), headers=headers)
         self.failUnlessEqual(rsp.status_code, 201)     
         
+    def testPostCreationProps(self):
+        domain = 'creationprops.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        creationProps = {'layout': {'class': 'H5D_CHUNKED', 'dims': [10, 10]},
+            'filters': [{'class': 'H5Z_FILTER_DEFLATE', 'level': 6}],
+            'fillTime': 'H5D_FILL_TIME_NEVER'}
+        payload = {'type': 'H5T_STD_I32LE', 'shape': [40, 80], 
+            'creationProperties': creationProps}
+        req = self.endpoint + "/datasets/"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        rspJson = json.loads(rsp.text)
+        dset_uuid = rspJson['id']
+        self.assertTrue(helper.validateId(dset_uuid))
+        
+        req = self.endpoint + "/datasets/" + dset_uuid
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        props = rspJson['creationProperties']
+        self.failUnlessEqual(props['layout']['class'], 'H5D_CHUNKED')
+        self.failUnlessEqual(props['layout']['dims'], [10, 10])
+        self.failUnlessEqual(props['filters'][0]['class'], 'H5Z_FILTER_DEFLATE')
+        self.failUnlessEqual(props['filters'][0]['level'], 6)
+        self.failUnlessEqual(props['fillTime'], 'H5D_FILL_TIME_NEVER')
+        
+        # chunk rank doesn't match shape
+        creationProps['layout']['dims'] = [10,]
+        req = self.endpoint + "/datasets/"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
     def testPostInvalidType(self):
         domain = 'tall.' + config.get('domain')  
         root_uuid = helper.getRootUUID(domain)
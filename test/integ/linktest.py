@@ -125,6 +125,33 @@ class LinkTest(unittest.TestCase):
         self.failUnlessEqual(len(names), 1000)  # should get 1000 unique links
     
     
+    def testGetCompressed(self):
+        logging.info("LinkTest.testGetCompressed")
+        domain = 'group1k.' + config.get('domain')   
+        root_uuid = helper.getRootUUID(domain)     
+        req = helper.getEndpoint() + "/groups/" + root_uuid + "/links"
+        headers = {'host': domain, 'Accept-Encoding': 'gzip'}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(rsp.headers['Content-Encoding'], 'gzip')
+        self.assertTrue('Accept-Encoding' in rsp.headers['Vary'])
+        rspJson = json.loads(rsp.text)  # requests decompresses the body
+        self.failUnlessEqual(len(rspJson['links']), 1000)
+        
+        # no compression if the client doesn't ask for it
+        headers['Accept-Encoding'] = 'identity'
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertTrue('Content-Encoding' not in rsp.headers)
+        self.failUnlessEqual(len(json.loads(rsp.text)['links']), 1000)
+        
+        # small responses aren't compressed
+        headers['Accept-Encoding'] = 'gzip'
+        rsp = requests.get(req, headers=headers, params={'Limit': 1})
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertTrue('Content-Encoding' not in rsp.headers)
+        
+        
     #Fix - This is crazy slow!
     """    
     def testMoveLinks(self):
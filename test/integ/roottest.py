@@ -162,5 +162,68 @@ class RootTest(unittest.TestCase):
         self.failUnlessEqual(rsp.status_code, 201)
         rspJson = json.loads(rsp.text)
         
+    def testProfileForbidden(self):
+        domain = 'tall.' + config.get('domain')
+        req = self.endpoint + "/?profile=1"
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 403)
+        req = self.endpoint + "/admin/profiles"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 403)
+        headers['X-Admin-Key'] = 'notthekey'
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 403)
+        
+    def testProfile(self):
+        if not config.get('admin_key'):
+            self.skipTest("admin_key not configured")
+        domain = 'tall.' + config.get('domain')
+        headers = {'host': domain, 'X-Admin-Key': config.get('admin_key')}
+        req = self.endpoint + "/?profile=1"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertTrue('X-Profile-Id' in rsp.headers)
+        profileId = rsp.headers['X-Profile-Id']
+        req = self.endpoint + "/admin/profiles"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        ids = [str(item['id']) for item in rspJson['profiles']]
+        self.assertTrue(profileId in ids)
+        req = self.endpoint + "/admin/profiles/" + profileId
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual(rspJson['uri'], '/?profile=1')
+        self.assertEqual(rspJson['domain'], domain)
+        self.assertTrue(rspJson['elapsed'] > 0)
+        self.assertTrue(rspJson['stats'].find('getRootResponse') > 0)
+        rsp = requests.delete(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 404)
+        
+    def testMetrics(self):
+        req = self.endpoint + "/admin/metrics"
+        domain = 'tall.' + config.get('domain')
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 403)
+        if not config.get('admin_key'):
+            self.skipTest("admin_key not configured")
+        rsp = requests.get(self.endpoint + "/", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        headers['X-Admin-Key'] = config.get('admin_key')
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        filePool = rspJson['filePool']
+        for k in ('size', 'maxSize', 'hits', 'misses', 'chunkCacheHits', 
+            'chunkCacheMisses', 'files'):
+            self.assertTrue(k in filePool)
+        if filePool['maxSize'] > 0:
+            self.assertTrue(filePool['size'] > 0)
+        
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -14,6 +14,7 @@ import os
 import stat
 from shutil import copyfile
 import h5py
+import numpy
 
 SRC = "../../testfiles"
 DES = "../../data/test"
@@ -57,7 +58,8 @@ testfiles = {
     'opaque_attr.h5': ('.',),
     'opaque_dset.h5': ('.',),
     'committed_type.h5': ('.',),
-    'tstr.h5': ('.',)
+    'tstr.h5': ('.',),
+    'chunked.h5': ('.', 'chunked_updated.h5')
 }
 
 # files that will get set as read-only
@@ -91,6 +93,19 @@ def makeAttr1k():
         f.attrs[name] = "this is attribute: " + str(i)
     f.close()
 
+"""
+Make a testfile with a gzip compressed, chunked dataset
+"""
+def makeChunked():
+    file_path = SRC + "/chunked.h5" 
+    if os.path.exists(file_path):
+        return # don't waste time re-creating  
+    print 'makeChunked()' 
+    f = h5py.File(file_path, "w")
+    data = numpy.arange(400, dtype='i4').reshape((20, 20))
+    f.create_dataset('dset', data=data, chunks=(10, 10), compression='gzip')
+    f.close()
+
 """
 Remove files from given directory
 """    
@@ -137,6 +152,9 @@ makeGroup1k()
 # create attr1k.h5 (if not created before)
 makeAttr1k()
 
+# create chunked.h5 (if not created before)
+makeChunked()
+
 removeFilesFromDir(DES)
 
 test_dirs = ('.', 'subdir', 'subdir/subdir')
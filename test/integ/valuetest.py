@@ -14,6 +14,9 @@ import config
 import helper
 import unittest
 import json
+import threading
+import numpy as np
+import time
 
 class ValueTest(unittest.TestCase):
     def __init__(self, *args, **kwargs):
@@ -154,6 +157,254 @@ class ValueTest(unittest.TestCase):
                 for j in range(4):
                     self.assertEqual(arr[j], (i+1)*(j*2+1))
                 
+    def testGetStats(self):
+        domain = 'tall.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')  # values: i*j
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/stats"
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        stats = json.loads(rsp.text)['stats']
+        self.assertEqual(stats['min'], 0)
+        self.assertEqual(stats['max'], 81)
+        self.assertEqual(stats['sum'], 2025)
+        self.assertEqual(stats['mean'], 20.25)
+        self.assertTrue(stats['std'] > 0)
+        
+        # reduce rows 2 and 3 along the second dimension
+        params = {'ops': 'max,count', 'axis': '1', 'dim1_start': 2, 'dim1_stop': 4}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        stats = json.loads(rsp.text)['stats']
+        self.assertEqual(stats['max'], [18, 27])
+        self.assertEqual(stats['count'], 10)
+        self.assertTrue('min' not in stats)
+        
+        for params in ({'ops': 'median'}, {'axis': 2}, {'axis': 'x'}):
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 400)
+
+    def testGetHistogram(self):
+        domain = 'tall.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')  # values: i*j
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/histogram"
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers, params={'bins': 3})
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['counts'], [68, 22, 10])
+        self.failUnlessEqual(rspJson['edges'], [0, 27, 54, 81])
+        
+        # bin edges, on rows 2 and 3
+        params = {'bins': '0,10,20,30', 'dim1_start': 2, 'dim1_stop': 4}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(json.loads(rsp.text)['counts'], [9, 8, 3])
+        rsp = requests.get(req, headers=headers, params={'bins': 2, 'range': '50,100'})
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['counts'], [9, 1])
+        self.failUnlessEqual(rspJson['edges'], [50, 75, 100])
+        
+        for params in ({'bins': 0}, {'bins': 'x'}, {'bins': '3,2,1'}, {'range': '5,1'}, 
+                {'range': '1'}, {'field': 'x'}):
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 400)
+        
+    def testGetDownsample(self):
+        domain = 'tall.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')  # values: i*j
+        dset112UUID = helper.getUUID(domain, g11UUID, 'dset1.1.2')  # values: 0-19
+        headers = {'host': domain}
+        
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/value"
+        params = {'downsample': 'minmax', 'dim1_buckets': 2, 'dim2_buckets': 5}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual(rspJson['buckets'], [2, 5])
+        self.assertEqual(rspJson['min'][0], [0, 0, 0, 0, 0])
+        self.assertEqual(rspJson['max'][0], [4, 12, 20, 28, 36])
+        self.assertEqual(rspJson['max'][1], [9, 27, 45, 63, 81])
+        self.assertTrue('value' not in rspJson)
+        
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value"
+        params = {'downsample': 'mean', 'dim1_buckets': 4}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['value'], [2.0, 7.0, 12.0, 17.0])
+        
+        params = {'downsample': 'lttb', 'dim1_buckets': 5, 'dim1_start': 2}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual(len(rspJson['index']), 5)
+        self.assertEqual(rspJson['index'][0], 2)
+        self.assertEqual(rspJson['index'][-1], 19)
+        self.assertEqual(rspJson['value'], rspJson['index'])
+        
+        # bad mode, lttb on 2-d data, too few buckets
+        for (uuid, params) in ((dset112UUID, {'downsample': 'median'}),
+                (dset111UUID, {'downsample': 'lttb'}),
+                (dset112UUID, {'downsample': 'minmax', 'dim1_buckets': 0})):
+            req = helper.getEndpoint() + "/datasets/" + uuid + "/value"
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 400)
+        
+    def testPyramid(self):
+        # create domain
+        domain = 'pyramid.valuetest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        payload = {'type': 'H5T_IEEE_F32LE', 'shape': 1000}
+        req = self.endpoint + "/datasets/"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        dsetUUID = json.loads(rsp.text)['id']
+        req = self.endpoint + "/datasets/" + dsetUUID + "/value"
+        payload = {'value': range(1000)}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        pyramidReq = self.endpoint + "/datasets/" + dsetUUID + "/pyramid"
+        rsp = requests.get(pyramidReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 404)  # not built yet
+        rsp = requests.put(pyramidReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['stale'], False)
+        self.failUnlessEqual([level['dims'] for level in rspJson['levels']], [[500], [250]])
+        
+        # coarsest level with at least 200 values
+        params = {'dim1_resolution': 200}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['level'], 2)
+        self.failUnlessEqual(rspJson['factor'], 4)
+        self.failUnlessEqual(len(rspJson['value']), 250)
+        self.failUnlessEqual(rspJson['value'][:2], [1.5, 5.5])
+        params = {'dim1_resolution': 150, 'dim1_start': 100, 'dim1_stop': 500}
+        rsp = requests.get(req, headers=headers, params=params)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['level'], 1)
+        self.failUnlessEqual(rspJson['start'], [100])
+        self.failUnlessEqual(len(rspJson['value']), 200)
+        
+        # a write leaves the pyramid stale, values come from the dataset
+        payload = {'start': 0, 'stop': 1, 'value': [10]}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.get(pyramidReq, headers=headers)
+        self.failUnlessEqual(json.loads(rsp.text)['stale'], True)
+        rsp = requests.get(req, headers=headers, params={'dim1_resolution': 200})
+        rspJson = json.loads(rsp.text)
+        self.assertTrue('level' not in rspJson)
+        self.failUnlessEqual(len(rspJson['value']), 1000)
+        
+        rsp = requests.put(pyramidReq, headers=headers, params={'background': 1})
+        self.failUnlessEqual(rsp.status_code, 202)
+        for i in range(50):
+            # wait for the build
+            rsp = requests.get(pyramidReq, headers=headers)
+            if rsp.status_code == 200 and not json.loads(rsp.text)['stale']:
+                break
+            time.sleep(0.1)
+        self.failUnlessEqual(json.loads(rsp.text)['stale'], False)
+        rsp = requests.get(req, headers=headers, params={'dim1_resolution': 0})
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.delete(pyramidReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.delete(pyramidReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 404)
+        
+    def testGetConcurrent(self):
+        # identical concurrent requests may share one read on the server
+        domain = 'tall.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset112UUID = helper.getUUID(domain, g11UUID, 'dset1.1.2')
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value"
+        headers = {'host': domain}
+        results = []
+        def getValue():
+            rsp = requests.get(req, headers=headers)
+            results.append((rsp.status_code, rsp.text))
+        threads = [threading.Thread(target=getValue) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.failUnlessEqual(len(results), 8)
+        for (status, text) in results:
+            self.failUnlessEqual(status, 200)
+            self.failUnlessEqual(json.loads(text)['value'], range(20))
+        
+    def testGetServerTiming(self):
+        domain = 'tall.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset112UUID = helper.getUUID(domain, g11UUID, 'dset1.1.2')
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value"
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertTrue('Server-Timing' not in rsp.headers)
+
+        # ask for per-phase timings
+        headers['X-Server-Timing'] = '1'
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertTrue('Server-Timing' in rsp.headers)
+        phases = {}
+        for metric in rsp.headers['Server-Timing'].split(','):
+            name, dur = metric.strip().split(';')
+            self.assertTrue(dur.startswith('dur='))
+            phases[name] = float(dur[len('dur='):])
+        # no 'open' or 'uuid' phase when the file was already open in the pool
+        for name in ('domain', 'init', 'read', 'encode', 'write', 'total'):
+            self.assertTrue(name in phases)
+
+    def testGetFloat(self):
+        domain = 'tall.' + config.get('domain')  
+        headers = {'host': domain}
+        rootUUID = helper.getRootUUID(domain)
+        g2UUID = helper.getUUID(domain, rootUUID, 'g2')
+        dset22UUID = helper.getUUID(domain, g2UUID, 'dset2.2') 
+        req = helper.getEndpoint() + "/datasets/" + dset22UUID + "/value"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        # float32 values are returned with their shortest repr
+        self.assertTrue(rsp.text.find('[0.0, 0.1, 0.2, 0.3, 0.4]') > 0)
+        rspJson = json.loads(rsp.text)
+        data = rspJson['value'] 
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[2], [0.0, 0.3, 0.6, 0.9, 1.2])
+        
+        # limit the number of significant digits
+        rsp = requests.get(req + "?precision=1", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual(rspJson['value'][2], [0, 0.3, 0.6, 0.9, 1])
+        
+        rsp = requests.get(req + "?precision=abc", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.get(req + "?precision=0", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
     def testGetSelectionBadQuery(self):
         domain = 'tall.' + config.get('domain')  
         headers = {'host': domain}
@@ -176,6 +427,47 @@ class ValueTest(unittest.TestCase):
         rsp = requests.get(req, headers=headers)
         self.failUnlessEqual(rsp.status_code, 400)  
         
+    def testGetSelect(self):
+        domain = 'tall.' + config.get('domain')  
+        headers = {'host': domain}
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')  # values: i*j
+        dset112UUID = helper.getUUID(domain, g11UUID, 'dset1.1.2')  # values: 0-19
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value"
+        for (select, expected) in (('[2:10:2]', [2, 4, 6, 8]), ('-3:', [17, 18, 19]), 
+                ('[[5, 1, 5]]', [5, 1, 5]), ('7', 7), ('...', range(20))):
+            rsp = requests.get(req, params={'select': select}, headers=headers)
+            self.failUnlessEqual(rsp.status_code, 200)
+            self.assertEqual(json.loads(rsp.text)['value'], expected)
+        
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/value"
+        for (select, expected) in (('[2, 1:4]', [2, 4, 6]), ('[..., -1]', range(0, 90, 9)[:10]), 
+                ('[::4, [3, 1]]', [[0, 0], [12, 4], [24, 8]])):
+            rsp = requests.get(req, params={'select': select}, headers=headers)
+            self.failUnlessEqual(rsp.status_code, 200)
+            self.assertEqual(json.loads(rsp.text)['value'], expected)
+        rsp = requests.get(req, params={'select': '[4:6, 2:4]'}, 
+            headers={'host': domain, 'Accept': 'application/octet-stream'})
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(list(np.frombuffer(rsp.content, dtype='>i4')), [8, 12, 10, 15])
+        
+        # stats use the select param too (indices keep their dimension)
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/stats"
+        rsp = requests.get(req, params={'select': '[3, :]', 'ops': 'sum'}, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['stats']['sum'], 135)
+        rsp = requests.get(req, params={'select': '[[3, 4]]'}, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/value"
+        for params in ({'select': '[1, 2, 3]'}, {'select': '::-1'}, {'select': '[10]'}, 
+                {'select': '[[1], [2]]'}, {'select': '2', 'dim1_start': '2'}, 
+                {'select': '[[1, 2]]', 'downsample': 'mean'}):
+            rsp = requests.get(req, params=params, headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+        
     def testGetScalar(self):
         domain = 'scalar.' + config.get('domain')
         headers = {'host': domain}  
@@ -246,6 +538,175 @@ class ValueTest(unittest.TestCase):
         self.failUnlessEqual(first[0], 24) 
         self.failUnlessEqual(first[1], "13:53")  
         
+    def testGetQuery(self):
+        domain = 'compound.' + config.get('domain')  
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset') 
+        req = helper.getEndpoint() + "/datasets/" + dset_uuid + "/value"
+        headers = {'host': domain}
+        params = {'query': 'temp >= 70'}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['index'], [45, 46, 47, 68, 69, 70, 71])
+        self.failUnlessEqual(len(rspJson['value']), 7)
+        self.failUnlessEqual(rspJson['value'][0][:3], [22, "16:53", 70])
+        
+        # page through the matches
+        params = {'query': "temp >= 70 and (date == 21 or wind == 'W 8')", 'Limit': 2}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(json.loads(rsp.text)['index'], [47, 68])
+        params['Marker'] = 68
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(json.loads(rsp.text)['index'], [69, 70])
+        params['Marker'] = 71
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(json.loads(rsp.text)['index'], [])
+        
+        params = {'query': '60 < temp < 62', 'return': 'index', 'dim1_stop': 10}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['index'], [1, 2, 6])
+        self.assertTrue('value' not in rspJson)
+        
+        for query in ('temp >', 'nosuch > 1', "temp == 'x'", '__import__("os")'):
+            rsp = requests.get(req, headers=headers, params={'query': query})
+            self.failUnlessEqual(rsp.status_code, 400)
+
+    def testIndex(self):
+        domain = 'compound.' + config.get('domain')
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset')
+        indexReq = helper.getEndpoint() + "/datasets/" + dset_uuid + "/indexes"
+        headers = {'host': domain}
+        rsp = requests.get(indexReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(json.loads(rsp.text)['indexes'], [])
+        # field names that match other dataset resources are still indexes
+        for field in ('type', 'shape', 'append', 'indexesX'):
+            rsp = requests.get(indexReq + "/" + field, headers=headers)
+            self.failUnlessEqual(rsp.status_code, 404)
+        # building an index is an admin request
+        rsp = requests.put(indexReq + "/temp", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 403)
+        if not config.get('admin_key'):
+            self.skipTest("admin_key not configured")
+        headers['X-Admin-Key'] = config.get('admin_key')
+        rsp = requests.put(indexReq + "/temp", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['field'], 'temp')
+        self.failUnlessEqual(rspJson['rows'], 72)
+        rsp = requests.put(indexReq + "/nosuch", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.get(indexReq, headers=headers)
+        self.failUnlessEqual([item['field'] for item in json.loads(rsp.text)['indexes']], ['temp'])
+
+        # queries give the same results using the index
+        req = helper.getEndpoint() + "/datasets/" + dset_uuid + "/value"
+        rsp = requests.get(req, headers=headers, params={'query': 'temp >= 70'})
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['index'], [45, 46, 47, 68, 69, 70, 71])
+        self.failUnlessEqual(rspJson['value'][0][:3], [22, "16:53", 70])
+
+        rsp = requests.delete(indexReq + "/temp", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.get(indexReq + "/temp", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 404)
+
+    def testZoneMap(self):
+        domain = 'compound.' + config.get('domain')
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset')
+        zoneReq = helper.getEndpoint() + "/datasets/" + dset_uuid + "/zonemap"
+        headers = {'host': domain}
+        rsp = requests.get(zoneReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 404)
+        # zone maps are created by admin requests
+        rsp = requests.put(zoneReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 403)
+        if not config.get('admin_key'):
+            self.skipTest("admin_key not configured")
+        headers['X-Admin-Key'] = config.get('admin_key')
+        rsp = requests.put(zoneReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['fields'], ['date', 'temp', 'pressure'])
+        self.failUnlessEqual(rspJson['validZones'], 0)
+
+        # the query computes the zone stats
+        req = helper.getEndpoint() + "/datasets/" + dset_uuid + "/value"
+        rsp = requests.get(req, headers=headers, params={'query': 'temp >= 70'})
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(json.loads(rsp.text)['index'], [45, 46, 47, 68, 69, 70, 71])
+        rsp = requests.get(zoneReq, headers=headers)
+        rspJson = json.loads(rsp.text)
+        self.failUnlessEqual(rspJson['validZones'], rspJson['zones'])
+
+        rsp = requests.delete(zoneReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.get(zoneReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 404)
+
+    def testGetFields(self):
+        domain = 'compound.' + config.get('domain')  
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset') 
+        req = helper.getEndpoint() + "/datasets/" + dset_uuid + "/value"
+        headers = {'host': domain}
+        params = {'fields': 'temp,date', 'dim1_stop': 3}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(json.loads(rsp.text)['value'], [[63, 24], [61, 24], [61, 24]])
+        
+        # column-oriented
+        params = {'fields': 'time,temp', 'dim1_stop': 2, 'columns': 1}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        value = json.loads(rsp.text)['value']
+        self.failUnlessEqual(value, {'time': ['13:53', '12:53'], 'temp': [63, 61]})
+        
+        # binary, as rows and as columns
+        binaryHeaders = {'host': domain, 'Accept': 'application/octet-stream'}
+        params = {'fields': 'temp', 'dim1_stop': 4}
+        rsp = requests.get(req, headers=binaryHeaders, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(rsp.headers['Content-Type'], 'application/octet-stream')
+        self.failUnlessEqual(list(np.frombuffer(rsp.content, dtype='<i8')), [63, 61, 61, 58])
+        params = {'fields': 'temp,pressure', 'dim1_stop': 2, 'columns': 1}
+        rsp = requests.get(req, headers=binaryHeaders, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(list(np.frombuffer(rsp.content[:16], dtype='<i8')), [63, 61])
+        self.failUnlessEqual(list(np.frombuffer(rsp.content[16:], dtype='<f8')), [29.88, 29.87])
+        
+        # point selection and query
+        payload = {'points': [0, 5], 'fields': ['wind']}
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(json.loads(rsp.text)['value'], [['SE 10'], ['SW 7']])
+        params = {'query': 'temp >= 79', 'fields': 'time'}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(json.loads(rsp.text)['value'], [['15:53']])
+        
+        for params in ({'fields': 'nosuch'}, {'fields': 'temp,temp'}):
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 400)
+        # not a compound type
+        tallDomain = 'tall.' + config.get('domain')
+        tallRoot = helper.getRootUUID(tallDomain)
+        dset112UUID = helper.getUUID(tallDomain, helper.getUUID(tallDomain, 
+            helper.getUUID(tallDomain, tallRoot, 'g1'), 'g1.1'), 'dset1.1.2')
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value"
+        for params in ({'fields': 'x'}, {'columns': 1}):
+            rsp = requests.get(req, headers={'host': tallDomain}, params=params)
+            self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.get(req, headers={'host': tallDomain, 'Accept': 'application/octet-stream'})
+        self.failUnlessEqual(rsp.status_code, 200)
+        # in the dataset's byte order
+        self.failUnlessEqual(list(np.frombuffer(rsp.content, dtype='>i4')), range(20))
+        
     def testGetCommitted(self):
         domain = 'committed_type.' + config.get('domain')  
         root_uuid = helper.getRootUUID(domain)
@@ -465,6 +926,45 @@ class ValueTest(unittest.TestCase):
             self.assertEqual(len(data), len(points))
             self.assertEqual(9, data[3])
             
+    def testPostSelections(self):
+        domain = 'tall.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')  # values: i*j
+        req = self.endpoint + "/datasets/" + dset111UUID + "/value"
+        headers = {'host': domain}
+        selections = [{'start': [0, 2], 'stop': [2, 4]}, {'points': [[9, 9], [3, 4]]},
+            {'start': [5, 0], 'stop': [10, 10], 'step': [4, 5]}]
+        rsp = requests.post(req, data=json.dumps({'selections': selections}), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        data = json.loads(rsp.text)['value']
+        self.assertEqual(data, [[[0, 0], [2, 3]], [81, 12], [[0, 25], [0, 45]]])
+        
+        # binary: offsets table, then the values of each selection
+        headers['Accept'] = 'application/octet-stream'
+        rsp = requests.post(req, data=json.dumps({'selections': selections}), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        offsets = [int(n) for n in np.frombuffer(rsp.content[:32], dtype='<u8')]
+        self.assertEqual(offsets, [0, 16, 24, 40])
+        values = np.frombuffer(rsp.content[32:], dtype='>i4')
+        self.assertEqual(list(values[offsets[1] // 4:offsets[2] // 4]), [81, 12])
+        del headers['Accept']
+        
+        # select strings, with indices dropping their dimension
+        selections = [{'select': '[0:2, 2:4]'}, {'select': '[9, [9, 2]]'}]
+        rsp = requests.post(req, data=json.dumps({'selections': selections}), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        data = json.loads(rsp.text)['value']
+        self.assertEqual(data, [[[0, 0], [2, 3]], [81, 18]])
+        
+        for selections in ([], [{'start': [0, 11]}], [{'points': [[1, 2, 3]]}], 
+                [{'points': [[1, 2]], 'stop': [3, 3]}], ['x'], [{'select': '[1, 2, 3]'}], 
+                [{'select': 2}], [{'select': '1', 'start': [0, 0]}],
+                [{'hyperslab': {'start': [0, 0], 'stop': [2, 2]}}], [{'strat': [0, 2]}]):
+            rsp = requests.post(req, data=json.dumps({'selections': selections}), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+            
         
         
         
@@ -566,6 +1066,149 @@ class ValueTest(unittest.TestCase):
         # read back the data
         readData = helper.readDataset(domain, dset1UUID)
         self.failUnlessEqual(readData, data)  # verify we got back what we started with
+        
+        # write with a select string
+        payload = {'select': '[-4::2]', 'value': [0, 1]}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        readData = helper.readDataset(domain, dset1UUID)
+        self.failUnlessEqual(readData, data[:6] + [0, 19, 1, 29])
+        for payload in ({'select': '[[1, 2]]', 'value': [0, 1]}, {'select': '[10]', 'value': 0},
+                {'select': '1', 'start': 1, 'value': 0}):
+            rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+        
+    def testPutPoints(self):
+        # create domain
+        domain = 'valueputpoints.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        payload = {'type': 'H5T_STD_I32LE', 'shape': [10, 10]}
+        req = self.endpoint + "/datasets/"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        dset1UUID = json.loads(rsp.text)['id']
+        self.assertTrue(helper.linkObject(domain, dset1UUID, 'dset1'))
+        
+        req = self.endpoint + "/datasets/" + dset1UUID + "/value"
+        payload = {'points': [[9, 9], [0, 1], [5, 5]], 'value': [1, 2, 3]}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        # binary: coordinates as uint64, then the values
+        body = np.array([[2, 3], [0, 1]], dtype='<u8').tobytes() + \
+            np.array([4, 5], dtype='<i4').tobytes()
+        binaryHeaders = {'host': domain, 'Content-Type': 'application/octet-stream'}
+        rsp = requests.put(req + '?points=2', data=body, headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        payload = {'points': [[9, 9], [0, 1], [5, 5], [2, 3], [0, 0]]}
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['value'], [1, 5, 3, 4, 0])
+        
+        for payload in ({'points': [[10, 0]], 'value': [1]}, {'points': [[1, 1]], 'value': [1, 2]},
+                {'points': [1], 'value': [1]}, {'points': [[1, 1]], 'value': [1], 'select': '1'}):
+            rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.put(req + '?points=2', data=body[:20], headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.put(req + '?points=2', data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
+    def testPutStream(self):
+        # create domain
+        domain = 'valueputstream.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        # 2d dataset bigger than one upload slab
+        payload = {'type': 'H5T_IEEE_F32LE', 'shape': [1200, 1000]}
+        req = self.endpoint + "/datasets/"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        dset1UUID = json.loads(rsp.text)['id']
+        self.assertTrue(helper.linkObject(domain, dset1UUID, 'dset1'))
+        
+        req = self.endpoint + "/datasets/" + dset1UUID + "/value"
+        data = np.arange(1200 * 1000, dtype='<f4').reshape((1200, 1000))
+        def pieces():
+            body = data.tobytes()
+            for i in range(0, len(body), 1000000):
+                yield body[i:i + 1000000]
+        binaryHeaders = {'host': domain, 'Content-Type': 'application/octet-stream'}
+        rsp = requests.put(req, data=pieces(), headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.get(req, params={'select': '[::599, -2:]'}, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['value'], data[::599, -2:].tolist())
+        
+        # newline-delimited JSON rows of a selection
+        lines = '[1, 2]\n[3, 4]\n[5, 6]\n'
+        ndjsonHeaders = {'host': domain, 'Content-Type': 'application/x-ndjson'}
+        rsp = requests.put(req, params={'select': '[10:13, 5:7]'}, data=lines, headers=ndjsonHeaders)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.get(req, params={'select': '[10:13, 4:7]'}, headers=headers)
+        self.assertEqual(json.loads(rsp.text)['value'], [[10004, 1, 2], [11004, 3, 4], [12004, 5, 6]])
+        
+        # the body has to fill the selection
+        rsp = requests.put(req, params={'select': '[0:2, 0]'}, data='\x00' * 12, 
+            headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.put(req, params={'select': '[0:2, 0]'}, data='\x00' * 4, 
+            headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.put(req, params={'select': '[0:2, 0]'}, data='1\n[2\n', 
+            headers=ndjsonHeaders)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.get(req, params={'select': '[0:2, 0]'}, headers=headers)
+        self.assertEqual(json.loads(rsp.text)['value'], [0, 1000])
+        
+    def testAppend(self):
+        # create domain
+        domain = 'valueappend.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        # create extensible 1d dataset
+        payload = {'type': 'H5T_STD_I32LE', 'shape': 0, 'maxshape': 0}
+        req = self.endpoint + "/datasets/"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        dset1UUID = json.loads(rsp.text)['id']
+        ok = helper.linkObject(domain, dset1UUID, 'dset1')
+        self.assertTrue(ok)
+        
+        req = self.endpoint + "/datasets/" + dset1UUID + "/append"
+        rsp = requests.post(req, data=json.dumps({'value': [2, 3, 5]}), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual((rspJson['start'], rspJson['dims']), (0, [3]))
+        
+        # binary rows are in the dataset's type
+        binaryHeaders = {'host': domain, 'Content-Type': 'application/octet-stream'}
+        data = np.array([7, 11], dtype='<i4').tobytes()
+        rsp = requests.post(req, data=data, headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual((rspJson['start'], rspJson['dims']), (3, [5]))
+        readData = helper.readDataset(domain, dset1UUID)
+        self.failUnlessEqual(readData, [2, 3, 5, 7, 11])
+        
+        for payload in ({'value': [[1, 2]]}, {'value': 'x'}, {}):
+            rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.post(req, data='abc', headers=binaryHeaders)
+        self.failUnlessEqual(rsp.status_code, 400)
+        rsp = requests.post(req + '?axis=1', data=json.dumps({'value': [1]}), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
              
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import os
+
+"""
+ Settings for the benchmark scripts (named benchconfig so it doesn't hide the
+ server's config module).  Any value can be overridden with an environment 
+ variable of the same name in upper case, e.g. BENCH_ITERATIONS=200.
+"""
+
+cfg = {
+    'bench_port':  5050,           # port for the in-process server
+    'datapath': '../../data/',     # server data directory
+    'domain':  'perf.hdf.io',      # benchmark files go to <datapath>/perf
+    'bench_iterations': 50,        # timed requests per case
+    'bench_warmup': 5,             # untimed requests per case
+    'bench_output': 'bench_results.json',
+    'bench_tolerance': 0.25,       # allowed slowdown vs. baseline (fraction)
+    'num_groups': 1000,            # sub-groups in the "wide" domain
+    'group_depth': 50,             # nesting level of the "deep" domain
+    'num_attrs': 1000,             # attributes in the "attrs" domain
+    'dset_1d': 1000000,            # extent of the 1-D dataset
+    'dset_2d': 1000,               # extent of each dimension of the 2-D dataset
+    'dset_3d': 100,                # extent of each dimension of the 3-D dataset
+    'dset_compound': 100000,       # elements in the compound dataset
+    'dset_vlen': 10000,            # elements in the vlen dataset
+    'num_points': 1000,            # points per point-selection request
+    'db_objects': '1000,100000',   # object counts for the Hdf5db benchmarks (comma separated)
+    'db_iterations': 20,           # timed calls per Hdf5db case
+    'db_slow_iterations': 3,       # timed calls for cases that visit every object
+    'db_dset_size': 10000,         # elements in each type-class dataset
+    'db_output': 'db_results.json',
+    'db_baseline': 'db_baseline.json'
+}
+   
+def get(x):
+    # see if there are an environment variable override
+    if x.upper() in os.environ:
+        value = os.environ[x.upper()]
+        if type(cfg[x]) is int:
+            value = int(value)
+        elif type(cfg[x]) is float:
+            value = float(value)
+        return value
+    # no command line override, just return the cfg value        
+    return cfg[x]
@@ -0,0 +1,349 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import os
+import json
+import shutil
+import random
+import logging
+import argparse
+import numpy as np
+import h5py
+try:
+    import resource
+except ImportError:
+    resource = None   # no peak memory on Windows
+
+sys.path.append('../../server')
+from hdf5db import Hdf5db
+import hdf5dtype
+import benchconfig
+import benchutil
+import makedata
+
+"""
+ Hdf5db and hdf5dtype benchmarks (no HTTP).
+ Each case runs in a forked process so the reported peak memory ('peak_kb' -
+ growth of max RSS while the case ran) belongs to that case alone.
+ Results are written as JSON (see benchutil) and compared with the baseline
+ file ('db_baseline') if it exists:
+ 
+    python benchdb.py                 # run all cases
+    python benchdb.py -k init         # only cases with "init" in the name
+    python benchdb.py -s              # save this run as the new baseline
+"""
+
+def getDbDir():
+    return os.path.join(makedata.getDataDir(), 'db')
+
+def getObjectCounts():
+    return [int(n) for n in str(benchconfig.get('db_objects')).split(',')]
+
+"""
+File with n objects linked from the root group (every 10th is a dataset)
+"""
+def makeObjects(filePath, n):
+    f = h5py.File(filePath, 'w', libver='latest')
+    for i in range(n):
+        name = 'o{:07d}'.format(i)
+        if i % 10 == 9:
+            f.create_dataset(name, data=np.arange(4, dtype='i4'))
+        else:
+            f.create_group(name)
+    f.close()
+    
+"""
+Nested compound type (getTypeItem only handles one level of nesting, so
+the type item for createDataType is put together separately)
+"""
+def getCompoundType():
+    inner = np.dtype([('id', 'i8'), ('name', 'S16'), ('x', 'f8'), ('y', 'f4')])
+    dt = np.dtype([('id', 'i8'), ('vals', 'f4', (4,)), ('name', 'S16'), 
+        ('flag', h5py.special_dtype(enum=('i1', {'off': 0, 'on': 1}))), ('x', 'f8')])
+    innerItem = hdf5dtype.getTypeItem(inner)
+    nestedItem = { 'class': 'H5T_COMPOUND', 'fields': [
+        { 'name': 'id', 'type': 'H5T_STD_I64LE' },
+        { 'name': 'inner', 'type': innerItem },
+        { 'name': 'outer', 'type': { 'class': 'H5T_COMPOUND', 'fields': [
+            { 'name': 'a', 'type': innerItem }, 
+            { 'name': 'b', 'type': 'H5T_IEEE_F32LE' }]}}]}
+    return (inner, dt, nestedItem)
+
+"""
+One dataset per type class
+"""
+def makeTypes(filePath):
+    n = benchconfig.get('db_dset_size')
+    f = h5py.File(filePath, 'w')
+    f.create_dataset('integer', data=np.arange(n, dtype='i4'))
+    f.create_dataset('float', data=np.arange(n, dtype='f8'))
+    f.create_dataset('string', data=np.array(['str%06d' % i for i in range(n)], dtype='S10'))
+    dt = h5py.special_dtype(vlen=str)
+    dset = f.create_dataset('vlen_string', (n,), dtype=dt)
+    dset[...] = ['vlen string %d' % i for i in range(n)]
+    dt = h5py.special_dtype(vlen=np.dtype('i4'))
+    dset = f.create_dataset('vlen', (n,), dtype=dt)
+    for i in range(n):
+        dset[i] = np.arange(i % 10 + 1, dtype='i4')
+    dt = h5py.special_dtype(enum=('i2', {'RED': 0, 'GREEN': 1, 'BLUE': 2}))
+    f.create_dataset('enum', data=np.arange(n, dtype='i2') % 3, dtype=dt)
+    f.create_dataset('array', (n,), dtype=np.dtype(('f4', (3,))))
+    (inner, dt, nestedItem) = getCompoundType()
+    f.create_dataset('compound', (n,), dtype=dt)
+    f.create_dataset('compound_nested', (n,), dtype=hdf5dtype.createDataType(nestedItem))
+    targets = [f.create_group('g%d' % i) for i in range(10)]
+    dt = h5py.special_dtype(ref=h5py.Reference)
+    dset = f.create_dataset('objref', (n,), dtype=dt)
+    dset[...] = [targets[i % 10].ref for i in range(n)]
+    dt = h5py.special_dtype(ref=h5py.RegionReference)
+    count = min(n, 1000)   # region refs are slow to create
+    dset = f.create_dataset('regionref', (count,), dtype=dt)
+    data = f['integer']
+    dset[...] = [data.regionref[i:i+10] for i in range(count)]
+    f.close()
+    
+def makeData(force=False):
+    dbDir = getDbDir()
+    if not os.path.exists(dbDir):
+        os.makedirs(dbDir)
+    files = [('objs_%d.h5' % n, makeObjects, (n,)) for n in getObjectCounts()]
+    files.append(('types.h5', makeTypes, ()))
+    for (fileName, maker, args) in files:
+        filePath = os.path.join(dbDir, fileName)
+        if os.path.exists(filePath) and not force:
+            continue
+        print 'make', filePath
+        maker(filePath, *args)
+        # initialized copy for the non-init cases
+        workPath = os.path.join(dbDir, 'work_' + fileName)
+        shutil.copyfile(filePath, workPath)
+        with Hdf5db(workPath) as db:
+            db.initFile()
+
+"""
+  getMaxRss - max resident set size of this process in KB
+"""
+def getMaxRss():
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss /= 1024   # bytes on Mac OS X
+    return maxrss
+
+"""
+  runIsolated - run case (which returns a stats dict) in a child process and
+    add the peak memory growth.
+"""
+def runIsolated(case):
+    if not hasattr(os, 'fork'):
+        startRss = getMaxRss()
+        stats = case()
+        stats['peak_kb'] = getMaxRss() - startRss
+        return stats
+    (rfd, wfd) = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # child
+        os.close(rfd)
+        status = 0
+        try:
+            startRss = getMaxRss()
+            stats = case()
+            stats['peak_kb'] = getMaxRss() - startRss
+            os.write(wfd, json.dumps(stats))
+        except Exception:
+            logging.exception("benchmark case failed")
+            status = 1
+        os.close(wfd)
+        os._exit(status)
+    os.close(wfd)
+    output = ''
+    while True:
+        data = os.read(rfd, 4096)
+        if not data:
+            break
+        output += data
+    os.close(rfd)
+    (pid, status) = os.waitpid(pid, 0)
+    if status != 0:
+        return None
+    return json.loads(output)
+    
+"""
+  getCases - return list of (name, case) where case() returns a stats dict
+"""
+def getCases():
+    iterations = benchconfig.get('db_iterations')
+    slowIterations = benchconfig.get('db_slow_iterations')
+    dbDir = getDbDir()
+    cases = []
+    
+    def addObjectCases(n):
+        srcPath = os.path.join(dbDir, 'objs_%d.h5' % n)
+        workPath = os.path.join(dbDir, 'work_objs_%d.h5' % n)
+        tmpPath = os.path.join(dbDir, 'tmp_objs_%d.h5' % n)
+        
+        def initCase():
+            def setup():
+                shutil.copyfile(srcPath, tmpPath)
+            def run(arg):
+                with Hdf5db(tmpPath) as db:
+                    db.initFile()
+            try:
+                return benchutil.timeCase(run, slowIterations, setup=setup)
+            finally:
+                os.remove(tmpPath)
+        cases.append(('init_file_%d' % n, initCase))
+        
+        def uuidByAddressCase():
+            with Hdf5db(workPath) as db:
+                db.initFile()
+                names = random.sample(list(db.f), min(n, 1000))
+                addrs = [h5py.h5o.get_info(db.f[name].id).addr for name in names]
+                def run():
+                    for addr in addrs:
+                        db.getUUIDByAddress(addr)
+                return benchutil.timeCase(run, iterations, 1)
+        cases.append(('uuid_by_address_x1000_%d' % n, uuidByAddressCase))
+        
+        def linkItemsCase(marker):
+            def case():
+                with Hdf5db(workPath) as db:
+                    rootUuid = db.getUUIDByPath('/')
+                    def run():
+                        db.getLinkItems(rootUuid, marker=marker, limit=100)
+                    return benchutil.timeCase(run, iterations, 1)
+            return case
+        cases.append(('link_items_first100_%d' % n, linkItemsCase(None)))
+        marker = 'o{:07d}'.format(max(0, n - 101))
+        cases.append(('link_items_last100_%d' % n, linkItemsCase(marker)))
+        
+        def numLinksCase():
+            with Hdf5db(workPath) as db:
+                db.initFile()
+                obj = db.f['o{:07d}'.format(n / 2)]
+                def run():
+                    db.getNumLinksToObject(obj)
+                return benchutil.timeCase(run, slowIterations)
+        cases.append(('num_links_to_object_%d' % n, numLinksCase))
+        
+        def deleteCase():
+            shutil.copyfile(workPath, tmpPath)
+            try:
+                with Hdf5db(tmpPath) as db:
+                    rootUuid = db.getUUIDByPath('/')
+                    def setup():
+                        objUuid = db.createGroup()
+                        db.linkObject(rootUuid, objUuid, 'tmp_' + objUuid)
+                        return objUuid
+                    def run(objUuid):
+                        db.deleteObjectByUuid(objUuid)
+                    return benchutil.timeCase(run, slowIterations, setup=setup)
+            finally:
+                os.remove(tmpPath)
+        cases.append(('delete_object_%d' % n, deleteCase))
+    
+    for n in getObjectCounts():
+        addObjectCases(n)
+        
+    # dataset reads for each type class
+    typesPath = os.path.join(dbDir, 'work_types.h5')
+    def readCase(dsetName):
+        def case():
+            with Hdf5db(typesPath) as db:
+                objUuid = db.getUUIDByPath('/' + dsetName)
+                def run():
+                    db.getDatasetValuesByUuid(objUuid)
+                return benchutil.timeCase(run, iterations, 1)
+        return case
+    for dsetName in ('integer', 'float', 'string', 'vlen_string', 'vlen', 'enum', 
+            'array', 'compound', 'compound_nested', 'objref', 'regionref'):
+        cases.append(('get_values_' + dsetName, readCase(dsetName)))
+        
+    # conversion helpers
+    def vlenToListCase():
+        with Hdf5db(typesPath) as db:
+            data = db.f['vlen'][...]
+            def run():
+                db.vlenToList(data)
+            return benchutil.timeCase(run, iterations, 1)
+    cases.append(('vlen_to_list', vlenToListCase))
+    def refToListCase():
+        with Hdf5db(typesPath) as db:
+            db.initFile()
+            data = db.f['objref'][...]
+            def run():
+                db.refToList(data)
+            return benchutil.timeCase(run, iterations, 1)
+    cases.append(('ref_to_list', refToListCase))
+    
+    # type conversions
+    (inner, dt, nestedItem) = getCompoundType()
+    def getTypeItemCase():
+        def run():
+            for i in range(1000):
+                hdf5dtype.getTypeItem(dt)
+        return benchutil.timeCase(run, iterations, 1)
+    cases.append(('get_type_item_compound_x1000', getTypeItemCase))
+    def createDataTypeCase():
+        def run():
+            for i in range(1000):
+                hdf5dtype.createDataType(nestedItem)
+        return benchutil.timeCase(run, iterations, 1)
+    cases.append(('create_data_type_nested_x1000', createDataTypeCase))
+    
+    return cases
+    
+def main():
+    parser = argparse.ArgumentParser(description='h5serv Hdf5db benchmarks')
+    parser.add_argument('-k', dest='keyword', help='only run cases containing this string')
+    parser.add_argument('-o', dest='output', default=benchconfig.get('db_output'),
+        help='file for JSON results')
+    parser.add_argument('-b', dest='baseline', default=benchconfig.get('db_baseline'),
+        help='baseline results to compare with')
+    parser.add_argument('-s', dest='save', action='store_true', 
+        help='save results as the baseline')
+    parser.add_argument('-f', dest='force', action='store_true', 
+        help='re-create the benchmark data files')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    makeData(args.force)
+    
+    results = {}
+    for (name, case) in getCases():
+        if args.keyword and name.find(args.keyword) < 0:
+            continue
+        stats = runIsolated(case)
+        if stats is None:
+            print "%-40s FAILED" % name
+            continue
+        results[name] = stats
+        print "%-40s p50: %10.3f ms  p99: %10.3f ms  peak: %8d KB" % (name, 
+            stats['p50'], stats['p99'], stats['peak_kb'])
+            
+    benchutil.saveResults(args.output, results)
+    print 'results written to:', args.output
+    if args.save:
+        benchutil.saveResults(args.baseline, results)
+        print 'baseline saved to:', args.baseline
+    elif os.path.exists(args.baseline):
+        baseline = benchutil.loadResults(args.baseline)
+        regressions = benchutil.compareResults(baseline, results, 
+            benchconfig.get('bench_tolerance'), keys=('p50', 'peak_kb'))
+        benchutil.printRegressions(regressions)
+        if regressions:
+            sys.exit(1)
+    
+if __name__ == '__main__':
+    main()
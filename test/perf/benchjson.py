@@ -0,0 +1,68 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import argparse
+import numpy as np
+from tornado.escape import json_encode
+
+sys.path.append('../../server')
+import jsonUtil
+import benchconfig
+import benchutil
+
+"""
+ Compare JSON encoding of value responses: tolist() + json_encode (the
+ previous path) against jsonUtil.encodeArray, with and without a float
+ precision.
+ 
+    python benchjson.py
+"""
+
+def getArrays():
+    n = benchconfig.get('dset_1d')
+    arrays = {}
+    arrays['int32_1d'] = np.arange(n, dtype='i4')
+    arrays['int16_3d'] = np.arange(n, dtype='i2').reshape((n // 10000, 100, 100))
+    arrays['uint64_1d'] = np.arange(n, dtype='u8')
+    arrays['float64_1d'] = np.random.randn(n)
+    arrays['float64_2d'] = np.random.randn(n).reshape((n // 1000, 1000))
+    arrays['float32_1d'] = np.random.randn(n).astype('f4')
+    dt = np.dtype([('time', 'i8'), ('temp', 'f4'), ('pressure', 'f8')])
+    data = np.zeros((n // 4,), dtype=dt)
+    data['time'] = np.arange(n // 4)
+    data['temp'] = np.random.random(n // 4) * 40.0
+    data['pressure'] = np.random.random(n // 4) * 1000.0
+    arrays['compound_1d'] = data
+    return arrays
+    
+def main():
+    parser = argparse.ArgumentParser(description='h5serv JSON encoding benchmarks')
+    parser.add_argument('-o', dest='output', default='json_results.json',
+        help='file for JSON results')
+    args = parser.parse_args()
+    
+    iterations = max(3, benchconfig.get('bench_iterations') / 10)
+    results = {}
+    arrays = getArrays()
+    for name in sorted(arrays.keys()):
+        arr = arrays[name]
+        cases = (('tolist_' + name, lambda: json_encode(arr.tolist())),
+            ('array_' + name, lambda: jsonUtil.encodeArray(arr)),
+            ('array_prec6_' + name, lambda: jsonUtil.encodeArray(arr, 6)))
+        for (caseName, func) in cases:
+            results[caseName] = benchutil.timeCase(func, iterations, 1)
+            print "%-40s p50: %10.3f ms" % (caseName, results[caseName]['p50'])
+    benchutil.saveResults(args.output, results)
+    print 'results written to:', args.output
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import json
+import random
+import logging
+import argparse
+import threading
+import requests
+import tornado.httpserver
+from tornado.ioloop import IOLoop
+
+sys.path.append('../../server')
+import config      # server config
+import benchconfig
+import benchutil
+import makedata
+
+"""
+ REST server benchmarks.
+ Starts the h5serv app in-process on 'bench_port', creates the synthetic
+ domains (see makedata.py) and reports req/s, p50 and p99 (ms) per case.
+ Results are written as JSON (see benchutil) for comparison against a 
+ baseline run:
+ 
+    python benchserver.py                        # run all cases
+    python benchserver.py -k read                # only cases with "read" in the name
+    python benchserver.py -b baseline.json       # report cases slower than baseline
+"""
+
+"""
+  startServer - run the app on a separate thread, return the server's ioloop 
+    once it is listening
+"""
+def startServer(port):
+    config.cfg['datapath'] = benchconfig.get('datapath')
+    config.cfg['debug'] = False   # no autoreload
+    import app   # import after config is set up
+    ioloop = IOLoop()
+    ready = threading.Event()
+    def run():
+        ioloop.make_current()
+        server = tornado.httpserver.HTTPServer(app.make_app())
+        server.listen(port)
+        ready.set()
+        ioloop.start()
+        server.stop()
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    ready.wait()
+    return ioloop
+
+
+class Client:
+    def __init__(self, port):
+        self.endpoint = 'http://127.0.0.1:' + str(port)
+        self.session = requests.Session()   # keep-alive connection
+        
+    def request(self, method, domain, path, params=None, body=None):
+        headers = {'host': makedata.getDomain(domain)}
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+        rsp = self.session.request(method, self.endpoint + path, 
+            headers=headers, params=params, data=data)
+        if rsp.status_code not in (200, 201):
+            raise IOError("%s %s returned %d" % (method, path, rsp.status_code))
+        return rsp
+        
+    def get(self, domain, path, params=None):
+        return self.request('GET', domain, path, params=params)
+        
+    def getJson(self, domain, path, params=None):
+        return json.loads(self.get(domain, path, params).text)
+        
+    def getRootUUID(self, domain):
+        return self.getJson(domain, '/')['root']
+        
+    def getUUID(self, domain, parentUuid, name):
+        rspJson = self.getJson(domain, '/groups/' + parentUuid + '/links/' + name)
+        target = rspJson['href']
+        return target[target.rfind('/') + 1:]
+
+"""
+  getCases - return list of (name, func, iterations) for each benchmark case
+"""
+def getCases(client):
+    iterations = benchconfig.get('bench_iterations')
+    fewer = max(5, iterations / 10)   # for the large selections
+    cases = []
+    def add(name, func, n=iterations):
+        cases.append((name, func, n))
+    
+    # root / group / link / attribute requests
+    root = client.getRootUUID('dsets')
+    add('root_get', lambda: client.get('dsets', '/'))
+    wideRoot = client.getRootUUID('wide')
+    add('group_collection_wide', lambda: client.get('wide', '/groups'), fewer)
+    add('link_list_wide', lambda: client.get('wide', '/groups/' + wideRoot + '/links'), fewer)
+    add('link_list_wide_limit100', lambda: client.get('wide', 
+        '/groups/' + wideRoot + '/links', {'Limit': 100}))
+    add('group_get_wide', lambda: client.get('wide', '/groups/' + wideRoot))
+    uuid = client.getRootUUID('deep')
+    for i in range(benchconfig.get('group_depth')):
+        uuid = client.getUUID('deep', uuid, 'g{:04d}'.format(i))
+    deepest = uuid
+    add('group_get_deep', lambda: client.get('deep', '/groups/' + deepest))
+    attrRoot = client.getRootUUID('attrs')
+    add('attr_list', lambda: client.get('attrs', '/groups/' + attrRoot + '/attributes'), fewer)
+    add('attr_list_limit100', lambda: client.get('attrs', 
+        '/groups/' + attrRoot + '/attributes', {'Limit': 100}))
+    add('attr_get', lambda: client.get('attrs', '/groups/' + attrRoot + '/attributes/a000500'))
+    
+    # hyperslab reads
+    dsets = {}
+    for name in ('dset1d', 'dset2d', 'dset3d', 'compound', 'vlen'):
+        dsets[name] = client.getUUID('dsets', root, name)
+    def addRead(name, dsetName, counts, n=iterations):
+        params = {}
+        for dim in range(len(counts)):
+            params['dim%d_start' % (dim + 1)] = 0
+            params['dim%d_stop' % (dim + 1)] = counts[dim]
+        path = '/datasets/' + dsets[dsetName] + '/value'
+        add(name, lambda: client.get('dsets', path, params), n)
+    addRead('read_1d_10', 'dset1d', (10,))
+    addRead('read_1d_1k', 'dset1d', (1000,))
+    addRead('read_1d_100k', 'dset1d', (100000,), fewer)
+    addRead('read_2d_10x10', 'dset2d', (10, 10))
+    addRead('read_2d_100x100', 'dset2d', (100, 100))
+    addRead('read_2d_500x500', 'dset2d', (500, 500), fewer)
+    addRead('read_3d_10x10x10', 'dset3d', (10, 10, 10))
+    addRead('read_3d_50x50x50', 'dset3d', (50, 50, 50), fewer)
+    addRead('read_compound_1k', 'compound', (1000,))
+    addRead('read_vlen_1k', 'vlen', (1000,))
+    
+    # point selection
+    extent = benchconfig.get('dset_1d')
+    points = sorted(random.sample(xrange(extent), min(extent, benchconfig.get('num_points'))))
+    path = '/datasets/' + dsets['dset1d'] + '/value'
+    add('points_1d', lambda: client.request('POST', 'dsets', path, body={'points': points}))
+    
+    # writes
+    writeRoot = client.getRootUUID('writes')
+    path1d = '/datasets/' + client.getUUID('writes', writeRoot, 'dset1d') + '/value'
+    body1d = {'start': 0, 'stop': 1000, 'value': range(1000)}
+    add('write_1d_1k', lambda: client.request('PUT', 'writes', path1d, body=body1d))
+    path2d = '/datasets/' + client.getUUID('writes', writeRoot, 'dset2d') + '/value'
+    value = [[float(i)] * 100 for i in range(100)]
+    body2d = {'start': [0, 0], 'stop': [100, 100], 'value': value}
+    add('write_2d_100x100', lambda: client.request('PUT', 'writes', path2d, body=body2d))
+    
+    return cases
+        
+def main():
+    parser = argparse.ArgumentParser(description='h5serv REST benchmarks')
+    parser.add_argument('-k', dest='keyword', help='only run cases containing this string')
+    parser.add_argument('-o', dest='output', default=benchconfig.get('bench_output'),
+        help='file for JSON results')
+    parser.add_argument('-b', dest='baseline', help='baseline results to compare with')
+    parser.add_argument('-f', dest='force', action='store_true', 
+        help='re-create the benchmark data files')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    makedata.makeData(args.force)
+    port = benchconfig.get('bench_port')
+    ioloop = startServer(port)
+    client = Client(port)
+    
+    results = {}
+    warmup = benchconfig.get('bench_warmup')
+    try:
+        for (name, func, iterations) in getCases(client):
+            if args.keyword and name.find(args.keyword) < 0:
+                continue
+            results[name] = benchutil.timeCase(func, iterations, warmup)
+            print "%-40s %10.1f req/s  p50: %8.3f ms  p99: %8.3f ms" % (name, 
+                results[name]['rps'], results[name]['p50'], results[name]['p99'])
+    finally:
+        ioloop.add_callback(ioloop.stop)
+    
+    benchutil.saveResults(args.output, results)
+    print 'results written to:', args.output
+    
+    if args.baseline:
+        baseline = benchutil.loadResults(args.baseline)
+        regressions = benchutil.compareResults(baseline, results, 
+            benchconfig.get('bench_tolerance'), keys=('p50', 'p99'))
+        benchutil.printRegressions(regressions)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
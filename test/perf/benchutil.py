@@ -0,0 +1,136 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import time
+import json
+import platform
+
+"""
+ Benchmark helpers - latency statistics, result files and baseline comparison.
+
+ Result files look like:
+    { "info":  { "time": ..., "python": ..., "h5py": ..., ... },
+      "cases": { "<case name>": { "count": 50, "p50": 1.2, "p99": 3.4, ... }, ... } }
+ (times are in milliseconds)
+"""
+
+"""
+  percentile - nearest-rank percentile of a sorted list
+"""
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    index = int(round(pct / 100.0 * len(values) + 0.5)) - 1
+    index = max(0, min(index, len(values) - 1))
+    return values[index]
+
+"""
+  getStats - summarize a list of latencies (in seconds)
+"""
+def getStats(latencies):
+    values = sorted(latencies)
+    total = sum(values)
+    stats = { 'count': len(values) }
+    stats['total'] = total * 1000.0
+    stats['mean'] = total * 1000.0 / len(values) if values else 0.0
+    stats['min'] = values[0] * 1000.0 if values else 0.0
+    stats['max'] = values[-1] * 1000.0 if values else 0.0
+    stats['p50'] = percentile(values, 50) * 1000.0
+    stats['p99'] = percentile(values, 99) * 1000.0
+    stats['rps'] = len(values) / total if total > 0 else 0.0
+    return stats
+
+"""
+  timeCase - call func warmup + iterations times, return stats for the timed calls.
+    If setup is given, it is called (untimed) before each call and its return
+    value is passed to func.
+"""
+def timeCase(func, iterations, warmup=0, setup=None):
+    latencies = []
+    for i in range(warmup + iterations):
+        if setup:
+            arg = setup()
+            start = time.time()
+            func(arg)
+        else:
+            start = time.time()
+            func()
+        if i >= warmup:
+            latencies.append(time.time() - start)
+    return getStats(latencies)
+
+def getInfo():
+    info = { 'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()) }
+    info['python'] = platform.python_version()
+    info['platform'] = platform.platform()
+    try:
+        import numpy
+        import h5py
+        import tornado
+        info['numpy'] = numpy.__version__
+        info['h5py'] = h5py.version.version
+        info['hdf5'] = h5py.version.hdf5_version
+        info['tornado'] = tornado.version
+    except ImportError:
+        pass
+    return info
+
+def saveResults(filePath, cases):
+    results = { 'info': getInfo(), 'cases': cases }
+    with open(filePath, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return results
+
+def loadResults(filePath):
+    with open(filePath) as f:
+        results = json.load(f)
+    return results
+
+"""
+  compareResults - return list of (case, key, baseline value, new value) for
+    each case that is slower than the baseline by more than tolerance.
+    keys are the stats to compare (e.g. 'p50', 'peak_kb').
+"""
+def compareResults(baseline, cases, tolerance, keys=('p50',)):
+    regressions = []
+    baseCases = baseline['cases']
+    for name in sorted(cases.keys()):
+        if name not in baseCases:
+            continue
+        for key in keys:
+            if key not in cases[name] or key not in baseCases[name]:
+                continue
+            baseValue = baseCases[name][key]
+            value = cases[name][key]
+            if baseValue > 0 and value > baseValue * (1.0 + tolerance):
+                regressions.append((name, key, baseValue, value))
+    return regressions
+
+def printResults(cases, keys=('count', 'rps', 'p50', 'p99'), out=sys.stdout):
+    out.write("%-40s" % 'case')
+    for key in keys:
+        out.write("%12s" % key)
+    out.write('\n')
+    for name in sorted(cases.keys()):
+        out.write("%-40s" % name)
+        for key in keys:
+            value = cases[name].get(key, '')
+            if type(value) is float:
+                out.write("%12.3f" % value)
+            else:
+                out.write("%12s" % value)
+        out.write('\n')
+
+def printRegressions(regressions, out=sys.stdout):
+    for (name, key, baseValue, value) in regressions:
+        out.write("REGRESSION %s %s: %.3f -> %.3f (%+.1f%%)\n" % 
+            (name, key, baseValue, value, (value / baseValue - 1.0) * 100.0))
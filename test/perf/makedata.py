@@ -0,0 +1,111 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import os
+import numpy as np
+import h5py
+
+import benchconfig
+
+"""
+ Create the synthetic domains used by the benchmarks.
+ Files go to <datapath>/perf/ and are only re-created if missing (or if -f
+ is given).  Sizes are taken from benchconfig.
+"""
+
+DOMAINS = ('wide', 'deep', 'attrs', 'dsets', 'writes')
+
+def getDataDir():
+    return os.path.join(benchconfig.get('datapath'), 'perf')
+    
+def getDomain(name):
+    # domain for the given benchmark file, e.g. wide.perf.hdf.io
+    return name + '.' + benchconfig.get('domain')
+
+"""
+Group with num_groups sub-groups
+"""
+def makeWide(f):
+    for i in range(benchconfig.get('num_groups')):
+        f.create_group('g{:06d}'.format(i))
+
+"""
+Chain of group_depth nested groups (each with a small dataset)
+"""
+def makeDeep(f):
+    grp = f
+    for i in range(benchconfig.get('group_depth')):
+        grp = grp.create_group('g{:04d}'.format(i))
+        grp.create_dataset('dset', data=np.arange(10, dtype='i4'))
+        
+"""
+Root group with num_attrs attributes
+"""
+def makeAttrs(f):
+    for i in range(benchconfig.get('num_attrs')):
+        f.attrs['a{:06d}'.format(i)] = np.arange(i % 10 + 1, dtype='f8')
+
+"""
+1-D/2-D/3-D numeric, compound and vlen datasets
+"""
+def makeDsets(f):
+    n = benchconfig.get('dset_1d')
+    f.create_dataset('dset1d', data=np.arange(n, dtype='i4'))
+    n = benchconfig.get('dset_2d')
+    data = np.arange(n * n, dtype='f4').reshape((n, n))
+    f.create_dataset('dset2d', data=data, chunks=True)
+    n = benchconfig.get('dset_3d')
+    data = np.arange(n * n * n, dtype='f8').reshape((n, n, n))
+    f.create_dataset('dset3d', data=data, chunks=True)
+    n = benchconfig.get('dset_compound')
+    dt = np.dtype([('time', 'i8'), ('temp', 'f4'), ('pressure', 'f4'), ('station', 'S8')])
+    data = np.zeros((n,), dtype=dt)
+    data['time'] = np.arange(n)
+    data['temp'] = np.random.random(n) * 40.0
+    data['pressure'] = np.random.random(n) * 1000.0
+    data['station'] = 'st001'
+    f.create_dataset('compound', data=data)
+    n = benchconfig.get('dset_vlen')
+    dt = h5py.special_dtype(vlen=np.dtype('i4'))
+    dset = f.create_dataset('vlen', (n,), dtype=dt)
+    for i in range(n):
+        dset[i] = np.arange(i % 20 + 1, dtype='i4')
+        
+"""
+Datasets that the write benchmarks update
+"""
+def makeWrites(f):
+    f.create_dataset('dset1d', data=np.zeros((benchconfig.get('dset_1d'),), dtype='i4'))
+    n = benchconfig.get('dset_2d')
+    f.create_dataset('dset2d', data=np.zeros((n, n), dtype='f4'), chunks=True)
+
+makers = { 'wide': makeWide, 'deep': makeDeep, 'attrs': makeAttrs, 
+    'dsets': makeDsets, 'writes': makeWrites }
+
+"""
+  makeData - create any missing benchmark files (all of them if force is set)
+"""
+def makeData(force=False):
+    dataDir = getDataDir()
+    if not os.path.exists(dataDir):
+        os.makedirs(dataDir)
+    for name in DOMAINS:
+        filePath = os.path.join(dataDir, name + '.h5')
+        if os.path.exists(filePath) and not force:
+            continue
+        print 'make', filePath
+        f = h5py.File(filePath, 'w')
+        makers[name](f)
+        f.close()
+        
+if __name__ == '__main__':
+    makeData(force=('-f' in sys.argv))
@@ -12,7 +12,7 @@
 
 import os
 
-unit_tests = ('timeUtilTest', 'fileUtilTest', 'hdf5dtypeTest', 'hdf5dbTest')
+unit_tests = ('timeUtilTest', 'timingUtilTest', 'profileUtilTest', 'slowLogUtilTest', 'jsonUtilTest', 'compressUtilTest', 'filePoolUtilTest', 'valueCacheUtilTest', 'flightUtilTest', 'reduceUtilTest', 'queryUtilTest', 'indexUtilTest', 'zoneUtilTest', 'selectionUtilTest', 'uploadUtilTest', 'fileUtilTest', 'hdf5dtypeTest', 'hdf5dbTest')
 integ_tests = ('roottest', 'grouptest', 'linktest', 'datasettest', 'valuetest',
     'attributetest', 'datatypetest', 'shapetest', 'datasettypetest', 'spidertest')
 #
@@ -0,0 +1,125 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import zlib
+import gzip
+import sys
+from StringIO import StringIO
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+ 
+
+sys.path.append('../../server')
+import compressUtil
+from compressUtil import CompressionTransform
+
+
+class CompressUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(CompressUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def getTransform(self, acceptEncoding):
+        headers = HTTPHeaders()
+        if acceptEncoding is not None:
+            headers['Accept-Encoding'] = acceptEncoding
+        request = HTTPServerRequest(method='GET', uri='/', headers=headers)
+        return CompressionTransform(request)
+        
+    def getResponseHeaders(self, contentType='application/json; charset=UTF-8', length=None):
+        headers = HTTPHeaders()
+        headers['Content-Type'] = contentType
+        if length is not None:
+            headers['Content-Length'] = str(length)
+        return headers
+        
+    def testParseAcceptEncoding(self):
+        accepted = compressUtil.parseAcceptEncoding('gzip;q=0.5, deflate, br;q=0, *;q=0.1')
+        self.assertEqual(accepted, {'gzip': 0.5, 'deflate': 1.0, 'br': 0.0, '*': 0.1})
+        self.assertEqual(compressUtil.parseAcceptEncoding(''), {})
+        
+    def testChooseEncoding(self):
+        available = compressUtil.getAvailableEncodings()
+        self.assertTrue('gzip' in available)
+        self.assertEqual(compressUtil.chooseEncoding('gzip'), 'gzip')
+        self.assertEqual(compressUtil.chooseEncoding('gzip, deflate'), 'gzip')
+        self.assertEqual(compressUtil.chooseEncoding('gzip;q=0.5, deflate'), 'deflate')
+        self.assertEqual(compressUtil.chooseEncoding('identity'), None)
+        self.assertEqual(compressUtil.chooseEncoding('gzip;q=0'), None)
+        self.assertEqual(compressUtil.chooseEncoding(''), None)
+        self.assertEqual(compressUtil.chooseEncoding('*'), available[0])
+        
+    def testCompressibleType(self):
+        self.assertTrue(compressUtil.isCompressibleType('application/json; charset=UTF-8'))
+        self.assertTrue(compressUtil.isCompressibleType('text/html'))
+        self.assertFalse(compressUtil.isCompressibleType('image/png'))
+        self.assertFalse(compressUtil.isCompressibleType(''))
+        
+    def testGzip(self):
+        body = '[' + ', '.join([str(i) for i in range(1000)]) + ']'
+        transform = self.getTransform('gzip, deflate')
+        headers = self.getResponseHeaders(length=len(body))
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, body, True)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(headers['Content-Length']), len(chunk))
+        self.assertTrue(len(chunk) < len(body))
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(chunk)).read(), body)
+        
+    def testDeflate(self):
+        body = 'x' * 5000
+        transform = self.getTransform('deflate')
+        headers = self.getResponseHeaders()
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, body, True)
+        self.assertEqual(headers['Content-Encoding'], 'deflate')
+        self.assertEqual(zlib.decompress(chunk), body)
+        
+    def testNotCompressed(self):
+        # too small
+        transform = self.getTransform('gzip')
+        headers = self.getResponseHeaders()
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, '{}', True)
+        self.assertEqual(chunk, '{}')
+        self.assertTrue('Content-Encoding' not in headers)
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        # content type not in 'compress_types'
+        body = 'x' * 5000
+        headers = self.getResponseHeaders(contentType='image/png')
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, body, True)
+        self.assertEqual(chunk, body)
+        self.assertTrue('Content-Encoding' not in headers)
+        # client doesn't accept compression
+        transform = self.getTransform(None)
+        headers = self.getResponseHeaders()
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, body, True)
+        self.assertEqual(chunk, body)
+        self.assertTrue('Content-Encoding' not in headers)
+        
+    def testStreaming(self):
+        # small chunks are compressed if more are coming
+        transform = self.getTransform('gzip')
+        headers = self.getResponseHeaders(length=100)
+        pieces = ['[0', ', 1' * 10, ', 2' * 10, ']']
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, pieces[0], False)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertTrue('Content-Length' not in headers)
+        out = chunk
+        for i in range(1, len(pieces)):
+            chunk = transform.transform_chunk(pieces[i], i == len(pieces) - 1)
+            self.assertTrue(len(chunk) > 0)   # each flush sends data
+            out += chunk
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(out)).read(), ''.join(pieces))
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
@@ -13,7 +13,23 @@ cfg = {
     'testfiledir': '../../testfiles/',
     'domain':  'unit.hdf.io',
     'datapath': '../data/',
-    'uuidlen':  36 
+    'uuidlen':  36,
+    'profile_max_concurrent': 1,
+    'profile_max_saved': 2,
+    'slow_request_log': 'slow_request.log',
+    'slow_request_threshold': 100,
+    'compress_encodings': ['zstd', 'br', 'gzip', 'deflate'],
+    'compress_types': ['application/json', 'text/'],
+    'compress_min_size': 1024,
+    'compress_level': 1,
+    'file_pool_size': 0,
+    'chunk_cache_nbytes': 1024*1024,
+    'chunk_cache_nslots': 521,
+    'chunk_cache_w0': 0.75,
+    'chunk_cache_overrides': {},
+    'value_cache_size': 0,
+    'value_cache_max_item': 0.25,
+    'read_threads': 2
 }
    
 def get(x):
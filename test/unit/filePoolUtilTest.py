@@ -0,0 +1,130 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import os
+import sys
+import time
+import numpy as np
+import h5py
+ 
+
+sys.path.append('../../server')
+import config
+import filePoolUtil
+from hdf5db import Hdf5db
+
+
+class FilePoolUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(FilePoolUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def setUp(self):
+        self.savedCfg = dict(config.cfg)
+        config.cfg['file_pool_size'] = 2
+        config.cfg['datapath'] = '.'
+        f = h5py.File('pool.h5', 'w')
+        f.create_dataset('dset', data=np.arange(10000, dtype='i4').reshape((100, 100)),
+            chunks=(10, 10), compression='gzip')
+        f.close()
+        filePoolUtil.resetStats()
+            
+    def tearDown(self):
+        filePoolUtil.closeAll()
+        config.cfg.clear()
+        config.cfg.update(self.savedCfg)
+        for name in ('pool.h5', 'pool2.h5', 'pool3.h5'):
+            if os.path.exists(name):
+                os.remove(name)
+        
+    def testReuse(self):
+        with Hdf5db('pool.h5') as db:
+            f = db.f
+            dsetUuid = db.getUUIDByPath('/dset')
+            dset = db.getDatasetObjByUuid(dsetUuid)
+        with Hdf5db('pool.h5') as db:
+            self.assertTrue(db.f is f)  # same handle
+            self.assertTrue(db.getDatasetObjByUuid(dsetUuid) is dset)
+            # nested open gets its own handle
+            with Hdf5db('pool.h5') as db2:
+                self.assertTrue(db2.f is not f)
+        stats = filePoolUtil.getStats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['busy'], 1)
+        self.assertEqual(stats['size'], 1)
+        
+    def testStale(self):
+        with Hdf5db('pool.h5') as db:
+            f = db.f
+        # replace the file behind the pool's back
+        time.sleep(0.01)
+        os.remove('pool.h5')
+        f2 = h5py.File('pool.h5', 'w')
+        f2.create_group('g1')
+        f2.close()
+        with Hdf5db('pool.h5') as db:
+            self.assertTrue(db.f is not f)
+            self.assertTrue(db.getUUIDByPath('/g1') is not None)
+        self.assertEqual(filePoolUtil.getStats()['stale'], 1)
+        
+    def testEviction(self):
+        for name in ('pool2.h5', 'pool3.h5'):
+            Hdf5db.createHDF5File(name)
+        for name in ('pool.h5', 'pool2.h5', 'pool3.h5'):
+            with Hdf5db(name) as db:
+                db.getUUIDByPath('/')
+        stats = filePoolUtil.getStats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evictions'], 1)
+        paths = [item['filePath'] for item in stats['files']]
+        self.assertEqual(paths, ['pool2.h5', 'pool3.h5'])
+        filePoolUtil.closeFile('pool2.h5')
+        self.assertEqual(filePoolUtil.getStats()['size'], 1)
+        
+    def testChunkCacheStats(self):
+        with Hdf5db('pool.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            # 2x2 chunks
+            db.getDatasetValuesByUuid(dsetUuid, (slice(0, 20), slice(0, 20)))
+        with Hdf5db('pool.h5') as db:
+            # one new chunk row, other row re-used
+            db.getDatasetValuesByUuid(dsetUuid, (slice(10, 30), slice(0, 20)))
+        stats = filePoolUtil.getStats()
+        self.assertEqual(stats['chunkCacheMisses'], 6)
+        self.assertEqual(stats['chunkCacheHits'], 2)
+        self.assertTrue('metadataCacheHitRate' in stats['files'][0])
+        
+    def testChunkCacheConfig(self):
+        settings = filePoolUtil.getChunkCacheConfig('pool.h5')
+        self.assertEqual(settings['nbytes'], config.get('chunk_cache_nbytes'))
+        self.assertEqual(filePoolUtil.getChunkCacheConfig('pool.h5', '/dset'), None)
+        domain = 'pool.' + config.get('domain')
+        config.cfg['chunk_cache_overrides'] = { 
+            domain: {'nslots': 1009},
+            domain + '/dset': {'nbytes': 4*1024*1024, 'w0': 1.0} }
+        settings = filePoolUtil.getChunkCacheConfig('pool.h5')
+        self.assertEqual(settings['nslots'], 1009)
+        self.assertEqual(settings['nbytes'], config.get('chunk_cache_nbytes'))
+        settings = filePoolUtil.getChunkCacheConfig('pool.h5', '/dset')
+        self.assertEqual(settings['nslots'], 1009)
+        self.assertEqual(settings['nbytes'], 4*1024*1024)
+        with Hdf5db('pool.h5') as db:
+            dset = db.getDatasetObjByUuid(db.getUUIDByPath('/dset'))
+            rdcc = dset.id.get_access_plist().get_chunk_cache()
+            self.assertEqual(rdcc, (1009, 4*1024*1024, 1.0))
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
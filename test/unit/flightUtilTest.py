@@ -0,0 +1,101 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import threading
+from tornado import gen
+from tornado.ioloop import IOLoop
+ 
+
+sys.path.append('../../server')
+import config
+import flightUtil
+
+
+class FlightUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(FlightUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def setUp(self):
+        flightUtil.resetStats()
+        
+    def testCoalesce(self):
+        calls = []
+        release = threading.Event()
+        def read():
+            calls.append(threading.current_thread().name)
+            release.wait(5)
+            return 'body'
+            
+        @gen.coroutine
+        def requests():
+            f1 = flightUtil.run(('a.hdf.io', '/datasets/x/value'), read)
+            f2 = flightUtil.run(('a.hdf.io', '/datasets/x/value'), read)
+            f3 = flightUtil.run(('a.hdf.io', '/datasets/y/value'), read)
+            self.assertTrue(f1 is f2)
+            self.assertTrue(f1 is not f3)
+            release.set()
+            results = yield [f1, f2, f3]
+            raise gen.Return(results)
+            
+        results = IOLoop.current().run_sync(requests)
+        self.assertEqual(results, ['body', 'body', 'body'])
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(calls[0].startswith('read-'))
+        stats = flightUtil.getStats()
+        self.assertEqual(stats['started'], 2)
+        self.assertEqual(stats['coalesced'], 1)
+        self.assertEqual(stats['inFlight'], 0)
+        
+    def testForget(self):
+        release = threading.Event()
+        def read():
+            release.wait(5)
+            return 'body'
+            
+        @gen.coroutine
+        def requests():
+            f1 = flightUtil.run(('a.hdf.io', '/datasets/x/value'), read)
+            f2 = flightUtil.run(('b.hdf.io', '/datasets/x/value'), read)
+            # a write to a.hdf.io: later requests don't join the earlier read
+            flightUtil.forget('a.hdf.io')
+            f3 = flightUtil.run(('a.hdf.io', '/datasets/x/value'), read)
+            f4 = flightUtil.run(('b.hdf.io', '/datasets/x/value'), read)
+            self.assertTrue(f1 is not f3)
+            self.assertTrue(f2 is f4)
+            release.set()
+            results = yield [f1, f2, f3]
+            raise gen.Return(results)
+            
+        results = IOLoop.current().run_sync(requests)
+        self.assertEqual(results, ['body', 'body', 'body'])
+        self.assertEqual(flightUtil.getStats()['inFlight'], 0)
+        
+    def testError(self):
+        def read():
+            raise ValueError("bad read")
+        
+        @gen.coroutine
+        def request():
+            result = yield flightUtil.run(('a.hdf.io', '/datasets/z'), read)
+            raise gen.Return(result)
+            
+        self.assertRaises(ValueError, IOLoop.current().run_sync, request)
+        # failed reads aren't kept
+        self.assertEqual(flightUtil.getStats()['inFlight'], 0)
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
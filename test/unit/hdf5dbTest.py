@@ -12,13 +12,18 @@
 import unittest
 import sys
 import os
+import threading
 import os.path as op
 import stat
 import logging
 import shutil
+import zlib
+import numpy as np
+import h5py
 
 sys.path.append('../../server')
-from hdf5db import Hdf5db
+from hdf5db import Hdf5db, getDbRegistry
+import selectionUtil
 import config
 
 
@@ -284,6 +289,49 @@ class Hdf5dbTest(unittest.TestCase):
             for i in range(20):
                 self.assertEqual(d112_values[i], i)
                 
+    def testReadFields(self):
+        getFile('compound.h5')
+        with Hdf5db('compound.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            values = db.getDatasetValuesByUuid(dsetUuid, (slice(0, 3),), fields=['temp', 'date'])
+            self.assertEqual(values, [(63, 24), (61, 24), (61, 24)])
+            values = db.getDatasetValuesByUuid(dsetUuid, (slice(0, 2),), asArray=True, 
+                fields=['wind'])
+            self.assertEqual(values.dtype.names, ('wind',))
+            self.assertEqual(list(values['wind']), ['SE 10', 'SE 10'])
+            values = db.getDatasetPointSelectionByUuid(dsetUuid, [0, 5], fields=['wind'])
+            self.assertEqual(values, [('SE 10',), ('SW 7',)])
+            self.assertEqual(db.getDatasetValuesByUuid(dsetUuid, fields=['nosuch']), None)
+            self.assertEqual(db.httpStatus, 400)
+        getFile('tall.h5')
+        with Hdf5db('tall.h5') as db:
+            d111Uuid = db.getUUIDByPath('/g1/g1.1/dset1.1.1')
+            self.assertEqual(db.getDatasetValuesByUuid(d111Uuid, fields=['x']), None)
+            self.assertEqual(db.httpStatus, 400)
+        
+    def testReadRegions(self):
+        getFile('tall.h5')
+        data = np.fromfunction(lambda i, j: i * j, (10, 10)).astype('i4')
+        with Hdf5db('tall.h5') as db:
+            d111Uuid = db.getUUIDByPath('/g1/g1.1/dset1.1.1')  # values: i*j
+            dset = db.getDatasetObjByUuid(d111Uuid)
+            hyperslabs = [(slice(0, 2), slice(2, 4)), (slice(5, 10, 4), slice(0, 10, 5))]
+            self.assertTrue(db.canCombineHyperslabs(dset, hyperslabs))
+            # rows 1 and 2 overlap
+            self.assertFalse(db.canCombineHyperslabs(dset, 
+                [(slice(0, 2), slice(0, 1)), (slice(1, 3), slice(0, 1))]))
+            for regions in ([('hyperslab', hyperslabs[0]), ('points', [[9, 9], [3, 4]]), 
+                    ('hyperslab', hyperslabs[1])], [('hyperslab', hyperslabs[1]), 
+                    ('hyperslab', hyperslabs[0])]):
+                values = db.getDatasetRegionValuesByUuid(d111Uuid, regions)
+                for ((kind, selection), regionValues) in zip(regions, values):
+                    if kind == 'hyperslab':
+                        self.assertTrue(np.array_equal(regionValues, data[selection]))
+                    else:
+                        self.assertEqual(list(regionValues), [81, 12])
+            self.assertEqual(db.getDatasetRegionValuesByUuid(d111Uuid, [('points', [[10, 0]])]), None)
+            self.assertEqual(db.httpStatus, 400)
+        
     def testReadZeroDimDataset(self):
          getFile('zerodim.h5')
          d111_values = None
@@ -304,7 +352,426 @@ class Hdf5dbTest(unittest.TestCase):
             self.failUnlessEqual(len(rootUuid), config.get('uuidlen'))
             item = db.getAttributeItem("groups", rootUuid, "attr1")
         
-     
+
+    def testDirectChunks(self):
+        removeFile('chunked.h5')
+        data = np.arange(400, dtype='i4').reshape((20, 20))
+        f = h5py.File('chunked.h5', 'w')
+        f.create_dataset('dset', data=data, chunks=(10, 10), compression='gzip')
+        f.create_dataset('contiguous', data=data)
+        f.close()
+        with Hdf5db('chunked.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            item = db.getDatasetChunkInfoByUuid(dsetUuid)
+            self.failUnlessEqual(item['chunks'], [10, 10])
+            self.failUnlessEqual(item['filters'][0]['name'], 'deflate')
+            result = db.readDatasetChunkByUuid(dsetUuid, [10, 0])
+            if sys.version_info[0] < 3:
+                # h5py only returns the chunk's bytes on Python 3
+                self.failUnlessEqual(result, None)
+                self.failUnlessEqual(db.httpStatus, 501)
+                result = (0, zlib.compress(data[10:20, 0:10].tostring()))
+            (filterMask, chunk) = result
+            self.failUnlessEqual(filterMask, 0)
+            values = np.frombuffer(zlib.decompress(chunk), dtype='i4').reshape((10, 10))
+            self.assertTrue((values == data[10:20, 0:10]).all())
+            # not on a chunk boundary
+            self.failUnlessEqual(db.readDatasetChunkByUuid(dsetUuid, [5, 0]), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            # copy the chunk to another location
+            ok = db.writeDatasetChunkByUuid(dsetUuid, [0, 10], chunk, filterMask)
+            self.failUnlessEqual(ok, True)
+            contiguousUuid = db.getUUIDByPath('/contiguous')
+            self.failUnlessEqual(db.getDatasetChunkInfoByUuid(contiguousUuid), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+        f = h5py.File('chunked.h5', 'r')
+        self.assertTrue((f['dset'][0:10, 10:20] == data[10:20, 0:10]).all())
+        f.close()
+        removeFile('chunked.h5')
+        
+    def testReadSelect(self):
+        removeFile('select.h5')
+        data = np.arange(400, dtype='>i4').reshape((20, 20))
+        f = h5py.File('select.h5', 'w')
+        f.create_dataset('chunked', data=data, chunks=(10, 10))
+        f.create_dataset('contiguous', data=data)
+        f.close()
+        with Hdf5db('select.h5') as db:
+            for name in ('chunked', 'contiguous'):
+                dsetUuid = db.getUUIDByPath('/' + name)
+                dset = db.getDatasetObjByUuid(dsetUuid)
+                for text in ('[10:20, 0:10]', '[3, 5:9]', '[2:4, :]', '[-1]', '[::3, [7, 2, 7]]', 
+                        '[[19, 0], 10:]', '[5:5]'):
+                    selection = tuple(selectionUtil.parseSelection(text, data.shape))
+                    values = db.getDatasetValuesByUuid(dsetUuid, selection, asArray=True)
+                    expected = eval('data' + text)
+                    self.assertEqual(values.shape, expected.shape)
+                    self.assertTrue(np.array_equal(values, expected))
+                selection = (slice(10, 20, 1), slice(0, 10, 1))
+                self.assertEqual(db.isDirectRead(dset, selection), name == 'chunked')
+                selection = (slice(2, 4, 1), slice(0, 20, 1))
+                self.assertEqual(db.isDirectRead(dset, selection), name == 'contiguous')
+        removeFile('select.h5')
+        
+    def testCreateDatasetCreationProps(self):
+        removeFile('creationprops.h5')
+        Hdf5db.createHDF5File('creationprops.h5')
+        creationProps = { 'layout': {'class': 'H5D_CHUNKED', 'dims': [10, 20]},
+            'fillTime': 'H5D_FILL_TIME_ALLOC', 'allocTime': 'H5D_ALLOC_TIME_EARLY', 
+            'filters': [{'class': 'H5Z_FILTER_DEFLATE', 'level': 9}, 
+                'H5Z_FILTER_SHUFFLE', 'H5Z_FILTER_FLETCHER32'] }
+        with Hdf5db('creationprops.h5') as db:
+            dsetUuid = db.createDataset('H5T_STD_I32LE', (100, 100), 
+                creation_props=creationProps)
+            self.failUnlessEqual(len(dsetUuid), config.get('uuidlen'))
+            item = db.getDatasetItemByUuid(dsetUuid)['creationProperties']
+            self.failUnlessEqual(item['layout'], {'class': 'H5D_CHUNKED', 'dims': [10, 20]})
+            self.failUnlessEqual(item['fillTime'], 'H5D_FILL_TIME_ALLOC')
+            self.failUnlessEqual(item['allocTime'], 'H5D_ALLOC_TIME_EARLY')
+            filters = [filterItem['class'] for filterItem in item['filters']]
+            # pipeline order, not request order
+            self.failUnlessEqual(filters, ['H5Z_FILTER_SHUFFLE', 
+                'H5Z_FILTER_DEFLATE', 'H5Z_FILTER_FLETCHER32'])
+            self.failUnlessEqual(item['filters'][1]['level'], 9)
+            
+            # the requested fill time is kept for chunked and filtered layouts
+            for fillTime in ('H5D_FILL_TIME_NEVER', 'H5D_FILL_TIME_IFSET'):
+                for creationProps in (
+                    {'layout': {'class': 'H5D_CHUNKED', 'dims': [10, 20]}},
+                    {'layout': {'class': 'H5D_CHUNKED'}, 'filters': ['H5Z_FILTER_DEFLATE']},
+                    {'filters': ['H5Z_FILTER_SHUFFLE']},
+                    {'layout': {'class': 'H5D_CONTIGUOUS'}} ):
+                    creationProps['fillTime'] = fillTime
+                    dsetUuid = db.createDataset('H5T_STD_I32LE', (100, 100), 
+                        creation_props=creationProps)
+                    self.failUnlessEqual(len(dsetUuid), config.get('uuidlen'))
+                    item = db.getDatasetItemByUuid(dsetUuid)['creationProperties']
+                    self.failUnlessEqual(item['fillTime'], fillTime)
+            dsetUuid = db.createDataset('H5T_STD_I32LE', (10, 10), max_shape=(None, 10),
+                creation_props={'fillTime': 'H5D_FILL_TIME_NEVER'})
+            item = db.getDatasetItemByUuid(dsetUuid)['creationProperties']
+            self.failUnlessEqual(item['layout']['class'], 'H5D_CHUNKED')
+            self.failUnlessEqual(item['fillTime'], 'H5D_FILL_TIME_NEVER')
+            db.resizeDataset(dsetUuid, (20, 10))
+            self.failUnlessEqual(db.getDatasetObjByUuid(dsetUuid).shape, (20, 10))
+            
+            # default layout
+            dsetUuid = db.createDataset('H5T_STD_I32LE', (10,))
+            item = db.getDatasetItemByUuid(dsetUuid)['creationProperties']
+            self.failUnlessEqual(item['layout'], {'class': 'H5D_CONTIGUOUS'})
+            self.assertTrue('filters' not in item)
+            
+            # invalid properties
+            for creationProps in ( 
+                {'layout': {'class': 'H5D_CHUNKED', 'dims': [10]}},
+                {'layout': {'class': 'H5D_CHUNKED', 'dims': [10, 200]}},
+                {'layout': {'class': 'H5D_CONTIGUOUS'}, 'filters': ['H5Z_FILTER_SHUFFLE']},
+                {'filters': [{'class': 'H5Z_FILTER_DEFLATE', 'level': 10}]},
+                {'filters': ['H5Z_FILTER_DEFLATE', 'H5Z_FILTER_LZF']},
+                {'fillTime': 'H5D_FILL_TIME_SOMETIMES'},
+                {'chunks': [10, 10]} ):
+                db.httpStatus = 200
+                dsetUuid = db.createDataset('H5T_STD_I32LE', (100, 100), 
+                    creation_props=creationProps)
+                self.failUnlessEqual(dsetUuid, None)
+                self.failUnlessEqual(db.httpStatus, 400)
+        removeFile('creationprops.h5')
+        
+    def testPyramid(self):
+        removeFile('pyramid.h5')
+        data = np.arange(300*50, dtype='i2').reshape((300, 50))
+        f = h5py.File('pyramid.h5', 'w')
+        f.create_dataset('dset', data=data)
+        f.close()
+        with Hdf5db('pyramid.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            self.failUnlessEqual(db.getPyramidInfoByUuid(dsetUuid), None)
+            self.failUnlessEqual(db.httpStatus, 404)
+            # small blocks so levels are built over several reads
+            item = db.buildPyramidByUuid(dsetUuid, blockSize=1000, minExtent=40)
+            self.failUnlessEqual(item['stale'], False)
+            dims = [level['dims'] for level in item['levels']]
+            self.failUnlessEqual(dims, [[150, 25], [75, 13], [38, 7]])
+            
+            slices = (slice(0, 300, 1), slice(0, 50, 1))
+            # level 1 has 150 rows, fewer than the 160 asked for
+            self.failUnlessEqual(db.getPyramidValuesByUuid(dsetUuid, slices, [160, None]), None)
+            pyramid = db.getPyramidValuesByUuid(dsetUuid, slices, [70, None])
+            self.failUnlessEqual(pyramid['level'], 2)
+            self.failUnlessEqual(pyramid['value'].shape, (75, 13))
+            self.assertAlmostEqual(pyramid['value'][0, 0], data[0:4, 0:4].mean())
+            # last column covers 2 dataset columns
+            self.assertAlmostEqual(pyramid['value'][1, 12], data[4:8, 48:50].mean())
+            pyramid = db.getPyramidValuesByUuid(dsetUuid, (slice(10, 20, 1), slice(0, 50, 1)), [1, None])
+            self.failUnlessEqual(pyramid['level'], 3)
+            self.failUnlessEqual(pyramid['start'], [8, 0])
+            self.assertAlmostEqual(pyramid['value'][1, 6], data[16:24, 48:50].mean())
+            
+            # writes leave the pyramid stale
+            db.setDatasetValuesByUuid(dsetUuid, [1] * 50, (slice(0, 1), slice(0, 50)))
+            self.failUnlessEqual(db.getPyramidInfoByUuid(dsetUuid)['stale'], True)
+            self.failUnlessEqual(db.getPyramidValuesByUuid(dsetUuid, slices, [70, None]), None)
+            self.failUnlessEqual(db.deletePyramidByUuid(dsetUuid), True)
+            self.failUnlessEqual(db.getPyramidInfoByUuid(dsetUuid), None)
+        removeFile('pyramid.h5')
+
+    def testIndex(self):
+        removeFile('index.h5')
+        dt = np.dtype([('key', 'i4'), ('name', 'S4'), ('value', 'f8')])
+        data = np.zeros((1000,), dtype=dt)
+        data['key'] = (np.arange(1000) * 7) % 1000
+        data['name'] = [str(i % 10) for i in range(1000)]
+        data['value'] = np.arange(1000)
+        f = h5py.File('index.h5', 'w')
+        f.create_dataset('dset', data=data, maxshape=(None,), chunks=(100,))
+        f.close()
+
+        def getScanRows(query):
+            # rows matching the query, without the index
+            key = data['key']
+            name = data['name']
+            return list(np.flatnonzero(eval(query)))
+
+        with Hdf5db('index.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            self.failUnlessEqual(db.getIndexesByUuid(dsetUuid), [])
+            self.failUnlessEqual(db.createIndexByUuid(dsetUuid, 'nosuchfield'), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            # small blocks so the index is built over several reads
+            item = db.createIndexByUuid(dsetUuid, 'key', blockSize=1000)
+            self.failUnlessEqual(item['field'], 'key')
+            self.failUnlessEqual(item['rows'], 1000)
+            db.createIndexByUuid(dsetUuid, 'name')
+            items = db.getIndexesByUuid(dsetUuid)
+            self.failUnlessEqual([item['field'] for item in items], ['key', 'name'])
+
+            slices = (slice(0, 1000, 1),)
+            result = db.getDatasetQueryByUuid(dsetUuid, slices, 'key >= 10 and key < 15')
+            self.failUnlessEqual(list(result['index']), getScanRows('(key >= 10) & (key < 15)'))
+            self.failUnlessEqual(list(result['value']['value']), list(result['index']))
+            result = db.getDatasetQueryByUuid(dsetUuid, slices, "key < 30 and name == '3'",
+                returnValues=False)
+            self.failUnlessEqual(list(result['index']), getScanRows("(key < 30) & (name == '3')"))
+            result = db.getDatasetQueryByUuid(dsetUuid, (slice(100, 900, 2),),
+                'key > 990 or key < 3', limit=2, marker=200)
+            self.failUnlessEqual(list(result['index']), [286, 428])
+
+            # overwrite rows in the middle, then append rows
+            db.setDatasetValuesByUuid(dsetUuid, [(2000, 'x', 0.0)] * 10, (slice(500, 510),))
+            result = db.getDatasetQueryByUuid(dsetUuid, slices, 'key >= 2000')
+            self.failUnlessEqual(list(result['index']), range(500, 510))
+            db.resizeDataset(dsetUuid, (1200,))
+            self.failUnlessEqual(db.getIndexesByUuid(dsetUuid)[0]['rows'], 1200)
+            db.setDatasetValuesByUuid(dsetUuid, [(3000, 'y', 1.0)] * 100, (slice(1100, 1200),))
+            result = db.getDatasetQueryByUuid(dsetUuid, (slice(0, 1200, 1),), 'key > 1000')
+            self.failUnlessEqual(list(result['index']), range(500, 510) + range(1100, 1200))
+            # new rows are filled with zeros
+            result = db.getDatasetQueryByUuid(dsetUuid, (slice(0, 1200, 1),), 'key == 0')
+            self.failUnlessEqual(list(result['index']), [0] + range(1000, 1100))
+
+            self.failUnlessEqual(db.deleteIndexByUuid(dsetUuid, 'key'), True)
+            self.failUnlessEqual(db.deleteIndexByUuid(dsetUuid, 'key'), False)
+            self.failUnlessEqual(db.httpStatus, 404)
+        removeFile('index.h5')
+
+    def testZoneMap(self):
+        removeFile('zonemap.h5')
+        dt = np.dtype([('time', 'f8'), ('name', 'S4')])
+        data = np.zeros((1000,), dtype=dt)
+        data['time'] = np.arange(1000)
+        data['time'][5] = np.nan
+        f = h5py.File('zonemap.h5', 'w')
+        f.create_dataset('dset', data=data, maxshape=(None,), chunks=(100,))
+        f.create_dataset('image', data=np.arange(400).reshape((20, 20)), chunks=(10, 10))
+        f.close()
+        with Hdf5db('zonemap.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(dsetUuid), None)
+            self.failUnlessEqual(db.httpStatus, 404)
+            item = db.createZoneMapByUuid(dsetUuid)
+            self.failUnlessEqual(item['fields'], ['time'])
+            self.failUnlessEqual(item['zoneShape'], [100])
+            self.failUnlessEqual((item['zones'], item['validZones']), (10, 0))
+
+            # zone stats are computed as the query needs them
+            slices = (slice(0, 1000, 1),)
+            result = db.getDatasetQueryByUuid(dsetUuid, slices, 'time >= 250 and time < 253')
+            self.failUnlessEqual(list(result['index']), [250, 251, 252])
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(dsetUuid)['validZones'], 10)
+            dset = db.getDatasetObjByUuid(dsetUuid)
+            plan = db.getZonePlan(dsetUuid, dset, slices, {'time': (250, True, 253, False)})
+            self.failUnlessEqual(plan, [(slice(200, 300, 1),)])
+            # the zone map doesn't cover string fields
+            self.failUnlessEqual(db.getZonePlan(dsetUuid, dset, slices,
+                {'name': ('a', True, 'b', True)}), None)
+
+            # writes invalidate the zones they touch
+            db.setDatasetValuesByUuid(dsetUuid, [(5000.0, 'x')] * 2, (slice(450, 452),))
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(dsetUuid)['validZones'], 9)
+            result = db.getDatasetQueryByUuid(dsetUuid, slices, 'time > 1000')
+            self.failUnlessEqual(list(result['index']), [450, 451])
+            db.resizeDataset(dsetUuid, (1050,))
+            item = db.getZoneMapInfoByUuid(dsetUuid)
+            self.failUnlessEqual((item['zones'], item['validZones']), (11, 10))
+            result = db.getDatasetQueryByUuid(dsetUuid, (slice(0, 1050, 1),), 'time < 1')
+            self.failUnlessEqual(list(result['index']), [0] + range(1000, 1050))
+
+            imageUuid = db.getUUIDByPath('/image')
+            item = db.createZoneMapByUuid(imageUuid)
+            self.failUnlessEqual((item['fields'], item['zones']), ([], 4))
+            image = db.getDatasetObjByUuid(imageUuid)
+            plan = db.getZonePlan(imageUuid, image, (slice(0, 20, 1), slice(5, 20, 1)),
+                {None: (None, False, 100, False)})
+            self.failUnlessEqual(plan, [(slice(0, 10, 1), slice(5, 10, 1)),
+                (slice(0, 10, 1), slice(10, 20, 1))])
+            self.failUnlessEqual(db.deleteZoneMapByUuid(imageUuid), True)
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(imageUuid), None)
+        removeFile('zonemap.h5')
+
+    def testPointWrite(self):
+        removeFile('points.h5')
+        f = h5py.File('points.h5', 'w')
+        f.create_dataset('image', data=np.zeros((50, 40), dtype='<i4'), chunks=(10, 10))
+        f.create_dataset('series', data=np.zeros((100,), dtype='f8'))
+        f.create_dataset('names', (5,), dtype=h5py.special_dtype(vlen=str))
+        f.close()
+        with Hdf5db('points.h5') as db:
+            imageUuid = db.getUUIDByPath('/image')
+            db.createZoneMapByUuid(imageUuid)
+            result = db.getDatasetStatsByUuid(imageUuid, (slice(0, 50), slice(0, 40)), ['max'])
+            self.failUnlessEqual(result['max'], 0)
+            db.getZonePlan(imageUuid, db.getDatasetObjByUuid(imageUuid), 
+                (slice(0, 50, 1), slice(0, 40, 1)), {None: (1, True, None, False)})
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(imageUuid)['validZones'], 20)
+            # unordered points across chunks, the repeated point gets the last value
+            points = [[49, 39], [0, 0], [12, 31], [0, 0], [25, 5]]
+            ok = db.setDatasetPointValuesByUuid(imageUuid, points, [1, 2, 3, 4, 5])
+            self.failUnlessEqual(ok, True)
+            values = db.getDatasetPointSelectionByUuid(imageUuid, points)
+            self.failUnlessEqual(values, [1, 4, 3, 4, 5])
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(imageUuid)['validZones'], 16)
+            # binary values
+            ok = db.setDatasetPointValuesByUuid(imageUuid, np.array([[1, 2]], dtype='<u8'), 
+                np.array([7], dtype='<i4').tobytes())
+            self.failUnlessEqual(ok, True)
+            self.failUnlessEqual(db.getDatasetPointSelectionByUuid(imageUuid, [[1, 2]]), [7])
+            for (points, data) in (([[50, 0]], [1]), ([[-1, 0]], [1]), ([[1, 2, 3]], [1]), 
+                    ([[1, 2]], [1, 2]), ([[1, 2]], ['x']), ('abc', [1])):
+                self.failUnlessEqual(db.setDatasetPointValuesByUuid(imageUuid, points, data), False)
+                self.failUnlessEqual(db.httpStatus, 400)
+                
+            seriesUuid = db.getUUIDByPath('/series')
+            ok = db.setDatasetPointValuesByUuid(seriesUuid, [90, 3], [1.5, 2.5])
+            self.failUnlessEqual(ok, True)
+            values = db.getDatasetValuesByUuid(seriesUuid, (slice(0, 100, 1),))
+            self.failUnlessEqual((values[3], values[90], sum(values)), (2.5, 1.5, 4.0))
+            namesUuid = db.getUUIDByPath('/names')
+            ok = db.setDatasetPointValuesByUuid(namesUuid, [3, 1], ['abc', 'de'])
+            self.failUnlessEqual(ok, True)
+            values = db.getDatasetValuesByUuid(namesUuid)
+            self.failUnlessEqual(values, ['', 'de', '', 'abc', ''])
+        removeFile('points.h5')
+        
+    def testAppend(self):
+        removeFile('append.h5')
+        dt = np.dtype([('time', 'f8'), ('count', 'i4')])
+        f = h5py.File('append.h5', 'w')
+        f.create_dataset('series', (0,), dtype=dt, maxshape=(None,), chunks=(100,))
+        f.create_dataset('image', data=np.zeros((2, 3), dtype='<i2'), maxshape=(4, None))
+        f.close()
+        with Hdf5db('append.h5') as db:
+            seriesUuid = db.getUUIDByPath('/series')
+            db.createIndexByUuid(seriesUuid, 'time')
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(seriesUuid, 
+                [[2.0, 1], [1.0, 2]]), (0, (2,)))
+            rows = np.array([(3.0, 3), (0.5, 4)], dtype=dt)
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(seriesUuid, rows.tobytes()), 
+                (2, (4,)))
+            values = db.getDatasetValuesByUuid(seriesUuid)
+            self.failUnlessEqual(values, [(2.0, 1), (1.0, 2), (3.0, 3), (0.5, 4)])
+            # the index covers the appended rows
+            result = db.getDatasetQueryByUuid(seriesUuid, (slice(0, 4, 1),), 'time < 1.5')
+            self.failUnlessEqual(list(result['index']), [1, 3])
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(seriesUuid, [[1.0]]), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(seriesUuid, 'abc'), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            
+            imageUuid = db.getUUIDByPath('/image')
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(imageUuid, 
+                [[1], [2]], axis=1), (3, (2, 4)))
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(imageUuid, 
+                np.ones((1, 4), dtype='<i2').tobytes(), axis=0), (2, (3, 4)))
+            values = db.getDatasetValuesByUuid(imageUuid)
+            self.failUnlessEqual(values, [[0, 0, 0, 1], [0, 0, 0, 2], [1, 1, 1, 1]])
+            # past the max extent
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(imageUuid, 
+                [[1, 2, 3, 4]] * 2, axis=0), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            self.failUnlessEqual(db.appendDatasetValuesByUuid(imageUuid, [[1]], axis=2), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+        removeFile('append.h5')
+        
+    def testHistogram(self):
+        removeFile('histogram.h5')
+        
+        dt = np.dtype([('energy', 'f4'), ('name', 'S4')])
+        data = np.zeros((1000,), dtype=dt)
+        data['energy'] = np.arange(1000) % 100
+        data['energy'][7] = np.nan
+        f = h5py.File('histogram.h5', 'w')
+        f.create_dataset('dset', data=data, chunks=(100,))
+        f.close()
+        with Hdf5db('histogram.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            slices = (slice(0, 1000, 1),)
+            self.failUnlessEqual(db.getDatasetHistogramByUuid(dsetUuid, slices, 4), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            self.failUnlessEqual(db.getDatasetHistogramByUuid(dsetUuid, slices, 4, field='name'), None)
+            self.failUnlessEqual(db.httpStatus, 400)
+            # small blocks so the selection is read in several parts
+            result = db.getDatasetHistogramByUuid(dsetUuid, slices, 4, field='energy', 
+                blockSize=300)
+            self.failUnlessEqual(list(result['counts']), [249, 250, 250, 250])
+            self.failUnlessEqual(list(result['edges']), [0, 24.75, 49.5, 74.25, 99])
+            result = db.getDatasetHistogramByUuid(dsetUuid, (slice(0, 200, 2),), 
+                [0, 10, 50], field='energy')
+            self.failUnlessEqual(list(result['counts']), [10, 42])  # last bin includes 50
+            
+            # same result when the zone map is used
+            db.createZoneMapByUuid(dsetUuid)
+            result = db.getDatasetHistogramByUuid(dsetUuid, slices, 2, (10, 20), 'energy')
+            self.failUnlessEqual(list(result['counts']), [50, 60])
+            self.failUnlessEqual(db.getZoneMapInfoByUuid(dsetUuid)['validZones'], 10)
+        removeFile('histogram.h5')
+        
+    def testRegistryThreads(self):
+        # instances on different threads don't clobber each other's entry
+        # (A enters, B enters, A exits, B exits)
+        getFile('tall.h5')
+        filePath = op.abspath('tall.h5')
+        with Hdf5db(filePath) as db:
+            pass  # initialize the file's db group before the threads use it
+        entered = threading.Event()
+        exited = threading.Event()
+        results = []
+        def reader():
+            with Hdf5db(filePath, readonly=True) as db:
+                entered.set()
+                exited.wait(5)
+                results.append(getDbRegistry()[filePath] is db)
+                results.append(len(db.getLinkItems(db.getUUIDByPath('/'))))
+            results.append(filePath in getDbRegistry())
+        thread = threading.Thread(target=reader)
+        with Hdf5db(filePath, readonly=True) as db:
+            thread.start()
+            entered.wait(5)
+            self.assertTrue(getDbRegistry()[filePath] is db)
+        exited.set()
+        thread.join()
+        self.assertFalse(filePath in getDbRegistry())
+        self.assertEqual(results, [True, 2, False])
+
              
              
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import numpy as np
+ 
+
+sys.path.append('../../server')
+import queryUtil
+import indexUtil
+
+
+class IndexUtilTest(unittest.TestCase):
+        
+    def testKeyRange(self):
+        def getRange(query, field='x'):
+            return indexUtil.getKeyRange(queryUtil.parseQuery(query), field)
+        self.assertEqual(getRange('x > 5'), (5, False, None, False))
+        self.assertEqual(getRange('5 >= x'), (None, False, 5, True))
+        self.assertEqual(getRange('1 < x <= 10'), (1, False, 10, True))
+        self.assertEqual(getRange('x == 3 and y > 2'), (3, True, 3, True))
+        self.assertEqual(getRange('x >= 1 and x < 4 and x > 2'), (2, False, 4, False))
+        self.assertEqual(getRange('x < 3 or x == 7'), (None, False, 7, True))
+        self.assertEqual(getRange('(x < 3 or x == 7) and x > 1'), (1, False, 7, True))
+        self.assertEqual(getRange("name == 'abc'", 'name'), ('abc', True, 'abc', True))
+        for query in ('x < 3 or y > 1', 'not x > 3', 'x != 3', 'y > 1', 'x'):
+            self.assertEqual(getRange(query), None)
+        self.assertTrue(indexUtil.isRangeComparable(getRange('x > 5'), np.dtype('i4')))
+        self.assertFalse(indexUtil.isRangeComparable(getRange("x > 'a'"), np.dtype('i4')))
+        
+    def testSearch(self):
+        keys = np.sort(np.random.RandomState(0).randint(0, 1000, 20000))
+        for value in (-1, 0, 500, 999, 1000):
+            for side in ('left', 'right'):
+                self.assertEqual(indexUtil.searchSorted(keys, value, side), 
+                    np.searchsorted(keys, value, side))
+        positions = indexUtil.getRangePositions(keys, (10, False, 20, True))
+        self.assertEqual(positions, (np.searchsorted(keys, 10, 'right'), 
+            np.searchsorted(keys, 20, 'right')))
+        # empty range
+        (first, stop) = indexUtil.getRangePositions(keys, (20, False, 10, False))
+        self.assertEqual(first, stop)
+        
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
@@ -0,0 +1,101 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import json
+import sys
+import numpy as np
+ 
+
+sys.path.append('../../server')
+import jsonUtil
+
+
+class JsonUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(JsonUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def checkSameAsList(self, arr):
+        text = jsonUtil.encodeArray(arr)
+        self.assertEqual(text, json.dumps(arr.tolist()))
+        
+    def testIntegers(self):
+        for dt in ('i1', 'i2', 'i4', 'i8', 'u1', 'u2', 'u4'):
+            self.checkSameAsList(np.arange(100, dtype=dt))
+        self.checkSameAsList(np.arange(24, dtype='i4').reshape((2, 3, 4)))
+        self.checkSameAsList(np.array([0, 2**63, 2**64 - 1], dtype='u8'))
+        
+    def testFloats(self):
+        data = np.array([0.1, 1.0, -0.0, 1e16, 1.5e-7, 3.141592653589793, 1e-300])
+        self.checkSameAsList(data)
+        self.checkSameAsList(np.linspace(-1.0, 1.0, 60).reshape((3, 4, 5)))
+        data = np.array([1.0, np.nan, np.inf, -np.inf])
+        self.assertEqual(jsonUtil.encodeArray(data), '[1.0, NaN, Infinity, -Infinity]')
+        # float32 values use the shortest float32 repr
+        data = np.array([0.1, 2.5, -3.0], dtype='f4')
+        text = jsonUtil.encodeArray(data)
+        self.assertEqual(text, '[0.1, 2.5, -3.0]')
+        self.assertTrue((np.array(json.loads(text), dtype='f4') == data).all())
+        
+    def testPrecision(self):
+        data = np.array([3.141592653589793, 1e20, 0.5])
+        self.assertEqual(jsonUtil.encodeArray(data, 3), '[3.14, 1e+20, 0.5]')
+        data = np.array([[1.23456, np.nan]], dtype='f4')
+        self.assertEqual(jsonUtil.encodeArray(data, 2), '[[1.2, NaN]]')
+        
+    def testCompound(self):
+        dt = np.dtype([('a', 'i4'), ('b', 'f8'), ('c', 'u1')])
+        data = np.zeros((2, 3), dtype=dt)
+        data['a'] = np.arange(6).reshape((2, 3))
+        data['b'] = 0.25
+        data['c'] = 7
+        self.checkSameAsList(data)
+        
+    def testScalarAndEmpty(self):
+        self.assertEqual(jsonUtil.encodeArray(np.float64(0.1)), '0.1')
+        self.assertEqual(jsonUtil.encodeArray(np.array(42, dtype='i2')), '42')
+        self.checkSameAsList(np.zeros((0,), dtype='f4'))
+        self.checkSameAsList(np.zeros((3, 0), dtype='i4'))
+        
+    def testFallback(self):
+        # arrays that aren't numeric go through tolist()
+        self.checkSameAsList(np.array(['abc', 'de'], dtype='S3'))
+        dt = np.dtype([('a', 'i4'), ('s', 'S4')])
+        self.checkSameAsList(np.array([(1, 'x'), (2, 'y')], dtype=dt))
+        
+    def testChunks(self):
+        saveChunkSize = jsonUtil.CHUNK_SIZE
+        jsonUtil.CHUNK_SIZE = 7
+        try:
+            self.checkSameAsList(np.arange(100, dtype='i4').reshape((10, 10)))
+            self.checkSameAsList(np.linspace(0.0, 1.0, 101))
+            self.checkSameAsList(np.linspace(0.0, 1.0, 120).reshape((4, 5, 6)))
+        finally:
+            jsonUtil.CHUNK_SIZE = saveChunkSize
+        
+    def testResponse(self):
+        response = { 'value': np.arange(3, dtype='i4'), 'hrefs': [{'rel': 'self', 'href': 'x'}] }
+        text = jsonUtil.encodeResponse(response)
+        self.assertEqual(json.loads(text), { 'value': [0, 1, 2], 'hrefs': [{'rel': 'self', 'href': 'x'}] })
+        items = [{ 'name': 'attr1', 'value': np.array([1.5, 2.5]) }]
+        text = jsonUtil.encodeResponse({ 'attributes': items })
+        self.assertEqual(json.loads(text), { 'attributes': [{ 'name': 'attr1', 'value': [1.5, 2.5] }] })
+        response = { 'value': [np.arange(2, dtype='i4'), np.array([1.5])] }
+        self.assertEqual(json.loads(jsonUtil.encodeResponse(response)), { 'value': [[0, 1], [1.5]] })
+        response = { 'name': '</script>', 'count': 3 }
+        self.assertEqual(jsonUtil.encodeResponse(response).find('</'), -1)
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
@@ -0,0 +1,70 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+ 
+
+sys.path.append('../../server')
+import profileUtil
+import config
+
+
+def busyWork(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+    
+
+class ProfileUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ProfileUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def testProfile(self):
+        profiler = profileUtil.startProfile()
+        self.assertTrue(profiler is not None)
+        # only one profile at a time is allowed by the test config
+        self.assertEqual(profileUtil.startProfile(), None)
+        busyWork(1000)
+        profileId = profileUtil.stopProfile(profiler, '/datasets/xyz/value', 
+            'tall.unit.hdf.io', 0.5)
+        items = profileUtil.getProfiles()
+        ids = [item['id'] for item in items]
+        self.assertTrue(profileId in ids)
+        item = profileUtil.getProfile(profileId)
+        self.assertEqual(item['uri'], '/datasets/xyz/value')
+        self.assertEqual(item['domain'], 'tall.unit.hdf.io')
+        self.assertEqual(item['elapsed'], 0.5)
+        text = profileUtil.getProfileText(profileId, sort='cumulative', limit=50)
+        self.assertTrue(text.find('busyWork') > 0)
+        self.assertTrue(profileUtil.deleteProfile(profileId))
+        self.assertFalse(profileUtil.deleteProfile(profileId))
+        self.assertEqual(profileUtil.getProfileText(profileId), None)
+        
+    def testMaxSaved(self):
+        ids = []
+        for i in range(4):
+            profiler = profileUtil.startProfile()
+            self.assertTrue(profiler is not None)
+            ids.append(profileUtil.stopProfile(profiler, '/', 'unit.hdf.io', 0.1))
+        items = profileUtil.getProfiles()
+        self.assertEqual(len(items), config.get('profile_max_saved'))
+        # oldest profiles are discarded first
+        self.assertEqual(profileUtil.getProfile(ids[0]), None)
+        self.assertTrue(profileUtil.getProfile(ids[3]) is not None)
+            
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
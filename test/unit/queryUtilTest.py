@@ -0,0 +1,63 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import numpy as np
+ 
+
+sys.path.append('../../server')
+import queryUtil
+
+
+class QueryUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(QueryUtilTest, self).__init__(*args, **kwargs)
+        # main
+        dt = np.dtype([('id', 'i4'), ('energy', 'f8'), ('det', 'S4'), ('flag', 'u1')])
+        self.rows = np.zeros(20, dtype=dt)
+        self.rows['id'] = np.arange(20)
+        self.rows['energy'] = np.arange(20) * 0.5
+        self.rows['det'] = ['a', 'b'] * 10
+        self.rows['flag'] = np.arange(20) % 3 == 0
+        
+    def match(self, query):
+        tree = queryUtil.parseQuery(query)
+        fields = dict([(name, self.rows[name]) for name in queryUtil.getQueryFields(tree)])
+        return list(np.flatnonzero(queryUtil.evaluateQuery(tree, fields, len(self.rows))))
+        
+    def testParse(self):
+        tree = queryUtil.parseQuery("id > 5 and not (det == 'a' or flag)")
+        self.assertEqual(tree[0], 'and')
+        self.assertEqual(queryUtil.getQueryFields(tree), set(['id', 'det', 'flag']))
+        tree = queryUtil.parseQuery("2 <= `energy` < -1.5e1")
+        self.assertEqual(tree, ('compare', [('const', 2), ('field', 'energy'), 
+            ('const', -15.0)], ['<=', '<']))
+        for query in ('', 'id >', '(id > 1', 'id > 1)', 'id = 1', 'id > 1 and', 
+                '1 < 2 < ', 'id.real > 1', '__import__("os")', "'a'", '(' * 40 + 'id' + ')' * 40):
+            self.assertRaises(ValueError, queryUtil.parseQuery, query)
+        
+    def testEvaluate(self):
+        self.assertEqual(self.match('id >= 17'), [17, 18, 19])
+        self.assertEqual(self.match('2 < energy <= 3'), [5, 6])
+        self.assertEqual(self.match("det == 'b' && id < 6"), [1, 3, 5])
+        self.assertEqual(self.match('flag & ~(id > 3) | id == 19'), [0, 3, 19])
+        self.assertEqual(self.match('not flag and id < 3'), [1, 2])
+        self.assertEqual(self.match('id == -1'), [])
+        self.assertEqual(len(self.match('1 < 2')), 20)
+        for query in ("id > 'x'", 'det < 1'):
+            self.assertRaises(ValueError, self.match, query)
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
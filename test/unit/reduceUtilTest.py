@@ -0,0 +1,136 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import numpy as np
+ 
+
+sys.path.append('../../server')
+import reduceUtil
+
+
+class ReduceUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ReduceUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def getStats(self, arr, slices, ops, axes, blockBytes):
+        accumulator = reduceUtil.StatsAccumulator(ops, axes, arr.ndim)
+        blocks = reduceUtil.getBlockSlices(slices, arr.shape, arr.dtype.itemsize, blockBytes)
+        for blockSlices in blocks:
+            accumulator.add(arr[blockSlices])
+        return accumulator.getResult()
+        
+    def testBlockSlices(self):
+        slices = (slice(1, 20, 3), slice(0, 10))
+        blocks = reduceUtil.getBlockSlices(slices, (20, 10), 8, 160)
+        # 7 rows of 80 bytes, 2 rows per block
+        self.assertEqual(len(blocks), 4)
+        self.assertEqual(blocks[0], (slice(1, 7, 3), slice(0, 10)))
+        self.assertEqual(blocks[3], (slice(19, 20, 3), slice(0, 10)))
+        # rounded to chunks
+        blocks = reduceUtil.getBlockSlices((slice(0, 100),), (100,), 4, 100, (10,))
+        self.assertEqual(blocks[0], (slice(0, 20, 1),))
+        
+    def testStats(self):
+        arr = np.random.RandomState(1).normal(50.0, 10.0, (31, 7, 5))
+        slices = (slice(2, 30, 2), slice(0, 7), slice(1, 5))
+        sel = arr[slices]
+        ops = reduceUtil.STATS_OPS
+        for axes in (None, (0,), (1,), (1, 2), (0, 2)):
+            result = self.getStats(arr, slices, ops, axes, 100)
+            if axes is None:
+                self.assertTrue(type(result['mean']) is float)
+            self.assertTrue(np.allclose(result['min'], sel.min(axis=axes)))
+            self.assertTrue(np.allclose(result['max'], sel.max(axis=axes)))
+            self.assertTrue(np.allclose(result['sum'], sel.sum(axis=axes)))
+            self.assertTrue(np.allclose(result['mean'], sel.mean(axis=axes)))
+            self.assertTrue(np.allclose(result['std'], sel.std(axis=axes)))
+            self.assertEqual(result['count'], sel.size // np.min(sel, axis=axes).size)
+            
+    def testIntegerStats(self):
+        arr = np.arange(1000, dtype='u1').reshape((100, 10))
+        result = self.getStats(arr, (slice(0, 100), slice(0, 10)), ['sum', 'max'], None, 50)
+        # no overflow in the sum
+        self.assertEqual(result['sum'], int(arr.astype('u8').sum()))
+        self.assertEqual(result['max'], 255)
+        
+    def addBlocks(self, addBlock, arr, rowsPerBlock):
+        for rowStart in range(0, arr.shape[0], rowsPerBlock):
+            addBlock(arr[rowStart:rowStart + rowsPerBlock], rowStart)
+        
+    def testBucketEdges(self):
+        self.assertEqual(list(reduceUtil.getBucketEdges(10, 3)), [0, 3, 6, 10])
+        self.assertEqual(list(reduceUtil.getBucketEdges(2, 5)), [0, 1, 2])
+        self.assertEqual(list(reduceUtil.getLttbEdges(10, 4)), [0, 1, 5, 9, 10])
+        
+    def testBucketDownsample(self):
+        arr = np.random.RandomState(2).normal(size=(103, 17))
+        edges = [reduceUtil.getBucketEdges(103, 10), reduceUtil.getBucketEdges(17, 4)]
+        # buckets (11 rows or so) span blocks of 6 rows
+        minmax = reduceUtil.BucketAccumulator('minmax', edges)
+        self.addBlocks(minmax.add, arr, 6)
+        minmax = minmax.getResult()
+        mean = reduceUtil.BucketAccumulator('mean', edges)
+        self.addBlocks(mean.add, arr, 6)
+        mean = mean.getResult()
+        self.assertEqual(minmax['min'].shape, (10, 4))
+        for i in range(10):
+            for j in range(4):
+                bucket = arr[edges[0][i]:edges[0][i+1], edges[1][j]:edges[1][j+1]]
+                self.assertEqual(minmax['min'][i, j], bucket.min())
+                self.assertEqual(minmax['max'][i, j], bucket.max())
+                self.assertAlmostEqual(mean['value'][i, j], bucket.mean())
+        
+    def testLttb(self):
+        arr = np.zeros(100)
+        arr[37] = 5.0    # spike
+        arr[71] = -3.0   # dip
+        edges = reduceUtil.getLttbEdges(100, 10)
+        for rowsPerBlock in (7, 100):
+            selector = reduceUtil.LttbSelector(edges)
+            self.addBlocks(selector.addMeans, arr, rowsPerBlock)
+            selector.finishMeans()
+            self.addBlocks(selector.addPoints, arr, rowsPerBlock)
+            result = selector.getResult()
+            index = list(result['index'])
+            self.assertEqual(len(index), 10)
+            self.assertEqual(index[0], 0)
+            self.assertEqual(index[-1], 99)
+            self.assertTrue(37 in index)
+            self.assertTrue(71 in index)
+            self.assertTrue(np.array_equal(result['value'], arr[result['index']]))
+            
+    def testHistogram(self):
+        arr = np.random.RandomState(0).randn(1000)
+        arr[10] = np.nan
+        values = arr[~np.isnan(arr)]
+        valueRange = None
+        for i in range(0, 1000, 70):
+            valueRange = reduceUtil.mergeValueRanges(valueRange, 
+                reduceUtil.getValueRange(arr[i:i + 70]))
+        self.assertEqual(valueRange, (values.min(), values.max()))
+        for (bins, binRange) in ((7, valueRange), (4, (-1, 1)), ([-2, 0, 0.5, 3], None)):
+            accumulator = reduceUtil.HistogramAccumulator(bins, binRange)
+            self.addBlocks(lambda block, rowStart: accumulator.add(block), arr, 70)
+            result = accumulator.getResult()
+            (counts, edges) = np.histogram(values, bins, binRange)
+            self.assertTrue(np.array_equal(result['counts'], counts))
+            self.assertTrue(np.array_equal(result['edges'], edges))
+        self.assertEqual(reduceUtil.getValueRange(np.array([np.nan])), None)
+        self.assertRaises(ValueError, reduceUtil.HistogramAccumulator, [3, 1, 2])
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
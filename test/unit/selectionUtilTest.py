@@ -0,0 +1,83 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import numpy as np
+ 
+
+sys.path.append('../../server')
+import selectionUtil
+
+
+class SelectionUtilTest(unittest.TestCase):
+        
+    def testParse(self):
+        parse = selectionUtil.parseSelection
+        self.assertEqual(parse('[0:1000:2, 5, ::10]', (2000, 10, 100)), 
+            [slice(0, 1000, 2), 5, slice(0, 100, 10)])
+        self.assertEqual(parse('-10:, [3, -1, 3]', (20, 10)), [slice(10, 20, 1), [3, 9, 3]])
+        self.assertEqual(parse('[..., -2]', (20, 10, 3)), 
+            [slice(0, 20, 1), slice(0, 10, 1), 1])
+        self.assertEqual(parse('[[3, 1]]', (20,)), [[3, 1]])
+        self.assertEqual(parse('[1:]', (20, 4)), [slice(1, 20, 1), slice(0, 4, 1)])
+        self.assertEqual(parse('[5:2]', (20,)), [slice(5, 5, 1)])
+        self.assertEqual(parse('', ()), [])
+        for text in ('[1, 2, 3]', '[[1], [2]]', '::-1', '20', '-21', '[1:2', '1.5', 
+                '..., ...', '[[]]', '1:2:3:4', 'x'):
+            try:
+                parse(text, (20, 4))
+                self.fail("expected ValueError for: " + text)
+            except ValueError:
+                pass
+            
+    def testShape(self):
+        selection = [slice(0, 10, 3), 4, [5, 1, 5]]
+        shape = (10, 5, 6)
+        self.assertEqual(selectionUtil.getSelectionShape(selection, shape), (4, 3))
+        self.assertEqual(selectionUtil.getSelectionCount(selection, shape), 12)
+        self.assertEqual(selectionUtil.getHyperslab(selection), None)
+        self.assertEqual(selectionUtil.getHyperslab(selection, bounding=True), 
+            (slice(0, 10, 3), slice(4, 5, 1), slice(1, 6, 1)))
+        (args, axis, order) = selectionUtil.getSortedSelection(selection)
+        self.assertEqual(args, (slice(0, 10, 3), 4, [1, 5]))
+        self.assertEqual(axis, 1)
+        data = np.arange(10 * 5 * 6).reshape(shape)
+        self.assertTrue(np.array_equal(np.take(data[args], order, axis), 
+            data[:, 4][::3][:, [5, 1, 5]]))
+        self.assertEqual(selectionUtil.getSortedSelection([[1, 2], 0]), (([1, 2], 0), None, None))
+        
+    def testFastPaths(self):
+        shape = (100, 20, 30)
+        isContiguous = selectionUtil.isContiguous
+        self.assertTrue(isContiguous([slice(5, 10, 1), slice(0, 20, 1), slice(0, 30, 1)], shape))
+        self.assertTrue(isContiguous([3, 4, slice(2, 9, 1)], shape))
+        self.assertTrue(isContiguous([3, slice(4, 6, 1), slice(0, 30, 1)], shape))
+        self.assertFalse(isContiguous([slice(5, 10, 1), slice(0, 20, 1), slice(0, 29, 1)], shape))
+        self.assertFalse(isContiguous([3, 4, slice(2, 9, 2)], shape))
+        self.assertFalse(isContiguous([3, 4, [2, 3]], shape))
+        self.assertFalse(isContiguous([3, 4, slice(2, 2, 1)], shape))
+        chunks = (10, 8, 30)
+        isChunkAligned = selectionUtil.isChunkAligned
+        self.assertTrue(isChunkAligned([slice(10, 30, 1), slice(8, 20, 1), slice(0, 30, 1)], 
+            shape, chunks))
+        self.assertFalse(isChunkAligned([slice(10, 30, 1), slice(8, 19, 1), slice(0, 30, 1)], 
+            shape, chunks))
+        self.assertFalse(isChunkAligned([slice(10, 30, 2), slice(8, 16, 1), slice(0, 30, 1)], 
+            shape, chunks))
+        self.assertFalse(isChunkAligned([slice(0, 10, 1), slice(0, 8, 1), slice(0, 30, 1)], 
+            shape, None))
+        
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
@@ -0,0 +1,68 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import json
+import os
+import sys
+ 
+
+sys.path.append('../../server')
+import config
+import slowLogUtil
+
+
+class SlowLogUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(SlowLogUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def setUp(self):
+        self.logFile = config.get('slow_request_log')
+        if os.path.exists(self.logFile):
+            os.remove(self.logFile)
+            
+    def tearDown(self):
+        if os.path.exists(self.logFile):
+            os.remove(self.logFile)
+        
+    def testLogRequest(self):
+        self.assertTrue(slowLogUtil.isEnabled())
+        fast = { 'uri': '/datasets/abc/value', 'elapsed': 1.0 }
+        self.assertFalse(slowLogUtil.logRequest(fast))
+        self.assertFalse(os.path.exists(self.logFile))
+        slow = { 'uri': '/datasets/abc/value', 'elapsed': 250.0,
+            'selectionSize': 1000, 'responseBytes': 4321 }
+        self.assertTrue(slowLogUtil.logRequest(slow))
+        self.assertTrue(slowLogUtil.logRequest(slow))
+        with open(self.logFile) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 2)
+        entry = json.loads(lines[0])
+        self.assertEqual(entry['uri'], '/datasets/abc/value')
+        self.assertEqual(entry['selectionSize'], 1000)
+        self.assertEqual(entry['responseBytes'], 4321)
+        
+    def testDisabled(self):
+        logFile = config.cfg['slow_request_log']
+        config.cfg['slow_request_log'] = None
+        try:
+            self.assertFalse(slowLogUtil.isEnabled())
+            self.assertFalse(slowLogUtil.logRequest({'elapsed': 5000.0}))
+        finally:
+            config.cfg['slow_request_log'] = logFile
+        self.assertFalse(os.path.exists(self.logFile))
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
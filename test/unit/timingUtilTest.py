@@ -0,0 +1,64 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import time
+import sys
+ 
+
+sys.path.append('../../server')
+from timingUtil import RequestTimer, nullTimer
+
+
+class TimingUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TimingUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def testPhases(self):
+        timer = RequestTimer()
+        with timer.phase('domain'):
+            pass
+        with timer.phase('read'):
+            time.sleep(0.01)
+        with timer.phase('read'):
+            time.sleep(0.01)
+        self.assertEqual(timer.names, ['domain', 'read'])
+        self.assertTrue(timer.getTime('read') >= 0.02)
+        self.assertEqual(timer.getTime('encode'), 0.0)
+        header = timer.getServerTimingHeader()
+        self.assertTrue(header.startswith('domain;dur='))
+        self.assertTrue(header.find(', read;dur=') > 0)
+        self.assertTrue(header.find(', total;dur=') > 0)
+        
+    def testPhaseException(self):
+        timer = RequestTimer()
+        try:
+            with timer.phase('read'):
+                raise IOError()
+        except IOError:
+            pass
+        self.assertEqual(timer.names, ['read'])
+        
+    def testDisabled(self):
+        timer = RequestTimer(enabled=False)
+        with timer.phase('read'):
+            pass
+        self.assertEqual(timer.names, [])
+        with nullTimer.phase('read'):
+            pass
+        self.assertEqual(nullTimer.names, [])
+            
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
@@ -0,0 +1,72 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+ 
+
+sys.path.append('../../server')
+import uploadUtil
+
+
+class UploadUtilTest(unittest.TestCase):
+        
+    def testUploadType(self):
+        self.assertEqual(uploadUtil.getUploadType('application/octet-stream'), 
+            'application/octet-stream')
+        self.assertEqual(uploadUtil.getUploadType('application/x-ndjson; charset=utf-8'), 
+            'application/x-ndjson')
+        self.assertEqual(uploadUtil.getUploadType('application/json'), None)
+        
+    def testRowBuffer(self):
+        # 3 byte rows, 2 rows per slab, 5 rows in the selection
+        buf = uploadUtil.RowBuffer(3, 2, 5)
+        self.assertEqual(buf.add('abcd'), [])
+        self.assertEqual(buf.add('efghijklm'), [(0, 'abcdef'), (2, 'ghijkl')])
+        self.assertEqual(buf.add('no'), [])
+        self.assertEqual(buf.finish(), (4, 'mno'))
+        # too much data, or not enough
+        buf = uploadUtil.RowBuffer(3, 2, 2)
+        self.assertRaises(ValueError, buf.add, 'abcdefg')
+        buf = uploadUtil.RowBuffer(3, 2, 2)
+        self.assertEqual(buf.add('abcd'), [])
+        self.assertRaises(ValueError, buf.finish)
+        buf = uploadUtil.RowBuffer(3, 1, 2)
+        self.assertEqual(buf.add('abcdef'), [(0, 'abc'), (1, 'def')])
+        self.assertEqual(buf.finish(), None)
+        
+    def testLineBuffer(self):
+        buf = uploadUtil.LineBuffer(2, 4, 100)
+        self.assertEqual(buf.add('[1, 2]\n[3,'), [])
+        self.assertEqual(buf.add(' 4]\n\n[5, 6]\n[7'), [(0, [[1, 2], [3, 4]])])
+        self.assertEqual(buf.add(', 8]\n'), [(2, [[5, 6], [7, 8]])])
+        self.assertEqual(buf.finish(), None)
+        self.assertEqual(buf.rows, 4)
+        # the last line doesn't need a newline
+        buf = uploadUtil.LineBuffer(2, 3, 100)
+        self.assertEqual(buf.add('1\n2\n3'), [(0, [1, 2])])
+        self.assertEqual(buf.finish(), (2, [3]))
+        for (text, maxRows) in (('1\n2\n3\n', 2), ('1\n{', 2), ('1\n', 2)):
+            buf = uploadUtil.LineBuffer(10, maxRows, 100)
+            try:
+                buf.add(text)
+                buf.finish()
+                self.fail("expected ValueError for: " + text)
+            except ValueError:
+                pass
+        buf = uploadUtil.LineBuffer(10, 2, 4)
+        self.assertRaises(ValueError, buf.add, '[1, 2, 3]')
+        
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
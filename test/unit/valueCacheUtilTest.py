@@ -0,0 +1,130 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import os
+import sys
+import numpy as np
+import h5py
+ 
+
+sys.path.append('../../server')
+import config
+import valueCacheUtil
+from hdf5db import Hdf5db
+
+
+class ValueCacheUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ValueCacheUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def setUp(self):
+        self.savedCfg = dict(config.cfg)
+        config.cfg['value_cache_size'] = 1000
+        valueCacheUtil.clear()
+        valueCacheUtil.resetStats()
+            
+    def tearDown(self):
+        valueCacheUtil.clear()
+        config.cfg.clear()
+        config.cfg.update(self.savedCfg)
+        if os.path.exists('valuecache.h5'):
+            os.remove('valuecache.h5')
+        
+    def testGetKey(self):
+        shape = (10, 20)
+        key1 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, Ellipsis, 1.0)
+        key2 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, 
+            (slice(0, 10, 1), slice(None)), 1.0)
+        self.assertEqual(key1, key2)
+        key3 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, Ellipsis, 2.0)
+        self.assertNotEqual(key1, key3)
+        # projections of a compound type are cached separately
+        key4 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, Ellipsis, 1.0, ['x'])
+        self.assertNotEqual(key1, key4)
+        key5 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, Ellipsis, 1.0, op=('histogram', 10))
+        self.assertNotEqual(key1, key5)
+        # an index drops its dimension, so it isn't the same as a slice of one
+        key6 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, (2, [3, 1]), 1.0)
+        key7 = valueCacheUtil.getKey('a.h5', 'uuid1', shape, (slice(2, 3), [3, 1]), 1.0)
+        self.assertNotEqual(key6, key7)
+        
+    def testEviction(self):
+        keys = []
+        for i in range(5):
+            key = valueCacheUtil.getKey('a.h5', 'uuid' + str(i), (50,), Ellipsis, 1.0)
+            keys.append(key)
+            arr = np.zeros((50,), dtype='i4')  # 200 bytes
+            self.assertTrue(valueCacheUtil.put(key, arr))
+            self.assertFalse(arr.flags.writeable)
+        self.assertEqual(valueCacheUtil.getStats()['size'], 1000)
+        # touch the oldest, so the second one gets evicted next
+        self.assertTrue(valueCacheUtil.get(keys[0]) is not None)
+        key = valueCacheUtil.getKey('a.h5', 'uuid5', (50,), Ellipsis, 1.0)
+        self.assertTrue(valueCacheUtil.put(key, np.zeros((50,), dtype='i4')))
+        self.assertTrue(valueCacheUtil.get(keys[0]) is not None)
+        self.assertEqual(valueCacheUtil.get(keys[1]), None)
+        # too big to cache
+        self.assertFalse(valueCacheUtil.put(key, np.zeros((100,), dtype='i4')))
+        stats = valueCacheUtil.getStats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['count'], 5)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        
+    def testInvalidate(self):
+        f = h5py.File('valuecache.h5', 'w')
+        f.create_dataset('dset', data=np.arange(100, dtype='i4'), maxshape=(None,))
+        f.close()
+        with Hdf5db('valuecache.h5') as db:
+            dsetUuid = db.getUUIDByPath('/dset')
+            selection = (slice(0, 10),)
+            values = db.getDatasetValuesByUuid(dsetUuid, selection)
+            self.assertEqual(values[0], 0)
+            values = db.getDatasetValuesByUuid(dsetUuid, selection)
+            self.assertEqual(valueCacheUtil.getStats()['hits'], 1)
+            db.setDatasetValuesByUuid(dsetUuid, [42]*10, selection)
+            self.assertEqual(valueCacheUtil.getStats()['count'], 0)
+            values = db.getDatasetValuesByUuid(dsetUuid, selection)
+            self.assertEqual(values[0], 42)
+            db.resizeDataset(dsetUuid, (200,))
+            self.assertEqual(valueCacheUtil.getStats()['count'], 0)
+            values = db.getDatasetValuesByUuid(dsetUuid, Ellipsis, asArray=True)
+            self.assertEqual(values.shape, (200,))
+        stats = valueCacheUtil.getStats()
+        self.assertEqual(stats['invalidations'], 2)
+        self.assertEqual(stats['hits'], 1)
+        
+    def testStalePut(self):
+        # a read that overlapped a write (invalidated while reading) isn't cached
+        key = valueCacheUtil.getKey('a.h5', 'uuid1', (10,), (slice(0, 10),), 0)
+        generation = valueCacheUtil.getGeneration('a.h5', 'uuid1')
+        valueCacheUtil.invalidate('a.h5', 'uuid1')
+        self.assertFalse(valueCacheUtil.put(key, np.arange(10), generation))
+        self.assertEqual(valueCacheUtil.get(key), None)
+        generation = valueCacheUtil.getGeneration('a.h5', 'uuid1')
+        valueCacheUtil.invalidateFile('a.h5')
+        self.assertFalse(valueCacheUtil.put(key, np.arange(10), generation))
+        # other datasets aren't affected
+        otherKey = valueCacheUtil.getKey('a.h5', 'uuid2', (10,), (slice(0, 10),), 0)
+        generation = valueCacheUtil.getGeneration('a.h5', 'uuid2')
+        valueCacheUtil.invalidate('a.h5', 'uuid1')
+        self.assertTrue(valueCacheUtil.put(otherKey, np.arange(10), generation))
+        generation = valueCacheUtil.getGeneration('a.h5', 'uuid1')
+        self.assertTrue(valueCacheUtil.put(key, np.arange(10), generation))
+        self.assertEqual(valueCacheUtil.getStats()['count'], 2)
+    
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
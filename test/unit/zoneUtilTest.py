@@ -0,0 +1,59 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import numpy as np
+ 
+
+sys.path.append('../../server')
+import zoneUtil
+
+
+class ZoneUtilTest(unittest.TestCase):
+        
+    def testZones(self):
+        dt = np.dtype([('a', 'f4'), ('b', 'S4'), ('c', 'i8'), ('d', ('i4', (2,)))])
+        self.assertEqual(zoneUtil.getZoneFields(dt), ['a', 'c'])
+        self.assertEqual(zoneUtil.getZoneFields(np.dtype('u2')), [None])
+        self.assertEqual(zoneUtil.getZoneFields(np.dtype('S8')), [])
+        self.assertEqual(zoneUtil.getZoneShape((100, 7), (20, 4), 8, 1000), (20, 4))
+        self.assertEqual(zoneUtil.getZoneShape((100, 7), None, 8, 1000), (17, 7))
+        self.assertEqual(zoneUtil.getZoneGrid((100, 7), (20, 4)), (5, 2))
+        
+        shape = (100, 7)
+        slices = (slice(5, 95, 10), slice(0, 7, 1))
+        gridSlices = zoneUtil.getZoneGridSlices(slices, shape, (20, 4))
+        self.assertEqual(gridSlices, (slice(0, 5), slice(0, 2)))
+        self.assertEqual(len(zoneUtil.getGridPositions(gridSlices)), 10)
+        self.assertEqual(zoneUtil.getZoneSelection((1, 1), (20, 4), slices, shape), 
+            (slice(25, 40, 10), slice(4, 7, 1)))
+        # no selected rows in the zone
+        slices = (slice(5, 100, 50), slice(0, 7, 1))
+        self.assertEqual(zoneUtil.getZoneSelection((1, 0), (20, 4), slices, shape), None)
+        
+    def testStats(self):
+        self.assertEqual(zoneUtil.getZoneStats(np.array([[3, 1], [7, 2]])), (1, 7, 0))
+        self.assertEqual(zoneUtil.getZoneStats(np.array([np.nan, 1.0, 3.0])), (1.0, 3.0, 1))
+        (low, high, nulls) = zoneUtil.getZoneStats(np.array([np.nan, np.nan]))
+        self.assertTrue(np.isnan(low) and np.isnan(high))
+        self.assertEqual(nulls, 2)
+        self.assertTrue(zoneUtil.zoneMayMatch(1, 3, (3, True, None, False)))
+        self.assertFalse(zoneUtil.zoneMayMatch(1, 3, (3, False, None, False)))
+        self.assertFalse(zoneUtil.zoneMayMatch(1, 3, (None, False, 0, True)))
+        self.assertTrue(zoneUtil.zoneMayMatch(1, 3, (2, True, 2, True)))
+        self.assertFalse(zoneUtil.zoneMayMatch(np.nan, np.nan, (None, False, None, False)))
+        
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()